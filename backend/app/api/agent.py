@@ -734,16 +734,6 @@ async def create_task(
         task_id=task.id,
         tag_ids=normalized_tag_ids,
     )
-    await session.commit()
-    await session.refresh(task)
-    record_activity(
-        session,
-        event_type="task.created",
-        task_id=task.id,
-        message=f"Task created by lead: {task.title}.",
-        agent_id=agent_ctx.agent.id,
-    )
-    await session.commit()
     if task.assigned_agent_id:
         assigned_agent = await Agent.objects.by_id(task.assigned_agent_id).first(
             session,
@@ -755,6 +745,16 @@ async def create_task(
                 task=task,
                 agent=assigned_agent,
             )
+    await session.commit()
+    await session.refresh(task)
+    record_activity(
+        session,
+        event_type="task.created",
+        task_id=task.id,
+        message=f"Task created by lead: {task.title}.",
+        agent_id=agent_ctx.agent.id,
+    )
+    await session.commit()
     return await tasks_api._task_read_response(
         session,
         task=task,
@@ -20,7 +20,6 @@ from app.api.deps import (
     get_board_for_user_write,
     require_admin_or_agent,
 )
-from app.core.logging import get_logger
 from app.core.time import utcnow
 from app.db.pagination import paginate
 from app.db.session import async_session_maker, get_session
@@ -29,7 +28,6 @@ from app.models.approvals import Approval
 from app.models.tasks import Task
 from app.schemas.approvals import ApprovalCreate, ApprovalRead, ApprovalStatus, ApprovalUpdate
 from app.schemas.pagination import DefaultLimitOffsetPage
-from app.services.activity_log import record_activity
 from app.services.approval_task_links import (
     load_task_ids_by_approval,
     lock_tasks_for_approval,
@@ -38,7 +36,7 @@ from app.services.approval_task_links import (
     replace_approval_task_links,
     task_counts_for_board,
 )
-from app.services.openclaw.gateway_dispatch import GatewayDispatchService
+from app.services.openclaw.outbox import OutboxActivity, enqueue_agent_message
 
 if TYPE_CHECKING:
     from collections.abc import AsyncIterator, Sequence
@@ -49,7 +47,6 @@ if TYPE_CHECKING:
     from app.models.boards import Board
 
 router = APIRouter(prefix="/boards/{board_id}/approvals", tags=["approvals"])
-logger = get_logger(__name__)
 
 STREAM_POLL_SECONDS = 2
 STATUS_FILTER_QUERY = Query(default=None, alias="status")
@@ -238,12 +235,7 @@ async def _notify_lead_on_approval_resolution(
     if approval.status not in {"approved", "rejected"}:
         return
     lead = await _resolve_board_lead(session, board_id=board.id)
-    if lead is None or not lead.openclaw_session_id:
-        return
-
-    dispatch = GatewayDispatchService(session)
-    config = await dispatch.optional_gateway_config_for_board(board)
-    if config is None:
+    if lead is None:
         return
 
     task_ids_by_approval = await load_task_ids_by_approval(session, approval_ids=[approval.id])
@@ -252,30 +244,20 @@ async def _notify_lead_on_approval_resolution(
         approval=approval,
         task_ids=task_ids_by_approval.get(approval.id, []),
     )
-    error = await dispatch.try_send_agent_message(
-        session_key=lead.openclaw_session_id,
-        config=config,
-        agent_name=lead.name,
+    # Staged in the outbox; delivered once the approval update commits.
+    enqueue_agent_message(
+        session,
+        board=board,
+        agent=lead,
         message=message,
-        deliver=False,
-    )
-    if error is None:
-        record_activity(
-            session,
-            event_type="approval.lead_notified",
-            message=f"Lead agent notified for {approval.status} approval {approval.id}.",
-            agent_id=lead.id,
-            task_id=approval.task_id,
-        )
-    else:
-        record_activity(
-            session,
-            event_type="approval.lead_notify_failed",
-            message=f"Lead notify failed for approval {approval.id}: {error}",
-            agent_id=lead.id,
+        activity=OutboxActivity(
+            notified_event_type="approval.lead_notified",
+            notified_message=f"Lead agent notified for {approval.status} approval {approval.id}.",
+            failed_event_type="approval.lead_notify_failed",
+            failed_message=f"Lead notify failed for approval {approval.id}",
             task_id=approval.task_id,
-        )
-    await session.commit()
+        ),
+    )
 
 
 async def _fetch_approval_events(
@@ -465,21 +447,13 @@ async def update_approval(
         if approval.status != "pending":
             approval.resolved_at = utcnow()
     session.add(approval)
+    if approval.status in {"approved", "rejected"} and approval.status != prior_status:
+        await _notify_lead_on_approval_resolution(
+            session=session,
+            board=board,
+            approval=approval,
+        )
     await session.commit()
     await session.refresh(approval)
-    if approval.status in {"approved", "rejected"} and approval.status != prior_status:
-        try:
-            await _notify_lead_on_approval_resolution(
-                session=session,
-                board=board,
-                approval=approval,
-            )
-        except Exception:
-            logger.exception(
-                "approval.lead_notify_unexpected board_id=%s approval_id=%s status=%s",
-                board.id,
-                approval.id,
-                approval.status,
-            )
     reads = await _approval_reads(session, [approval])
     return reads[0]
@@ -34,7 +34,7 @@ from app.models.users import User
 from app.schemas.board_group_memory import BoardGroupMemoryCreate, BoardGroupMemoryRead
 from app.schemas.pagination import DefaultLimitOffsetPage
 from app.services.mentions import extract_mentions, matches_agent_mention
-from app.services.openclaw.gateway_dispatch import GatewayDispatchService
+from app.services.openclaw.outbox import enqueue_agent_message
 from app.services.organizations import (
     is_org_admin,
     list_accessible_board_ids,
@@ -246,7 +246,6 @@ def _group_header(*, is_broadcast: bool, mentioned: bool) -> str:
 @dataclass(frozen=True)
 class _NotifyGroupContext:
     session: AsyncSession
-    dispatch: GatewayDispatchService
     group: BoardGroup
     board_by_id: dict[UUID, Board]
     mentions: set[str]
@@ -256,20 +255,16 @@ class _NotifyGroupContext:
     base_url: str
 
 
-async def _notify_group_target(
+def _notify_group_target(
     context: _NotifyGroupContext,
     agent: Agent,
 ) -> None:
-    session_key = agent.openclaw_session_id
     board_id = agent.board_id
-    if not session_key or board_id is None:
+    if board_id is None:
         return
     board = context.board_by_id.get(board_id)
     if board is None:
         return
-    config = await context.dispatch.optional_gateway_config_for_board(board)
-    if config is None:
-        return
     header = _group_header(
         is_broadcast=context.is_broadcast,
         mentioned=matches_agent_mention(agent, context.mentions),
@@ -283,14 +278,7 @@ async def _notify_group_target(
         f"POST {context.base_url}/api/v1/boards/{board.id}/group-memory\n"
         'Body: {"content":"...","tags":["chat"]}'
     )
-    error = await context.dispatch.try_send_agent_message(
-        session_key=session_key,
-        config=config,
-        agent_name=agent.name,
-        message=message,
-    )
-    if error is not None:
-        return
+    enqueue_agent_message(context.session, board=board, agent=agent, message=message)
 
 
 async def _notify_group_memory_targets(
@@ -335,7 +323,6 @@ async def _notify_group_memory_targets(
 
     context = _NotifyGroupContext(
         session=session,
-        dispatch=GatewayDispatchService(session),
         group=group,
         board_by_id=board_by_id,
         mentions=mentions,
@@ -345,7 +332,7 @@ async def _notify_group_memory_targets(
         base_url=base_url,
     )
     for agent in targets.values():
-        await _notify_group_target(context, agent)
+        _notify_group_target(context, agent)
 
 
 @group_router.get("", response_model=DefaultLimitOffsetPage[BoardGroupMemoryRead])
@@ -433,15 +420,16 @@ async def create_board_group_memory(
         source=source,
     )
     session.add(memory)
-    await session.commit()
-    await session.refresh(memory)
     if should_notify:
+        # Notifications go to the outbox in the same commit as the memory entry.
         await _notify_group_memory_targets(
             session=session,
             group=group,
             memory=memory,
             actor=actor,
         )
+    await session.commit()
+    await session.refresh(memory)
     return memory
 
 
@@ -625,15 +613,16 @@ async def create_board_group_memory_for_board(
         source=source,
     )
     session.add(memory)
-    await session.commit()
-    await session.refresh(memory)
     if should_notify:
+        # Notifications go to the outbox in the same commit as the memory entry.
         await _notify_group_memory_targets(
             session=session,
             group=group,
             memory=memory,
             actor=actor,
         )
+    await session.commit()
+    await session.refresh(memory)
     return memory
 
 
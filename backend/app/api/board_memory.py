@@ -28,8 +28,7 @@ from app.models.board_memory import BoardMemory
 from app.schemas.board_memory import BoardMemoryCreate, BoardMemoryRead
 from app.schemas.pagination import DefaultLimitOffsetPage
 from app.services.mentions import extract_mentions, matches_agent_mention
-from app.services.openclaw.gateway_dispatch import GatewayDispatchService
-from app.services.openclaw.gateway_rpc import GatewayConfig as GatewayClientConfig
+from app.services.openclaw.outbox import enqueue_agent_message
 
 if TYPE_CHECKING:
     from collections.abc import AsyncIterator
@@ -99,8 +98,6 @@ async def _send_control_command(
     session: AsyncSession,
     board: Board,
     actor: ActorContext,
-    dispatch: GatewayDispatchService,
-    config: GatewayClientConfig,
     command: str,
 ) -> None:
     pause_targets: list[Agent] = await Agent.objects.filter_by(
@@ -111,17 +108,13 @@ async def _send_control_command(
     for agent in pause_targets:
         if actor.actor_type == "agent" and actor.agent and agent.id == actor.agent.id:
             continue
-        if not agent.openclaw_session_id:
-            continue
-        error = await dispatch.try_send_agent_message(
-            session_key=agent.openclaw_session_id,
-            config=config,
-            agent_name=agent.name,
+        enqueue_agent_message(
+            session,
+            board=board,
+            agent=agent,
             message=command,
             deliver=True,
         )
-        if error is not None:
-            continue
 
 
 def _chat_targets(
@@ -157,11 +150,7 @@ async def _notify_chat_targets(
     memory: BoardMemory,
     actor: ActorContext,
 ) -> None:
-    if not memory.content:
-        return
-    dispatch = GatewayDispatchService(session)
-    config = await dispatch.optional_gateway_config_for_board(board)
-    if config is None:
+    if not memory.content or board.gateway_id is None:
         return
 
     normalized = memory.content.strip()
@@ -173,8 +162,6 @@ async def _notify_chat_targets(
             session=session,
             board=board,
             actor=actor,
-            dispatch=dispatch,
-            config=config,
             command=command,
         )
         return
@@ -206,14 +193,7 @@ async def _notify_chat_targets(
             f"POST {base_url}/api/v1/agent/boards/{board.id}/memory\n"
             'Body: {"content":"...","tags":["chat"]}'
         )
-        error = await dispatch.try_send_agent_message(
-            session_key=agent.openclaw_session_id,
-            config=config,
-            agent_name=agent.name,
-            message=message,
-        )
-        if error is not None:
-            continue
+        enqueue_agent_message(session, board=board, agent=agent, message=message)
 
 
 @router.get("", response_model=DefaultLimitOffsetPage[BoardMemoryRead])
@@ -294,13 +274,14 @@ async def create_board_memory(
         source=source,
     )
     session.add(memory)
-    await session.commit()
-    await session.refresh(memory)
     if is_chat:
+        # Notifications go to the outbox in the same commit as the memory entry.
         await _notify_chat_targets(
             session=session,
             board=board,
             memory=memory,
             actor=actor,
         )
+    await session.commit()
+    await session.refresh(memory)
     return memory
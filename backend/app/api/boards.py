@@ -37,6 +37,7 @@ from app.services.board_snapshot import build_board_snapshot
 from app.services.openclaw.gateway_dispatch import GatewayDispatchService
 from app.services.openclaw.gateway_rpc import GatewayConfig as GatewayClientConfig
 from app.services.openclaw.gateway_rpc import OpenClawGatewayError
+from app.services.organization_access_cache import invalidate_organization_board_access
 from app.services.organizations import OrganizationContext, board_access_filter
 
 if TYPE_CHECKING:
@@ -397,6 +398,8 @@ async def create_board(
     """Create a board in the active organization."""
     data = payload.model_dump()
     data["organization_id"] = ctx.organization.id
+    # Members with org-wide access gain the new board.
+    invalidate_organization_board_access(session, ctx.organization.id)
     return await crud.create(session, Board, **data)
 
 
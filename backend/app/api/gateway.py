@@ -5,20 +5,25 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from fastapi import APIRouter, Depends, Query
+from sqlmodel import col, select
 
 from app.api.deps import require_org_admin
 from app.core.auth import AuthContext, get_auth_context
 from app.db.session import get_session
+from app.models.gateways import Gateway
 from app.schemas.common import OkResponse
 from app.schemas.gateway_api import (
     GatewayCommandsResponse,
     GatewayResolveQuery,
+    GatewayRpcMetricSeries,
+    GatewayRpcMetricsResponse,
     GatewaySessionHistoryResponse,
     GatewaySessionMessageRequest,
     GatewaySessionResponse,
     GatewaySessionsResponse,
     GatewaysStatusResponse,
 )
+from app.services.openclaw.gateway_metrics import get_gateway_rpc_metrics
 from app.services.openclaw.gateway_rpc import GATEWAY_EVENTS, GATEWAY_METHODS, PROTOCOL_VERSION
 from app.services.openclaw.session_service import GatewaySessionService
 from app.services.organizations import OrganizationContext
@@ -150,3 +155,34 @@ async def gateway_commands(
         methods=GATEWAY_METHODS,
         events=GATEWAY_EVENTS,
     )
+
+
+@router.get("/rpc-metrics", response_model=GatewayRpcMetricsResponse)
+async def gateway_rpc_metrics(
+    session: AsyncSession = SESSION_DEP,
+    ctx: OrganizationContext = ORG_ADMIN_DEP,
+) -> GatewayRpcMetricsResponse:
+    """Return this process's RPC latency series for the organization's gateways."""
+    gateway_ids = {
+        str(gateway_id)
+        for gateway_id in await session.exec(
+            select(Gateway.id).where(col(Gateway.organization_id) == ctx.organization.id),
+        )
+    }
+    return GatewayRpcMetricsResponse(
+        series=[
+            GatewayRpcMetricSeries(
+                gateway_id=item.key.gateway,
+                phase=item.key.phase,
+                method=item.key.method,
+                outcome=item.key.outcome,
+                count=item.count,
+                sum_seconds=item.sum_seconds,
+                p50_seconds=item.quantile(0.5),
+                p95_seconds=item.quantile(0.95),
+                p99_seconds=item.quantile(0.99),
+            )
+            for item in get_gateway_rpc_metrics().snapshot()
+            if item.key.gateway in gateway_ids
+        ],
+    )
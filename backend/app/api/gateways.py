@@ -9,6 +9,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel import col
 
 from app.api.deps import require_org_admin
+from app.core.agent_token_cache import invalidate_agent_token_cache
 from app.core.auth import AuthContext, get_auth_context
 from app.db import crud
 from app.db.pagination import paginate
@@ -274,6 +275,7 @@ async def delete_gateway(
     if main_agent is not None:
         await service.clear_agent_foreign_keys(agent_id=main_agent.id)
         await session.delete(main_agent)
+        await invalidate_agent_token_cache(main_agent.id)
 
     duplicate_main_agents = await Agent.objects.filter_by(
         gateway_id=gateway.id,
@@ -284,6 +286,7 @@ async def delete_gateway(
             continue
         await service.clear_agent_foreign_keys(agent_id=agent.id)
         await session.delete(agent)
+        await invalidate_agent_token_cache(agent.id)
 
     # NOTE: The migration declares `ondelete="CASCADE"` for gateway_installed_skills.gateway_id,
     # but some backends/test environments (e.g. SQLite without FK pragma) may not
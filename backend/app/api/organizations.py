@@ -53,6 +53,7 @@ from app.schemas.organizations import (
     OrganizationUserRead,
 )
 from app.schemas.pagination import DefaultLimitOffsetPage
+from app.services.organization_access_cache import invalidate_organization_board_access
 from app.services.organizations import (
     OrganizationContext,
     accept_invite,
@@ -395,6 +396,7 @@ async def delete_my_org(
         col(Organization.id) == org_id,
         commit=False,
     )
+    invalidate_organization_board_access(session, org_id)
     await session.commit()
     return OkResponse()
 
@@ -57,9 +57,7 @@ from app.services.approval_task_links import (
     pending_approval_conflicts_by_task,
 )
 from app.services.mentions import extract_mentions, matches_agent_mention
-from app.services.openclaw.gateway_dispatch import GatewayDispatchService
-from app.services.openclaw.gateway_rpc import GatewayConfig as GatewayClientConfig
-from app.services.openclaw.gateway_rpc import OpenClawGatewayError
+from app.services.openclaw.outbox import OutboxActivity, enqueue_agent_message
 from app.services.organizations import require_board_access
 from app.services.tags import (
     TagState,
@@ -67,6 +65,11 @@ from app.services.tags import (
     replace_tags,
     validate_tag_ids,
 )
+from app.services.task_comment_notifications import (
+    QueuedTaskCommentNotification,
+    deliver_task_comment_notification,
+    enqueue_task_comment_notification,
+)
 from app.services.task_dependencies import (
     blocked_by_dependency_ids,
     dependency_ids_by_task_id,
@@ -500,36 +503,24 @@ def _serialize_comment(event: ActivityEvent) -> dict[str, object]:
     return TaskCommentRead.model_validate(event).model_dump(mode="json")
 
 
-async def _send_lead_task_message(
-    *,
-    dispatch: GatewayDispatchService,
-    session_key: str,
-    config: GatewayClientConfig,
-    message: str,
-) -> OpenClawGatewayError | None:
-    return await dispatch.try_send_agent_message(
-        session_key=session_key,
-        config=config,
-        agent_name="Lead Agent",
-        message=message,
-        deliver=False,
-    )
+def _task_notification_message(*, headline: str, board: Board, task: Task, action: str) -> str:
+    description = _truncate_snippet(task.description or "")
+    details = [
+        f"Board: {board.name}",
+        f"Task: {task.title}",
+        f"Task ID: {task.id}",
+        f"Status: {task.status}",
+    ]
+    if description:
+        details.append(f"Description: {description}")
+    return f"{headline}\n" + "\n".join(details) + f"\n\nTake action: {action}"
 
 
-async def _send_agent_task_message(
-    *,
-    dispatch: GatewayDispatchService,
-    session_key: str,
-    config: GatewayClientConfig,
-    agent_name: str,
-    message: str,
-) -> OpenClawGatewayError | None:
-    return await dispatch.try_send_agent_message(
-        session_key=session_key,
-        config=config,
-        agent_name=agent_name,
-        message=message,
-        deliver=False,
+async def _board_lead(session: AsyncSession, board: Board) -> Agent | None:
+    return (
+        await Agent.objects.filter_by(board_id=board.id)
+        .filter(col(Agent.is_board_lead).is_(True))
+        .first(session)
     )
 
 
@@ -540,51 +531,25 @@ async def _notify_agent_on_task_assign(
     task: Task,
     agent: Agent,
 ) -> None:
-    if not agent.openclaw_session_id:
-        return
-    dispatch = GatewayDispatchService(session)
-    config = await dispatch.optional_gateway_config_for_board(board)
-    if config is None:
-        return
-    description = _truncate_snippet(task.description or "")
-    details = [
-        f"Board: {board.name}",
-        f"Task: {task.title}",
-        f"Task ID: {task.id}",
-        f"Status: {task.status}",
-    ]
-    if description:
-        details.append(f"Description: {description}")
-    message = (
-        "TASK ASSIGNED\n"
-        + "\n".join(details)
-        + ("\n\nTake action: open the task and begin work. " "Post updates as task comments.")
-    )
-    error = await _send_agent_task_message(
-        dispatch=dispatch,
-        session_key=agent.openclaw_session_id,
-        config=config,
-        agent_name=agent.name,
-        message=message,
-    )
-    if error is None:
-        record_activity(
-            session,
-            event_type="task.assignee_notified",
-            message=f"Agent notified for assignment: {agent.name}.",
-            agent_id=agent.id,
-            task_id=task.id,
-        )
-        await session.commit()
-    else:
-        record_activity(
-            session,
-            event_type="task.assignee_notify_failed",
-            message=f"Assignee notify failed: {error}",
-            agent_id=agent.id,
+    # Staged in the outbox; delivered once the caller commits.
+    enqueue_agent_message(
+        session,
+        board=board,
+        agent=agent,
+        message=_task_notification_message(
+            headline="TASK ASSIGNED",
+            board=board,
+            task=task,
+            action="open the task and begin work. Post updates as task comments.",
+        ),
+        activity=OutboxActivity(
+            notified_event_type="task.assignee_notified",
+            notified_message=f"Agent notified for assignment: {agent.name}.",
+            failed_event_type="task.assignee_notify_failed",
+            failed_message="Assignee notify failed",
             task_id=task.id,
-        )
-        await session.commit()
+        ),
+    )
 
 
 async def notify_agent_on_task_assign(
@@ -594,7 +559,7 @@ async def notify_agent_on_task_assign(
     task: Task,
     agent: Agent,
 ) -> None:
-    """Notify an assignee via gateway after task assignment."""
+    """Stage an assignee notification in the outbox; the caller commits it."""
     await _notify_agent_on_task_assign(
         session=session,
         board=board,
@@ -609,55 +574,28 @@ async def _notify_lead_on_task_create(
     board: Board,
     task: Task,
 ) -> None:
-    lead = (
-        await Agent.objects.filter_by(board_id=board.id)
-        .filter(col(Agent.is_board_lead).is_(True))
-        .first(session)
-    )
-    if lead is None or not lead.openclaw_session_id:
-        return
-    dispatch = GatewayDispatchService(session)
-    config = await dispatch.optional_gateway_config_for_board(board)
-    if config is None:
+    lead = await _board_lead(session, board)
+    if lead is None:
         return
-    description = _truncate_snippet(task.description or "")
-    details = [
-        f"Board: {board.name}",
-        f"Task: {task.title}",
-        f"Task ID: {task.id}",
-        f"Status: {task.status}",
-    ]
-    if description:
-        details.append(f"Description: {description}")
-    message = (
-        "NEW TASK ADDED\n"
-        + "\n".join(details)
-        + "\n\nTake action: triage, assign, or plan next steps."
-    )
-    error = await _send_lead_task_message(
-        dispatch=dispatch,
-        session_key=lead.openclaw_session_id,
-        config=config,
-        message=message,
-    )
-    if error is None:
-        record_activity(
-            session,
-            event_type="task.lead_notified",
-            message=f"Lead agent notified for task: {task.title}.",
-            agent_id=lead.id,
-            task_id=task.id,
-        )
-        await session.commit()
-    else:
-        record_activity(
-            session,
-            event_type="task.lead_notify_failed",
-            message=f"Lead notify failed: {error}",
-            agent_id=lead.id,
+    enqueue_agent_message(
+        session,
+        board=board,
+        agent=lead,
+        agent_name="Lead Agent",
+        message=_task_notification_message(
+            headline="NEW TASK ADDED",
+            board=board,
+            task=task,
+            action="triage, assign, or plan next steps.",
+        ),
+        activity=OutboxActivity(
+            notified_event_type="task.lead_notified",
+            notified_message=f"Lead agent notified for task: {task.title}.",
+            failed_event_type="task.lead_notify_failed",
+            failed_message="Lead notify failed",
             task_id=task.id,
-        )
-        await session.commit()
+        ),
+    )
 
 
 async def _notify_lead_on_task_unassigned(
@@ -666,55 +604,28 @@ async def _notify_lead_on_task_unassigned(
     board: Board,
     task: Task,
 ) -> None:
-    lead = (
-        await Agent.objects.filter_by(board_id=board.id)
-        .filter(col(Agent.is_board_lead).is_(True))
-        .first(session)
-    )
-    if lead is None or not lead.openclaw_session_id:
+    lead = await _board_lead(session, board)
+    if lead is None:
         return
-    dispatch = GatewayDispatchService(session)
-    config = await dispatch.optional_gateway_config_for_board(board)
-    if config is None:
-        return
-    description = _truncate_snippet(task.description or "")
-    details = [
-        f"Board: {board.name}",
-        f"Task: {task.title}",
-        f"Task ID: {task.id}",
-        f"Status: {task.status}",
-    ]
-    if description:
-        details.append(f"Description: {description}")
-    message = (
-        "TASK BACK IN INBOX\n"
-        + "\n".join(details)
-        + "\n\nTake action: assign a new owner or adjust the plan."
-    )
-    error = await _send_lead_task_message(
-        dispatch=dispatch,
-        session_key=lead.openclaw_session_id,
-        config=config,
-        message=message,
-    )
-    if error is None:
-        record_activity(
-            session,
-            event_type="task.lead_unassigned_notified",
-            message=f"Lead notified task returned to inbox: {task.title}.",
-            agent_id=lead.id,
-            task_id=task.id,
-        )
-        await session.commit()
-    else:
-        record_activity(
-            session,
-            event_type="task.lead_unassigned_notify_failed",
-            message=f"Lead notify failed: {error}",
-            agent_id=lead.id,
+    enqueue_agent_message(
+        session,
+        board=board,
+        agent=lead,
+        agent_name="Lead Agent",
+        message=_task_notification_message(
+            headline="TASK BACK IN INBOX",
+            board=board,
+            task=task,
+            action="assign a new owner or adjust the plan.",
+        ),
+        activity=OutboxActivity(
+            notified_event_type="task.lead_unassigned_notified",
+            notified_message=f"Lead notified task returned to inbox: {task.title}.",
+            failed_event_type="task.lead_unassigned_notify_failed",
+            failed_message="Lead notify failed",
             task_id=task.id,
-        )
-        await session.commit()
+        ),
+    )
 
 
 def _status_values(status_filter: str | None) -> list[str]:
@@ -1329,16 +1240,6 @@ async def create_task(
         task_id=task.id,
         tag_ids=normalized_tag_ids,
     )
-    await session.commit()
-    await session.refresh(task)
-
-    record_activity(
-        session,
-        event_type="task.created",
-        task_id=task.id,
-        message=f"Task created: {task.title}.",
-    )
-    await session.commit()
     await _notify_lead_on_task_create(session=session, board=board, task=task)
     if task.assigned_agent_id:
         assigned_agent = await Agent.objects.by_id(task.assigned_agent_id).first(
@@ -1351,6 +1252,16 @@ async def create_task(
                 task=task,
                 agent=assigned_agent,
             )
+    await session.commit()
+    await session.refresh(task)
+
+    record_activity(
+        session,
+        event_type="task.created",
+        task_id=task.id,
+        message=f"Task created: {task.title}.",
+    )
+    await session.commit()
     return await _task_read_response(
         session,
         task=task,
@@ -1612,26 +1523,15 @@ async def _notify_task_comment_targets(
     *,
     request: _TaskCommentNotifyRequest,
 ) -> None:
-    import logging
-    logger = logging.getLogger(__name__)
-    logger.info("comment_notify: targets=%s mention_names=%s", list(request.targets.keys()), request.mention_names)
-    if not request.targets:
-        logger.info("comment_notify: no targets, skipping")
+    if not request.targets or not request.task.board_id:
         return
-    board = (
-        await Board.objects.by_id(request.task.board_id).first(session)
-        if request.task.board_id
-        else None
-    )
+    board = await Board.objects.by_id(request.task.board_id).first(session)
     if board is None:
         return
-    dispatch = GatewayDispatchService(session)
-    config = await dispatch.optional_gateway_config_for_board(board)
-    if not config:
-        return
 
     snippet = _truncate_snippet(request.message)
     actor_name = _comment_actor_name(request.actor)
+    messages: dict[UUID, str] = {}
     for agent in request.targets.values():
         if not agent.openclaw_session_id:
             continue
@@ -1642,7 +1542,7 @@ async def _notify_task_comment_targets(
             if mentioned
             else "A new comment was posted on your task."
         )
-        notification = (
+        messages[agent.id] = (
             f"{header}\n"
             f"Board: {board.name}\n"
             f"Task: {request.task.title}\n"
@@ -1653,14 +1553,18 @@ async def _notify_task_comment_targets(
             "If you are mentioned but not assigned, reply in the task "
             "thread but do not change task status."
         )
-        logger.info("comment_notify: sending to agent=%s session=%s", agent.name, agent.openclaw_session_id)
-        error = await _send_agent_task_message(
-            dispatch=dispatch,
-            session_key=agent.openclaw_session_id,
-            config=config,
-            agent_name=agent.name,
-            message=notification,
-        )
+    if not messages:
+        return
+    item = QueuedTaskCommentNotification(
+        board_id=board.id,
+        task_id=request.task.id,
+        messages=messages,
+        created_at=utcnow(),
+    )
+    # Delivery happens in the queue worker; only fall back to sending inline when the
+    # queue is unavailable so notifications are not lost.
+    if not enqueue_task_comment_notification(item):
+        await deliver_task_comment_notification(item)
 
 
 @dataclass(slots=True)
@@ -2055,9 +1959,9 @@ async def _apply_lead_task_update(
         previous_status=update.previous_status,
         actor_agent_id=update.actor.agent.id,
     )
+    await _lead_notify_new_assignee(session, update=update)
     await session.commit()
     await session.refresh(update.task)
-    await _lead_notify_new_assignee(session, update=update)
     return await _task_read_response(
         session,
         task=update.task,
@@ -2395,11 +2299,11 @@ async def _finalize_updated_task(
         )
 
     session.add(update.task)
+    await _notify_task_update_assignment_changes(session, update=update)
     await session.commit()
     await session.refresh(update.task)
     await _record_task_comment_from_update(session, update=update)
     await _record_task_update_activity(session, update=update)
-    await _notify_task_update_assignment_changes(session, update=update)
 
     return await _task_read_response(
         session,
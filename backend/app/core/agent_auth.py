@@ -4,10 +4,17 @@ This module is used for *agent-originated* API calls (as opposed to human users)
 
 Key ideas:
 - Agents authenticate with an opaque token presented as `X-Agent-Token: <token>`.
+- Tokens are located through an indexed, non-secret lookup key so only one
+  PBKDF2 hash is verified per request. Agents minted before lookup keys existed
+  are matched by a legacy scan once and backfilled on that first success.
+- Recently verified tokens are cached (see `app.core.agent_token_cache`) so
+  polling agents skip the PBKDF2 verification entirely on repeat requests.
 - For convenience, some deployments may also allow `Authorization: Bearer <token>`
   for agents (controlled by caller/dependency).
 - To reduce write-amplification, we only touch `Agent.last_seen_at` at a fixed
-  interval and we avoid touching it for safe/read-only HTTP methods.
+  interval, and touches are coalesced by the presence aggregator
+  (`app.services.agent_presence`) into periodic bulk UPDATEs instead of
+  per-request commits.
 
 This is intentionally separate from user authentication (Clerk/local bearer token)
 so we can evolve agent policy independently.
@@ -22,7 +29,13 @@ from typing import TYPE_CHECKING, Literal
 from fastapi import Depends, Header, HTTPException, Request, status
 from sqlmodel import col, select
 
-from app.core.agent_tokens import verify_agent_token
+from app.core.agent_token_cache import get_agent_token_cache
+from app.core.agent_tokens import (
+    agent_token_lookup_key,
+    agent_token_needs_rehash,
+    hash_agent_token_async,
+    verify_agent_token_async,
+)
 from app.core.logging import get_logger
 from app.core.time import utcnow
 from app.db.session import get_session
@@ -34,7 +47,6 @@ if TYPE_CHECKING:
 logger = get_logger(__name__)
 
 _LAST_SEEN_TOUCH_INTERVAL = timedelta(seconds=30)
-_SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
 SESSION_DEP = Depends(get_session)
 
 
@@ -47,14 +59,57 @@ class AgentAuthContext:
 
 
 async def _find_agent_for_token(session: AsyncSession, token: str) -> Agent | None:
+    lookup = agent_token_lookup_key(token)
+    agent = (
+        await session.exec(
+            select(Agent).where(col(Agent.agent_token_lookup) == lookup),
+        )
+    ).first()
+    if agent is not None:
+        cache = get_agent_token_cache()
+        if await cache.get(lookup) == agent.id:
+            return agent
+        if agent.agent_token_hash and await verify_agent_token_async(
+            token,
+            agent.agent_token_hash,
+        ):
+            await cache.set(lookup, agent.id)
+            return agent
+        return None
+    return await _find_legacy_agent_for_token(session, token, lookup=lookup)
+
+
+async def _find_legacy_agent_for_token(
+    session: AsyncSession,
+    token: str,
+    *,
+    lookup: str,
+) -> Agent | None:
+    """Match agents that predate lookup keys and backfill them on success.
+
+    Only rows without a lookup key are scanned, so this path shrinks to nothing
+    as existing agents authenticate (or get their tokens rotated).
+    """
     agents = list(
         await session.exec(
-            select(Agent).where(col(Agent.agent_token_hash).is_not(None)),
+            select(Agent)
+            .where(col(Agent.agent_token_hash).is_not(None))
+            .where(col(Agent.agent_token_lookup).is_(None)),
         ),
     )
     for agent in agents:
-        if agent.agent_token_hash and verify_agent_token(token, agent.agent_token_hash):
-            return agent
+        if not agent.agent_token_hash or not await verify_agent_token_async(
+            token,
+            agent.agent_token_hash,
+        ):
+            continue
+        agent.agent_token_lookup = lookup
+        if agent_token_needs_rehash(agent.agent_token_hash):
+            agent.agent_token_hash = await hash_agent_token_async(token)
+        session.add(agent)
+        await session.commit()
+        logger.info("agent auth backfilled token lookup key agent_id=%s", agent.id)
+        return agent
     return None
 
 
@@ -78,31 +133,26 @@ def _resolve_agent_token(
     return None
 
 
-async def _touch_agent_presence(
-    request: Request,
-    session: AsyncSession,
-    agent: Agent,
-) -> None:
+async def _touch_agent_presence(agent: Agent) -> None:
     """Best-effort update of last_seen/status for any authenticated agent request.
 
     Heartbeats are the primary presence mechanism, but agents may still make API
     calls (task comments, memory updates, etc). Touch presence so the UI reflects
-    real activity even if the heartbeat loop isn't running.
+    real activity even if the heartbeat loop isn't running. The touch is recorded
+    in the presence aggregator and written on its next bulk flush.
     """
+    # Imported here so `app.core` does not depend on `app.services` at import time.
+    from app.services.agent_presence import get_presence_aggregator
+
     now = utcnow()
-    if agent.last_seen_at is not None and now - agent.last_seen_at < _LAST_SEEN_TOUCH_INTERVAL:
-        return
-
-    agent.last_seen_at = now
-    agent.updated_at = now
-    if agent.status not in {"updating", "deleting"}:
-        agent.status = "online"
-    session.add(agent)
-
-    # For safe HTTP methods, endpoints typically do not commit. Persist the touch
-    # so agents that only poll/read still show as online.
-    if request.method.upper() in _SAFE_METHODS:
-        await session.commit()
+    aggregator = get_presence_aggregator()
+    pending = aggregator.pending(agent.id)
+    last_seen = agent.last_seen_at
+    if pending is not None and (last_seen is None or pending.seen_at > last_seen):
+        last_seen = pending.seen_at
+    if last_seen is None or now - last_seen >= _LAST_SEEN_TOUCH_INTERVAL:
+        await aggregator.record(agent.id, seen_at=now)
+    aggregator.apply(agent)
 
 
 async def get_agent_auth_context(
@@ -133,7 +183,7 @@ async def get_agent_auth_context(
             resolved[:6],
         )
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
-    await _touch_agent_presence(request, session, agent)
+    await _touch_agent_presence(agent)
     return AgentAuthContext(actor_type="agent", agent=agent)
 
 
@@ -166,5 +216,5 @@ async def get_agent_auth_context_optional(
             resolved[:6],
         )
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
-    await _touch_agent_presence(request, session, agent)
+    await _touch_agent_presence(agent)
     return AgentAuthContext(actor_type="agent", agent=agent)
@@ -0,0 +1,253 @@
+"""Bounded cache of recently verified agent tokens.
+
+Agent requests poll frequently, and every request would otherwise pay a full
+PBKDF2 verification. Once a token has been verified against an agent row, its
+lookup digest is remembered for a short TTL so repeated requests skip the KDF.
+
+Safety notes:
+- Entries are keyed by the token lookup digest (never the plaintext token) and
+  map to the agent id that the digest resolved to when it was verified.
+- A hit is only trusted when the indexed row lookup returns that same agent, so
+  a rotated or deleted token can never authenticate from a stale entry.
+- Token rotation and agent deletion invalidate entries explicitly as well. The
+  Redis backend shares entries (and therefore invalidation) across replicas.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable
+from typing import Any, Protocol, cast
+from uuid import UUID
+
+import redis
+import redis.asyncio
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+_REDIS_KEY_PREFIX = "mc:agent-token-cache"
+# A slow Redis must not stall authentication; on timeout the cache just misses.
+_REDIS_TIMEOUT_SECONDS = 0.5
+
+
+class AgentTokenCache(Protocol):
+    """Storage interface for verified token digests."""
+
+    async def get(self, digest: str) -> UUID | None:
+        """Return the agent id cached for a verified token digest."""
+        ...
+
+    async def set(self, digest: str, agent_id: UUID) -> None:
+        """Remember that a token digest verified for an agent."""
+        ...
+
+    async def invalidate_agent(self, agent_id: UUID) -> None:
+        """Drop every cached digest that maps to an agent."""
+        ...
+
+    async def clear(self) -> None:
+        """Drop all cached entries."""
+        ...
+
+
+class NullAgentTokenCache:
+    """Cache implementation used when caching is disabled."""
+
+    async def get(self, digest: str) -> UUID | None:
+        del digest
+        return None
+
+    async def set(self, digest: str, agent_id: UUID) -> None:
+        del digest, agent_id
+
+    async def invalidate_agent(self, agent_id: UUID) -> None:
+        del agent_id
+
+    async def clear(self) -> None:
+        return None
+
+
+class InMemoryAgentTokenCache:
+    """Process-local LRU cache with a per-entry TTL."""
+
+    def __init__(self, *, max_entries: int, ttl_seconds: float) -> None:
+        self._max_entries = max(0, max_entries)
+        self._ttl_seconds = max(0.0, ttl_seconds)
+        self._entries: OrderedDict[str, tuple[UUID, float]] = OrderedDict()
+        self._digests_by_agent: dict[UUID, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _discard(self, digest: str) -> None:
+        entry = self._entries.pop(digest, None)
+        if entry is None:
+            return
+        digests = self._digests_by_agent.get(entry[0])
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._digests_by_agent[entry[0]]
+
+    async def get(self, digest: str) -> UUID | None:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            agent_id, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._discard(digest)
+                return None
+            self._entries.move_to_end(digest)
+            return agent_id
+
+    async def set(self, digest: str, agent_id: UUID) -> None:
+        if self._max_entries == 0 or self._ttl_seconds == 0:
+            return
+        with self._lock:
+            self._discard(digest)
+            self._entries[digest] = (agent_id, time.monotonic() + self._ttl_seconds)
+            self._digests_by_agent.setdefault(agent_id, set()).add(digest)
+            while len(self._entries) > self._max_entries:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+
+    async def invalidate_agent(self, agent_id: UUID) -> None:
+        with self._lock:
+            for digest in list(self._digests_by_agent.get(agent_id, ())):
+                self._discard(digest)
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._digests_by_agent.clear()
+
+
+class RedisAgentTokenCache:
+    """Redis-backed cache shared by all API replicas.
+
+    Redis failures degrade to cache misses (full verification) rather than
+    failing authentication.
+    """
+
+    def __init__(
+        self,
+        client: redis.asyncio.Redis,
+        *,
+        ttl_seconds: float,
+        key_prefix: str = _REDIS_KEY_PREFIX,
+    ) -> None:
+        self._client = client
+        self._ttl_ms = max(0, int(ttl_seconds * 1000))
+        self._key_prefix = key_prefix
+
+    def _token_key(self, digest: str) -> str:
+        return f"{self._key_prefix}:token:{digest}"
+
+    def _agent_key(self, agent_id: UUID) -> str:
+        return f"{self._key_prefix}:agent:{agent_id}"
+
+    async def get(self, digest: str) -> UUID | None:
+        try:
+            raw = await self._client.get(self._token_key(digest))
+        except redis.RedisError as exc:
+            logger.warning("agent_token_cache.redis.get_failed error=%s", exc)
+            return None
+        if raw is None:
+            return None
+        value = raw.decode("utf-8") if isinstance(raw, bytes) else str(raw)
+        try:
+            return UUID(value)
+        except ValueError:
+            return None
+
+    async def set(self, digest: str, agent_id: UUID) -> None:
+        if self._ttl_ms == 0:
+            return
+        agent_key = self._agent_key(agent_id)
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            pipe.set(self._token_key(digest), str(agent_id), px=self._ttl_ms)
+            pipe.sadd(agent_key, digest)
+            pipe.pexpire(agent_key, self._ttl_ms)
+            await pipe.execute()
+        except redis.RedisError as exc:
+            logger.warning("agent_token_cache.redis.set_failed error=%s", exc)
+
+    async def invalidate_agent(self, agent_id: UUID) -> None:
+        agent_key = self._agent_key(agent_id)
+        try:
+            members = await cast(Awaitable[set[Any]], self._client.smembers(agent_key))
+            keys = [
+                self._token_key(m.decode("utf-8") if isinstance(m, bytes) else str(m))
+                for m in members
+            ]
+            await self._client.delete(agent_key, *keys)
+        except redis.RedisError as exc:
+            logger.warning(
+                "agent_token_cache.redis.invalidate_failed agent_id=%s error=%s",
+                agent_id,
+                exc,
+            )
+
+    async def clear(self) -> None:
+        try:
+            keys = [key async for key in self._client.scan_iter(match=f"{self._key_prefix}:*")]
+            if keys:
+                await self._client.delete(*keys)
+        except redis.RedisError as exc:
+            logger.warning("agent_token_cache.redis.clear_failed error=%s", exc)
+
+
+_cache: AgentTokenCache | None = None
+_cache_lock = threading.Lock()
+
+
+def _build_cache() -> AgentTokenCache:
+    backend = settings.agent_token_cache_backend
+    if backend == "off":
+        return NullAgentTokenCache()
+    if backend == "redis":
+        redis_url = settings.agent_token_cache_redis_url or settings.rq_redis_url
+        return RedisAgentTokenCache(
+            redis.asyncio.Redis.from_url(
+                redis_url,
+                socket_timeout=_REDIS_TIMEOUT_SECONDS,
+                socket_connect_timeout=_REDIS_TIMEOUT_SECONDS,
+            ),
+            ttl_seconds=settings.agent_token_cache_ttl_seconds,
+        )
+    return InMemoryAgentTokenCache(
+        max_entries=settings.agent_token_cache_max_entries,
+        ttl_seconds=settings.agent_token_cache_ttl_seconds,
+    )
+
+
+def get_agent_token_cache() -> AgentTokenCache:
+    """Return the process-wide verified-token cache configured in settings."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = _build_cache()
+    return _cache
+
+
+def set_agent_token_cache(cache: AgentTokenCache | None) -> None:
+    """Replace the process-wide cache (``None`` rebuilds it from settings lazily)."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
+
+
+async def invalidate_agent_token_cache(*agent_ids: UUID) -> None:
+    """Invalidate cached token verifications for the given agents."""
+    cache = get_agent_token_cache()
+    for agent_id in agent_ids:
+        await cache.invalidate_agent(agent_id)
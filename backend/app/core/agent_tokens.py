@@ -1,14 +1,32 @@
-"""Token generation and verification helpers for agent authentication."""
+"""Token generation and verification helpers for agent authentication.
+
+PBKDF2 is deliberately slow, so async callers should use the `*_async`
+variants: they run the KDF in a dedicated executor (threads by default, or a
+process pool) behind a concurrency limit instead of blocking the event loop.
+"""
 
 from __future__ import annotations
 
+import asyncio
 import base64
 import hashlib
 import hmac
 import secrets
+import threading
+import time
+import weakref
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TypeVar
+
+from app.core.config import settings
 
 ITERATIONS = 200_000
 SALT_BYTES = 16
+LOOKUP_KEY_PREFIX = b"openclaw-agent-token-lookup:"
+
+T = TypeVar("T")
 
 
 def generate_agent_token() -> str:
@@ -25,6 +43,15 @@ def _b64decode(value: str) -> bytes:
     return base64.urlsafe_b64decode(value + padding)
 
 
+def agent_token_lookup_key(token: str) -> str:
+    """Return the deterministic, indexable lookup key for a plaintext token.
+
+    Tokens are 256-bit random values, so a single SHA-256 pass is enough to make
+    the key non-reversible; the PBKDF2 hash stays the actual credential check.
+    """
+    return hashlib.sha256(LOOKUP_KEY_PREFIX + token.encode("utf-8")).hexdigest()
+
+
 def hash_agent_token(token: str) -> str:
     """Hash an agent token using PBKDF2-HMAC-SHA256 with a random salt."""
     salt = secrets.token_bytes(SALT_BYTES)
@@ -53,3 +80,164 @@ def verify_agent_token(token: str, stored_hash: str) -> bool:
         iterations_int,
     )
     return hmac.compare_digest(candidate, expected_digest)
+
+
+def agent_token_needs_rehash(stored_hash: str) -> bool:
+    """Return whether a stored hash uses parameters older than the current ones."""
+    parts = stored_hash.split("$")
+    if len(parts) != 4 or parts[0] != "pbkdf2_sha256":
+        return True
+    return parts[1] != str(ITERATIONS)
+
+
+@dataclass(frozen=True)
+class AgentTokenCryptoStats:
+    """Snapshot of agent-token crypto executor usage."""
+
+    calls: int
+    in_flight: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+    run_seconds_total: float
+
+
+class _CryptoStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.in_flight = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.run_seconds_total = 0.0
+
+    def started(self, wait_seconds: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+    def finished(self, run_seconds: float) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.run_seconds_total += run_seconds
+
+    def snapshot(self) -> AgentTokenCryptoStats:
+        with self._lock:
+            return AgentTokenCryptoStats(
+                calls=self.calls,
+                in_flight=self.in_flight,
+                wait_seconds_total=self.wait_seconds_total,
+                wait_seconds_max=self.wait_seconds_max,
+                run_seconds_total=self.run_seconds_total,
+            )
+
+
+_stats = _CryptoStats()
+_executor: Executor | None = None
+_executor_lock = threading.Lock()
+_semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _crypto_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = settings.agent_token_crypto_max_workers
+                if settings.agent_token_crypto_executor == "process":
+                    _executor = ProcessPoolExecutor(max_workers=workers)
+                else:
+                    _executor = ThreadPoolExecutor(
+                        max_workers=workers,
+                        thread_name_prefix="agent-token-crypto",
+                    )
+    return _executor
+
+
+def _crypto_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(settings.agent_token_crypto_max_concurrency)
+        _semaphores[loop] = semaphore
+    return semaphore
+
+
+async def _run_crypto(func: Callable[..., T], *args: str) -> T:
+    """Run a CPU-bound token function in the crypto executor.
+
+    Wait time covers queueing behind the concurrency limit, which is where
+    contention shows up when `max_concurrency <= max_workers` (the default).
+    """
+    queued_at = time.perf_counter()
+    async with _crypto_semaphore():
+        started_at = time.perf_counter()
+        _stats.started(started_at - queued_at)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_crypto_executor(), func, *args)
+        finally:
+            _stats.finished(time.perf_counter() - started_at)
+
+
+async def hash_agent_token_async(token: str) -> str:
+    """Hash an agent token without blocking the event loop."""
+    return await _run_crypto(hash_agent_token, token)
+
+
+async def verify_agent_token_async(token: str, stored_hash: str) -> bool:
+    """Verify an agent token without blocking the event loop."""
+    return await _run_crypto(verify_agent_token, token, stored_hash)
+
+
+def agent_token_crypto_stats() -> AgentTokenCryptoStats:
+    """Return cumulative usage/wait statistics for the crypto executor."""
+    return _stats.snapshot()
+
+
+def render_agent_token_crypto_metrics() -> str:
+    """Render crypto executor usage in the Prometheus text format."""
+    stats = agent_token_crypto_stats()
+    prefix = "mission_control_agent_token_crypto"
+    series = (
+        ("calls_total", "counter", "Agent token hash/verify calls.", stats.calls),
+        ("in_flight", "gauge", "Agent token crypto calls running now.", stats.in_flight),
+        (
+            "wait_seconds_total",
+            "counter",
+            "Seconds calls waited for the crypto concurrency limit.",
+            stats.wait_seconds_total,
+        ),
+        (
+            "wait_seconds_max",
+            "gauge",
+            "Longest wait for the crypto concurrency limit.",
+            stats.wait_seconds_max,
+        ),
+        (
+            "run_seconds_total",
+            "counter",
+            "Seconds spent running agent token crypto.",
+            stats.run_seconds_total,
+        ),
+    )
+    lines: list[str] = []
+    for name, kind, help_text, value in series:
+        lines += [
+            f"# HELP {prefix}_{name} {help_text}",
+            f"# TYPE {prefix}_{name} {kind}",
+            f"{prefix}_{name} {value!r}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def shutdown_agent_token_crypto() -> None:
+    """Shut down the crypto executor (it is recreated lazily on next use)."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
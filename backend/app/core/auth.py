@@ -5,7 +5,8 @@ This module resolves an authenticated *user* from inbound HTTP requests.
 Auth modes:
 - `local`: a single shared bearer token (`LOCAL_AUTH_TOKEN`) for self-hosted
   deployments.
-- `clerk`: Clerk JWT authentication for multi-user deployments.
+- `clerk`: Clerk JWT authentication for multi-user deployments. Session tokens
+  are verified locally against a cached JWKS (see `app.core.clerk_tokens`).
 
 The public surface area is the `get_auth_context*` dependencies, which return an
 `AuthContext` used across API routers.
@@ -25,13 +26,18 @@ import httpx
 from clerk_backend_api import Clerk
 from clerk_backend_api.models.clerkerrors import ClerkErrors
 from clerk_backend_api.models.sdkerror import SDKError
-from clerk_backend_api.security.types import AuthenticateRequestOptions, AuthStatus, RequestState
+from clerk_backend_api.security.types import (
+    AuthenticateRequestOptions,
+    AuthErrorReason,
+    AuthStatus,
+    RequestState,
+)
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import BaseModel, ValidationError
-from starlette.concurrency import run_in_threadpool
 
 from app.core.auth_mode import AuthMode
+from app.core.clerk_tokens import get_clerk_session_verifier, session_token_from_headers, signed_out
 from app.core.config import settings
 from app.core.logging import get_logger
 from app.db import crud
@@ -195,15 +201,14 @@ def _make_authenticate_request_options() -> AuthenticateRequestOptions:
 
 
 async def _authenticate_clerk_request(request: Request) -> RequestState:
-    # The SDK docs use httpx.Request as the request object; build one from the ASGI request.
-    httpx_request = httpx.Request(
-        request.method,
-        str(request.url),
-        headers=dict(request.headers),
-    )
-    options = _make_authenticate_request_options()
-    sdk = Clerk(bearer_auth=options.secret_key or "")
-    return await run_in_threadpool(sdk.authenticate_request, httpx_request, options)
+    # Verify locally against the cached JWKS (networkless `jwt_key` flow of the SDK);
+    # repeat requests with the same session token are served from the verified cache.
+    if not _make_authenticate_request_options().secret_key:
+        return signed_out(AuthErrorReason.SECRET_KEY_MISSING)
+    token = session_token_from_headers(request)
+    if token is None:
+        return signed_out(AuthErrorReason.SESSION_TOKEN_MISSING)
+    return await get_clerk_session_verifier().authenticate(request, token)
 
 
 async def _fetch_clerk_profile(clerk_user_id: str) -> tuple[str | None, str | None]:
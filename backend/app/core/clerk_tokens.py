@@ -0,0 +1,356 @@
+"""Local Clerk session-token verification with cached JWKS and results.
+
+The Clerk SDK's `authenticate_request` is networkless when given a `jwt_key`,
+so this module keeps Clerk's signing keys (JWKS) in process and verifies
+session tokens on the event loop instead of hopping to a threadpool and
+possibly fetching keys remotely on every request.
+
+Caching model:
+- JWKS: fetched once, refreshed in the background, and re-fetched on demand
+  when a token carries an unknown `kid` (rate-limited so garbage tokens cannot
+  hammer Clerk).
+- Verified session tokens: keyed by a SHA-256 digest of the token and kept
+  only until the token's own `exp`, so a cache hit never outlives the JWT.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from http.cookies import SimpleCookie
+from typing import Any
+
+import httpx
+from clerk_backend_api.security.authenticaterequest import authenticate_request
+from clerk_backend_api.security.types import (
+    AuthenticateRequestOptions,
+    AuthErrorReason,
+    AuthStatus,
+    Requestish,
+    RequestState,
+    TokenVerificationErrorReason,
+)
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicNumbers
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+_JWKS_FETCH_TIMEOUT_SECONDS = 5.0
+_JWKS_MIN_REFETCH_SECONDS = 30.0
+
+
+@dataclass(frozen=True)
+class ClerkAuthStats:
+    """Snapshot of Clerk verification cache and latency counters."""
+
+    cache_hits: int
+    cache_misses: int
+    verifications: int
+    verification_seconds_total: float
+    verification_seconds_max: float
+    jwks_fetches: int
+    jwks_fetch_failures: int
+
+    @property
+    def cache_hit_rate(self) -> float:
+        total = self.cache_hits + self.cache_misses
+        return self.cache_hits / total if total else 0.0
+
+
+def _b64url_decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def _unverified_kid(token: str) -> str | None:
+    try:
+        header = json.loads(_b64url_decode(token.split(".", 1)[0]))
+    except (ValueError, IndexError):
+        return None
+    kid = header.get("kid") if isinstance(header, dict) else None
+    return kid if isinstance(kid, str) else None
+
+
+def _jwk_to_pem(jwk: dict[str, Any]) -> str | None:
+    if jwk.get("kty") != "RSA":
+        return None
+    try:
+        public_key = RSAPublicNumbers(
+            e=int.from_bytes(_b64url_decode(str(jwk["e"])), "big"),
+            n=int.from_bytes(_b64url_decode(str(jwk["n"])), "big"),
+        ).public_key()
+    except (KeyError, ValueError):
+        return None
+    pem = public_key.public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    return pem.decode("utf-8")
+
+
+def signed_out(reason: AuthErrorReason | TokenVerificationErrorReason) -> RequestState:
+    """Build a signed-out request state with a reason."""
+    return RequestState(status=AuthStatus.SIGNED_OUT, reason=reason)
+
+
+def _jwks_url() -> str:
+    base = (settings.clerk_api_url or "https://api.clerk.com").strip().rstrip("/")
+    if not base.endswith("/v1"):
+        base = f"{base}/v1"
+    return f"{base}/jwks"
+
+
+class ClerkJwksCache:
+    """Clerk signing keys (kid -> PEM) with background and on-demand refresh."""
+
+    def __init__(self) -> None:
+        self._keys: dict[str, str] = {}
+        self._last_fetch: float | None = None
+        self._lock = asyncio.Lock()
+        self.fetches = 0
+        self.fetch_failures = 0
+
+    async def refresh(self) -> bool:
+        """Fetch the JWKS from Clerk and replace the cached keys."""
+        self._last_fetch = time.monotonic()
+        self.fetches += 1
+        try:
+            async with httpx.AsyncClient(timeout=_JWKS_FETCH_TIMEOUT_SECONDS) as client:
+                response = await client.get(
+                    _jwks_url(),
+                    headers={
+                        "Accept": "application/json",
+                        "Authorization": f"Bearer {settings.clerk_secret_key.strip()}",
+                    },
+                )
+                response.raise_for_status()
+                payload = response.json()
+        except (httpx.HTTPError, ValueError) as exc:
+            self.fetch_failures += 1
+            logger.warning("auth.clerk.jwks.fetch_failed error=%s", exc)
+            return False
+        raw_keys = payload.get("keys") if isinstance(payload, dict) else None
+        keys: dict[str, str] = {}
+        for jwk in raw_keys if isinstance(raw_keys, list) else []:
+            if not isinstance(jwk, dict) or not isinstance(jwk.get("kid"), str):
+                continue
+            pem = _jwk_to_pem(jwk)
+            if pem is not None:
+                keys[jwk["kid"]] = pem
+        if not keys:
+            self.fetch_failures += 1
+            logger.warning("auth.clerk.jwks.empty")
+            return False
+        self._keys = keys
+        logger.debug("auth.clerk.jwks.refreshed keys=%s", len(keys))
+        return True
+
+    async def key_for(self, kid: str) -> str | None:
+        """Return the PEM for a key id, re-fetching the JWKS if it is unknown."""
+        pem = self._keys.get(kid)
+        if pem is not None:
+            return pem
+        async with self._lock:
+            pem = self._keys.get(kid)
+            if pem is not None:
+                return pem
+            # Rate-limited even with no keys cached, so a Clerk outage at startup does
+            # not turn every request into a blocking refetch.
+            if (
+                self._last_fetch is not None
+                and time.monotonic() - self._last_fetch < _JWKS_MIN_REFETCH_SECONDS
+            ):
+                return None
+            await self.refresh()
+            return self._keys.get(kid)
+
+    async def run(self, interval_seconds: float) -> None:
+        """Refresh the JWKS forever at a fixed interval (cancel to stop)."""
+        while True:
+            async with self._lock:
+                await self.refresh()
+            await asyncio.sleep(interval_seconds)
+
+
+class ClerkSessionVerifier:
+    """Verifies Clerk session tokens locally and caches results until `exp`."""
+
+    def __init__(self, jwks: ClerkJwksCache, *, max_entries: int) -> None:
+        self.jwks = jwks
+        self._max_entries = max(0, max_entries)
+        self._verified: OrderedDict[str, tuple[dict[str, Any], float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._verifications = 0
+        self._verification_seconds_total = 0.0
+        self._verification_seconds_max = 0.0
+
+    def _cached_claims(self, digest: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._verified.get(digest)
+            if entry is not None and entry[1] > time.time():
+                self._verified.move_to_end(digest)
+                self._hits += 1
+                return dict(entry[0])
+            if entry is not None:
+                del self._verified[digest]
+            self._misses += 1
+            return None
+
+    def _remember(self, digest: str, claims: dict[str, Any]) -> None:
+        exp = claims.get("exp")
+        if self._max_entries == 0 or not isinstance(exp, (int, float)):
+            return
+        with self._lock:
+            self._verified[digest] = (dict(claims), float(exp))
+            self._verified.move_to_end(digest)
+            while len(self._verified) > self._max_entries:
+                self._verified.popitem(last=False)
+
+    def _record_verification(self, seconds: float) -> None:
+        with self._lock:
+            self._verifications += 1
+            self._verification_seconds_total += seconds
+            self._verification_seconds_max = max(self._verification_seconds_max, seconds)
+
+    async def authenticate(self, request: Requestish, token: str) -> RequestState:
+        """Authenticate a request whose session token has already been extracted."""
+        digest = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        claims = self._cached_claims(digest)
+        if claims is not None:
+            return RequestState(status=AuthStatus.SIGNED_IN, token=token, payload=claims)
+
+        kid = _unverified_kid(token)
+        if kid is None:
+            return signed_out(TokenVerificationErrorReason.TOKEN_INVALID)
+        pem = await self.jwks.key_for(kid)
+        if pem is None:
+            return signed_out(TokenVerificationErrorReason.JWK_KID_MISMATCH)
+
+        started = time.perf_counter()
+        state = authenticate_request(
+            request,
+            AuthenticateRequestOptions(
+                jwt_key=pem,
+                clock_skew_in_ms=int(settings.clerk_leeway * 1000),
+                accepts_token=["session_token"],
+            ),
+        )
+        self._record_verification(time.perf_counter() - started)
+        if state.status == AuthStatus.SIGNED_IN and isinstance(state.payload, dict):
+            self._remember(digest, state.payload)
+        return state
+
+    def stats(self) -> ClerkAuthStats:
+        """Return cumulative cache and verification counters."""
+        with self._lock:
+            return ClerkAuthStats(
+                cache_hits=self._hits,
+                cache_misses=self._misses,
+                verifications=self._verifications,
+                verification_seconds_total=self._verification_seconds_total,
+                verification_seconds_max=self._verification_seconds_max,
+                jwks_fetches=self.jwks.fetches,
+                jwks_fetch_failures=self.jwks.fetch_failures,
+            )
+
+
+def session_token_from_headers(request: Requestish) -> str | None:
+    """Extract a Clerk session token the same way the Clerk SDK does."""
+    authorization = request.headers.get("Authorization")
+    if authorization is not None:
+        return authorization.replace("Bearer ", "") or None
+    cookie_header = request.headers.get("cookie")
+    if not cookie_header:
+        return None
+    for name, morsel in SimpleCookie(cookie_header).items():
+        if name.startswith("__session") and morsel.value:
+            return morsel.value
+    return None
+
+
+_verifier: ClerkSessionVerifier | None = None
+_verifier_lock = threading.Lock()
+
+
+def get_clerk_session_verifier() -> ClerkSessionVerifier:
+    """Return the process-wide Clerk session verifier."""
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                _verifier = ClerkSessionVerifier(
+                    ClerkJwksCache(),
+                    max_entries=settings.clerk_session_cache_max_entries,
+                )
+    return _verifier
+
+
+def set_clerk_session_verifier(verifier: ClerkSessionVerifier | None) -> None:
+    """Replace the process-wide verifier (``None`` rebuilds it lazily)."""
+    global _verifier
+    with _verifier_lock:
+        _verifier = verifier
+
+
+def render_clerk_auth_metrics() -> str:
+    """Render Clerk verification counters in the Prometheus text format.
+
+    Empty until a verifier exists (it is created on the first Clerk-authenticated request).
+    """
+    verifier = _verifier
+    if verifier is None:
+        return ""
+    stats = verifier.stats()
+    prefix = "mission_control_clerk_auth"
+    series = (
+        ("cache_hits_total", "counter", "Session tokens served from the cache.", stats.cache_hits),
+        (
+            "cache_misses_total",
+            "counter",
+            "Session tokens verified against Clerk keys.",
+            stats.cache_misses,
+        ),
+        (
+            "verifications_total",
+            "counter",
+            "Full session token verifications.",
+            stats.verifications,
+        ),
+        (
+            "verification_seconds_total",
+            "counter",
+            "Seconds spent in full session token verification.",
+            stats.verification_seconds_total,
+        ),
+        (
+            "verification_seconds_max",
+            "gauge",
+            "Slowest full session token verification.",
+            stats.verification_seconds_max,
+        ),
+        ("jwks_fetches_total", "counter", "Clerk JWKS fetches.", stats.jwks_fetches),
+        (
+            "jwks_fetch_failures_total",
+            "counter",
+            "Failed Clerk JWKS fetches.",
+            stats.jwks_fetch_failures,
+        ),
+    )
+    lines: list[str] = []
+    for name, kind, help_text, value in series:
+        lines += [
+            f"# HELP {prefix}_{name} {help_text}",
+            f"# TYPE {prefix}_{name} {kind}",
+            f"{prefix}_{name} {value!r}",
+        ]
+    return "\n".join(lines) + "\n"
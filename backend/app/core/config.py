@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Self
+from typing import Literal, Self
 
 from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -46,6 +46,104 @@ class Settings(BaseSettings):
     clerk_api_url: str = "https://api.clerk.com"
     clerk_verify_iat: bool = True
     clerk_leeway: float = 10.0
+    clerk_jwks_refresh_seconds: float = Field(default=3600.0, gt=0)
+    clerk_session_cache_max_entries: int = Field(default=10_000, ge=0)
+
+    # Agent auth: cache of recently verified agent tokens ("off" disables it).
+    # The redis backend shares entries/invalidation across API replicas and
+    # defaults to `rq_redis_url` when no dedicated URL is configured.
+    agent_token_cache_backend: Literal["memory", "redis", "off"] = "memory"
+    agent_token_cache_ttl_seconds: float = Field(default=300.0, ge=0)
+    agent_token_cache_max_entries: int = Field(default=10_000, ge=0)
+    agent_token_cache_redis_url: str = ""
+    # Agent token PBKDF2 work runs off the event loop in this executor; the
+    # concurrency limit bounds queued jobs so waits are measurable.
+    agent_token_crypto_executor: Literal["thread", "process"] = "thread"
+    agent_token_crypto_max_workers: int = Field(default=4, ge=1)
+    agent_token_crypto_max_concurrency: int = Field(default=4, ge=1)
+
+    # Agent presence touches are coalesced and flushed in one bulk UPDATE per
+    # interval. Use the redis backend when running several API replicas.
+    agent_presence_backend: Literal["memory", "redis"] = "memory"
+    agent_presence_flush_interval_seconds: float = Field(default=5.0, gt=0)
+    agent_presence_redis_url: str = ""
+
+    # Organization access: per-member board-access snapshots are memoized per
+    # request and shared across requests for a short TTL (0 disables sharing).
+    org_access_cache_ttl_seconds: float = Field(default=10.0, ge=0)
+    org_access_cache_max_entries: int = Field(default=10_000, ge=0)
+
+    # OpenClaw gateway RPC: long-lived authenticated websockets are pooled per
+    # gateway config and shared by concurrent calls (demultiplexed by request id).
+    # A request unanswered within the request timeout drops its connection (and
+    # fails the other requests in flight on it) so a half-open socket is not reused.
+    gateway_rpc_pool_enabled: bool = True
+    gateway_rpc_pool_max_connections: int = Field(default=2, ge=1)
+    gateway_rpc_pool_max_in_flight: int = Field(default=32, ge=1)
+    gateway_rpc_pool_idle_timeout_seconds: float = Field(default=60.0, ge=0)
+    gateway_rpc_pool_request_timeout_seconds: float = Field(default=30.0, gt=0)
+
+    # Gateway read cache: results of allowlisted read-only RPC methods are cached
+    # per gateway for a short TTL, concurrent misses share one call, and writes
+    # sent through `openclaw_call` invalidate the reads they affect. Overrides map
+    # a read method to its TTL in seconds (0 disables caching for that method).
+    gateway_rpc_cache_enabled: bool = True
+    gateway_rpc_cache_ttl_overrides: dict[str, float] = Field(default_factory=dict)
+    gateway_rpc_cache_max_entries: int = Field(default=1024, ge=1)
+
+    # Gateway template sync: board agents on one gateway synced concurrently.
+    gateway_template_sync_concurrency: int = Field(default=8, ge=1)
+
+    # Gateway lead broadcasts: boards messaged at once, and how long one board may take
+    # (lead provisioning plus dispatch retries) before it is reported as timed out.
+    gateway_lead_broadcast_concurrency: int = Field(default=8, ge=1)
+    gateway_lead_broadcast_board_timeout_seconds: float = Field(default=60.0, gt=0)
+
+    # Gateway outbox: agent notifications are written with the triggering change and
+    # delivered by `scripts/rq outbox`. Each batch sends to gateways concurrently
+    # (bounded per gateway) while messages for one agent session stay in order.
+    # Claimed rows whose worker died are retried once the claim lease expires.
+    # Delivered/failed rows are pruned hourly once older than the retention (0 keeps them).
+    gateway_outbox_batch_size: int = Field(default=100, ge=1)
+    gateway_outbox_poll_seconds: float = Field(default=1.0, gt=0)
+    gateway_outbox_gateway_concurrency: int = Field(default=8, ge=1)
+    gateway_outbox_max_attempts: int = Field(default=5, ge=1)
+    gateway_outbox_retry_base_seconds: float = Field(default=5.0, ge=0)
+    gateway_outbox_retry_max_seconds: float = Field(default=300.0, ge=0)
+    gateway_outbox_claim_lease_seconds: float = Field(default=300.0, gt=0)
+    gateway_outbox_retention_seconds: float = Field(default=7 * 24 * 3600.0, ge=0)
+
+    # Agent workspace templates: compiled once per process. Auto-reload recompiles
+    # edited template files (default: on in dev only). The bytecode cache dir
+    # defaults to Jinja's per-user temp directory when empty.
+    agent_template_auto_reload: bool | None = None
+    agent_template_bytecode_cache: bool = True
+    agent_template_bytecode_cache_dir: str = ""
+    agent_template_override_cache_size: int = Field(default=256, ge=1)
+
+    # Gateway circuit breaker: once `min_calls` are in the sliding window and the
+    # transport failure rate reaches the threshold, calls to that gateway fail
+    # fast for `open_seconds`; then a single probe decides whether to close.
+    gateway_circuit_enabled: bool = True
+    gateway_circuit_window_size: int = Field(default=20, ge=1)
+    gateway_circuit_min_calls: int = Field(default=5, ge=1)
+    gateway_circuit_failure_rate: float = Field(default=0.5, gt=0, le=1)
+    gateway_circuit_open_seconds: float = Field(default=30.0, gt=0)
+
+    # Gateway events: one elected replica keeps an event connection open per
+    # gateway and feeds agent activity into the presence aggregator. Use the
+    # redis lock backend (defaults to `rq_redis_url`) with several API replicas.
+    gateway_events_enabled: bool = False
+    gateway_events_lock_backend: Literal["memory", "redis"] = "memory"
+    gateway_events_redis_url: str = ""
+    gateway_events_lock_ttl_seconds: float = Field(default=30.0, gt=0)
+    gateway_events_flush_interval_seconds: float = Field(default=2.0, gt=0)
+    gateway_events_refresh_seconds: float = Field(default=60.0, gt=0)
+    gateway_events_idle_timeout_seconds: float = Field(default=90.0, gt=0)
+    gateway_events_reconnect_max_seconds: float = Field(default=60.0, gt=0)
+
+    # Prometheus `/metrics` endpoint: disabled unless set; scrapers send it as a bearer token.
+    metrics_token: str = ""
 
     cors_origins: str = ""
     base_url: str = ""
@@ -56,10 +154,22 @@ class Settings(BaseSettings):
     # RQ queueing / dispatch
     rq_redis_url: str = "redis://localhost:6379/0"
     rq_queue_name: str = "default"
-    rq_dispatch_throttle_seconds: float = 15.0
     rq_dispatch_max_retries: int = 3
     rq_dispatch_retry_base_seconds: float = 10.0
     rq_dispatch_retry_max_seconds: float = 120.0
+    # Connections per Redis URL shared by queue clients in one process (and event loop).
+    rq_redis_max_connections: int = Field(default=16, ge=1)
+    # Queue tasks a worker runs at once; tasks for one board or agent session stay in order.
+    rq_worker_concurrency: int = Field(default=4, ge=1)
+    # Workers refresh a heartbeat at a third of this TTL; tasks held by a worker whose
+    # heartbeat expired are put back on the queue by the other workers.
+    rq_worker_heartbeat_ttl_seconds: float = Field(default=30.0, gt=0)
+    # Queued gateway messages take a token from Redis buckets shared by all workers:
+    # one per gateway and, when the session rate is above 0, one per agent session.
+    rq_dispatch_gateway_rate_per_second: float = Field(default=2.0, gt=0)
+    rq_dispatch_gateway_burst: int = Field(default=10, ge=1)
+    rq_dispatch_session_rate_per_second: float = Field(default=0.0, ge=0)
+    rq_dispatch_session_burst: int = Field(default=3, ge=1)
 
     # OpenClaw gateway runtime compatibility
     gateway_min_version: str = "2026.02.9"
@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
-from contextlib import asynccontextmanager
+import asyncio
+import hmac
+from contextlib import asynccontextmanager, suppress
 from typing import TYPE_CHECKING, Any
 
-from fastapi import APIRouter, FastAPI, status
+from fastapi import APIRouter, FastAPI, Header, HTTPException, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from fastapi_pagination import add_pagination
@@ -32,11 +34,19 @@ from app.api.task_custom_fields import router as task_custom_fields_router
 from app.api.tasks import router as tasks_router
 from app.api.users import router as users_router
 from app.api.wiki import router as wiki_router
+from app.core.agent_tokens import render_agent_token_crypto_metrics, shutdown_agent_token_crypto
+from app.core.auth_mode import AuthMode
+from app.core.clerk_tokens import get_clerk_session_verifier, render_clerk_auth_metrics
 from app.core.config import settings
 from app.core.error_handling import install_error_handling
 from app.core.logging import configure_logging, get_logger
 from app.db.session import init_db
 from app.schemas.health import HealthStatusResponse
+from app.services.agent_presence import get_presence_aggregator
+from app.services.dispatch_rate_limit import render_dispatch_rate_limit_metrics
+from app.services.openclaw.gateway_events import get_gateway_event_supervisor
+from app.services.openclaw.gateway_metrics import get_gateway_rpc_metrics, render_prometheus
+from app.services.openclaw.gateway_rpc import close_gateway_connection_pool
 
 if TYPE_CHECKING:
     from collections.abc import AsyncIterator
@@ -437,10 +447,37 @@ async def lifespan(_: FastAPI) -> AsyncIterator[None]:
         settings.db_auto_migrate,
     )
     await init_db()
+    presence = get_presence_aggregator()
+    background_tasks = [
+        asyncio.create_task(presence.run(settings.agent_presence_flush_interval_seconds)),
+    ]
+    if settings.auth_mode == AuthMode.CLERK:
+        background_tasks.append(
+            asyncio.create_task(
+                get_clerk_session_verifier().jwks.run(settings.clerk_jwks_refresh_seconds),
+            ),
+        )
+    if settings.gateway_events_enabled:
+        background_tasks.append(
+            asyncio.create_task(
+                get_gateway_event_supervisor().run(settings.gateway_events_refresh_seconds),
+            ),
+        )
     logger.info("app.lifecycle.started")
     try:
         yield
     finally:
+        for task in background_tasks:
+            task.cancel()
+        for task in background_tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        try:
+            await presence.flush_with_new_session()
+        except Exception:
+            logger.exception("app.lifecycle.presence_flush_failed")
+        await close_gateway_connection_pool()
+        shutdown_agent_token_crypto()
         logger.info("app.lifecycle.stopped")
 
 
@@ -522,6 +559,26 @@ def readyz() -> HealthStatusResponse:
     return HealthStatusResponse(ok=True)
 
 
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics(authorization: str | None = Header(default=None)) -> Response:
+    """Expose gateway RPC, dispatch rate-limit and auth metrics in the Prometheus text format.
+
+    The endpoint is disabled (404) unless `METRICS_TOKEN` is configured.
+    """
+    if not settings.metrics_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    expected = f"Bearer {settings.metrics_token}"
+    if not hmac.compare_digest((authorization or "").encode(), expected.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    return Response(
+        content=render_prometheus(get_gateway_rpc_metrics().snapshot())
+        + render_dispatch_rate_limit_metrics()
+        + render_agent_token_crypto_metrics()
+        + render_clerk_auth_metrics(),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
 api_v1 = APIRouter(prefix="/api/v1")
 api_v1.include_router(auth_router)
 api_v1.include_router(agent_router)
@@ -11,6 +11,7 @@ from app.models.board_onboarding import BoardOnboardingSession
 from app.models.board_webhook_payloads import BoardWebhookPayload
 from app.models.board_webhooks import BoardWebhook
 from app.models.boards import Board
+from app.models.gateway_outbox import GatewayOutboxMessage
 from app.models.gateways import Gateway
 from app.models.organization_board_access import OrganizationBoardAccess
 from app.models.organization_invite_board_access import OrganizationInviteBoardAccess
@@ -44,6 +45,7 @@ __all__ = [
     "BoardGroup",
     "Board",
     "Gateway",
+    "GatewayOutboxMessage",
     "GatewayInstalledSkill",
     "MarketplaceSkill",
     "SkillPack",
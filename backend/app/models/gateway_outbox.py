@@ -0,0 +1,50 @@
+"""Outbox rows for gateway messages sent to agent sessions."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from uuid import UUID, uuid4
+
+from sqlalchemy import Index
+from sqlmodel import Field
+
+from app.core.time import utcnow
+from app.models.base import QueryModel
+
+RUNTIME_ANNOTATION_TYPES = (datetime,)
+
+
+class GatewayOutboxMessage(QueryModel, table=True):
+    """Agent message written with the change that triggered it and delivered later.
+
+    Status moves `pending` -> `sending` (claimed; `next_attempt_at` is the lease
+    expiry) -> `delivered`, or back to `pending` with backoff, or to `failed` once
+    attempts are exhausted. The optional activity fields are recorded as activity
+    events when delivery succeeds or finally fails.
+    """
+
+    __tablename__ = "gateway_outbox"  # pyright: ignore[reportAssignmentType]
+    __table_args__ = (
+        Index("ix_gateway_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    gateway_id: UUID = Field(index=True)
+    board_id: UUID | None = None
+    agent_id: UUID | None = None
+    task_id: UUID | None = None
+    session_key: str = Field(index=True)
+    agent_name: str
+    message: str
+    deliver: bool = False
+    status: str = Field(default="pending")
+    attempts: int = 0
+    last_error: str | None = None
+    notified_event_type: str | None = None
+    notified_message: str | None = None
+    failed_event_type: str | None = None
+    failed_message: str | None = None
+    created_at: datetime = Field(default_factory=utcnow)
+    next_attempt_at: datetime = Field(default_factory=utcnow)
+    delivered_at: datetime | None = None
+    latency_ms: float | None = None
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from typing import Literal
+
 from sqlmodel import SQLModel
 
 from app.schemas.common import NonEmptyStr
@@ -25,6 +27,15 @@ class GatewayResolveQuery(SQLModel):
     gateway_allow_insecure_tls: bool = False
 
 
+class GatewayCircuitStatus(SQLModel):
+    """Circuit breaker state for a gateway as seen by this API process."""
+
+    state: Literal["closed", "open", "half_open"]
+    failure_rate: float
+    window_calls: int
+    retry_after_seconds: float | None = None
+
+
 class GatewaysStatusResponse(SQLModel):
     """Aggregated gateway status response including session metadata."""
 
@@ -35,6 +46,7 @@ class GatewaysStatusResponse(SQLModel):
     main_session: object | None = None
     main_session_error: str | None = None
     error: str | None = None
+    circuit: GatewayCircuitStatus | None = None
 
 
 class GatewaySessionsResponse(SQLModel):
@@ -62,3 +74,23 @@ class GatewayCommandsResponse(SQLModel):
     protocol_version: int
     methods: list[str]
     events: list[str]
+
+
+class GatewayRpcMetricSeries(SQLModel):
+    """Latency summary for one gateway/phase/method/outcome series."""
+
+    gateway_id: str
+    phase: str
+    method: str
+    outcome: str
+    count: int
+    sum_seconds: float
+    p50_seconds: float | None = None
+    p95_seconds: float | None = None
+    p99_seconds: float | None = None
+
+
+class GatewayRpcMetricsResponse(SQLModel):
+    """Gateway RPC latency and outcome metrics recorded by this API process."""
+
+    series: list[GatewayRpcMetricSeries]
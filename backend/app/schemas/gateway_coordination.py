@@ -176,6 +176,10 @@ class GatewayLeadBroadcastBoardResult(SQLModel):
         description="Resolved lead agent display name.",
     )
     ok: bool = Field(default=False, description="Whether this board delivery succeeded.")
+    timed_out: bool = Field(
+        default=False,
+        description="Whether this board hit the per-board broadcast timeout.",
+    )
     error: str | None = Field(
         default=None,
         description="Failure reason if this board failed.",
@@ -203,6 +207,10 @@ class GatewayLeadBroadcastResponse(SQLModel):
     ok: bool = Field(default=True, description="Whether broadcast execution succeeded.")
     sent: int = Field(default=0, description="Number of boards successfully messaged.")
     failed: int = Field(default=0, description="Number of boards that failed messaging.")
+    timed_out: int = Field(
+        default=0,
+        description="Number of failed boards that hit the per-board timeout (included in failed).",
+    )
     results: list[GatewayLeadBroadcastBoardResult] = Field(default_factory=list)
 
 
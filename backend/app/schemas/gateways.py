@@ -88,4 +88,7 @@ class GatewayTemplatesSyncResult(SQLModel):
     agents_updated: int
     agents_skipped: int
     main_updated: bool
+    files_written: int = 0
+    files_skipped: int = 0
+    files_deleted: int = 0
     errors: list[GatewayTemplatesSyncError] = Field(default_factory=list)
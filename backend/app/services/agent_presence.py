@@ -0,0 +1,289 @@
+"""Write-behind aggregation of agent presence touches.
+
+Every authenticated agent request marks the agent as recently seen. Writing
+that through immediately means a single-row UPDATE transaction per agent per
+touch interval on the hottest table. Instead, touches are recorded in memory
+(or in a shared Redis hash when several API replicas run) and flushed in one
+bulk UPDATE every `agent_presence_flush_interval_seconds`.
+
+Unflushed touches recorded by this process are overlaid onto loaded `Agent`
+rows by `apply_pending_presence`, so computed status stays current between
+flushes. Each flush bumps `updated_at` to the flush time so the agents SSE
+stream (which polls on `updated_at`) picks the change up.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from collections.abc import Awaitable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Protocol, cast
+from uuid import UUID
+
+import redis
+import redis.asyncio
+from sqlalchemy import and_, case, or_, update
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel import col
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.time import utcnow
+from app.db.session import async_session_maker
+from app.models.agents import Agent
+
+if TYPE_CHECKING:
+    from sqlalchemy.sql.dml import Update
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+logger = get_logger(__name__)
+
+_REDIS_PRESENCE_KEY = "mc:agent-presence:pending"
+_PINNED_STATUSES = ("updating", "deleting")
+# Touches are recorded on the request path, so a slow Redis must fail fast.
+_REDIS_TIMEOUT_SECONDS = 0.5
+
+
+@dataclass(frozen=True)
+class PresenceTouch:
+    """Latest unflushed presence observation for one agent."""
+
+    agent_id: UUID
+    seen_at: datetime
+    mark_online: bool = True
+
+
+def _merge(current: PresenceTouch | None, touch: PresenceTouch) -> PresenceTouch:
+    if current is None:
+        return touch
+    return PresenceTouch(
+        agent_id=touch.agent_id,
+        seen_at=max(current.seen_at, touch.seen_at),
+        mark_online=current.mark_online or touch.mark_online,
+    )
+
+
+class PresenceStore(Protocol):
+    """Pending-touch storage drained by each flush."""
+
+    async def record(self, touch: PresenceTouch) -> None:
+        """Record or coalesce a touch."""
+        ...
+
+    async def drain(self) -> list[PresenceTouch]:
+        """Atomically take every pending touch."""
+        ...
+
+
+class InMemoryPresenceStore:
+    """Process-local pending touches keyed by agent id."""
+
+    def __init__(self) -> None:
+        self._pending: dict[UUID, PresenceTouch] = {}
+        self._lock = threading.Lock()
+
+    async def record(self, touch: PresenceTouch) -> None:
+        with self._lock:
+            self._pending[touch.agent_id] = _merge(self._pending.get(touch.agent_id), touch)
+
+    async def drain(self) -> list[PresenceTouch]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return list(pending.values())
+
+
+class RedisPresenceStore:
+    """Pending touches in a Redis hash shared by all API replicas."""
+
+    def __init__(self, client: redis.asyncio.Redis, *, key: str = _REDIS_PRESENCE_KEY) -> None:
+        self._client = client
+        self._key = key
+
+    async def record(self, touch: PresenceTouch) -> None:
+        value = json.dumps(
+            {"seen_at": touch.seen_at.isoformat(), "mark_online": touch.mark_online},
+        )
+        try:
+            await cast(Awaitable[int], self._client.hset(self._key, str(touch.agent_id), value))
+        except redis.RedisError as exc:
+            logger.warning("agent_presence.redis.record_failed error=%s", exc)
+
+    async def drain(self) -> list[PresenceTouch]:
+        try:
+            pipe = self._client.pipeline(transaction=True)
+            pipe.hgetall(self._key)
+            pipe.delete(self._key)
+            raw, _deleted = await pipe.execute()
+        except redis.RedisError as exc:
+            logger.warning("agent_presence.redis.drain_failed error=%s", exc)
+            return []
+        touches: list[PresenceTouch] = []
+        for raw_id, raw_value in cast(dict[bytes | str, bytes | str], raw).items():
+            try:
+                agent_id = UUID(raw_id.decode() if isinstance(raw_id, bytes) else raw_id)
+                data = json.loads(raw_value)
+                touches.append(
+                    PresenceTouch(
+                        agent_id=agent_id,
+                        seen_at=datetime.fromisoformat(str(data["seen_at"])),
+                        mark_online=bool(data.get("mark_online", True)),
+                    ),
+                )
+            except (ValueError, KeyError, TypeError):
+                logger.warning("agent_presence.redis.invalid_entry agent_id=%s", raw_id)
+        return touches
+
+
+def _bulk_presence_update(touches: list[PresenceTouch], *, flushed_at: datetime) -> Update:
+    seen_by_id = {touch.agent_id: touch.seen_at for touch in touches}
+    online_ids = [touch.agent_id for touch in touches if touch.mark_online]
+    seen_value = case(seen_by_id, value=col(Agent.id))
+    return (
+        update(Agent)
+        .where(col(Agent.id).in_(list(seen_by_id)))
+        .values(
+            # Never move last_seen_at backwards (a heartbeat may have committed since).
+            last_seen_at=case(
+                (
+                    or_(
+                        col(Agent.last_seen_at).is_(None),
+                        col(Agent.last_seen_at) < seen_value,
+                    ),
+                    seen_value,
+                ),
+                else_=col(Agent.last_seen_at),
+            ),
+            updated_at=flushed_at,
+            status=case(
+                (
+                    and_(
+                        col(Agent.id).in_(online_ids),
+                        col(Agent.status).not_in(_PINNED_STATUSES),
+                    ),
+                    "online",
+                ),
+                else_=col(Agent.status),
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+class AgentPresenceAggregator:
+    """Coalesces agent presence touches and flushes them in bulk."""
+
+    def __init__(self, store: PresenceStore) -> None:
+        self._store = store
+        self._recent: dict[UUID, PresenceTouch] = {}
+        self._recent_lock = threading.Lock()
+
+    async def record(
+        self,
+        agent_id: UUID,
+        *,
+        seen_at: datetime,
+        mark_online: bool = True,
+    ) -> None:
+        """Record a touch; it reaches the database on the next flush."""
+        touch = PresenceTouch(agent_id=agent_id, seen_at=seen_at, mark_online=mark_online)
+        with self._recent_lock:
+            self._recent[agent_id] = _merge(self._recent.get(agent_id), touch)
+        await self._store.record(touch)
+
+    def pending(self, agent_id: UUID) -> PresenceTouch | None:
+        """Return this process's latest unflushed touch for an agent."""
+        with self._recent_lock:
+            return self._recent.get(agent_id)
+
+    def apply(self, agent: Agent) -> Agent:
+        """Overlay an unflushed touch onto a loaded agent row.
+
+        Values are set as already-committed state so the overlay never makes the
+        row dirty (and never causes an autoflush UPDATE in the caller's session).
+        """
+        touch = self.pending(agent.id)
+        if touch is None:
+            return agent
+        if agent.last_seen_at is None or agent.last_seen_at < touch.seen_at:
+            set_committed_value(agent, "last_seen_at", touch.seen_at)
+            if touch.mark_online and agent.status not in _PINNED_STATUSES:
+                set_committed_value(agent, "status", "online")
+        return agent
+
+    async def flush(self, session: AsyncSession) -> int:
+        """Write every pending touch in a single bulk UPDATE."""
+        flushed_at = utcnow()
+        touches = await self._store.drain()
+        if touches:
+            try:
+                await session.exec(_bulk_presence_update(touches, flushed_at=flushed_at))
+                await session.commit()
+            except Exception:
+                # Put the drained touches back so the next flush retries them.
+                for touch in touches:
+                    await self._store.record(touch)
+                raise
+            logger.debug("agent_presence.flushed count=%s", len(touches))
+        with self._recent_lock:
+            self._recent = {
+                agent_id: touch
+                for agent_id, touch in self._recent.items()
+                if touch.seen_at > flushed_at
+            }
+        return len(touches)
+
+    async def flush_with_new_session(self) -> int:
+        """Flush using a short-lived session from the global session maker."""
+        async with async_session_maker() as session:
+            return await self.flush(session)
+
+    async def run(self, interval_seconds: float) -> None:
+        """Flush forever at a fixed interval (cancel to stop)."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.flush_with_new_session()
+            except Exception:
+                logger.exception("agent_presence.flush_failed")
+
+
+_aggregator: AgentPresenceAggregator | None = None
+_aggregator_lock = threading.Lock()
+
+
+def _build_store() -> PresenceStore:
+    if settings.agent_presence_backend == "redis":
+        redis_url = settings.agent_presence_redis_url or settings.rq_redis_url
+        return RedisPresenceStore(
+            redis.asyncio.Redis.from_url(
+                redis_url,
+                socket_timeout=_REDIS_TIMEOUT_SECONDS,
+                socket_connect_timeout=_REDIS_TIMEOUT_SECONDS,
+            ),
+        )
+    return InMemoryPresenceStore()
+
+
+def get_presence_aggregator() -> AgentPresenceAggregator:
+    """Return the process-wide presence aggregator configured in settings."""
+    global _aggregator
+    if _aggregator is None:
+        with _aggregator_lock:
+            if _aggregator is None:
+                _aggregator = AgentPresenceAggregator(_build_store())
+    return _aggregator
+
+
+def set_presence_aggregator(aggregator: AgentPresenceAggregator | None) -> None:
+    """Replace the process-wide aggregator (``None`` rebuilds it from settings lazily)."""
+    global _aggregator
+    with _aggregator_lock:
+        _aggregator = aggregator
+
+
+def apply_pending_presence(agent: Agent) -> Agent:
+    """Overlay this process's unflushed presence touch onto an agent row."""
+    return get_presence_aggregator().apply(agent)
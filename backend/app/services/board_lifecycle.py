@@ -11,6 +11,7 @@ from typing import TYPE_CHECKING
 from fastapi import HTTPException, status
 from sqlmodel import col, select
 
+from app.core.agent_token_cache import invalidate_agent_token_cache
 from app.db import crud
 from app.models.activity_events import ActivityEvent
 from app.models.agents import Agent
@@ -31,6 +32,7 @@ from app.schemas.common import OkResponse
 from app.services.openclaw.gateway_resolver import gateway_client_config, require_gateway_for_board
 from app.services.openclaw.gateway_rpc import OpenClawGatewayError
 from app.services.openclaw.provisioning import OpenClawGatewayProvisioner
+from app.services.organization_access_cache import invalidate_organization_board_access
 
 if TYPE_CHECKING:
     from sqlmodel.ext.asyncio.session import AsyncSession
@@ -155,7 +157,9 @@ async def delete_board(session: AsyncSession, *, board: Board) -> OkResponse:
             commit=False,
         )
         await crud.delete_where(session, Agent, col(Agent.id).in_(agent_ids))
+        await invalidate_agent_token_cache(*agent_ids)
 
     await session.delete(board)
+    invalidate_organization_board_access(session, board.organization_id)
     await session.commit()
     return OkResponse()
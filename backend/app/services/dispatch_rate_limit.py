@@ -0,0 +1,205 @@
+"""Redis token buckets that pace queued gateway dispatch.
+
+Queue handlers take one token per gateway message before sending it. Buckets live
+in Redis, so every worker shares them: each gateway refills at
+`rq_dispatch_gateway_rate_per_second` up to `rq_dispatch_gateway_burst` tokens,
+and, when `rq_dispatch_session_rate_per_second` is set, each agent session has its
+own bucket as well. A send waits only when a bucket it needs is empty, so idle
+gateways get full throughput while busy ones are throttled.
+
+The time a send to each gateway would have to wait right now, and the total time
+spent waiting, are exported on `/metrics`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable
+from dataclasses import dataclass
+from typing import Any, cast
+
+import redis
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.queue import async_redis_client
+
+logger = get_logger(__name__)
+
+_KEY_PREFIX = "mc:dispatch-rate"
+_GATEWAYS_KEY = f"{_KEY_PREFIX}:gateways"
+_WAITED_KEY = f"{_KEY_PREFIX}:waited-seconds"
+_WAIT_METRIC = "mission_control_dispatch_rate_limit_wait_seconds"
+_WAITED_METRIC = "mission_control_dispatch_rate_limit_waited_seconds_total"
+_METRICS_TIMEOUT_SECONDS = 1.0
+
+# KEYS[1] is the set of known gateways and KEYS[2..] the bucket hashes; ARGV[1] is the
+# gateway id followed by a (rate per second, burst) pair per bucket. Takes one token
+# from every bucket, or none when any is empty, using the Redis clock so workers agree.
+# Returns 0 on success, otherwise the milliseconds until every bucket has a token.
+_ACQUIRE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local wait = 0
+local tokens = {}
+for i = 2, #KEYS do
+    local rate = tonumber(ARGV[2 * i - 2])
+    local burst = tonumber(ARGV[2 * i - 1])
+    local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local available = tonumber(state[1]) or burst
+    local elapsed = math.max(0, now - (tonumber(state[2]) or now))
+    available = math.min(burst, available + elapsed * rate / 1000)
+    if available < 1 then
+        wait = math.max(wait, math.ceil((1 - available) * 1000 / rate))
+    end
+    tokens[i] = available
+end
+redis.call('SADD', KEYS[1], ARGV[1])
+if wait > 0 then
+    return wait
+end
+for i = 2, #KEYS do
+    local rate = tonumber(ARGV[2 * i - 2])
+    local burst = tonumber(ARGV[2 * i - 1])
+    redis.call('HSET', KEYS[i], 'tokens', tostring(tokens[i] - 1), 'ts', now)
+    redis.call('PEXPIRE', KEYS[i], math.ceil(burst * 1000 / rate) + 1000)
+end
+return 0
+"""
+
+# Seconds until each gateway bucket (KEYS[2..]) has a token, as strings; missing
+# buckets are full. Forgets gateways (ARGV[i-1]) whose bucket has expired.
+_WAITS_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local rate = tonumber(ARGV[#ARGV])
+local waits = {}
+for i = 2, #KEYS do
+    local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    if state[1] then
+        local elapsed = math.max(0, now - tonumber(state[2]))
+        local available = tonumber(state[1]) + elapsed * rate / 1000
+        waits[i - 1] = tostring(math.max(0, (1 - available) / rate))
+    else
+        redis.call('SREM', KEYS[1], ARGV[i - 1])
+        waits[i - 1] = false
+    end
+end
+return waits
+"""
+
+
+@dataclass(frozen=True)
+class GatewayRateLimitSnapshot:
+    """Current and cumulative dispatch wait for one gateway."""
+
+    gateway: str
+    wait_seconds: float
+    waited_seconds_total: float
+
+
+def _gateway_key(gateway_id: str) -> str:
+    return f"{_KEY_PREFIX}:gateway:{gateway_id}"
+
+
+def _session_key(gateway_id: str, session_key: str) -> str:
+    return f"{_KEY_PREFIX}:session:{gateway_id}:{session_key}"
+
+
+async def acquire_dispatch_token(gateway_id: str, *, session_key: str | None = None) -> float:
+    """Wait for a token to send to `gateway_id` (and `session_key`); return seconds waited.
+
+    Redis errors are logged and the send goes ahead unthrottled.
+    """
+    keys = [_GATEWAYS_KEY, _gateway_key(gateway_id)]
+    args: list[Any] = [
+        gateway_id,
+        settings.rq_dispatch_gateway_rate_per_second,
+        settings.rq_dispatch_gateway_burst,
+    ]
+    if session_key and settings.rq_dispatch_session_rate_per_second > 0:
+        keys.append(_session_key(gateway_id, session_key))
+        args += [settings.rq_dispatch_session_rate_per_second, settings.rq_dispatch_session_burst]
+
+    client = async_redis_client(redis_url=settings.rq_redis_url)
+    acquire = client.register_script(_ACQUIRE_SCRIPT)
+    waited = 0.0
+    try:
+        while wait_ms := int(await acquire(keys=keys, args=args)):
+            await asyncio.sleep(wait_ms / 1000)
+            waited += wait_ms / 1000
+        if waited:
+            await cast(Awaitable[float], client.hincrbyfloat(_WAITED_KEY, gateway_id, waited))
+    except redis.RedisError as exc:
+        logger.warning(
+            "queue.dispatch_rate.unavailable",
+            extra={"gateway_id": gateway_id, "error": str(exc)},
+        )
+    return waited
+
+
+def dispatch_rate_limit_snapshot(client: redis.Redis) -> list[GatewayRateLimitSnapshot]:
+    """Read every known gateway's current wait and total wait, ordered by gateway."""
+    gateways = sorted(
+        member.decode() if isinstance(member, bytes) else str(member)
+        for member in cast(set[Any], client.smembers(_GATEWAYS_KEY))
+    )
+    if not gateways:
+        return []
+    waits = cast(
+        list[Any],
+        client.register_script(_WAITS_SCRIPT)(
+            keys=[_GATEWAYS_KEY, *(_gateway_key(gateway) for gateway in gateways)],
+            args=[*gateways, settings.rq_dispatch_gateway_rate_per_second],
+        ),
+    )
+    totals = cast(list[Any], client.hmget(_WAITED_KEY, gateways))
+    return [
+        GatewayRateLimitSnapshot(
+            gateway=gateway,
+            wait_seconds=float(wait or 0),
+            waited_seconds_total=float(total or 0),
+        )
+        for gateway, wait, total in zip(gateways, waits, totals, strict=True)
+        if wait is not None
+    ]
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_prometheus(snapshots: list[GatewayRateLimitSnapshot]) -> str:
+    """Render dispatch rate-limit gauges/counters in the Prometheus text format."""
+    lines = [
+        f"# HELP {_WAIT_METRIC} Seconds a queued dispatch to the gateway would wait for a token.",
+        f"# TYPE {_WAIT_METRIC} gauge",
+        *(
+            f'{_WAIT_METRIC}{{gateway="{_escape_label(item.gateway)}"}} {item.wait_seconds!r}'
+            for item in snapshots
+        ),
+        f"# HELP {_WAITED_METRIC} Seconds queued dispatches spent waiting for gateway tokens.",
+        f"# TYPE {_WAITED_METRIC} counter",
+        *(
+            f'{_WAITED_METRIC}{{gateway="{_escape_label(item.gateway)}"}} '
+            f"{item.waited_seconds_total!r}"
+            for item in snapshots
+        ),
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def render_dispatch_rate_limit_metrics() -> str:
+    """Read the shared buckets and render them; empty when Redis is unreachable."""
+    client = redis.Redis.from_url(
+        settings.rq_redis_url,
+        socket_timeout=_METRICS_TIMEOUT_SECONDS,
+        socket_connect_timeout=_METRICS_TIMEOUT_SECONDS,
+    )
+    try:
+        return render_prometheus(dispatch_rate_limit_snapshot(client))
+    except redis.RedisError as exc:
+        logger.warning("queue.dispatch_rate.metrics_unavailable", extra={"error": str(exc)})
+        return ""
+    finally:
+        client.close()
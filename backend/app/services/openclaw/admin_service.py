@@ -173,6 +173,7 @@ class GatewayAdminLifecycleService(OpenClawDBService):
             token=gateway.token,
             allow_insecure_tls=gateway.allow_insecure_tls,
             disable_device_pairing=gateway.disable_device_pairing,
+            gateway_id=str(gateway.id),
         )
         target_id = GatewayAgentIdentity.openclaw_agent_id(gateway)
         try:
@@ -231,7 +232,7 @@ class GatewayAdminLifecycleService(OpenClawDBService):
                 status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
                 detail="Organization owner not found (required for gateway agent USER.md rendering).",
             )
-        raw_token = mint_agent_token(agent)
+        raw_token = await mint_agent_token(agent)
         mark_provision_requested(
             agent,
             action=action,
@@ -0,0 +1,148 @@
+"""Process-wide Jinja environment for agent workspace templates.
+
+Provisioning renders the same `backend/templates/*.j2` files for every agent.
+One shared environment keeps compiled templates in memory, a bytecode cache
+lets new processes skip parsing, and per-agent overrides (`identity_template`,
+`soul_template`) are compiled once per distinct content. With auto-reload on
+(the default in dev), edited template files are recompiled on next use.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from jinja2 import (
+    BytecodeCache,
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    StrictUndefined,
+    Template,
+    TemplateNotFound,
+    select_autoescape,
+)
+
+from app.core.config import settings
+
+
+def templates_root() -> Path:
+    return Path(__file__).resolve().parents[3] / "templates"
+
+
+@dataclass(frozen=True)
+class AgentTemplateCacheStats:
+    """Override-template cache counters since the renderer was created."""
+
+    override_hits: int
+    override_misses: int
+    override_entries: int
+
+
+class AgentTemplates:
+    """Shared template environment plus an LRU of compiled override templates."""
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        auto_reload: bool = False,
+        bytecode_cache: BytecodeCache | None = None,
+        override_cache_size: int = 256,
+    ) -> None:
+        self.env = Environment(
+            loader=FileSystemLoader(root),
+            # Render markdown verbatim (HTML escaping makes it harder for agents to read).
+            autoescape=select_autoescape(default=False),
+            undefined=StrictUndefined,
+            keep_trailing_newline=True,
+            auto_reload=auto_reload,
+            bytecode_cache=bytecode_cache,
+        )
+        self._override_cache_size = max(1, override_cache_size)
+        self._overrides: OrderedDict[str, Template] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_template(self, name: str) -> Template:
+        """Return the compiled file template `name`.
+
+        Raises FileNotFoundError when the template file does not exist.
+        """
+        try:
+            return self.env.get_template(name)
+        except TemplateNotFound as exc:
+            msg = f"Missing template file: {name}"
+            raise FileNotFoundError(msg) from exc
+
+    def from_string(self, source: str) -> Template:
+        """Return a compiled template for override `source`, compiling it at most once."""
+        key = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        with self._lock:
+            template = self._overrides.get(key)
+            if template is not None:
+                self._overrides.move_to_end(key)
+                self._hits += 1
+                return template
+            self._misses += 1
+        # Compile outside the lock; a concurrent miss on the same source is harmless.
+        template = self.env.from_string(source)
+        with self._lock:
+            self._overrides[key] = template
+            self._overrides.move_to_end(key)
+            while len(self._overrides) > self._override_cache_size:
+                self._overrides.popitem(last=False)
+        return template
+
+    def stats(self) -> AgentTemplateCacheStats:
+        with self._lock:
+            return AgentTemplateCacheStats(
+                override_hits=self._hits,
+                override_misses=self._misses,
+                override_entries=len(self._overrides),
+            )
+
+
+_templates: AgentTemplates | None = None
+_templates_lock = threading.Lock()
+
+
+def _bytecode_cache() -> BytecodeCache | None:
+    if not settings.agent_template_bytecode_cache:
+        return None
+    directory = settings.agent_template_bytecode_cache_dir.strip()
+    if not directory:
+        # Jinja's default: a per-user directory under the system temp dir.
+        return FileSystemBytecodeCache()
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    return FileSystemBytecodeCache(str(path))
+
+
+def get_agent_templates() -> AgentTemplates:
+    """Return the process-wide agent template environment configured in settings."""
+    global _templates
+    if _templates is None:
+        with _templates_lock:
+            if _templates is None:
+                auto_reload = settings.agent_template_auto_reload
+                _templates = AgentTemplates(
+                    templates_root(),
+                    auto_reload=(
+                        settings.environment == "dev" if auto_reload is None else auto_reload
+                    ),
+                    bytecode_cache=_bytecode_cache(),
+                    override_cache_size=settings.agent_template_override_cache_size,
+                )
+    return _templates
+
+
+def set_agent_templates(templates: AgentTemplates | None) -> None:
+    """Replace the process-wide templates (``None`` rebuilds them from settings lazily)."""
+    global _templates
+    with _templates_lock:
+        _templates = templates
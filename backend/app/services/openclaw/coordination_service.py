@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 from abc import ABC
 from collections.abc import Awaitable, Callable
@@ -14,6 +15,7 @@ from sqlmodel import col, select
 from app.core.config import settings
 from app.core.logging import TRACE_LEVEL
 from app.core.time import utcnow
+from app.db.session import async_session_maker
 from app.models.agents import Agent
 from app.models.boards import Board
 from app.models.gateways import Gateway
@@ -553,6 +555,64 @@ class GatewayCoordinationService(AbstractGatewayMessagingService):
         )
         return lead, lead_created
 
+    async def _broadcast_to_board(
+        self,
+        *,
+        gateway: Gateway,
+        config: GatewayClientConfig,
+        board: Board,
+        message: str,
+        timeout_s: float,
+    ) -> GatewayLeadBroadcastBoardResult:
+        deadline = asyncio.timeout(timeout_s)
+        try:
+            async with deadline:
+                # Boards are messaged concurrently, so each needs its own DB session.
+                async with async_session_maker() as session:
+                    lead, _lead_created = await GatewayCoordinationService(
+                        session,
+                    )._ensure_and_message_board_lead(
+                        gateway=gateway,
+                        config=config,
+                        board=board,
+                        message=message,
+                    )
+        except (HTTPException, OpenClawGatewayError, TimeoutError, ValueError) as exc:
+            if deadline.expired():
+                return GatewayLeadBroadcastBoardResult(
+                    board_id=board.id,
+                    ok=False,
+                    timed_out=True,
+                    error=f"Timed out after {timeout_s:g}s.",
+                )
+            return GatewayLeadBroadcastBoardResult(
+                board_id=board.id,
+                ok=False,
+                error=map_gateway_error_message(
+                    GatewayOperation.LEAD_BROADCAST_DISPATCH,
+                    exc,
+                ),
+            )
+        except Exception as exc:
+            # Report it against this board so the other boards' results are kept.
+            self.logger.exception(
+                "gateway.coordination.lead_broadcast.board_failed_unexpected board_id=%s "
+                "error_type=%s",
+                board.id,
+                exc.__class__.__name__,
+            )
+            return GatewayLeadBroadcastBoardResult(
+                board_id=board.id,
+                ok=False,
+                error=f"Unexpected error: {exc.__class__.__name__}.",
+            )
+        return GatewayLeadBroadcastBoardResult(
+            board_id=board.id,
+            lead_agent_id=lead.id,
+            lead_agent_name=lead.name,
+            ok=True,
+        )
+
     async def message_gateway_board_lead(
         self,
         *,
@@ -668,11 +728,10 @@ class GatewayCoordinationService(AbstractGatewayMessagingService):
             statement = statement.where(col(Board.id).in_(payload.board_ids))
         boards = list(await self.session.exec(statement))
 
-        results: list[GatewayLeadBroadcastBoardResult] = []
-        sent = 0
-        failed = 0
+        semaphore = asyncio.Semaphore(settings.gateway_lead_broadcast_concurrency)
+        timeout_s = settings.gateway_lead_broadcast_board_timeout_seconds
 
-        for board in boards:
+        async def _send(board: Board) -> GatewayLeadBroadcastBoardResult:
             message = self._build_gateway_lead_message(
                 board=board,
                 actor_agent_name=actor_agent.name,
@@ -682,50 +741,45 @@ class GatewayCoordinationService(AbstractGatewayMessagingService):
                 reply_tags=payload.reply_tags,
                 reply_source=payload.reply_source,
             )
-            try:
-                lead, _lead_created = await self._ensure_and_message_board_lead(
+            async with semaphore:
+                return await self._broadcast_to_board(
                     gateway=gateway,
                     config=config,
                     board=board,
                     message=message,
+                    timeout_s=timeout_s,
                 )
-                board_result = GatewayLeadBroadcastBoardResult(
-                    board_id=board.id,
-                    lead_agent_id=lead.id,
-                    lead_agent_name=lead.name,
-                    ok=True,
-                )
-                sent += 1
-            except (HTTPException, OpenClawGatewayError, TimeoutError, ValueError) as exc:
-                board_result = GatewayLeadBroadcastBoardResult(
-                    board_id=board.id,
-                    ok=False,
-                    error=map_gateway_error_message(
-                        GatewayOperation.LEAD_BROADCAST_DISPATCH,
-                        exc,
-                    ),
-                )
-                failed += 1
-            results.append(board_result)
+
+        # Each board is bounded by its own timeout, so one slow lead provisioning
+        # cannot hold up the others and the response always covers every board.
+        results = list(await asyncio.gather(*(_send(board) for board in boards)))
+        sent = sum(1 for result in results if result.ok)
+        failed = len(results) - sent
+        timed_out = sum(1 for result in results if result.timed_out)
 
         record_activity(
             self.session,
             event_type="gateway.main.lead_broadcast.sent",
-            message=f"Broadcast {payload.kind} to {sent} board leads (failed: {failed}).",
+            message=(
+                f"Broadcast {payload.kind} to {sent} board leads "
+                f"(failed: {failed}, timed out: {timed_out})."
+            ),
             agent_id=actor_agent.id,
         )
         await self.session.commit()
         self.logger.info(
             "gateway.coordination.lead_broadcast.success trace_id=%s actor_agent_id=%s sent=%s "
-            "failed=%s",
+            "failed=%s timed_out=%s",
             trace_id,
             actor_agent.id,
             sent,
             failed,
+            timed_out,
         )
         return GatewayLeadBroadcastResponse(
             ok=True,
             sent=sent,
             failed=failed,
+            timed_out=timed_out,
             results=results,
         )
@@ -1,10 +1,17 @@
-"""OpenClaw-compatible device identity and connect-signature helpers."""
+"""OpenClaw-compatible device identity and connect-signature helpers.
+
+`load_device_identity` keeps the identity and its parsed Ed25519 keys in
+process, re-reading the identity file only when its inode, mtime or size
+changes, so a gateway handshake costs one signature instead of a file read,
+JSON parse and two PEM parses.
+"""
 
 from __future__ import annotations
 
 import hashlib
 import json
 import os
+import threading
 from dataclasses import dataclass
 from pathlib import Path
 from time import time
@@ -28,6 +35,30 @@ class DeviceIdentity:
     private_key_pem: str
 
 
+@dataclass(frozen=True)
+class LoadedDeviceIdentity:
+    """Device identity with its keys already parsed for signing."""
+
+    identity: DeviceIdentity
+    public_key_raw_base64url: str
+    private_key: Ed25519PrivateKey
+
+    @property
+    def device_id(self) -> str:
+        return self.identity.device_id
+
+    def sign(self, payload: str) -> str:
+        """Sign a device payload and return the base64url signature."""
+        return _base64url_encode(self.private_key.sign(payload.encode("utf-8")))
+
+
+# (path, inode, mtime_ns, size) of the identity file a cached load came from.
+_FileStamp = tuple[str, int, int, int]
+
+_loaded: tuple[_FileStamp, LoadedDeviceIdentity] | None = None
+_loaded_lock = threading.Lock()
+
+
 def _identity_path() -> Path:
     raw = os.getenv("OPENCLAW_GATEWAY_DEVICE_IDENTITY_PATH", "").strip()
     if raw:
@@ -124,6 +155,44 @@ def load_or_create_device_identity() -> DeviceIdentity:
     return identity
 
 
+def _file_stamp(path: Path) -> _FileStamp | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (str(path), stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def _load_private_key(private_key_pem: str) -> Ed25519PrivateKey:
+    loaded = serialization.load_pem_private_key(private_key_pem.encode("utf-8"), password=None)
+    if not isinstance(loaded, Ed25519PrivateKey):
+        msg = "device identity private key is not Ed25519"
+        raise ValueError(msg)
+    return loaded
+
+
+def load_device_identity() -> LoadedDeviceIdentity:
+    """Return the process-cached device identity, reloading it when the file changes."""
+    global _loaded
+    path = _identity_path()
+    cached = _loaded
+    if cached is not None and cached[0] == _file_stamp(path):
+        return cached[1]
+    with _loaded_lock:
+        cached = _loaded
+        if cached is not None and cached[0] == _file_stamp(path):
+            return cached[1]
+        identity = load_or_create_device_identity()
+        loaded = LoadedDeviceIdentity(
+            identity=identity,
+            public_key_raw_base64url=public_key_raw_base64url_from_pem(identity.public_key_pem),
+            private_key=_load_private_key(identity.private_key_pem),
+        )
+        stamp = _file_stamp(path)
+        _loaded = (stamp, loaded) if stamp is not None else None
+        return loaded
+
+
 def public_key_raw_base64url_from_pem(public_key_pem: str) -> str:
     """Return raw Ed25519 public key in base64url form expected by OpenClaw."""
     return _base64url_encode(_derive_public_key_raw(public_key_pem))
@@ -131,11 +200,7 @@ def public_key_raw_base64url_from_pem(public_key_pem: str) -> str:
 
 def sign_device_payload(private_key_pem: str, payload: str) -> str:
     """Sign a device payload with Ed25519 and return base64url signature."""
-    loaded = serialization.load_pem_private_key(private_key_pem.encode("utf-8"), password=None)
-    if not isinstance(loaded, Ed25519PrivateKey):
-        msg = "device identity private key is not Ed25519"
-        raise ValueError(msg)
-    signature = loaded.sign(payload.encode("utf-8"))
+    signature = _load_private_key(private_key_pem).sign(payload.encode("utf-8"))
     return _base64url_encode(signature)
 
 
@@ -0,0 +1,269 @@
+"""Short-lived cache for read-only gateway RPC results.
+
+Status pages, session lists and template sync call the same read methods
+(`sessions.list`, `config.get`, `agents.files.*`, ...) over and over. Results of
+allowlisted read methods are cached per gateway endpoint and `method + params`
+for a per-method TTL:
+
+- concurrent misses for the same key share one in-flight call (coalescing);
+- a write method sent through `openclaw_call`/`openclaw_call_many` drops the
+  cached reads it can change on that gateway, and a read that was in flight
+  when the write happened is not stored;
+- errors are never cached.
+
+Entries are process-local; other replicas converge within the TTL.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import json
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from app.core.config import settings
+
+# Read methods safe to serve from cache, with their default TTL in seconds.
+# `gateway_rpc_cache_ttl_overrides` can change a TTL or disable a method (0).
+DEFAULT_CACHE_TTLS: dict[str, float] = {
+    "sessions.list": 5.0,
+    "config.get": 30.0,
+    "agents.list": 30.0,
+    "agents.files.list": 30.0,
+    "agents.files.get": 30.0,
+    "models.list": 60.0,
+}
+
+# Write method -> cached read methods whose results it can change.
+WRITE_INVALIDATIONS: dict[str, frozenset[str]] = {
+    **dict.fromkeys(
+        (
+            "sessions.patch",
+            "sessions.reset",
+            "sessions.delete",
+            "sessions.compact",
+            "chat.send",
+            "send",
+            "agent",
+        ),
+        frozenset({"sessions.list"}),
+    ),
+    **dict.fromkeys(
+        ("agents.files.set", "agents.files.delete"),
+        frozenset({"agents.files.list", "agents.files.get"}),
+    ),
+    **dict.fromkeys(
+        ("agents.create", "agents.update", "agents.delete"),
+        frozenset(
+            {"agents.list", "agents.files.list", "agents.files.get", "config.get", "sessions.list"},
+        ),
+    ),
+    **dict.fromkeys(
+        ("config.set", "config.apply", "config.patch"),
+        frozenset({"config.get", "agents.list", "models.list"}),
+    ),
+}
+
+_CacheKey = tuple[str, str, str, str]
+
+
+@dataclass(frozen=True)
+class GatewayRpcCacheStats:
+    """Counters describing cache effectiveness since the cache was created."""
+
+    hits: int
+    misses: int
+    coalesced: int
+    invalidations: int
+    entries: int
+
+
+@dataclass
+class _Entry:
+    value: object
+    expires_at: float
+
+
+def _params_key(params: Mapping[str, Any] | None) -> str:
+    if not params:
+        return ""
+    return json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class GatewayRpcCache:
+    """Thread-safe TTL cache with request coalescing for gateway reads."""
+
+    def __init__(
+        self,
+        *,
+        ttls: Mapping[str, float] | None = None,
+        max_entries: int = 1024,
+    ) -> None:
+        resolved = dict(DEFAULT_CACHE_TTLS if ttls is None else ttls)
+        self._ttls = {method: ttl for method, ttl in resolved.items() if ttl > 0}
+        self._max_entries = max(1, max_entries)
+        self._entries: OrderedDict[_CacheKey, _Entry] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._in_flight: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop,
+            dict[tuple[_CacheKey, int], asyncio.Task[object]],
+        ] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._invalidations = 0
+
+    def is_cacheable(self, method: str) -> bool:
+        return method in self._ttls
+
+    def _lookup(self, key: _CacheKey, now: float) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: _CacheKey, generation: int, value: object) -> None:
+        with self._lock:
+            # A write invalidated this gateway while the read was in flight.
+            if self._generations.get(key[0], 0) != generation:
+                return
+            self._entries[key] = _Entry(
+                value=value,
+                expires_at=time.monotonic() + self._ttls[key[2]],
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    async def get_or_fetch(
+        self,
+        *,
+        scope: str,
+        credential: str,
+        method: str,
+        params: Mapping[str, Any] | None,
+        fetch: Callable[[], Awaitable[object]],
+    ) -> object:
+        """Return a cached result for `method`/`params` or fetch it once.
+
+        `scope` identifies the gateway endpoint (the unit of invalidation) and
+        `credential` separates callers whose tokens may see different results.
+        Callers always receive their own copy of the payload.
+        """
+        if method not in self._ttls:
+            return await fetch()
+        key: _CacheKey = (scope, credential, method, _params_key(params))
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._lookup(key, time.monotonic())
+            if entry is not None:
+                self._hits += 1
+                return copy.deepcopy(entry.value)
+            generation = self._generations.get(scope, 0)
+            in_flight = self._in_flight.setdefault(loop, {})
+            task = in_flight.get((key, generation))
+            if task is None:
+                self._misses += 1
+                task = loop.create_task(self._fetch(key, generation, fetch))
+                in_flight[(key, generation)] = task
+                task.add_done_callback(
+                    lambda done: self._forget(loop, (key, generation), done),
+                )
+            else:
+                self._coalesced += 1
+        # Shielded so one cancelled caller does not fail the others sharing the call.
+        return copy.deepcopy(await asyncio.shield(task))
+
+    async def _fetch(
+        self,
+        key: _CacheKey,
+        generation: int,
+        fetch: Callable[[], Awaitable[object]],
+    ) -> object:
+        value = await fetch()
+        self._store(key, generation, value)
+        return value
+
+    def _forget(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        flight_key: tuple[_CacheKey, int],
+        task: asyncio.Task[object],
+    ) -> None:
+        with self._lock:
+            in_flight = self._in_flight.get(loop)
+            if in_flight is not None and in_flight.get(flight_key) is task:
+                del in_flight[flight_key]
+        if not task.cancelled():
+            # Mark the error retrieved when every waiter was cancelled.
+            task.exception()
+
+    def invalidate_writes(self, scope: str, methods: Iterable[str]) -> None:
+        """Drop cached reads on `scope` that the given write methods can change."""
+        stale: set[str] = set()
+        for method in methods:
+            stale |= WRITE_INVALIDATIONS.get(method, frozenset())
+        if stale:
+            self.invalidate(scope, stale)
+
+    def invalidate(self, scope: str, methods: Iterable[str] | None = None) -> None:
+        """Drop cached reads on `scope` (all of them when `methods` is None)."""
+        wanted = None if methods is None else set(methods)
+        with self._lock:
+            self._generations[scope] = self._generations.get(scope, 0) + 1
+            self._invalidations += 1
+            for key in [
+                key
+                for key in self._entries
+                if key[0] == scope and (wanted is None or key[2] in wanted)
+            ]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> GatewayRpcCacheStats:
+        with self._lock:
+            return GatewayRpcCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                coalesced=self._coalesced,
+                invalidations=self._invalidations,
+                entries=len(self._entries),
+            )
+
+
+_cache: GatewayRpcCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_gateway_rpc_cache() -> GatewayRpcCache:
+    """Return the process-wide gateway read cache configured in settings."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = GatewayRpcCache(
+                    ttls={**DEFAULT_CACHE_TTLS, **settings.gateway_rpc_cache_ttl_overrides},
+                    max_entries=settings.gateway_rpc_cache_max_entries,
+                )
+    return _cache
+
+
+def set_gateway_rpc_cache(cache: GatewayRpcCache | None) -> None:
+    """Replace the process-wide cache (``None`` rebuilds it from settings lazily)."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
@@ -0,0 +1,193 @@
+"""Per-gateway circuit breakers for OpenClaw gateway RPC.
+
+Without a breaker every request and worker task retries an unreachable
+gateway on its own (`GatewayBackoff` keeps trying for minutes), piling up
+coroutines, DB sessions and websocket attempts. A `GatewayCircuitBreaker`
+tracks the outcome of recent calls to one gateway in a sliding window:
+
+- closed: calls flow; once at least `min_calls` are recorded and the failure
+  rate reaches the threshold, the circuit opens;
+- open: calls are rejected immediately until `open_seconds` have passed;
+- half-open: a single probe call is let through; success closes the circuit,
+  failure re-opens it.
+
+Only transport failures (connect errors, dropped connections, timeouts) count
+as failures; a gateway that answers with an RPC error is reachable. Breakers
+are process-local and shared by every caller in the process.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Literal
+
+from app.core.config import settings
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+@dataclass(frozen=True)
+class GatewayCircuitSnapshot:
+    """Point-in-time view of one gateway's breaker."""
+
+    state: CircuitState
+    failure_rate: float
+    window_calls: int
+    retry_after_seconds: float | None = None
+
+
+class GatewayCircuitBreaker:
+    """Failure-rate circuit breaker for a single gateway."""
+
+    def __init__(
+        self,
+        *,
+        window_size: int,
+        min_calls: int,
+        failure_rate_threshold: float,
+        open_seconds: float,
+    ) -> None:
+        self._outcomes: deque[bool] = deque(maxlen=max(1, window_size))
+        self._min_calls = max(1, min_calls)
+        self._failure_rate_threshold = failure_rate_threshold
+        self._open_seconds = open_seconds
+        self._state: CircuitState = "closed"
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for ok in self._outcomes if not ok) / len(self._outcomes)
+
+    def _retry_after(self, now: float) -> float:
+        return max(self._opened_at + self._open_seconds - now, 0.0)
+
+    def _open(self, now: float) -> None:
+        self._state = "open"
+        self._opened_at = now
+        self._probe_in_flight = False
+
+    def acquire(self) -> float | None:
+        """Admit a call; return seconds until the next probe when rejected."""
+        now = time.monotonic()
+        with self._lock:
+            if self._state == "open":
+                retry_after = self._retry_after(now)
+                if retry_after > 0:
+                    return retry_after
+                self._state = "half_open"
+            if self._state == "half_open":
+                if self._probe_in_flight:
+                    return max(self._open_seconds / 10, 0.1)
+                self._probe_in_flight = True
+            return None
+
+    def record(self, *, success: bool) -> None:
+        """Record the outcome of an admitted call."""
+        now = time.monotonic()
+        with self._lock:
+            if self._state == "half_open":
+                self._probe_in_flight = False
+                if success:
+                    self._state = "closed"
+                    self._outcomes.clear()
+                else:
+                    self._open(now)
+                return
+            if self._state == "open":
+                # A call admitted before the circuit opened; its outcome is stale.
+                return
+            self._outcomes.append(success)
+            if (
+                len(self._outcomes) >= self._min_calls
+                and self._failure_rate() >= self._failure_rate_threshold
+            ):
+                self._open(now)
+
+    def release(self) -> None:
+        """Forget an admitted call that ended without an outcome (e.g. cancelled)."""
+        with self._lock:
+            if self._state == "half_open":
+                self._probe_in_flight = False
+
+    def snapshot(self) -> GatewayCircuitSnapshot:
+        now = time.monotonic()
+        with self._lock:
+            retry_after = self._retry_after(now) if self._state == "open" else None
+            return GatewayCircuitSnapshot(
+                state=self._state,
+                failure_rate=self._failure_rate(),
+                window_calls=len(self._outcomes),
+                retry_after_seconds=retry_after,
+            )
+
+
+class GatewayCircuitRegistry:
+    """Breakers keyed by gateway label, created on first use."""
+
+    def __init__(
+        self,
+        *,
+        window_size: int,
+        min_calls: int,
+        failure_rate_threshold: float,
+        open_seconds: float,
+    ) -> None:
+        self._window_size = window_size
+        self._min_calls = min_calls
+        self._failure_rate_threshold = failure_rate_threshold
+        self._open_seconds = open_seconds
+        self._breakers: dict[str, GatewayCircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, gateway: str) -> GatewayCircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(gateway)
+            if breaker is None:
+                breaker = GatewayCircuitBreaker(
+                    window_size=self._window_size,
+                    min_calls=self._min_calls,
+                    failure_rate_threshold=self._failure_rate_threshold,
+                    open_seconds=self._open_seconds,
+                )
+                self._breakers[gateway] = breaker
+            return breaker
+
+    def snapshot(self, gateway: str) -> GatewayCircuitSnapshot:
+        """Return a gateway's breaker state (closed when it has no history)."""
+        with self._lock:
+            breaker = self._breakers.get(gateway)
+        if breaker is None:
+            return GatewayCircuitSnapshot(state="closed", failure_rate=0.0, window_calls=0)
+        return breaker.snapshot()
+
+
+_registry: GatewayCircuitRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_gateway_circuits() -> GatewayCircuitRegistry:
+    """Return the process-wide breaker registry configured in settings."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = GatewayCircuitRegistry(
+                    window_size=settings.gateway_circuit_window_size,
+                    min_calls=settings.gateway_circuit_min_calls,
+                    failure_rate_threshold=settings.gateway_circuit_failure_rate,
+                    open_seconds=settings.gateway_circuit_open_seconds,
+                )
+    return _registry
+
+
+def set_gateway_circuits(registry: GatewayCircuitRegistry | None) -> None:
+    """Replace the process-wide registry (``None`` rebuilds it from settings lazily)."""
+    global _registry
+    with _registry_lock:
+        _registry = registry
@@ -0,0 +1,491 @@
+"""Gateway event subscriptions that keep agent presence current without polling.
+
+One `GatewayEventSubscriber` per configured gateway holds a dedicated event
+connection (`subscribe_gateway_events`) and reconnects with jittered
+exponential backoff. Subscribers only run while they hold a per-gateway leader
+lock, so several API replicas never consume the same gateway twice.
+
+Agent activity (`agent`, `chat`, `heartbeat`, `presence`, `health` events) is
+reduced to session keys and buffered in a `GatewayActivityCollector`; `chat`
+events only count as activity, their messages are not stored or streamed. Each
+flush resolves the keys to agents in one query and records presence touches on
+the shared aggregator, whose bulk UPDATE bumps `updated_at` so the agents SSE
+stream publishes the change.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import threading
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import suppress
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Protocol, cast
+from uuid import UUID, uuid4
+
+import redis
+import redis.asyncio
+from sqlmodel import col, select
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.time import utcnow
+from app.db.session import async_session_maker
+from app.models.agents import Agent
+from app.models.gateways import Gateway
+from app.services.agent_presence import get_presence_aggregator
+from app.services.openclaw.constants import _SECURE_RANDOM, AGENT_SESSION_PREFIX
+from app.services.openclaw.gateway_resolver import optional_gateway_client_config
+from app.services.openclaw.gateway_rpc import GatewayConfig as GatewayClientConfig
+from app.services.openclaw.gateway_rpc import (
+    GatewayEvent,
+    OpenClawGatewayError,
+    subscribe_gateway_events,
+)
+
+if TYPE_CHECKING:
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+logger = get_logger(__name__)
+
+AGENT_ACTIVITY_EVENTS = frozenset({"agent", "chat", "heartbeat", "presence", "health"})
+_NESTED_ENTRY_KEYS = ("agents", "sessions", "presence", "entries")
+_LOCK_KEY_PREFIX = "mc:gateway-events:leader:"
+_RECONNECT_BASE_DELAY_S = 1.0
+# Lock calls run on the event loop; a slow Redis counts as not holding the lock.
+_REDIS_TIMEOUT_SECONDS = 1.0
+
+_REFRESH_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+  return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+  return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _agent_main_session_key(session_key: str) -> str | None:
+    parts = session_key.strip().split(":")
+    if len(parts) < 2 or parts[0] != AGENT_SESSION_PREFIX or not parts[1]:
+        return None
+    return f"{AGENT_SESSION_PREFIX}:{parts[1]}:main"
+
+
+def event_session_keys(event: GatewayEvent) -> set[str]:
+    """Return main session keys of agents an event shows as active."""
+    if event.event not in AGENT_ACTIVITY_EVENTS:
+        return set()
+    payload = event.payload
+    entries: list[object] = list(payload) if isinstance(payload, list) else [payload]
+    if isinstance(payload, dict):
+        for key in _NESTED_ENTRY_KEYS:
+            nested = payload.get(key)
+            if isinstance(nested, list):
+                entries.extend(nested)
+    keys: set[str] = set()
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        session_key = entry.get("sessionKey") or entry.get("session_key")
+        if isinstance(session_key, str):
+            main_key = _agent_main_session_key(session_key)
+            if main_key is not None:
+                keys.add(main_key)
+        agent_id = entry.get("agentId") or entry.get("agent_id")
+        if isinstance(agent_id, str) and agent_id.strip():
+            keys.add(f"{AGENT_SESSION_PREFIX}:{agent_id.strip()}:main")
+    return keys
+
+
+class GatewayActivityCollector:
+    """Buffers agent activity seen on gateway events until the next flush."""
+
+    def __init__(self) -> None:
+        self._pending: dict[tuple[UUID, str], datetime] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def observe(self, gateway_id: UUID, event: GatewayEvent) -> None:
+        seen_at = utcnow()
+        for session_key in event_session_keys(event):
+            self._pending[(gateway_id, session_key)] = seen_at
+
+    async def flush(self, session: AsyncSession) -> int:
+        """Resolve buffered session keys to agents and record presence touches."""
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        session_keys = {session_key for _gateway_id, session_key in pending}
+        rows = await session.exec(
+            select(Agent.id, Agent.gateway_id, Agent.openclaw_session_id).where(
+                col(Agent.openclaw_session_id).in_(session_keys),
+            ),
+        )
+        aggregator = get_presence_aggregator()
+        touched = 0
+        for agent_id, gateway_id, session_key in rows:
+            seen_at = pending.get((gateway_id, session_key or ""))
+            if seen_at is None:
+                continue
+            await aggregator.record(agent_id, seen_at=seen_at)
+            touched += 1
+        logger.debug(
+            "gateway.events.flushed session_keys=%s agents=%s",
+            len(session_keys),
+            touched,
+        )
+        return touched
+
+    async def flush_with_new_session(self) -> int:
+        async with async_session_maker() as session:
+            return await self.flush(session)
+
+    async def run(self, interval_seconds: float) -> None:
+        """Flush forever at a fixed interval (cancel to stop)."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.flush_with_new_session()
+            except Exception:
+                logger.exception("gateway.events.flush_failed")
+
+
+class LeaderLock(Protocol):
+    """Per-gateway lock that elects the replica allowed to subscribe."""
+
+    async def acquire(self, name: str) -> bool:
+        """Take or keep the lock; return whether this process holds it."""
+        ...
+
+    async def refresh(self, name: str) -> bool:
+        """Extend a held lock; return False when leadership was lost."""
+        ...
+
+    async def release(self, name: str) -> None:
+        """Give the lock up if this process holds it."""
+        ...
+
+
+class InMemoryLeaderLock:
+    """Single-replica lock: the local process always leads."""
+
+    async def acquire(self, name: str) -> bool:
+        _ = name
+        return True
+
+    async def refresh(self, name: str) -> bool:
+        _ = name
+        return True
+
+    async def release(self, name: str) -> None:
+        _ = name
+
+
+class RedisLeaderLock:
+    """Leader lock held as a Redis key with a TTL and an owner token."""
+
+    def __init__(
+        self,
+        client: redis.asyncio.Redis,
+        *,
+        ttl_seconds: float,
+        owner: str | None = None,
+        key_prefix: str = _LOCK_KEY_PREFIX,
+    ) -> None:
+        self._client = client
+        self._ttl_ms = max(1, int(ttl_seconds * 1000))
+        self._owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex}"
+        self._key_prefix = key_prefix
+
+    def _key(self, name: str) -> str:
+        return f"{self._key_prefix}{name}"
+
+    async def acquire(self, name: str) -> bool:
+        if await self.refresh(name):
+            return True
+        try:
+            return bool(
+                await self._client.set(self._key(name), self._owner, nx=True, px=self._ttl_ms),
+            )
+        except redis.RedisError as exc:
+            logger.warning("gateway.events.lock.acquire_failed name=%s error=%s", name, exc)
+            return False
+
+    async def refresh(self, name: str) -> bool:
+        try:
+            refreshed = await cast(
+                Awaitable[Any],
+                self._client.eval(
+                    _REFRESH_SCRIPT,
+                    1,
+                    self._key(name),
+                    self._owner,
+                    str(self._ttl_ms),
+                ),
+            )
+        except redis.RedisError as exc:
+            logger.warning("gateway.events.lock.refresh_failed name=%s error=%s", name, exc)
+            return False
+        return bool(refreshed)
+
+    async def release(self, name: str) -> None:
+        try:
+            await cast(
+                Awaitable[Any],
+                self._client.eval(_RELEASE_SCRIPT, 1, self._key(name), self._owner),
+            )
+        except redis.RedisError as exc:
+            logger.warning("gateway.events.lock.release_failed name=%s error=%s", name, exc)
+
+
+EventStreamFactory = Callable[[GatewayClientConfig], AsyncIterator[GatewayEvent]]
+
+
+def _default_event_stream(config: GatewayClientConfig) -> AsyncIterator[GatewayEvent]:
+    return subscribe_gateway_events(config=config)
+
+
+class _LeadershipLostError(Exception):
+    pass
+
+
+class GatewayEventSubscriber:
+    """Consumes one gateway's events while holding its leader lock."""
+
+    def __init__(
+        self,
+        gateway_id: UUID,
+        config: GatewayClientConfig,
+        *,
+        lock: LeaderLock,
+        collector: GatewayActivityCollector,
+        lock_ttl_seconds: float,
+        idle_timeout_seconds: float,
+        reconnect_max_seconds: float,
+        stream_factory: EventStreamFactory = _default_event_stream,
+    ) -> None:
+        self.gateway_id = gateway_id
+        self.config = config
+        self._lock = lock
+        self._collector = collector
+        self._lock_ttl_seconds = lock_ttl_seconds
+        self._idle_timeout_seconds = idle_timeout_seconds
+        self._reconnect_max_seconds = reconnect_max_seconds
+        self._stream_factory = stream_factory
+        self._delay_s = _RECONNECT_BASE_DELAY_S
+        self.events_received = 0
+
+    @property
+    def _lock_name(self) -> str:
+        return str(self.gateway_id)
+
+    async def _hold_leadership(self) -> None:
+        while True:
+            await asyncio.sleep(self._lock_ttl_seconds / 3)
+            if not await self._lock.refresh(self._lock_name):
+                raise _LeadershipLostError
+
+    async def _consume(self) -> None:
+        stream = self._stream_factory(self.config)
+        try:
+            while True:
+                async with asyncio.timeout(self._idle_timeout_seconds):
+                    event = await anext(stream, None)
+                if event is None:
+                    return
+                self._delay_s = _RECONNECT_BASE_DELAY_S
+                self.events_received += 1
+                self._collector.observe(self.gateway_id, event)
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                with suppress(Exception):
+                    await aclose()
+
+    async def _consume_as_leader(self) -> None:
+        consumer = asyncio.create_task(self._consume())
+        keeper = asyncio.create_task(self._hold_leadership())
+        try:
+            done, _pending = await asyncio.wait(
+                {consumer, keeper},
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        finally:
+            for task in (consumer, keeper):
+                task.cancel()
+            await asyncio.gather(consumer, keeper, return_exceptions=True)
+        for task in done:
+            task.result()
+
+    async def _backoff(self) -> None:
+        delay = self._delay_s * (1.0 + _SECURE_RANDOM.uniform(-0.2, 0.2))
+        self._delay_s = min(self._delay_s * 2.0, self._reconnect_max_seconds)
+        await asyncio.sleep(delay)
+
+    async def run(self) -> None:
+        """Subscribe whenever this process leads the gateway (cancel to stop)."""
+        try:
+            while True:
+                if not await self._lock.acquire(self._lock_name):
+                    await asyncio.sleep(self._lock_ttl_seconds / 2)
+                    continue
+                try:
+                    await self._consume_as_leader()
+                    logger.info("gateway.events.closed gateway_id=%s", self.gateway_id)
+                except _LeadershipLostError:
+                    logger.warning(
+                        "gateway.events.leadership_lost gateway_id=%s",
+                        self.gateway_id,
+                    )
+                    continue
+                except (OpenClawGatewayError, TimeoutError) as exc:
+                    logger.warning(
+                        "gateway.events.disconnected gateway_id=%s error=%s",
+                        self.gateway_id,
+                        str(exc) or exc.__class__.__name__,
+                    )
+                except Exception:
+                    # Keep the subscriber alive; an unexpected frame or bug is retried.
+                    logger.exception("gateway.events.failed gateway_id=%s", self.gateway_id)
+                await self._backoff()
+        finally:
+            await self._lock.release(self._lock_name)
+
+
+class GatewayEventSupervisor:
+    """Keeps one subscriber task running per configured gateway."""
+
+    def __init__(
+        self,
+        *,
+        lock: LeaderLock,
+        collector: GatewayActivityCollector | None = None,
+        stream_factory: EventStreamFactory = _default_event_stream,
+    ) -> None:
+        self._lock = lock
+        self.collector = collector or GatewayActivityCollector()
+        self._stream_factory = stream_factory
+        self._subscribers: dict[UUID, tuple[GatewayEventSubscriber, asyncio.Task[None]]] = {}
+
+    @property
+    def gateway_ids(self) -> set[UUID]:
+        return set(self._subscribers)
+
+    def _start(self, gateway_id: UUID, config: GatewayClientConfig) -> None:
+        subscriber = GatewayEventSubscriber(
+            gateway_id,
+            config,
+            lock=self._lock,
+            collector=self.collector,
+            lock_ttl_seconds=settings.gateway_events_lock_ttl_seconds,
+            idle_timeout_seconds=settings.gateway_events_idle_timeout_seconds,
+            reconnect_max_seconds=settings.gateway_events_reconnect_max_seconds,
+            stream_factory=self._stream_factory,
+        )
+        self._subscribers[gateway_id] = (subscriber, asyncio.create_task(subscriber.run()))
+
+    async def _stop(self, gateway_id: UUID) -> None:
+        _subscriber, task = self._subscribers.pop(gateway_id)
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+    def _reap(self, gateway_id: UUID) -> None:
+        _subscriber, task = self._subscribers.pop(gateway_id)
+        exc = None if task.cancelled() else task.exception()
+        logger.error(
+            "gateway.events.subscriber_exited gateway_id=%s",
+            gateway_id,
+            exc_info=exc,
+        )
+
+    async def sync(self, session: AsyncSession) -> None:
+        """Start, restart, or stop subscribers to match the configured gateways.
+
+        Subscribers whose task has exited are dropped and started again.
+        """
+        gateways = (await session.exec(select(Gateway))).all()
+        configs: dict[UUID, GatewayClientConfig] = {}
+        for gateway in gateways:
+            config = optional_gateway_client_config(gateway)
+            if config is not None:
+                configs[gateway.id] = config
+        for gateway_id in list(self._subscribers):
+            subscriber, task = self._subscribers[gateway_id]
+            if task.done():
+                self._reap(gateway_id)
+            elif configs.get(gateway_id) != subscriber.config:
+                await self._stop(gateway_id)
+        for gateway_id, config in configs.items():
+            if gateway_id not in self._subscribers:
+                self._start(gateway_id, config)
+
+    async def close(self) -> None:
+        for gateway_id in list(self._subscribers):
+            await self._stop(gateway_id)
+
+    async def run(self, refresh_seconds: float) -> None:
+        """Track gateway configuration and flush activity until cancelled."""
+        flusher = asyncio.create_task(
+            self.collector.run(settings.gateway_events_flush_interval_seconds),
+        )
+        try:
+            while True:
+                try:
+                    async with async_session_maker() as session:
+                        await self.sync(session)
+                except Exception:
+                    logger.exception("gateway.events.sync_failed")
+                await asyncio.sleep(refresh_seconds)
+        finally:
+            flusher.cancel()
+            with suppress(asyncio.CancelledError):
+                await flusher
+            await self.close()
+            try:
+                await self.collector.flush_with_new_session()
+            except Exception:
+                logger.exception("gateway.events.final_flush_failed")
+
+
+_supervisor: GatewayEventSupervisor | None = None
+_supervisor_lock = threading.Lock()
+
+
+def _build_lock() -> LeaderLock:
+    if settings.gateway_events_lock_backend == "redis":
+        redis_url = settings.gateway_events_redis_url or settings.rq_redis_url
+        return RedisLeaderLock(
+            redis.asyncio.Redis.from_url(
+                redis_url,
+                socket_timeout=_REDIS_TIMEOUT_SECONDS,
+                socket_connect_timeout=_REDIS_TIMEOUT_SECONDS,
+            ),
+            ttl_seconds=settings.gateway_events_lock_ttl_seconds,
+        )
+    return InMemoryLeaderLock()
+
+
+def get_gateway_event_supervisor() -> GatewayEventSupervisor:
+    """Return the process-wide gateway event supervisor configured in settings."""
+    global _supervisor
+    if _supervisor is None:
+        with _supervisor_lock:
+            if _supervisor is None:
+                _supervisor = GatewayEventSupervisor(lock=_build_lock())
+    return _supervisor
+
+
+def set_gateway_event_supervisor(supervisor: GatewayEventSupervisor | None) -> None:
+    """Replace the process-wide supervisor (``None`` rebuilds it from settings lazily)."""
+    global _supervisor
+    with _supervisor_lock:
+        _supervisor = supervisor
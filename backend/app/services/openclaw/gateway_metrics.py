@@ -0,0 +1,201 @@
+"""In-process latency histograms and outcome counters for gateway RPC.
+
+`gateway_rpc` records two phases per gateway: `connect` (websocket open plus the
+challenge/`connect` handshake) and `request` (send to response, per method).
+Each observation lands in a fixed-bucket histogram keyed by gateway, phase,
+method and outcome, so p95/p99 can be read per gateway/method without log
+scraping. Series are exported in Prometheus text format (`/metrics`) and as
+JSON snapshots with estimated quantiles (gateway admin API).
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from dataclasses import dataclass
+from typing import Literal
+
+RpcPhase = Literal["connect", "request"]
+RpcOutcome = Literal["ok", "gateway_error", "transport_error", "timeout"]
+
+# Upper bounds in seconds; the implicit last bucket is +Inf.
+DEFAULT_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+CONNECT_METHOD = "connect"
+_METRIC_NAME = "mission_control_gateway_rpc_duration_seconds"
+
+
+@dataclass(frozen=True)
+class RpcSeriesKey:
+    """Label set identifying one histogram series."""
+
+    gateway: str
+    phase: RpcPhase
+    method: str
+    outcome: RpcOutcome
+
+
+@dataclass(frozen=True)
+class RpcSeriesSnapshot:
+    """Point-in-time copy of one histogram series."""
+
+    key: RpcSeriesKey
+    bucket_bounds: tuple[float, ...]
+    bucket_counts: tuple[int, ...]
+    count: int
+    sum_seconds: float
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate a quantile by linear interpolation inside its bucket."""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for upper, in_bucket in zip(self.bucket_bounds, self.bucket_counts, strict=False):
+            if in_bucket and seen + in_bucket >= rank:
+                return lower + (upper - lower) * ((rank - seen) / in_bucket)
+            seen += in_bucket
+            lower = upper
+        # Rank falls in the +Inf bucket: report the largest finite bound.
+        return self.bucket_bounds[-1] if self.bucket_bounds else None
+
+
+class _Histogram:
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self, size: int) -> None:
+        self.counts = [0] * size
+        self.count = 0
+        self.sum = 0.0
+
+
+class GatewayRpcMetrics:
+    """Thread-safe registry of gateway RPC histograms."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self._buckets = tuple(sorted(buckets))
+        self._series: dict[RpcSeriesKey, _Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(
+        self,
+        *,
+        gateway: str,
+        phase: RpcPhase,
+        method: str,
+        outcome: RpcOutcome,
+        seconds: float,
+    ) -> None:
+        key = RpcSeriesKey(gateway=gateway, phase=phase, method=method, outcome=outcome)
+        index = len(self._buckets)
+        for position, bound in enumerate(self._buckets):
+            if seconds <= bound:
+                index = position
+                break
+        with self._lock:
+            histogram = self._series.get(key)
+            if histogram is None:
+                histogram = _Histogram(len(self._buckets) + 1)
+                self._series[key] = histogram
+            histogram.counts[index] += 1
+            histogram.count += 1
+            histogram.sum += max(seconds, 0.0)
+
+    def snapshot(self) -> list[RpcSeriesSnapshot]:
+        """Return every series, ordered by gateway, phase, method and outcome."""
+        with self._lock:
+            items = [
+                (key, tuple(histogram.counts), histogram.count, histogram.sum)
+                for key, histogram in self._series.items()
+            ]
+        return [
+            RpcSeriesSnapshot(
+                key=key,
+                bucket_bounds=self._buckets,
+                bucket_counts=counts[: len(self._buckets)],
+                count=count,
+                sum_seconds=total,
+            )
+            for key, counts, count, total in sorted(
+                items,
+                key=lambda item: (
+                    item[0].gateway,
+                    item[0].phase,
+                    item[0].method,
+                    item[0].outcome,
+                ),
+            )
+        ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if math.isinf(bound) else repr(float(bound))
+
+
+def render_prometheus(series: list[RpcSeriesSnapshot]) -> str:
+    """Render histogram series in the Prometheus text exposition format."""
+    lines = [
+        f"# HELP {_METRIC_NAME} OpenClaw gateway RPC latency by phase, method and outcome.",
+        f"# TYPE {_METRIC_NAME} histogram",
+    ]
+    for item in series:
+        labels = (
+            f'gateway="{_escape_label(item.key.gateway)}",phase="{item.key.phase}",'
+            f'method="{_escape_label(item.key.method)}",outcome="{item.key.outcome}"'
+        )
+        cumulative = 0
+        for bound, in_bucket in zip(
+            (*item.bucket_bounds, math.inf),
+            (*item.bucket_counts, item.count - sum(item.bucket_counts)),
+            strict=True,
+        ):
+            cumulative += in_bucket
+            lines.append(
+                f'{_METRIC_NAME}_bucket{{{labels},le="{_format_bound(bound)}"}} {cumulative}',
+            )
+        lines.append(f"{_METRIC_NAME}_sum{{{labels}}} {item.sum_seconds!r}")
+        lines.append(f"{_METRIC_NAME}_count{{{labels}}} {item.count}")
+    return "\n".join(lines) + "\n"
+
+
+_metrics: GatewayRpcMetrics | None = None
+_metrics_lock = threading.Lock()
+
+
+def get_gateway_rpc_metrics() -> GatewayRpcMetrics:
+    """Return the process-wide gateway RPC metrics registry."""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = GatewayRpcMetrics()
+    return _metrics
+
+
+def set_gateway_rpc_metrics(metrics: GatewayRpcMetrics | None) -> None:
+    """Replace the process-wide registry (``None`` creates a fresh one lazily)."""
+    global _metrics
+    with _metrics_lock:
+        _metrics = metrics
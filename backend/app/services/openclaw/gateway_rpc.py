@@ -3,6 +3,14 @@
 This is the low-level, DB-free interface for talking to the OpenClaw gateway.
 Keep gateway RPC protocol details and client helpers here so OpenClaw services
 operate within a single scope (no `app.integrations.*` plumbing).
+
+Calls share long-lived authenticated connections from a per-event-loop
+`GatewayConnectionPool`: each connection runs one reader task that routes
+responses to waiting callers by request id, so concurrent calls to the same
+gateway pay the connect/challenge/handshake cost once instead of per call.
+
+Connect/handshake and request latencies are recorded per gateway, method and
+outcome in `gateway_metrics` (see `GatewayConfig.gateway_id`).
 """
 
 from __future__ import annotations
@@ -10,21 +18,29 @@ from __future__ import annotations
 import asyncio
 import json
 import ssl
-from dataclasses import dataclass
+import threading
+import weakref
+from collections.abc import AsyncIterator, Callable, Coroutine, Sequence
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from time import perf_counter, time
 from typing import Any, Literal
 from urllib.parse import urlencode, urlparse, urlunparse
 from uuid import uuid4
 
 import websockets
-from websockets.exceptions import WebSocketException
+from websockets.exceptions import ConnectionClosed, WebSocketException
 
+from app.core.config import settings
 from app.core.logging import TRACE_LEVEL, get_logger
-from app.services.openclaw.device_identity import (
-    build_device_auth_payload,
-    load_or_create_device_identity,
-    public_key_raw_base64url_from_pem,
-    sign_device_payload,
+from app.services.openclaw.device_identity import build_device_auth_payload, load_device_identity
+from app.services.openclaw.gateway_cache import get_gateway_rpc_cache
+from app.services.openclaw.gateway_circuit import GatewayCircuitSnapshot, get_gateway_circuits
+from app.services.openclaw.gateway_metrics import (
+    CONNECT_METHOD,
+    RpcOutcome,
+    RpcPhase,
+    get_gateway_rpc_metrics,
 )
 
 PROTOCOL_VERSION = 3
@@ -40,6 +56,7 @@ DEFAULT_GATEWAY_CLIENT_MODE = "backend"
 CONTROL_UI_CLIENT_ID = "openclaw-control-ui"
 CONTROL_UI_CLIENT_MODE = "ui"
 GatewayConnectMode = Literal["device", "control_ui"]
+DEFAULT_BATCH_TIMEOUT_SECONDS = 30.0
 
 # NOTE: These are the base gateway methods from the OpenClaw gateway repo.
 # The gateway can expose additional methods at runtime via channel plugins.
@@ -166,6 +183,18 @@ class OpenClawGatewayError(RuntimeError):
     """Raised when OpenClaw gateway calls fail."""
 
 
+class GatewayCircuitOpenError(OpenClawGatewayError):
+    """Raised without contacting a gateway whose circuit breaker is open."""
+
+    def __init__(self, gateway: str, retry_after_seconds: float) -> None:
+        super().__init__(
+            f"Gateway {gateway} is unavailable (circuit open after repeated connection "
+            f"failures); next attempt allowed in {retry_after_seconds:.0f}s.",
+        )
+        self.gateway = gateway
+        self.retry_after_seconds = retry_after_seconds
+
+
 @dataclass(frozen=True)
 class GatewayConfig:
     """Connection configuration for the OpenClaw gateway."""
@@ -174,6 +203,117 @@ class GatewayConfig:
     token: str | None = None
     allow_insecure_tls: bool = False
     disable_device_pairing: bool = False
+    # Metrics label only; configs for the same endpoint share pooled connections.
+    gateway_id: str | None = field(default=None, compare=False)
+
+
+@dataclass(frozen=True)
+class GatewayCall:
+    """One request in an `openclaw_call_many` batch."""
+
+    method: str
+    params: dict[str, Any] | None = None
+
+
+@dataclass(frozen=True)
+class GatewayEvent:
+    """One server-pushed event frame (see `GATEWAY_EVENTS`)."""
+
+    event: str
+    payload: object = None
+    seq: int | None = None
+
+
+@dataclass(frozen=True)
+class GatewayCallResult:
+    """Outcome of one batched call: a payload or that call's own error."""
+
+    payload: object = None
+    error: OpenClawGatewayError | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def unwrap(self) -> object:
+        """Return the payload or raise the call's error."""
+        if self.error is not None:
+            raise self.error
+        return self.payload
+
+
+_TRANSPORT_ERRORS = (TimeoutError, ConnectionError, OSError, ValueError, WebSocketException)
+
+
+def _gateway_label(config: GatewayConfig) -> str:
+    if config.gateway_id:
+        return config.gateway_id
+    parsed = urlparse((config.url or "").strip())
+    return parsed.hostname or "unknown"
+
+
+def _classify_outcome(exc: BaseException | None) -> RpcOutcome:
+    if exc is None:
+        return "ok"
+    if isinstance(exc, OpenClawGatewayError):
+        return "gateway_error"
+    # Caller deadlines (`asyncio.timeout`, batch deadlines) cancel the awaiting task.
+    if isinstance(exc, (TimeoutError, asyncio.CancelledError)):
+        return "timeout"
+    return "transport_error"
+
+
+@asynccontextmanager
+async def _observed(gateway: str, phase: RpcPhase, method: str) -> AsyncIterator[None]:
+    """Record the wrapped block's latency and outcome in the RPC metrics."""
+    started_at = perf_counter()
+    error: BaseException | None = None
+    try:
+        yield
+    except BaseException as exc:
+        error = exc
+        raise
+    finally:
+        # Requests that never reached the socket are retried, not counted.
+        if not isinstance(error, _StaleConnectionError):
+            get_gateway_rpc_metrics().observe(
+                gateway=gateway,
+                phase=phase,
+                method=method,
+                outcome=_classify_outcome(error),
+                seconds=perf_counter() - started_at,
+            )
+
+
+@asynccontextmanager
+async def _circuit_guard(config: GatewayConfig) -> AsyncIterator[None]:
+    """Fail fast while the gateway's breaker is open and record call outcomes."""
+    if not settings.gateway_circuit_enabled:
+        yield
+        return
+    gateway = _gateway_label(config)
+    breaker = get_gateway_circuits().breaker(gateway)
+    retry_after = breaker.acquire()
+    if retry_after is not None:
+        raise GatewayCircuitOpenError(gateway, retry_after)
+    try:
+        yield
+    except OpenClawGatewayError:
+        # The gateway answered; an RPC-level error says nothing about reachability.
+        breaker.record(success=True)
+        raise
+    except _TRANSPORT_ERRORS:
+        breaker.record(success=False)
+        raise
+    except BaseException:
+        breaker.release()
+        raise
+    breaker.record(success=True)
+
+
+def gateway_circuit_snapshot(config: GatewayConfig) -> GatewayCircuitSnapshot:
+    """Return the circuit breaker state for a gateway config."""
+    return get_gateway_circuits().snapshot(_gateway_label(config))
 
 
 def _build_gateway_url(config: GatewayConfig) -> str:
@@ -243,7 +383,7 @@ def _build_device_connect_payload(
     auth_token: str | None,
     connect_nonce: str | None,
 ) -> dict[str, Any]:
-    identity = load_or_create_device_identity()
+    identity = load_device_identity()
     signed_at_ms = int(time() * 1000)
     payload = build_device_auth_payload(
         device_id=identity.device_id,
@@ -257,8 +397,8 @@ def _build_device_connect_payload(
     )
     device_payload: dict[str, Any] = {
         "id": identity.device_id,
-        "publicKey": public_key_raw_base64url_from_pem(identity.public_key_pem),
-        "signature": sign_device_payload(identity.private_key_pem, payload),
+        "publicKey": identity.public_key_raw_base64url,
+        "signature": identity.sign(payload),
         "signedAt": signed_at_ms,
     }
     if connect_nonce:
@@ -266,6 +406,20 @@ def _build_device_connect_payload(
     return device_payload
 
 
+def _response_result(data: dict[str, Any]) -> object:
+    """Return the payload of a response frame, raising on gateway errors."""
+    if data.get("type") == "res":
+        ok = data.get("ok")
+        if ok is not None and not ok:
+            error = data.get("error", {}).get("message", "Gateway error")
+            raise OpenClawGatewayError(error)
+        return data.get("payload")
+    if data.get("error"):
+        message = data["error"].get("message", "Gateway error")
+        raise OpenClawGatewayError(message)
+    return data.get("result")
+
+
 async def _await_response(
     ws: websockets.ClientConnection,
     request_id: str,
@@ -279,26 +433,11 @@ async def _await_response(
             request_id,
             data.get("type"),
         )
-
-        if data.get("type") == "res" and data.get("id") == request_id:
-            ok = data.get("ok")
-            if ok is not None and not ok:
-                error = data.get("error", {}).get("message", "Gateway error")
-                raise OpenClawGatewayError(error)
-            return data.get("payload")
-
         if data.get("id") == request_id:
-            if data.get("error"):
-                message = data["error"].get("message", "Gateway error")
-                raise OpenClawGatewayError(message)
-            return data.get("result")
+            return _response_result(data)
 
 
-async def _send_request(
-    ws: websockets.ClientConnection,
-    method: str,
-    params: dict[str, Any] | None,
-) -> object:
+def _request_message(method: str, params: dict[str, Any] | None) -> tuple[str, str]:
     request_id = str(uuid4())
     message = {
         "type": "req",
@@ -313,7 +452,16 @@ async def _send_request(
         request_id,
         sorted((params or {}).keys()),
     )
-    await ws.send(json.dumps(message))
+    return request_id, json.dumps(message)
+
+
+async def _send_request(
+    ws: websockets.ClientConnection,
+    method: str,
+    params: dict[str, Any] | None,
+) -> object:
+    request_id, message = _request_message(method, params)
+    await ws.send(message)
     return await _await_response(ws, request_id)
 
 
@@ -394,6 +542,399 @@ async def _recv_first_message_or_none(
         return None
 
 
+def _connect_kwargs(config: GatewayConfig, gateway_url: str) -> dict[str, Any]:
+    origin = _build_control_ui_origin(gateway_url) if config.disable_device_pairing else None
+    connect_kwargs: dict[str, Any] = {
+        "ssl": _create_ssl_context(config),
+        "ping_interval": None,
+    }
+    if origin is not None:
+        connect_kwargs["origin"] = origin
+    return connect_kwargs
+
+
+class _StaleConnectionError(ConnectionError):
+    """Raised when a pooled connection closed before a request was sent."""
+
+
+@dataclass(frozen=True)
+class GatewayPoolStats:
+    """Snapshot of gateway connection pool activity."""
+
+    connections_opened: int
+    open_connections: int
+    requests: int
+    reconnects: int
+
+
+class _PooledGatewayConnection:
+    """One authenticated gateway websocket shared by concurrent requests."""
+
+    def __init__(
+        self,
+        ws: websockets.ClientConnection,
+        *,
+        gateway: str,
+        max_in_flight: int,
+        idle_timeout_seconds: float,
+        request_timeout_seconds: float,
+    ) -> None:
+        self._ws = ws
+        self._gateway = gateway
+        self._pending: dict[str, asyncio.Future[object]] = {}
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._max_in_flight = max_in_flight
+        self._idle_timeout_seconds = idle_timeout_seconds
+        self._request_timeout_seconds = request_timeout_seconds
+        self._idle_handle: asyncio.TimerHandle | None = None
+        self._closing: asyncio.Task[None] | None = None
+        self.active = 0
+        self.closed = False
+        self._reader = asyncio.create_task(self._read_loop())
+        self._arm_idle_timer()
+
+    @property
+    def saturated(self) -> bool:
+        return self.active >= self._max_in_flight
+
+    async def _read_loop(self) -> None:
+        reason = "connection closed"
+        try:
+            async for raw in self._ws:
+                try:
+                    data = json.loads(raw)
+                except ValueError:
+                    logger.warning("gateway.rpc.pool.invalid_frame")
+                    continue
+                if not isinstance(data, dict):
+                    continue
+                request_id = data.get("id")
+                logger.log(
+                    TRACE_LEVEL,
+                    "gateway.rpc.recv request_id=%s type=%s",
+                    request_id,
+                    data.get("type"),
+                )
+                future = self._pending.get(request_id) if isinstance(request_id, str) else None
+                if future is None or future.done():
+                    continue
+                try:
+                    future.set_result(_response_result(data))
+                except OpenClawGatewayError as exc:
+                    future.set_exception(exc)
+        except (ConnectionClosed, OSError) as exc:
+            reason = str(exc) or exc.__class__.__name__
+        finally:
+            self._mark_closed(reason)
+
+    def _mark_closed(self, reason: str) -> None:
+        self.closed = True
+        self._cancel_idle_timer()
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError(f"Gateway connection lost: {reason}"))
+
+    def _arm_idle_timer(self) -> None:
+        if self._idle_timeout_seconds <= 0 or self.closed:
+            return
+        self._idle_handle = asyncio.get_running_loop().call_later(
+            self._idle_timeout_seconds,
+            self._close_if_idle,
+        )
+
+    def _cancel_idle_timer(self) -> None:
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+
+    def _close_if_idle(self) -> None:
+        self._idle_handle = None
+        if self.active == 0 and not self.closed:
+            logger.debug("gateway.rpc.pool.idle_close")
+            self._closing = asyncio.create_task(self.close())
+
+    async def request(self, method: str, params: dict[str, Any] | None) -> object:
+        """Send one request and wait for the response routed by the reader task."""
+        if self.closed:
+            raise _StaleConnectionError
+        self.active += 1
+        self._cancel_idle_timer()
+        try:
+            async with self._slots:
+                if self.closed:
+                    raise _StaleConnectionError
+                request_id, message = _request_message(method, params)
+                future = asyncio.get_running_loop().create_future()
+                self._pending[request_id] = future
+                try:
+                    async with _observed(self._gateway, "request", method):
+                        try:
+                            await self._ws.send(message)
+                        except ConnectionClosed as exc:
+                            raise _StaleConnectionError from exc
+                        try:
+                            async with asyncio.timeout(self._request_timeout_seconds):
+                                return await future
+                        except TimeoutError:
+                            self._abandon(f"no response to {method}")
+                            raise
+                finally:
+                    self._pending.pop(request_id, None)
+                    if future.done() and not future.cancelled():
+                        # The reader may fail the future after a failed send; mark it seen.
+                        future.exception()
+        finally:
+            self.active -= 1
+            if self.active == 0:
+                self._arm_idle_timer()
+
+    def _abandon(self, reason: str) -> None:
+        """Drop a connection that stopped answering without closing (half-open)."""
+        if self.closed:
+            return
+        logger.warning("gateway.rpc.pool.unresponsive gateway=%s reason=%s", self._gateway, reason)
+        self._mark_closed(reason)
+        self._closing = asyncio.create_task(self.close())
+
+    async def close(self) -> None:
+        """Close the websocket and fail any in-flight requests."""
+        self.closed = True
+        self._cancel_idle_timer()
+        await self._ws.close()
+        await self._reader
+
+
+async def _connect_with_handshake(
+    config: GatewayConfig,
+    gateway_url: str,
+) -> tuple[websockets.ClientConnection, object]:
+    """Open a websocket and complete the connect handshake; return it with the hello payload."""
+    async with _observed(_gateway_label(config), "connect", CONNECT_METHOD):
+        ws = await websockets.connect(gateway_url, **_connect_kwargs(config, gateway_url))
+        try:
+            first_message = await _recv_first_message_or_none(ws)
+            hello = await _ensure_connected(ws, first_message, config)
+        except BaseException:
+            await ws.close()
+            raise
+    return ws, hello
+
+
+async def _open_authenticated_websocket(
+    config: GatewayConfig,
+    gateway_url: str,
+) -> websockets.ClientConnection:
+    ws, _hello = await _connect_with_handshake(config, gateway_url)
+    return ws
+
+
+async def _collect_batch(
+    calls: Sequence[GatewayCall],
+    send: Callable[[GatewayCall], Coroutine[Any, Any, object]],
+    *,
+    deadline: float,
+) -> list[GatewayCallResult]:
+    """Issue every call without waiting on earlier replies, then gather results in order."""
+    if not calls:
+        return []
+    tasks = [asyncio.create_task(send(call)) for call in calls]
+    timeout = max(deadline - asyncio.get_running_loop().time(), 0.0)
+    _done, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    results: list[GatewayCallResult] = []
+    for call, task in zip(calls, tasks, strict=True):
+        if task in pending:
+            message = f"Gateway call {call.method} exceeded the batch deadline."
+            results.append(GatewayCallResult(error=OpenClawGatewayError(message)))
+            continue
+        exc = task.exception()
+        if exc is None:
+            results.append(GatewayCallResult(payload=task.result()))
+        elif isinstance(exc, OpenClawGatewayError):
+            results.append(GatewayCallResult(error=exc))
+        elif isinstance(exc, _TRANSPORT_ERRORS):
+            error = OpenClawGatewayError(str(exc) or exc.__class__.__name__)
+            error.__cause__ = exc
+            results.append(GatewayCallResult(error=error))
+        else:
+            raise exc
+    return results
+
+
+class GatewayConnectionPool:
+    """Long-lived authenticated gateway connections keyed by `GatewayConfig`.
+
+    A call reuses the least-loaded open connection that still has in-flight
+    capacity and only opens a new connection (up to `max_connections`) when
+    every existing one is saturated. Calls that find their connection closed
+    before the request was sent are retried once on a fresh connection; a
+    connection lost mid-request fails its in-flight calls as transport errors.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections: int,
+        max_in_flight: int,
+        idle_timeout_seconds: float,
+        request_timeout_seconds: float = 30.0,
+    ) -> None:
+        self._max_connections = max(1, max_connections)
+        self._max_in_flight = max(1, max_in_flight)
+        self._idle_timeout_seconds = idle_timeout_seconds
+        self._request_timeout_seconds = request_timeout_seconds
+        self._connections: dict[GatewayConfig, list[_PooledGatewayConnection]] = {}
+        self._connect_locks: dict[GatewayConfig, asyncio.Lock] = {}
+        self._connections_opened = 0
+        self._requests = 0
+        self._reconnects = 0
+
+    def _live(self, config: GatewayConfig) -> list[_PooledGatewayConnection]:
+        live = [conn for conn in self._connections.get(config, []) if not conn.closed]
+        self._connections[config] = live
+        return live
+
+    def _pick(self, config: GatewayConfig) -> _PooledGatewayConnection | None:
+        live = self._live(config)
+        if not live:
+            return None
+        conn = min(live, key=lambda item: item.active)
+        if conn.saturated and len(live) < self._max_connections:
+            return None
+        return conn
+
+    async def _open(self, config: GatewayConfig, gateway_url: str) -> _PooledGatewayConnection:
+        ws = await _open_authenticated_websocket(config, gateway_url)
+        self._connections_opened += 1
+        logger.debug(
+            "gateway.rpc.pool.connected gateway_url=%s",
+            _redacted_url_for_log(gateway_url),
+        )
+        return _PooledGatewayConnection(
+            ws,
+            gateway=_gateway_label(config),
+            max_in_flight=self._max_in_flight,
+            idle_timeout_seconds=self._idle_timeout_seconds,
+            request_timeout_seconds=self._request_timeout_seconds,
+        )
+
+    async def _acquire(self, config: GatewayConfig, gateway_url: str) -> _PooledGatewayConnection:
+        conn = self._pick(config)
+        if conn is not None:
+            return conn
+        lock = self._connect_locks.setdefault(config, asyncio.Lock())
+        async with lock:
+            # Another caller may have opened a connection while we waited.
+            conn = self._pick(config)
+            if conn is not None:
+                return conn
+            conn = await self._open(config, gateway_url)
+            self._connections.setdefault(config, []).append(conn)
+            return conn
+
+    async def call(
+        self,
+        method: str,
+        params: dict[str, Any] | None,
+        *,
+        config: GatewayConfig,
+        gateway_url: str,
+    ) -> object:
+        """Send a request over a pooled connection and return its payload."""
+        conn = await self._acquire(config, gateway_url)
+        return await self._request(conn, method, params, config=config, gateway_url=gateway_url)
+
+    async def _request(
+        self,
+        conn: _PooledGatewayConnection,
+        method: str,
+        params: dict[str, Any] | None,
+        *,
+        config: GatewayConfig,
+        gateway_url: str,
+    ) -> object:
+        self._requests += 1
+        try:
+            return await conn.request(method, params)
+        except _StaleConnectionError:
+            self._reconnects += 1
+            conn = await self._acquire(config, gateway_url)
+            return await conn.request(method, params)
+
+    async def call_many(
+        self,
+        calls: Sequence[GatewayCall],
+        *,
+        config: GatewayConfig,
+        gateway_url: str,
+        deadline: float,
+    ) -> list[GatewayCallResult]:
+        """Pipeline a batch of requests over one pooled connection."""
+        async with asyncio.timeout_at(deadline):
+            conn = await self._acquire(config, gateway_url)
+
+        async def _send(call: GatewayCall) -> object:
+            return await self._request(
+                conn,
+                call.method,
+                call.params,
+                config=config,
+                gateway_url=gateway_url,
+            )
+
+        return await _collect_batch(calls, _send, deadline=deadline)
+
+    def stats(self) -> GatewayPoolStats:
+        """Return cumulative pool counters."""
+        return GatewayPoolStats(
+            connections_opened=self._connections_opened,
+            open_connections=sum(len(self._live(config)) for config in list(self._connections)),
+            requests=self._requests,
+            reconnects=self._reconnects,
+        )
+
+    async def close(self) -> None:
+        """Close every pooled connection."""
+        connections = [conn for conns in self._connections.values() for conn in conns]
+        self._connections.clear()
+        for conn in connections:
+            await conn.close()
+
+
+# Pools hold loop-bound asyncio state, so each event loop gets its own.
+_pools: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, GatewayConnectionPool] = (
+    weakref.WeakKeyDictionary()
+)
+_pools_lock = threading.Lock()
+
+
+def get_gateway_connection_pool() -> GatewayConnectionPool:
+    """Return the connection pool for the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _pools_lock:
+        pool = _pools.get(loop)
+        if pool is None:
+            pool = GatewayConnectionPool(
+                max_connections=settings.gateway_rpc_pool_max_connections,
+                max_in_flight=settings.gateway_rpc_pool_max_in_flight,
+                idle_timeout_seconds=settings.gateway_rpc_pool_idle_timeout_seconds,
+                request_timeout_seconds=settings.gateway_rpc_pool_request_timeout_seconds,
+            )
+            _pools[loop] = pool
+    return pool
+
+
+async def close_gateway_connection_pool() -> None:
+    """Close and drop the running event loop's connection pool."""
+    with _pools_lock:
+        pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
+
+
 async def _openclaw_call_once(
     method: str,
     params: dict[str, Any] | None,
@@ -401,15 +942,19 @@ async def _openclaw_call_once(
     config: GatewayConfig,
     gateway_url: str,
 ) -> object:
-    origin = _build_control_ui_origin(gateway_url) if config.disable_device_pairing else None
-    ssl_context = _create_ssl_context(config)
-    connect_kwargs: dict[str, Any] = {"ping_interval": None}
-    if origin is not None:
-        connect_kwargs["origin"] = origin
-    async with websockets.connect(gateway_url, ssl=ssl_context, **connect_kwargs) as ws:
-        first_message = await _recv_first_message_or_none(ws)
-        await _ensure_connected(ws, first_message, config)
-        return await _send_request(ws, method, params)
+    if settings.gateway_rpc_pool_enabled:
+        return await get_gateway_connection_pool().call(
+            method,
+            params,
+            config=config,
+            gateway_url=gateway_url,
+        )
+    ws = await _open_authenticated_websocket(config, gateway_url)
+    try:
+        async with _observed(_gateway_label(config), "request", method):
+            return await _send_request(ws, method, params)
+    finally:
+        await ws.close()
 
 
 async def _openclaw_connect_metadata_once(
@@ -417,14 +962,13 @@ async def _openclaw_connect_metadata_once(
     config: GatewayConfig,
     gateway_url: str,
 ) -> object:
-    origin = _build_control_ui_origin(gateway_url) if config.disable_device_pairing else None
-    ssl_context = _create_ssl_context(config)
-    connect_kwargs: dict[str, Any] = {"ping_interval": None}
-    if origin is not None:
-        connect_kwargs["origin"] = origin
-    async with websockets.connect(gateway_url, ssl=ssl_context, **connect_kwargs) as ws:
-        first_message = await _recv_first_message_or_none(ws)
-        return await _ensure_connected(ws, first_message, config)
+    ws, hello = await _connect_with_handshake(config, gateway_url)
+    await ws.close()
+    return hello
+
+
+def _cache_scope(config: GatewayConfig) -> str:
+    return (config.url or "").strip()
 
 
 async def openclaw_call(
@@ -433,7 +977,36 @@ async def openclaw_call(
     *,
     config: GatewayConfig,
 ) -> object:
-    """Call a gateway RPC method and return the result payload."""
+    """Call a gateway RPC method and return the result payload.
+
+    Allowlisted read methods may be answered from the gateway read cache (see
+    `gateway_cache`); write methods invalidate the cached reads they affect.
+    """
+    if not settings.gateway_rpc_cache_enabled:
+        return await _openclaw_call_uncached(method, params, config=config)
+    cache = get_gateway_rpc_cache()
+    scope = _cache_scope(config)
+    if cache.is_cacheable(method):
+        return await cache.get_or_fetch(
+            scope=scope,
+            credential=config.token or "",
+            method=method,
+            params=params,
+            fetch=lambda: _openclaw_call_uncached(method, params, config=config),
+        )
+    try:
+        return await _openclaw_call_uncached(method, params, config=config)
+    finally:
+        # Also on failure: the gateway may have applied the write before the error.
+        cache.invalidate_writes(scope, (method,))
+
+
+async def _openclaw_call_uncached(
+    method: str,
+    params: dict[str, Any] | None,
+    *,
+    config: GatewayConfig,
+) -> object:
     gateway_url = _build_gateway_url(config)
     started_at = perf_counter()
     logger.debug(
@@ -447,12 +1020,13 @@ async def openclaw_call(
         config.disable_device_pairing,
     )
     try:
-        payload = await _openclaw_call_once(
-            method,
-            params,
-            config=config,
-            gateway_url=gateway_url,
-        )
+        async with _circuit_guard(config):
+            payload = await _openclaw_call_once(
+                method,
+                params,
+                config=config,
+                gateway_url=gateway_url,
+            )
         logger.debug(
             "gateway.rpc.call.success method=%s duration_ms=%s",
             method,
@@ -482,6 +1056,114 @@ async def openclaw_call(
         raise OpenClawGatewayError(str(exc)) from exc
 
 
+async def _openclaw_call_many_once(
+    calls: Sequence[GatewayCall],
+    *,
+    config: GatewayConfig,
+    gateway_url: str,
+    deadline: float,
+) -> list[GatewayCallResult]:
+    if settings.gateway_rpc_pool_enabled:
+        return await get_gateway_connection_pool().call_many(
+            calls,
+            config=config,
+            gateway_url=gateway_url,
+            deadline=deadline,
+        )
+    async with asyncio.timeout_at(deadline):
+        ws = await _open_authenticated_websocket(config, gateway_url)
+    conn = _PooledGatewayConnection(
+        ws,
+        gateway=_gateway_label(config),
+        max_in_flight=max(len(calls), 1),
+        idle_timeout_seconds=0,
+        request_timeout_seconds=settings.gateway_rpc_pool_request_timeout_seconds,
+    )
+    try:
+        return await _collect_batch(
+            calls,
+            lambda call: conn.request(call.method, call.params),
+            deadline=deadline,
+        )
+    finally:
+        await conn.close()
+
+
+async def openclaw_call_many(
+    calls: Sequence[GatewayCall],
+    *,
+    config: GatewayConfig,
+    timeout_seconds: float = DEFAULT_BATCH_TIMEOUT_SECONDS,
+) -> list[GatewayCallResult]:
+    """Pipeline several gateway RPC calls over one connection.
+
+    Every request is sent without waiting for earlier replies and results are
+    returned in call order. Each call carries its own error; calls still
+    unanswered when the overall deadline (including connecting) expires fail
+    with a deadline error. Failing to connect at all raises
+    `OpenClawGatewayError` for the whole batch. Batches are never served from
+    the read cache, but their write methods invalidate it.
+    """
+    try:
+        return await _openclaw_call_many_uncached(
+            calls,
+            config=config,
+            timeout_seconds=timeout_seconds,
+        )
+    finally:
+        if settings.gateway_rpc_cache_enabled:
+            get_gateway_rpc_cache().invalidate_writes(
+                _cache_scope(config),
+                {call.method for call in calls},
+            )
+
+
+async def _openclaw_call_many_uncached(
+    calls: Sequence[GatewayCall],
+    *,
+    config: GatewayConfig,
+    timeout_seconds: float,
+) -> list[GatewayCallResult]:
+    gateway_url = _build_gateway_url(config)
+    started_at = perf_counter()
+    deadline = asyncio.get_running_loop().time() + timeout_seconds
+    logger.debug(
+        "gateway.rpc.call_many.start calls=%s gateway_url=%s",
+        len(calls),
+        _redacted_url_for_log(gateway_url),
+    )
+    try:
+        async with _circuit_guard(config):
+            results = await _openclaw_call_many_once(
+                calls,
+                config=config,
+                gateway_url=gateway_url,
+                deadline=deadline,
+            )
+    except OpenClawGatewayError:
+        logger.warning(
+            "gateway.rpc.call_many.gateway_error calls=%s duration_ms=%s",
+            len(calls),
+            int((perf_counter() - started_at) * 1000),
+        )
+        raise
+    except _TRANSPORT_ERRORS as exc:  # pragma: no cover - network/protocol errors
+        logger.error(
+            "gateway.rpc.call_many.transport_error calls=%s duration_ms=%s error_type=%s",
+            len(calls),
+            int((perf_counter() - started_at) * 1000),
+            exc.__class__.__name__,
+        )
+        raise OpenClawGatewayError(str(exc) or exc.__class__.__name__) from exc
+    logger.debug(
+        "gateway.rpc.call_many.done calls=%s failed=%s duration_ms=%s",
+        len(calls),
+        sum(1 for result in results if not result.ok),
+        int((perf_counter() - started_at) * 1000),
+    )
+    return results
+
+
 async def openclaw_connect_metadata(*, config: GatewayConfig) -> object:
     """Open a gateway connection and return the connect/hello payload."""
     gateway_url = _build_gateway_url(config)
@@ -491,10 +1173,11 @@ async def openclaw_connect_metadata(*, config: GatewayConfig) -> object:
         _redacted_url_for_log(gateway_url),
     )
     try:
-        metadata = await _openclaw_connect_metadata_once(
-            config=config,
-            gateway_url=gateway_url,
-        )
+        async with _circuit_guard(config):
+            metadata = await _openclaw_connect_metadata_once(
+                config=config,
+                gateway_url=gateway_url,
+            )
         logger.debug(
             "gateway.rpc.connect_metadata.success duration_ms=%s",
             int((perf_counter() - started_at) * 1000),
@@ -521,6 +1204,45 @@ async def openclaw_connect_metadata(*, config: GatewayConfig) -> object:
         raise OpenClawGatewayError(str(exc)) from exc
 
 
+async def subscribe_gateway_events(*, config: GatewayConfig) -> AsyncIterator[GatewayEvent]:
+    """Open a dedicated gateway connection and yield its event frames.
+
+    The stream ends when the gateway closes the connection cleanly; connect and
+    transport failures raise `OpenClawGatewayError`. Response frames are ignored.
+    """
+    gateway_url = _build_gateway_url(config)
+    try:
+        ws = await _open_authenticated_websocket(config, gateway_url)
+    except _TRANSPORT_ERRORS as exc:
+        raise OpenClawGatewayError(str(exc)) from exc
+    logger.info(
+        "gateway.events.connected gateway_url=%s",
+        _redacted_url_for_log(gateway_url),
+    )
+    try:
+        async for raw in ws:
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                logger.warning("gateway.events.invalid_frame")
+                continue
+            if not isinstance(data, dict) or data.get("type") != "event":
+                continue
+            event = data.get("event")
+            if not isinstance(event, str):
+                continue
+            seq = data.get("seq")
+            yield GatewayEvent(
+                event=event,
+                payload=data.get("payload"),
+                seq=seq if isinstance(seq, int) else None,
+            )
+    except (ConnectionClosed, OSError) as exc:
+        raise OpenClawGatewayError(f"Gateway event stream lost: {exc}") from exc
+    finally:
+        await ws.close()
+
+
 async def send_message(
     message: str,
     *,
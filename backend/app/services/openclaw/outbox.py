@@ -0,0 +1,430 @@
+"""Transactional outbox for gateway messages to agent sessions.
+
+API handlers stage notifications with `enqueue_agent_message` in the same
+transaction as the change that triggered them, so a commit either records both
+or neither and no request waits on a gateway. The outbox worker
+(`scripts/rq outbox`) claims due rows in batches, sends to each gateway
+concurrently while keeping every agent session's messages in creation order,
+and records delivery state, latency, and the activity events the handlers used
+to write inline. Delivered and failed rows are pruned once they are older than
+`gateway_outbox_retention_seconds`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy.orm import aliased
+from sqlmodel import col, select
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.time import utcnow
+from app.db import crud
+from app.db.session import async_session_maker
+from app.models.agents import Agent
+from app.models.gateway_outbox import GatewayOutboxMessage
+from app.models.gateways import Gateway
+from app.models.tasks import Task
+from app.services.activity_log import record_activity
+from app.services.openclaw.gateway_dispatch import GatewayDispatchService
+from app.services.openclaw.gateway_resolver import optional_gateway_client_config
+from app.services.openclaw.gateway_rpc import GatewayConfig as GatewayClientConfig
+
+if TYPE_CHECKING:
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from app.models.boards import Board
+
+logger = get_logger(__name__)
+
+OUTBOX_PENDING = "pending"
+OUTBOX_SENDING = "sending"
+OUTBOX_DELIVERED = "delivered"
+OUTBOX_FAILED = "failed"
+_UNDELIVERED = (OUTBOX_PENDING, OUTBOX_SENDING)
+_FINISHED = (OUTBOX_DELIVERED, OUTBOX_FAILED)
+_PRUNE_INTERVAL_SECONDS = 3600.0
+_PRUNE_BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class OutboxActivity:
+    """Activity events to record once a message is delivered or finally fails.
+
+    `failed_message` is a prefix; the last delivery error is appended to it.
+    """
+
+    notified_event_type: str
+    notified_message: str
+    failed_event_type: str
+    failed_message: str
+    task_id: UUID | None = None
+
+
+@dataclass(frozen=True)
+class OutboxDrainStats:
+    """Counts for one drained outbox batch."""
+
+    claimed: int = 0
+    delivered: int = 0
+    retried: int = 0
+    failed: int = 0
+    deferred: int = 0
+
+
+@dataclass(frozen=True)
+class _Outcome:
+    row: GatewayOutboxMessage
+    delivered_at: datetime | None = None
+    error: str | None = None
+    # Held back because an earlier message for the same session failed.
+    deferred: bool = False
+    # Not worth retrying (e.g. the gateway is gone or unconfigured).
+    terminal: bool = False
+
+
+def enqueue_agent_message(
+    session: AsyncSession,
+    *,
+    board: Board,
+    agent: Agent,
+    message: str,
+    agent_name: str | None = None,
+    deliver: bool = False,
+    activity: OutboxActivity | None = None,
+) -> GatewayOutboxMessage | None:
+    """Stage a message for `agent` in the caller's transaction.
+
+    Nothing is written until the caller commits. Returns None when the agent has no
+    gateway session or the board has no gateway.
+    """
+    if not agent.openclaw_session_id or board.gateway_id is None:
+        return None
+    row = GatewayOutboxMessage(
+        gateway_id=board.gateway_id,
+        board_id=board.id,
+        agent_id=agent.id,
+        session_key=agent.openclaw_session_id,
+        agent_name=agent_name or agent.name,
+        message=message,
+        deliver=deliver,
+    )
+    if activity is not None:
+        row.task_id = activity.task_id
+        row.notified_event_type = activity.notified_event_type
+        row.notified_message = activity.notified_message
+        row.failed_event_type = activity.failed_event_type
+        row.failed_message = activity.failed_message
+    session.add(row)
+    return row
+
+
+def _retry_delay(attempts: int) -> float:
+    max_delay = float(settings.gateway_outbox_retry_max_seconds)
+    delay = min(
+        float(settings.gateway_outbox_retry_base_seconds) * 2.0 ** max(0, attempts - 1),
+        max_delay,
+    )
+    return delay + random.uniform(0.0, min(max_delay / 10, delay * 0.1))
+
+
+async def _in_order(
+    session: AsyncSession,
+    rows: list[GatewayOutboxMessage],
+) -> list[GatewayOutboxMessage]:
+    """Drop rows queued behind an older undelivered message for the same session.
+
+    `_claim_batch` already skips sessions whose oldest message is backing off or in
+    flight; this catches an older message locked by a concurrent claim.
+    """
+    statement = (
+        select(GatewayOutboxMessage.session_key, func.min(GatewayOutboxMessage.created_at))
+        .where(col(GatewayOutboxMessage.session_key).in_({row.session_key for row in rows}))
+        .where(col(GatewayOutboxMessage.status).in_(_UNDELIVERED))
+        .where(col(GatewayOutboxMessage.id).not_in([row.id for row in rows]))
+        .group_by(col(GatewayOutboxMessage.session_key))
+    )
+    oldest_blocked = dict((await session.exec(statement)).all())
+    return [
+        row
+        for row in rows
+        if row.session_key not in oldest_blocked or row.created_at < oldest_blocked[row.session_key]
+    ]
+
+
+async def _claim_batch(limit: int) -> list[GatewayOutboxMessage]:
+    now = utcnow()
+    async with async_session_maker() as session:
+        # Rows queued behind an older message that is backing off or leased to a worker
+        # (`next_attempt_at` still ahead) are left out of the query itself, so one
+        # blocked session's backlog cannot fill every batch and starve the others.
+        earlier = aliased(GatewayOutboxMessage)
+        blocked = (
+            select(earlier.id)
+            .where(col(earlier.session_key) == col(GatewayOutboxMessage.session_key))
+            .where(col(earlier.created_at) < col(GatewayOutboxMessage.created_at))
+            .where(col(earlier.status).in_(_UNDELIVERED))
+            .where(col(earlier.next_attempt_at) > now)
+        )
+        statement = (
+            select(GatewayOutboxMessage)
+            .where(col(GatewayOutboxMessage.status).in_(_UNDELIVERED))
+            .where(col(GatewayOutboxMessage.next_attempt_at) <= now)
+            .where(~blocked.exists())
+            .order_by(col(GatewayOutboxMessage.created_at))
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        rows = list((await session.exec(statement)).all())
+        if rows:
+            rows = await _in_order(session, rows)
+        lease_expires_at = now + timedelta(seconds=settings.gateway_outbox_claim_lease_seconds)
+        for row in rows:
+            row.status = OUTBOX_SENDING
+            row.next_attempt_at = lease_expires_at
+            session.add(row)
+        await session.commit()
+    return rows
+
+
+async def _deliver_to_gateway(
+    dispatch: GatewayDispatchService,
+    config: GatewayClientConfig | None,
+    rows: list[GatewayOutboxMessage],
+) -> list[_Outcome]:
+    if config is None:
+        return [_Outcome(row, error="Gateway is not configured.", terminal=True) for row in rows]
+    chains: dict[str, list[GatewayOutboxMessage]] = {}
+    for row in sorted(rows, key=lambda item: item.created_at):
+        chains.setdefault(row.session_key, []).append(row)
+    semaphore = asyncio.Semaphore(settings.gateway_outbox_gateway_concurrency)
+
+    async def _deliver_chain(chain: list[GatewayOutboxMessage]) -> list[_Outcome]:
+        outcomes: list[_Outcome] = []
+        async with semaphore:
+            for index, row in enumerate(chain):
+                error: Exception | None
+                try:
+                    error = await dispatch.try_send_agent_message(
+                        session_key=row.session_key,
+                        config=config,
+                        agent_name=row.agent_name,
+                        message=row.message,
+                        deliver=row.deliver,
+                    )
+                except Exception as exc:
+                    logger.exception(
+                        "gateway.outbox.send_unexpected",
+                        extra={"outbox_id": str(row.id)},
+                    )
+                    error = exc
+                if error is None:
+                    outcomes.append(_Outcome(row, delivered_at=utcnow()))
+                    continue
+                outcomes.append(_Outcome(row, error=str(error)))
+                outcomes.extend(_Outcome(later, deferred=True) for later in chain[index + 1 :])
+                break
+        return outcomes
+
+    results = await asyncio.gather(*(_deliver_chain(chain) for chain in chains.values()))
+    return [outcome for chain_outcomes in results for outcome in chain_outcomes]
+
+
+async def _record_outcomes(outcomes: Sequence[_Outcome]) -> OutboxDrainStats:
+    delivered = retried = failed = deferred = 0
+    now = utcnow()
+    async with async_session_maker() as session:
+        rows = {
+            row.id: row
+            for row in await GatewayOutboxMessage.objects.by_ids(
+                [outcome.row.id for outcome in outcomes],
+            ).all(session)
+        }
+        agent_ids = {row.agent_id for row in rows.values() if row.agent_id is not None}
+        task_ids = {row.task_id for row in rows.values() if row.task_id is not None}
+        live_agents = {agent.id for agent in await Agent.objects.by_ids(agent_ids).all(session)}
+        live_tasks = {task.id for task in await Task.objects.by_ids(task_ids).all(session)}
+
+        def _record(row: GatewayOutboxMessage, event_type: str | None, message: str) -> None:
+            if event_type is None or (row.task_id is not None and row.task_id not in live_tasks):
+                return
+            record_activity(
+                session,
+                event_type=event_type,
+                message=message,
+                agent_id=row.agent_id if row.agent_id in live_agents else None,
+                task_id=row.task_id,
+            )
+
+        for outcome in outcomes:
+            row = rows.get(outcome.row.id)
+            if row is None:
+                continue
+            if outcome.deferred:
+                deferred += 1
+                row.status = OUTBOX_PENDING
+                row.next_attempt_at = now
+            elif outcome.delivered_at is not None:
+                delivered += 1
+                row.status = OUTBOX_DELIVERED
+                row.attempts += 1
+                row.delivered_at = outcome.delivered_at
+                row.latency_ms = (outcome.delivered_at - row.created_at).total_seconds() * 1000
+                row.last_error = None
+                _record(row, row.notified_event_type, row.notified_message or "")
+                logger.info(
+                    "gateway.outbox.delivered",
+                    extra={
+                        "outbox_id": str(row.id),
+                        "gateway_id": str(row.gateway_id),
+                        "attempt": row.attempts,
+                        "latency_ms": round(row.latency_ms, 1),
+                    },
+                )
+            else:
+                row.attempts += 1
+                row.last_error = outcome.error
+                if outcome.terminal or row.attempts >= settings.gateway_outbox_max_attempts:
+                    failed += 1
+                    row.status = OUTBOX_FAILED
+                    _record(row, row.failed_event_type, f"{row.failed_message}: {outcome.error}")
+                    logger.warning(
+                        "gateway.outbox.failed",
+                        extra={
+                            "outbox_id": str(row.id),
+                            "gateway_id": str(row.gateway_id),
+                            "attempt": row.attempts,
+                            "error": outcome.error,
+                        },
+                    )
+                else:
+                    retried += 1
+                    row.status = OUTBOX_PENDING
+                    row.next_attempt_at = now + timedelta(seconds=_retry_delay(row.attempts))
+                    logger.info(
+                        "gateway.outbox.retry_scheduled",
+                        extra={
+                            "outbox_id": str(row.id),
+                            "gateway_id": str(row.gateway_id),
+                            "attempt": row.attempts,
+                            "error": outcome.error,
+                        },
+                    )
+            session.add(row)
+        await session.commit()
+    return OutboxDrainStats(
+        claimed=len(outcomes),
+        delivered=delivered,
+        retried=retried,
+        failed=failed,
+        deferred=deferred,
+    )
+
+
+async def drain_outbox(*, batch_size: int | None = None) -> OutboxDrainStats:
+    """Claim one batch of due outbox rows, deliver them, and record the results."""
+    rows = await _claim_batch(batch_size or settings.gateway_outbox_batch_size)
+    if not rows:
+        return OutboxDrainStats()
+    by_gateway: dict[UUID, list[GatewayOutboxMessage]] = {}
+    for row in rows:
+        by_gateway.setdefault(row.gateway_id, []).append(row)
+    async with async_session_maker() as session:
+        gateways = await Gateway.objects.by_ids(list(by_gateway)).all(session)
+        dispatch = GatewayDispatchService(session)
+    configs = {gateway.id: optional_gateway_client_config(gateway) for gateway in gateways}
+    results = await asyncio.gather(
+        *(
+            _deliver_to_gateway(dispatch, configs.get(gateway_id), gateway_rows)
+            for gateway_id, gateway_rows in by_gateway.items()
+        ),
+    )
+    return await _record_outcomes([outcome for outcomes in results for outcome in outcomes])
+
+
+async def prune_outbox() -> int:
+    """Delete delivered and failed rows older than the retention; return how many.
+
+    Age is measured from the row's last claim (`next_attempt_at`), which the
+    status index already covers. Rows are deleted in bounded batches.
+    """
+    if settings.gateway_outbox_retention_seconds <= 0:
+        return 0
+    cutoff = utcnow() - timedelta(seconds=settings.gateway_outbox_retention_seconds)
+    expired = (
+        select(GatewayOutboxMessage.id)
+        .where(col(GatewayOutboxMessage.status).in_(_FINISHED))
+        .where(col(GatewayOutboxMessage.next_attempt_at) < cutoff)
+        .limit(_PRUNE_BATCH_SIZE)
+    )
+    pruned = 0
+    async with async_session_maker() as session:
+        while True:
+            deleted = await crud.delete_where(
+                session,
+                GatewayOutboxMessage,
+                col(GatewayOutboxMessage.id).in_(expired),
+                commit=True,
+            )
+            pruned += deleted
+            if deleted < _PRUNE_BATCH_SIZE:
+                return pruned
+
+
+async def _prune_outbox_logged() -> None:
+    try:
+        pruned = await prune_outbox()
+    except Exception:
+        logger.exception("gateway.outbox.prune_failed")
+        return
+    if pruned:
+        logger.info("gateway.outbox.pruned", extra={"count": pruned})
+
+
+async def _run_outbox_loop() -> None:
+    loop = asyncio.get_running_loop()
+    next_prune_at = loop.time()
+    while True:
+        if loop.time() >= next_prune_at:
+            next_prune_at = loop.time() + _PRUNE_INTERVAL_SECONDS
+            await _prune_outbox_logged()
+        try:
+            stats = await drain_outbox()
+        except Exception:
+            logger.exception("gateway.outbox.drain_failed")
+            await asyncio.sleep(settings.gateway_outbox_poll_seconds)
+            continue
+        if stats.claimed:
+            logger.info(
+                "gateway.outbox.batch_complete",
+                extra={
+                    "claimed": stats.claimed,
+                    "delivered": stats.delivered,
+                    "retried": stats.retried,
+                    "failed": stats.failed,
+                    "deferred": stats.deferred,
+                },
+            )
+        # A full batch suggests a backlog; go straight for the next one.
+        if stats.claimed < settings.gateway_outbox_batch_size:
+            await asyncio.sleep(settings.gateway_outbox_poll_seconds)
+
+
+def run_outbox_worker() -> None:
+    """Entrypoint for continuously draining the gateway outbox."""
+    logger.info(
+        "gateway.outbox.worker_started",
+        extra={"batch_size": settings.gateway_outbox_batch_size},
+    )
+    try:
+        asyncio.run(_run_outbox_loop())
+    finally:
+        logger.info("gateway.outbox.worker_stopped")
@@ -7,6 +7,7 @@ DB-backed workflows (template sync, lead-agent record creation) live in
 
 from __future__ import annotations
 
+import hashlib
 import json
 import re
 from abc import ABC, abstractmethod
@@ -14,13 +15,12 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
-from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
-
 from app.core.config import settings
 from app.models.agents import Agent
 from app.models.boards import Board
 from app.models.gateways import Gateway
 from app.services import souls_directory
+from app.services.openclaw.agent_templates import get_agent_templates, templates_root
 from app.services.openclaw.constants import (
     BOARD_SHARED_TEMPLATE_MAP,
     DEFAULT_CHANNEL_HEARTBEAT_VISIBILITY,
@@ -36,11 +36,13 @@ from app.services.openclaw.constants import (
     MAIN_TEMPLATE_MAP,
     PRESERVE_AGENT_EDITABLE_FILES,
 )
-from app.services.openclaw.gateway_rpc import GatewayConfig as GatewayClientConfig
 from app.services.openclaw.gateway_rpc import (
+    GatewayCall,
+    GatewayConfig,
     OpenClawGatewayError,
     ensure_session,
     openclaw_call,
+    openclaw_call_many,
     send_message,
 )
 from app.services.openclaw.internal.agent_key import agent_key as _agent_key
@@ -64,6 +66,41 @@ class ProvisionOptions:
     overwrite: bool = False
 
 
+@dataclass(frozen=True, slots=True)
+class AgentFileSyncStats:
+    """Workspace file outcomes for one provisioning pass."""
+
+    written: int = 0
+    skipped: int = 0
+    deleted: int = 0
+
+
+def _content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _is_unchanged_file(
+    entry: dict[str, Any] | None,
+    *,
+    content: str,
+    content_hash: str,
+    manifest: dict[str, str],
+) -> bool:
+    """Whether the gateway copy is known to match `content` without reading it.
+
+    The manifest records what provisioning last wrote; the listed size guards
+    against the file having been edited or removed inside the workspace since.
+    """
+    if entry is None or bool(entry.get("missing")):
+        return False
+    if manifest.get(str(entry.get("name") or "")) != content_hash:
+        return False
+    size = entry.get("size")
+    if isinstance(size, int) and not isinstance(size, bool):
+        return size == len(content.encode("utf-8"))
+    return True
+
+
 _ROLE_SOUL_MAX_CHARS = 24_000
 _ROLE_SOUL_WORD_RE = re.compile(r"[a-z0-9]+")
 
@@ -99,7 +136,7 @@ def _repo_root() -> Path:
 
 
 def _templates_root() -> Path:
-    return _repo_root() / "templates"
+    return templates_root()
 
 
 def _heartbeat_config(agent: Agent) -> dict[str, Any]:
@@ -130,16 +167,6 @@ def _channel_heartbeat_visibility_patch(config_data: dict[str, Any]) -> dict[str
     return {"defaults": {"heartbeat": merged}}
 
 
-def _template_env() -> Environment:
-    return Environment(
-        loader=FileSystemLoader(_templates_root()),
-        # Render markdown verbatim (HTML escaping makes it harder for agents to read).
-        autoescape=select_autoescape(default=False),
-        undefined=StrictUndefined,
-        keep_trailing_newline=True,
-    )
-
-
 def _heartbeat_template_name(agent: Agent) -> str:
     return HEARTBEAT_LEAD_TEMPLATE if agent.is_board_lead else HEARTBEAT_AGENT_TEMPLATE
 
@@ -393,7 +420,7 @@ def _render_agent_files(
     include_bootstrap: bool,
     template_overrides: dict[str, str] | None = None,
 ) -> dict[str, str]:
-    env = _template_env()
+    templates = get_agent_templates()
     overrides: dict[str, str] = {}
     if agent.identity_template:
         overrides["IDENTITY.md"] = agent.identity_template
@@ -410,15 +437,11 @@ def _render_agent_files(
                 if template_overrides and name in template_overrides
                 else _heartbeat_template_name(agent)
             )
-            heartbeat_path = _templates_root() / heartbeat_template
-            if not heartbeat_path.exists():
-                msg = f"Missing template file: {heartbeat_template}"
-                raise FileNotFoundError(msg)
-            rendered[name] = env.get_template(heartbeat_template).render(**context).strip()
+            rendered[name] = templates.get_template(heartbeat_template).render(**context).strip()
             continue
         override = overrides.get(name)
         if override:
-            rendered[name] = env.from_string(override).render(**context).strip()
+            rendered[name] = templates.from_string(override).render(**context).strip()
             continue
         template_name = (
             template_overrides[name] if template_overrides and name in template_overrides else name
@@ -426,11 +449,7 @@ def _render_agent_files(
         if template_name == "SOUL.md":
             # Use shared Jinja soul template as the default implementation.
             template_name = "BOARD_SOUL.md.j2"
-        path = _templates_root() / template_name
-        if not path.exists():
-            msg = f"Missing template file: {template_name}"
-            raise FileNotFoundError(msg)
-        rendered[name] = env.get_template(template_name).render(**context).strip()
+        rendered[name] = templates.get_template(template_name).render(**context).strip()
     return rendered
 
 
@@ -483,6 +502,21 @@ class GatewayControlPlane(ABC):
     async def set_agent_file(self, *, agent_id: str, name: str, content: str) -> None:
         raise NotImplementedError
 
+    async def set_agent_files(
+        self,
+        *,
+        agent_id: str,
+        files: dict[str, str],
+    ) -> dict[str, OpenClawGatewayError]:
+        """Write several files, returning the error for each file that failed."""
+        errors: dict[str, OpenClawGatewayError] = {}
+        for name, content in files.items():
+            try:
+                await self.set_agent_file(agent_id=agent_id, name=name, content=content)
+            except OpenClawGatewayError as exc:
+                errors[name] = exc
+        return errors
+
     @abstractmethod
     async def delete_agent_file(self, *, agent_id: str, name: str) -> None:
         raise NotImplementedError
@@ -498,7 +532,7 @@ class GatewayControlPlane(ABC):
 class OpenClawGatewayControlPlane(GatewayControlPlane):
     """OpenClaw gateway RPC implementation of the lifecycle control-plane contract."""
 
-    def __init__(self, config: GatewayClientConfig) -> None:
+    def __init__(self, config: GatewayConfig) -> None:
         self._config = config
 
     async def health(self) -> object:
@@ -594,6 +628,30 @@ class OpenClawGatewayControlPlane(GatewayControlPlane):
             config=self._config,
         )
 
+    async def set_agent_files(
+        self,
+        *,
+        agent_id: str,
+        files: dict[str, str],
+    ) -> dict[str, OpenClawGatewayError]:
+        # One pipelined exchange instead of a round trip per file.
+        names = list(files)
+        results = await openclaw_call_many(
+            [
+                GatewayCall(
+                    "agents.files.set",
+                    {"agentId": agent_id, "name": name, "content": files[name]},
+                )
+                for name in names
+            ],
+            config=self._config,
+        )
+        return {
+            name: result.error
+            for name, result in zip(names, results, strict=True)
+            if result.error is not None
+        }
+
     async def delete_agent_file(self, *, agent_id: str, name: str) -> None:
         await openclaw_call(
             "agents.files.delete",
@@ -620,7 +678,7 @@ class OpenClawGatewayControlPlane(GatewayControlPlane):
 
 
 async def _gateway_config_agent_list(
-    config: GatewayClientConfig,
+    config: GatewayConfig,
 ) -> tuple[str | None, list[object], dict[str, Any]]:
     cfg = await openclaw_call("config.get", config=config)
     if not isinstance(cfg, dict):
@@ -742,34 +800,60 @@ class BaseAgentLifecycleManager(ABC):
         existing_files: dict[str, dict[str, Any]],
         action: str,
         overwrite: bool = False,
-    ) -> None:
+    ) -> AgentFileSyncStats:
+        """Write changed rendered files and delete stale ones.
+
+        Files whose content hash matches `agent.template_manifest` and that the
+        gateway still lists unchanged are skipped unless `overwrite` is set. The
+        manifest is replaced with the hashes of the files now in place.
+        """
         preserve_files = (
             self._preserve_files(agent) if agent is not None else set(PRESERVE_AGENT_EDITABLE_FILES)
         )
         target_file_names = desired_file_names or set(rendered.keys())
-        unsupported_names: list[str] = []
+        previous_manifest = dict(agent.template_manifest or {}) if agent is not None else {}
+        manifest: dict[str, str] = {}
+        files: dict[str, str] = {}
+        skipped = 0
 
         for name, content in rendered.items():
             if content == "":
                 continue
+            entry = existing_files.get(name)
             # Preserve "editable" files only during updates. During first-time provisioning,
             # the gateway may pre-create defaults for USER/MEMORY/etc, and we still want to
             # apply Mission Control's templates.
             if action == "update" and not overwrite and name in preserve_files:
-                entry = existing_files.get(name)
                 if entry and not bool(entry.get("missing")):
+                    skipped += 1
                     continue
-            try:
-                await self._control_plane.set_agent_file(
-                    agent_id=agent_id,
-                    name=name,
-                    content=content,
-                )
-            except OpenClawGatewayError as exc:
-                if "unsupported file" in str(exc).lower():
-                    unsupported_names.append(name)
-                    continue
-                raise
+            content_hash = _content_hash(content)
+            manifest[name] = content_hash
+            if not overwrite and _is_unchanged_file(
+                None if entry is None else {"name": name, **entry},
+                content=content,
+                content_hash=content_hash,
+                manifest=previous_manifest,
+            ):
+                skipped += 1
+                continue
+            files[name] = content
+
+        errors = (
+            await self._control_plane.set_agent_files(agent_id=agent_id, files=files)
+            if files
+            else {}
+        )
+        unsupported_names: list[str] = []
+        for name, exc in errors.items():
+            if "unsupported file" in str(exc).lower():
+                unsupported_names.append(name)
+                manifest.pop(name, None)
+                continue
+            raise exc
+        if agent is not None:
+            agent.template_manifest = manifest
+        written = len(files) - len(unsupported_names)
 
         if agent is not None and agent.is_board_lead and unsupported_names:
             unsupported_sorted = ", ".join(sorted(set(unsupported_names)))
@@ -780,14 +864,19 @@ class BaseAgentLifecycleManager(ABC):
             raise RuntimeError(msg)
 
         if agent is None or not self._allow_stale_file_deletion(agent):
-            return
-
-        stale_names = (
-            set(existing_files.keys()) & self._stale_file_candidates(agent)
-        ) - target_file_names
+            return AgentFileSyncStats(written=written, skipped=skipped)
+
+        # Only names the gateway still lists are deleted, so a clean workspace
+        # costs no delete calls.
+        stale_names = {
+            name for name, entry in existing_files.items() if not bool(entry.get("missing"))
+        } & self._stale_file_candidates(agent)
+        stale_names -= target_file_names
+        deleted = 0
         for name in sorted(stale_names):
             try:
                 await self._control_plane.delete_agent_file(agent_id=agent_id, name=name)
+                deleted += 1
             except OpenClawGatewayError as exc:
                 message = str(exc).lower()
                 if any(
@@ -801,6 +890,7 @@ class BaseAgentLifecycleManager(ABC):
                 ):
                     continue
                 raise
+        return AgentFileSyncStats(written=written, skipped=skipped, deleted=deleted)
 
     async def provision(
         self,
@@ -812,7 +902,7 @@ class BaseAgentLifecycleManager(ABC):
         options: ProvisionOptions,
         board: Board | None = None,
         session_label: str | None = None,
-    ) -> None:
+    ) -> AgentFileSyncStats:
         if not self._gateway.workspace_root:
             msg = "gateway_workspace_root is required"
             raise ValueError(msg)
@@ -855,7 +945,7 @@ class BaseAgentLifecycleManager(ABC):
             template_overrides=self._template_overrides(agent),
         )
 
-        await self._set_agent_files(
+        return await self._set_agent_files(
             agent=agent,
             agent_id=agent_id,
             rendered=rendered,
@@ -970,11 +1060,12 @@ def _control_plane_for_gateway(gateway: Gateway) -> OpenClawGatewayControlPlane:
         msg = "Gateway url is required"
         raise OpenClawGatewayError(msg)
     return OpenClawGatewayControlPlane(
-        GatewayClientConfig(
+        GatewayConfig(
             url=gateway.url,
             token=gateway.token,
             allow_insecure_tls=gateway.allow_insecure_tls,
             disable_device_pairing=gateway.disable_device_pairing,
+            gateway_id=str(gateway.id),
         ),
     )
 
@@ -1047,12 +1138,12 @@ class OpenClawGatewayProvisioner:
         wake: bool = True,
         deliver_wakeup: bool = True,
         wakeup_verb: str | None = None,
-    ) -> None:
+    ) -> AgentFileSyncStats:
         """Create/update an agent, sync all template files, and optionally wake the agent.
 
         Lifecycle steps (same for all agent types):
         1) create agent (idempotent)
-        2) set/update all template files
+        2) set/update changed template files (updates `agent.template_manifest`)
         3) wake the agent session (chat.send)
         """
 
@@ -1080,7 +1171,7 @@ class OpenClawGatewayProvisioner:
 
         control_plane = _control_plane_for_gateway(gateway)
         manager = manager_type(gateway, control_plane)
-        await manager.provision(
+        file_stats = await manager.provision(
             agent=agent,
             board=board,
             session_key=session_key,
@@ -1102,13 +1193,14 @@ class OpenClawGatewayProvisioner:
                     raise
 
         if not wake:
-            return
+            return file_stats
 
-        client_config = GatewayClientConfig(
+        client_config = GatewayConfig(
             url=gateway.url,
             token=gateway.token,
             allow_insecure_tls=gateway.allow_insecure_tls,
             disable_device_pairing=gateway.disable_device_pairing,
+            gateway_id=str(gateway.id),
         )
         await ensure_session(session_key, config=client_config, label=agent.name)
         verb = wakeup_verb or ("provisioned" if action == "provision" else "updated")
@@ -1118,6 +1210,7 @@ class OpenClawGatewayProvisioner:
             config=client_config,
             deliver=deliver_wakeup,
         )
+        return file_stats
 
     async def delete_agent_lifecycle(
         self,
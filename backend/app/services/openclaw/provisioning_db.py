@@ -11,17 +11,20 @@ from __future__ import annotations
 import asyncio
 import json
 import re
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING, Any, Literal, Protocol, TypeVar
 from uuid import UUID, uuid4
 
 from fastapi import HTTPException, Request, status
 from sqlalchemy import asc, func, or_
+from sqlalchemy.orm.attributes import flag_modified
 from sqlmodel import col, select
 from sse_starlette.sse import EventSourceResponse
 
-from app.core.agent_tokens import verify_agent_token
+from app.core.agent_token_cache import invalidate_agent_token_cache
+from app.core.agent_tokens import agent_token_lookup_key, verify_agent_token_async
+from app.core.config import settings
 from app.core.logging import TRACE_LEVEL
 from app.core.time import utcnow
 from app.db import crud
@@ -47,6 +50,8 @@ from app.schemas.agents import (
 from app.schemas.common import OkResponse
 from app.schemas.gateways import GatewayTemplatesSyncError, GatewayTemplatesSyncResult
 from app.services.activity_log import record_activity
+from app.services.agent_presence import apply_pending_presence
+from app.services.openclaw.agent_templates import get_agent_templates
 from app.services.openclaw.constants import (
     _TOOLS_KV_RE,
     DEFAULT_HEARTBEAT_CONFIG,
@@ -77,6 +82,7 @@ from app.services.openclaw.internal.session_keys import (
 )
 from app.services.openclaw.policies import OpenClawAuthorizationPolicy
 from app.services.openclaw.provisioning import (
+    AgentFileSyncStats,
     OpenClawGatewayControlPlane,
     OpenClawGatewayProvisioner,
 )
@@ -117,6 +123,8 @@ class GatewayTemplateSyncOptions:
     force_bootstrap: bool = False
     overwrite: bool = False
     board_id: UUID | None = None
+    # Agents synced at once; None uses `settings.gateway_template_sync_concurrency`.
+    concurrency: int | None = None
 
 
 @dataclass(frozen=True, slots=True)
@@ -213,7 +221,7 @@ class OpenClawProvisioningService(OpenClawDBService):
             identity_profile=merged_identity_profile,
             openclaw_session_id=self.lead_session_key(board),
         )
-        raw_token = mint_agent_token(agent)
+        raw_token = await mint_agent_token(agent)
         mark_provision_requested(agent, action=config_options.action, status="provisioning")
         await self.add_commit_refresh(agent)
 
@@ -256,6 +264,7 @@ class OpenClawProvisioningService(OpenClawDBService):
                 force_bootstrap=options.force_bootstrap,
                 overwrite=options.overwrite,
                 board_id=options.board_id,
+                concurrency=options.concurrency,
             )
 
         if template_user is None:
@@ -291,13 +300,14 @@ class OpenClawProvisioningService(OpenClawDBService):
                 token=gateway.token,
                 allow_insecure_tls=gateway.allow_insecure_tls,
                 disable_device_pairing=gateway.disable_device_pairing,
+                gateway_id=str(gateway.id),
             ),
         )
         ctx = _SyncContext(
             session=self.session,
             gateway=gateway,
             control_plane=control_plane,
-            backoff=GatewayBackoff(timeout_s=10 * 60, timeout_context="template sync"),
+            backoff=_template_sync_backoff(),
             options=options,
             provisioner=self._gateway,
         )
@@ -323,24 +333,13 @@ class OpenClawProvisioningService(OpenClawDBService):
         else:
             agents = []
 
-        stop_sync = False
-        for agent in agents:
-            board = boards_by_id.get(agent.board_id) if agent.board_id is not None else None
-            if board is None:
-                result.agents_skipped += 1
-                _append_sync_error(
-                    result,
-                    agent=agent,
-                    message="Skipping agent: board not found for agent.",
-                )
-                continue
-            if board.id in paused_board_ids:
-                result.agents_skipped += 1
-                continue
-            stop_sync = await _sync_one_agent(ctx, result, agent, board)
-            if stop_sync:
-                break
-
+        stop_sync = await _sync_board_agents(
+            ctx,
+            result,
+            agents,
+            boards_by_id=boards_by_id,
+            paused_board_ids=paused_board_ids,
+        )
         if not stop_sync and options.include_main:
             await _sync_main_agent(ctx, result)
         return result
@@ -354,6 +353,74 @@ class _SyncContext:
     backoff: GatewayBackoff
     options: GatewayTemplateSyncOptions
     provisioner: OpenClawGatewayProvisioner
+    # Agents sync concurrently but share one session; DB writes take this lock.
+    db_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+def _template_sync_backoff() -> GatewayBackoff:
+    return GatewayBackoff(timeout_s=10 * 60, timeout_context="template sync")
+
+
+async def _sync_board_agents(
+    ctx: _SyncContext,
+    result: GatewayTemplatesSyncResult,
+    agents: Sequence[Agent],
+    *,
+    boards_by_id: dict[UUID, Board],
+    paused_board_ids: set[UUID],
+) -> bool:
+    """Sync board agents with a bounded worker count; return True when sync must stop.
+
+    Each agent records into its own partial result, merged into `result` in agent
+    order so counts and errors do not depend on completion order. Once an agent
+    reports a fatal error, agents that have not started are not synced; agents
+    already in flight finish and are reported.
+    """
+    concurrency = ctx.options.concurrency or settings.gateway_template_sync_concurrency
+    slots = asyncio.Semaphore(max(concurrency, 1))
+    stop = asyncio.Event()
+
+    async def _sync(agent: Agent) -> tuple[GatewayTemplatesSyncResult, bool] | None:
+        async with slots:
+            if stop.is_set():
+                return None
+            partial = _base_result(
+                ctx.gateway,
+                include_main=result.include_main,
+                reset_sessions=result.reset_sessions,
+            )
+            board = boards_by_id.get(agent.board_id) if agent.board_id is not None else None
+            if board is None:
+                partial.agents_skipped += 1
+                _append_sync_error(
+                    partial,
+                    agent=agent,
+                    message="Skipping agent: board not found for agent.",
+                )
+                return partial, False
+            if board.id in paused_board_ids:
+                partial.agents_skipped += 1
+                return partial, False
+            # Backoff delay is stateful, so every worker gets its own.
+            agent_ctx = replace(ctx, backoff=_template_sync_backoff())
+            stop_sync = await _sync_one_agent(agent_ctx, partial, agent, board)
+            if stop_sync:
+                stop.set()
+            return partial, stop_sync
+
+    stop_sync = False
+    for outcome in await asyncio.gather(*(_sync(agent) for agent in agents)):
+        if outcome is None:
+            continue
+        partial, agent_stopped = outcome
+        result.agents_updated += partial.agents_updated
+        result.agents_skipped += partial.agents_skipped
+        result.files_written += partial.files_written
+        result.files_skipped += partial.files_skipped
+        result.files_deleted += partial.files_deleted
+        result.errors.extend(partial.errors)
+        stop_sync = stop_sync or agent_stopped
+    return stop_sync
 
 
 def _parse_tools_md(content: str) -> dict[str, str]:
@@ -362,6 +429,8 @@ def _parse_tools_md(content: str) -> dict[str, str]:
         line = raw.strip()
         if not line or line.startswith("#"):
             continue
+        # Rendered templates list values as markdown bullets: - `KEY=value`
+        line = line.removeprefix("- ").strip().strip("`")
         match = _TOOLS_KV_RE.match(line)
         if not match:
             continue
@@ -461,7 +530,7 @@ def _append_sync_error(
 
 
 async def _rotate_agent_token(session: AsyncSession, agent: Agent) -> str:
-    token = mint_agent_token(agent)
+    token = await mint_agent_token(agent)
     agent.updated_at = utcnow()
     session.add(agent)
     await session.commit()
@@ -544,14 +613,16 @@ async def _resolve_agent_auth_token(
                 ),
             )
             return None, False
-        auth_token = await _rotate_agent_token(ctx.session, agent)
+        async with ctx.db_lock:
+            auth_token = await _rotate_agent_token(ctx.session, agent)
 
-    if agent.agent_token_hash and not verify_agent_token(
+    if agent.agent_token_hash and not await verify_agent_token_async(
         auth_token,
         agent.agent_token_hash,
     ):
         if ctx.options.rotate_tokens:
-            auth_token = await _rotate_agent_token(ctx.session, agent)
+            async with ctx.db_lock:
+                auth_token = await _rotate_agent_token(ctx.session, agent)
         else:
             _append_sync_error(
                 result,
@@ -562,9 +633,36 @@ async def _resolve_agent_auth_token(
                     "token hash (agent auth may be broken)."
                 ),
             )
+    elif agent.agent_token_hash and agent.agent_token_lookup is None:
+        # Verified legacy token without a lookup key: backfill it while we have the plaintext.
+        agent.agent_token_lookup = agent_token_lookup_key(auth_token)
+        async with ctx.db_lock:
+            ctx.session.add(agent)
+            await ctx.session.commit()
     return auth_token, False
 
 
+async def _record_file_sync(
+    ctx: _SyncContext,
+    result: GatewayTemplatesSyncResult,
+    agent: Agent,
+    stats: AgentFileSyncStats | None,
+    *,
+    previous_manifest: dict[str, str] | None,
+) -> None:
+    if stats is not None:
+        result.files_written += stats.written
+        result.files_skipped += stats.skipped
+        result.files_deleted += stats.deleted
+    if agent.template_manifest != previous_manifest:
+        async with ctx.db_lock:
+            ctx.session.add(agent)
+            # The manifest may have been assigned while another agent's commit was
+            # flushing, which resets attribute history; mark it dirty explicitly.
+            flag_modified(agent, "template_manifest")
+            await ctx.session.commit()
+
+
 async def _sync_one_agent(
     ctx: _SyncContext,
     result: GatewayTemplatesSyncResult,
@@ -582,10 +680,11 @@ async def _sync_one_agent(
         return True
     if not auth_token:
         return False
+    previous_manifest = agent.template_manifest
     try:
 
-        async def _do_provision() -> bool:
-            await ctx.provisioner.apply_agent_lifecycle(
+        async def _do_provision() -> AgentFileSyncStats | None:
+            return await ctx.provisioner.apply_agent_lifecycle(
                 agent=agent,
                 gateway=ctx.gateway,
                 board=board,
@@ -597,10 +696,10 @@ async def _sync_one_agent(
                 reset_session=ctx.options.reset_sessions,
                 wake=False,
             )
-            return True
 
-        await ctx.backoff.run(_do_provision)
+        stats = await ctx.backoff.run(_do_provision)
         result.agents_updated += 1
+        await _record_file_sync(ctx, result, agent, stats, previous_manifest=previous_manifest)
     except TimeoutError as exc:  # pragma: no cover - gateway/network dependent
         result.agents_skipped += 1
         _append_sync_error(result, agent=agent, board=board, message=str(exc))
@@ -653,10 +752,11 @@ async def _sync_main_agent(
         )
         return True
     stop_sync = False
+    previous_manifest = main_agent.template_manifest
     try:
 
-        async def _do_provision_main() -> bool:
-            await ctx.provisioner.apply_agent_lifecycle(
+        async def _do_provision_main() -> AgentFileSyncStats | None:
+            return await ctx.provisioner.apply_agent_lifecycle(
                 agent=main_agent,
                 gateway=ctx.gateway,
                 board=None,
@@ -668,9 +768,15 @@ async def _sync_main_agent(
                 reset_session=ctx.options.reset_sessions,
                 wake=False,
             )
-            return True
 
-        await ctx.backoff.run(_do_provision_main)
+        stats = await ctx.backoff.run(_do_provision_main)
+        await _record_file_sync(
+            ctx,
+            result,
+            main_agent,
+            stats,
+            previous_manifest=previous_manifest,
+        )
     except TimeoutError as exc:  # pragma: no cover - gateway/network dependent
         _append_sync_error(result, agent=main_agent, message=str(exc))
         stop_sync = True
@@ -858,6 +964,7 @@ class AgentLifecycleService(OpenClawDBService):
     @classmethod
     def with_computed_status(cls, agent: Agent) -> Agent:
         now = utcnow()
+        apply_pending_presence(agent)
         if agent.status in {"deleting", "updating"}:
             return agent
         # Linked agents are managed externally — always treat as online.
@@ -1059,7 +1166,7 @@ class AgentLifecycleService(OpenClawDBService):
         data: dict[str, Any],
     ) -> tuple[Agent, str]:
         agent = Agent.model_validate(data)
-        raw_token = mint_agent_token(agent)
+        raw_token = await mint_agent_token(agent)
         mark_provision_requested(agent, action="provision", status="provisioning")
         agent.openclaw_session_id = self.resolve_session_key(agent)
         await self.add_commit_refresh(agent)
@@ -1335,8 +1442,8 @@ class AgentLifecycleService(OpenClawDBService):
         )
 
     @staticmethod
-    def mark_agent_update_pending(agent: Agent) -> str:
-        raw_token = mint_agent_token(agent)
+    async def mark_agent_update_pending(agent: Agent) -> str:
+        raw_token = await mint_agent_token(agent)
         mark_provision_requested(agent, action="update", status="updating")
         return raw_token
 
@@ -1411,7 +1518,7 @@ class AgentLifecycleService(OpenClawDBService):
         if agent.agent_token_hash is not None:
             return
 
-        raw_token = mint_agent_token(agent)
+        raw_token = await mint_agent_token(agent)
         mark_provision_requested(agent, action="provision", status="provisioning")
         await self.add_commit_refresh(agent)
         board = await self.require_board(
@@ -1747,25 +1854,13 @@ class AgentLifecycleService(OpenClawDBService):
         target_agent: dict[str, Any],
     ) -> None:
         """Render and push MISSION_CONTROL.md into a linked agent's workspace."""
-        from pathlib import Path
-
-        from jinja2 import Environment, FileSystemLoader, StrictUndefined
-
-        templates_root = Path(__file__).resolve().parents[3] / "templates"
-        env = Environment(
-            loader=FileSystemLoader(templates_root),
-            autoescape=False,
-            undefined=StrictUndefined,
-            keep_trailing_newline=True,
-        )
-
         import os
         mc_url = os.environ.get("MC_PUBLIC_URL", "http://localhost:8000")
 
         # Org admin token from environment (for task CRUD)
         org_token = os.environ.get("MC_ORG_TOKEN", "<ORG_ADMIN_TOKEN>")
 
-        template = env.get_template("LINKED_MISSION_CONTROL.md.j2")
+        template = get_agent_templates().get_template("LINKED_MISSION_CONTROL.md.j2")
         content = template.render(
             mc_url=mc_url,
             board_id=str(board.id),
@@ -1859,6 +1954,7 @@ class AgentLifecycleService(OpenClawDBService):
 
         await self.session.delete(agent)
         await self.session.commit()
+        await invalidate_agent_token_cache(agent.id)
 
         self.logger.info("agent.unlink agent_id=%s name=%s", agent_id, agent_name)
         return OkResponse(ok=True)
@@ -1912,7 +2008,7 @@ class AgentLifecycleService(OpenClawDBService):
             main_gateway=main_gateway,
             gateway_for_main=gateway_for_main,
         )
-        raw_token = self.mark_agent_update_pending(agent)
+        raw_token = await self.mark_agent_update_pending(agent)
         self.session.add(agent)
         await self.session.commit()
         await self.session.refresh(agent)
@@ -2156,6 +2252,7 @@ class AgentLifecycleService(OpenClawDBService):
         )
         await self.session.delete(agent)
         await self.session.commit()
+        await invalidate_agent_token_cache(agent.id)
 
         try:
             # Notify the gateway-main agent about cleanup for board-scoped deletes.
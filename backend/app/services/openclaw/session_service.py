@@ -12,6 +12,7 @@ from fastapi import HTTPException, status
 from app.core.logging import TRACE_LEVEL
 from app.models.boards import Board
 from app.schemas.gateway_api import (
+    GatewayCircuitStatus,
     GatewayResolveQuery,
     GatewaySessionHistoryResponse,
     GatewaySessionMessageRequest,
@@ -27,6 +28,7 @@ from app.services.openclaw.gateway_rpc import GatewayConfig as GatewayClientConf
 from app.services.openclaw.gateway_rpc import (
     OpenClawGatewayError,
     ensure_session,
+    gateway_circuit_snapshot,
     get_chat_history,
     openclaw_call,
     send_message,
@@ -187,6 +189,16 @@ class GatewaySessionService(OpenClawDBService):
             allowed=board.organization_id == organization_id,
         )
 
+    @staticmethod
+    def _circuit_status(config: GatewayClientConfig) -> GatewayCircuitStatus:
+        snapshot = gateway_circuit_snapshot(config)
+        return GatewayCircuitStatus(
+            state=snapshot.state,
+            failure_rate=snapshot.failure_rate,
+            window_calls=snapshot.window_calls,
+            retry_after_seconds=snapshot.retry_after_seconds,
+        )
+
     async def get_status(
         self,
         *,
@@ -202,12 +214,14 @@ class GatewaySessionService(OpenClawDBService):
             return GatewaysStatusResponse(
                 connected=False,
                 gateway_url=config.url,
+                circuit=self._circuit_status(config),
                 error=normalize_gateway_error_message(str(exc)),
             )
         if not compatibility.compatible:
             return GatewaysStatusResponse(
                 connected=False,
                 gateway_url=config.url,
+                circuit=self._circuit_status(config),
                 error=compatibility.message,
             )
         try:
@@ -232,6 +246,7 @@ class GatewaySessionService(OpenClawDBService):
             return GatewaysStatusResponse(
                 connected=True,
                 gateway_url=config.url,
+                circuit=self._circuit_status(config),
                 sessions_count=len(sessions_list),
                 sessions=sessions_list,
                 main_session=main_session_entry,
@@ -241,6 +256,7 @@ class GatewaySessionService(OpenClawDBService):
             return GatewaysStatusResponse(
                 connected=False,
                 gateway_url=config.url,
+                circuit=self._circuit_status(config),
                 error=normalize_gateway_error_message(str(exc)),
             )
 
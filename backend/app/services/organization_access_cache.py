@@ -0,0 +1,250 @@
+"""Cached board-access snapshots for organization members.
+
+Most user endpoints resolve a member's board access several times per request
+(`has_board_access`, `list_accessible_board_ids`), and dashboards issue many
+such requests per page load. A `MemberBoardAccess` snapshot holds a member's
+readable/writable board ids and is cached at two levels:
+
+- per request, in the request session's `info` dict;
+- across requests, in a process-local LRU with a short TTL.
+
+A snapshot is only used while the member's org-wide flags still match the row
+being checked, so a flag change made elsewhere is never served stale. Explicit
+access changes and board create/delete invalidate entries immediately and
+again after the surrounding transaction commits, so a concurrent request cannot
+re-populate the cache from pre-commit state. Other API replicas converge
+within the TTL.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from app.models.organization_members import OrganizationMember
+
+_SESSION_MEMO_KEY = "organization_access.snapshots"
+_SESSION_PENDING_KEY = "organization_access.pending_invalidations"
+
+
+@dataclass(frozen=True)
+class MemberBoardAccess:
+    """Readable and writable board ids resolved for one organization member."""
+
+    member_id: UUID
+    organization_id: UUID
+    all_boards_read: bool
+    all_boards_write: bool
+    read_board_ids: frozenset[UUID]
+    write_board_ids: frozenset[UUID]
+
+    def matches(self, member: OrganizationMember) -> bool:
+        """Return whether the snapshot was built from the member's current flags."""
+        return (
+            self.member_id == member.id
+            and self.organization_id == member.organization_id
+            and self.all_boards_read == bool(member.all_boards_read)
+            and self.all_boards_write == bool(member.all_boards_write)
+        )
+
+    def board_ids(self, *, write: bool) -> frozenset[UUID]:
+        """Return board ids accessible for the requested mode."""
+        return self.write_board_ids if write else self.read_board_ids
+
+    def allows(self, board_id: UUID, *, write: bool) -> bool:
+        """Return whether the member may access a board in the requested mode."""
+        return board_id in self.board_ids(write=write)
+
+
+class OrganizationAccessCache:
+    """Process-local LRU of member access snapshots with a per-entry TTL."""
+
+    def __init__(self, *, max_entries: int, ttl_seconds: float) -> None:
+        self._max_entries = max(0, max_entries)
+        self._ttl_seconds = max(0.0, ttl_seconds)
+        self._entries: OrderedDict[UUID, tuple[MemberBoardAccess, float]] = OrderedDict()
+        self._members_by_org: dict[UUID, set[UUID]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _discard(self, member_id: UUID) -> None:
+        entry = self._entries.pop(member_id, None)
+        if entry is None:
+            return
+        org_id = entry[0].organization_id
+        members = self._members_by_org.get(org_id)
+        if members is not None:
+            members.discard(member_id)
+            if not members:
+                del self._members_by_org[org_id]
+
+    def get(self, member_id: UUID) -> MemberBoardAccess | None:
+        with self._lock:
+            entry = self._entries.get(member_id)
+            if entry is None:
+                return None
+            snapshot, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._discard(member_id)
+                return None
+            self._entries.move_to_end(member_id)
+            return snapshot
+
+    def set(self, snapshot: MemberBoardAccess) -> None:
+        if self._max_entries == 0 or self._ttl_seconds == 0:
+            return
+        with self._lock:
+            self._discard(snapshot.member_id)
+            self._entries[snapshot.member_id] = (
+                snapshot,
+                time.monotonic() + self._ttl_seconds,
+            )
+            self._members_by_org.setdefault(snapshot.organization_id, set()).add(
+                snapshot.member_id,
+            )
+            while len(self._entries) > self._max_entries:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate_members(self, *member_ids: UUID) -> None:
+        with self._lock:
+            for member_id in member_ids:
+                self._discard(member_id)
+
+    def invalidate_organization(self, organization_id: UUID) -> None:
+        with self._lock:
+            for member_id in list(self._members_by_org.get(organization_id, ())):
+                self._discard(member_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._members_by_org.clear()
+
+
+_cache: OrganizationAccessCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_organization_access_cache() -> OrganizationAccessCache:
+    """Return the process-wide access cache configured in settings."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = OrganizationAccessCache(
+                    max_entries=settings.org_access_cache_max_entries,
+                    ttl_seconds=settings.org_access_cache_ttl_seconds,
+                )
+    return _cache
+
+
+def set_organization_access_cache(cache: OrganizationAccessCache | None) -> None:
+    """Replace the process-wide cache (``None`` rebuilds it from settings lazily)."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
+
+
+def _session_info(session: object) -> dict[str, Any] | None:
+    # Unit tests drive services with lightweight fake sessions that have no `info`.
+    info = getattr(session, "info", None)
+    return info if isinstance(info, dict) else None
+
+
+def _session_memo(session: object) -> dict[UUID, MemberBoardAccess] | None:
+    info = _session_info(session)
+    if info is None:
+        return None
+    memo: dict[UUID, MemberBoardAccess] = info.setdefault(_SESSION_MEMO_KEY, {})
+    return memo
+
+
+def cached_member_board_access(
+    session: object,
+    member: OrganizationMember,
+) -> MemberBoardAccess | None:
+    """Return a still-valid snapshot for a member from the request or shared cache."""
+    memo = _session_memo(session)
+    if memo is not None:
+        snapshot = memo.get(member.id)
+        if snapshot is not None and snapshot.matches(member):
+            return snapshot
+    snapshot = get_organization_access_cache().get(member.id)
+    if snapshot is None or not snapshot.matches(member):
+        return None
+    if memo is not None:
+        memo[member.id] = snapshot
+    return snapshot
+
+
+def remember_member_board_access(session: object, snapshot: MemberBoardAccess) -> None:
+    """Store a freshly loaded snapshot in the request and shared caches."""
+    memo = _session_memo(session)
+    if memo is not None:
+        memo[snapshot.member_id] = snapshot
+    get_organization_access_cache().set(snapshot)
+
+
+def _apply_invalidation(
+    info: dict[str, Any] | None,
+    *,
+    member_ids: tuple[UUID, ...] = (),
+    organization_id: UUID | None = None,
+) -> None:
+    cache = get_organization_access_cache()
+    if member_ids:
+        cache.invalidate_members(*member_ids)
+    if organization_id is not None:
+        cache.invalidate_organization(organization_id)
+    memo: dict[UUID, MemberBoardAccess] | None = (
+        info.get(_SESSION_MEMO_KEY) if info is not None else None
+    )
+    if memo:
+        for member_id, snapshot in list(memo.items()):
+            if member_id in member_ids or snapshot.organization_id == organization_id:
+                del memo[member_id]
+
+
+def _invalidate(
+    session: object,
+    *,
+    member_ids: tuple[UUID, ...] = (),
+    organization_id: UUID | None = None,
+) -> None:
+    info = _session_info(session)
+    _apply_invalidation(info, member_ids=member_ids, organization_id=organization_id)
+    if info is not None:
+        pending: list[tuple[tuple[UUID, ...], UUID | None]] = info.setdefault(
+            _SESSION_PENDING_KEY,
+            [],
+        )
+        pending.append((member_ids, organization_id))
+
+
+def invalidate_member_board_access(session: object, *member_ids: UUID) -> None:
+    """Drop cached snapshots for members whose explicit access changed."""
+    _invalidate(session, member_ids=member_ids)
+
+
+def invalidate_organization_board_access(session: object, organization_id: UUID) -> None:
+    """Drop cached snapshots for every member of an organization (board create/delete)."""
+    _invalidate(session, organization_id=organization_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    pending = session.info.pop(_SESSION_PENDING_KEY, None)
+    for member_ids, organization_id in pending or ():
+        _apply_invalidation(session.info, member_ids=member_ids, organization_id=organization_id)
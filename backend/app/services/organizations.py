@@ -8,7 +8,7 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 
 from fastapi import HTTPException, status
-from sqlalchemy import or_
+from sqlalchemy import and_, or_
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import col, select
 from sqlmodel.ext.asyncio.session import AsyncSession
@@ -23,6 +23,12 @@ from app.models.organization_members import OrganizationMember
 from app.models.organizations import Organization
 from app.models.skills import SkillPack
 from app.models.users import User
+from app.services.organization_access_cache import (
+    MemberBoardAccess,
+    cached_member_board_access,
+    invalidate_member_board_access,
+    remember_member_board_access,
+)
 
 if TYPE_CHECKING:
     from uuid import UUID
@@ -143,6 +149,24 @@ async def get_active_membership(
     user: User,
 ) -> OrganizationMember | None:
     """Resolve and normalize the user's currently active membership."""
+    # Hot path: one joined query when the stored active organization is valid.
+    member = (
+        await session.exec(
+            select(OrganizationMember)
+            .join(
+                User,
+                and_(
+                    col(User.id) == col(OrganizationMember.user_id),
+                    col(User.active_organization_id) == col(OrganizationMember.organization_id),
+                ),
+            )
+            .where(col(User.id) == user.id),
+        )
+    ).first()
+    if member is not None:
+        user.active_organization_id = member.organization_id
+        return member
+
     db_user = await User.objects.by_id(user.id).first(session)
     if db_user is None:
         db_user = user
@@ -378,15 +402,8 @@ async def has_board_access(
             return True
     elif member_all_boards_read(member):
         return True
-    access = await OrganizationBoardAccess.objects.filter_by(
-        organization_member_id=member.id,
-        board_id=board.id,
-    ).first(session)
-    if access is None:
-        return False
-    if write:
-        return bool(access.can_write)
-    return bool(access.can_read or access.can_write)
+    access = await get_member_board_access(session, member=member)
+    return access.allows(board.id, write=write)
 
 
 async def require_board_access(
@@ -442,39 +459,70 @@ def board_access_filter(
     return col(Board.id).in_(access_stmt)
 
 
-async def list_accessible_board_ids(
+async def _load_member_board_access(
     session: AsyncSession,
-    *,
     member: OrganizationMember,
-    write: bool,
-) -> list[UUID]:
-    """List board ids accessible to a member for read or write mode."""
-    if (write and member_all_boards_write(member)) or (
-        not write and member_all_boards_read(member)
-    ):
-        ids = await session.exec(
-            select(Board.id).where(
-                col(Board.organization_id) == member.organization_id,
+) -> MemberBoardAccess:
+    all_read = member_all_boards_read(member)
+    all_write = member_all_boards_write(member)
+    org_board_ids: frozenset[UUID] = frozenset()
+    if all_read:
+        org_board_ids = frozenset(
+            await session.exec(
+                select(Board.id).where(
+                    col(Board.organization_id) == member.organization_id,
+                ),
             ),
         )
-        return list(ids)
-
-    access_stmt = select(OrganizationBoardAccess.board_id).where(
-        col(OrganizationBoardAccess.organization_member_id) == member.id,
-    )
-    if write:
-        access_stmt = access_stmt.where(
-            col(OrganizationBoardAccess.can_write).is_(True),
-        )
-    else:
-        access_stmt = access_stmt.where(
-            or_(
-                col(OrganizationBoardAccess.can_read).is_(True),
-                col(OrganizationBoardAccess.can_write).is_(True),
+    read_ids: set[UUID] = set()
+    write_ids: set[UUID] = set()
+    if not all_write:
+        rows = await session.exec(
+            select(
+                OrganizationBoardAccess.board_id,
+                OrganizationBoardAccess.can_read,
+                OrganizationBoardAccess.can_write,
+            ).where(
+                col(OrganizationBoardAccess.organization_member_id) == member.id,
             ),
         )
-    board_ids = await session.exec(access_stmt)
-    return list(board_ids)
+        for board_id, can_read, can_write in rows:
+            if can_write:
+                write_ids.add(board_id)
+            if can_read or can_write:
+                read_ids.add(board_id)
+    return MemberBoardAccess(
+        member_id=member.id,
+        organization_id=member.organization_id,
+        all_boards_read=bool(member.all_boards_read),
+        all_boards_write=bool(member.all_boards_write),
+        read_board_ids=org_board_ids if all_read else frozenset(read_ids),
+        write_board_ids=org_board_ids if all_write else frozenset(write_ids),
+    )
+
+
+async def get_member_board_access(
+    session: AsyncSession,
+    *,
+    member: OrganizationMember,
+) -> MemberBoardAccess:
+    """Return the member's board-access snapshot, loading it on a cache miss."""
+    access = cached_member_board_access(session, member)
+    if access is None:
+        access = await _load_member_board_access(session, member)
+        remember_member_board_access(session, access)
+    return access
+
+
+async def list_accessible_board_ids(
+    session: AsyncSession,
+    *,
+    member: OrganizationMember,
+    write: bool,
+) -> list[UUID]:
+    """List board ids (sorted) accessible to a member for read or write mode."""
+    access = await get_member_board_access(session, member=member)
+    return sorted(access.board_ids(write=write))
 
 
 async def apply_member_access_update(
@@ -489,6 +537,7 @@ async def apply_member_access_update(
     member.all_boards_write = update.all_boards_write
     member.updated_at = now
     session.add(member)
+    invalidate_member_board_access(session, member.id)
 
     await crud.delete_where(
         session,
@@ -567,6 +616,7 @@ async def apply_invite_to_member(
     invite: OrganizationInvite,
 ) -> None:
     """Apply invite role/access grants onto an existing organization member."""
+    invalidate_member_board_access(session, member.id)
     now = utcnow()
     member_changed = False
     invite_role = normalize_role(invite.role or "member")
@@ -1,14 +1,30 @@
-"""Generic Redis-backed queue helpers for RQ-backed background workloads."""
+"""Generic Redis-backed queue helpers for RQ-backed background workloads.
+
+Clients share one connection pool per Redis URL (per event loop for the async
+client used by the worker), so enqueueing from API requests and polling from
+workers reuse connections instead of opening one per call.
+
+Workers that pass a `worker_id` dequeue reliably: each task is moved into that
+worker's processing list rather than popped, and stays there until the worker
+acks it. Workers refresh a heartbeat key while they run; tasks held by a worker
+whose heartbeat expired are moved back onto the queue by `requeue_orphaned_tasks_async`,
+so a crash mid-task delays the task instead of losing it.
+"""
 
 from __future__ import annotations
 
+import asyncio
 import json
+import threading
 import time
-from dataclasses import dataclass
+import weakref
+from collections.abc import Awaitable
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from typing import Any, cast
 
 import redis
+import redis.asyncio
 
 from app.core.config import settings
 from app.core.logging import get_logger
@@ -16,7 +32,10 @@ from app.core.logging import get_logger
 logger = get_logger(__name__)
 
 _SCHEDULED_SUFFIX = ":scheduled"
+_PROCESSING_SUFFIX = ":processing"
+_WORKER_SUFFIX = ":worker"
 _DRY_RUN_BATCH_SIZE = 100
+_MIN_BLOCK_SECONDS = 0.05
 
 
 @dataclass(frozen=True)
@@ -27,6 +46,8 @@ class QueuedTask:
     payload: dict[str, Any]
     created_at: datetime
     attempts: int = 0
+    # Raw queue entry of a reliably dequeued task, used to ack it; never serialized.
+    receipt: str | None = field(default=None, compare=False, repr=False)
 
     def to_json(self) -> str:
         return json.dumps(
@@ -40,65 +61,132 @@ class QueuedTask:
         )
 
 
+_pools: dict[str, redis.BlockingConnectionPool] = {}
+_async_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop,
+    dict[str, redis.asyncio.Redis],
+] = weakref.WeakKeyDictionary()
+_pools_lock = threading.Lock()
+
+
+def _connection_pool(redis_url: str) -> redis.BlockingConnectionPool:
+    with _pools_lock:
+        pool = _pools.get(redis_url)
+        if pool is None:
+            # Blocking pool: callers wait for a free connection instead of failing.
+            pool = redis.BlockingConnectionPool.from_url(
+                redis_url,
+                max_connections=settings.rq_redis_max_connections,
+            )
+            _pools[redis_url] = pool
+    return pool
+
+
 def _redis_client(redis_url: str | None = None) -> redis.Redis:
-    return redis.Redis.from_url(redis_url or settings.rq_redis_url)
+    return redis.Redis(connection_pool=_connection_pool(redis_url or settings.rq_redis_url))
+
+
+def async_redis_client(redis_url: str | None = None) -> redis.asyncio.Redis:
+    """Return the running event loop's shared async client for `redis_url`."""
+    url = redis_url or settings.rq_redis_url
+    loop = asyncio.get_running_loop()
+    with _pools_lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(url)
+        if client is None:
+            client = redis.asyncio.Redis(
+                connection_pool=redis.asyncio.BlockingConnectionPool.from_url(
+                    url,
+                    max_connections=settings.rq_redis_max_connections,
+                ),
+            )
+            clients[url] = client
+    return client
+
+
+async def close_async_redis_clients() -> None:
+    """Close the running event loop's async queue clients and their pools."""
+    with _pools_lock:
+        clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose(close_connection_pool=True)
 
 
 def _scheduled_queue_name(queue_name: str) -> str:
     return f"{queue_name}{_SCHEDULED_SUFFIX}"
 
 
+def _processing_list_name(queue_name: str, worker_id: str) -> str:
+    return f"{queue_name}{_PROCESSING_SUFFIX}:{worker_id}"
+
+
+def _heartbeat_key(queue_name: str, worker_id: str) -> str:
+    return f"{queue_name}{_WORKER_SUFFIX}:{worker_id}"
+
+
+def _workers_key(queue_name: str) -> str:
+    return f"{queue_name}{_WORKER_SUFFIX}s"
+
+
 def _now_seconds() -> float:
     return time.time()
 
 
+# Moves up to ARGV[2] members due by ARGV[1] from the scheduled zset (KEYS[1]) onto
+# the queue list (KEYS[2]) in one atomic step, oldest first, and returns the count
+# moved plus the earliest remaining score (false when the zset is empty).
+_PROMOTE_SCHEDULED_SCRIPT = """
+local ready = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+if #ready > 0 then
+    redis.call('LPUSH', KEYS[2], unpack(ready))
+    redis.call('ZREM', KEYS[1], unpack(ready))
+end
+local next_due = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return {#ready, next_due[2] or false}
+"""
+
+
+def _promoted(queue_name: str, result: object, now: float) -> float | None:
+    moved, next_due = cast(list[Any], result)
+    if moved:
+        logger.debug(
+            "rq.queue.drain_ready_scheduled",
+            extra={
+                "queue_name": queue_name,
+                "count": int(moved),
+            },
+        )
+    if next_due is None:
+        return None
+    return max(0.0, float(next_due) - now)
+
+
 def _drain_ready_scheduled_tasks(
     client: redis.Redis,
     queue_name: str,
     *,
     max_items: int = _DRY_RUN_BATCH_SIZE,
 ) -> float | None:
-    scheduled_queue = _scheduled_queue_name(queue_name)
+    """Promote due scheduled tasks; return seconds until the next one is due."""
     now = _now_seconds()
+    promote = client.register_script(_PROMOTE_SCHEDULED_SCRIPT)
+    result = promote(keys=[_scheduled_queue_name(queue_name), queue_name], args=[now, max_items])
+    return _promoted(queue_name, result, now)
 
-    ready_items = cast(
-        list[str | bytes],
-        client.zrangebyscore(
-            scheduled_queue,
-            "-inf",
-            now,
-            start=0,
-            num=max_items,
-        ),
-    )
-    if ready_items:
-        ready_values = tuple(ready_items)
-        client.lpush(queue_name, *ready_values)
-        client.zrem(scheduled_queue, *ready_values)
-        logger.debug(
-            "rq.queue.drain_ready_scheduled",
-            extra={
-                "queue_name": queue_name,
-                "count": len(ready_items),
-            },
-        )
 
-    next_item = cast(
-        list[tuple[str | bytes, float]],
-        client.zrangebyscore(
-            scheduled_queue,
-            now,
-            "+inf",
-            start=0,
-            num=1,
-            withscores=True,
-        ),
+async def _drain_ready_scheduled_tasks_async(
+    client: redis.asyncio.Redis,
+    queue_name: str,
+    *,
+    max_items: int = _DRY_RUN_BATCH_SIZE,
+) -> float | None:
+    now = _now_seconds()
+    promote = client.register_script(_PROMOTE_SCHEDULED_SCRIPT)
+    result = await promote(
+        keys=[_scheduled_queue_name(queue_name), queue_name],
+        args=[now, max_items],
     )
-    if not next_item:
-        return None
-
-    next_score = float(next_item[0][1])
-    return max(0.0, next_score - now)
+    return _promoted(queue_name, result, now)
 
 
 def _schedule_for_later(
@@ -166,42 +254,251 @@ def _coerce_datetime(raw: object | None) -> datetime:
     return datetime.now(UTC)
 
 
+def _block_timeout(block_timeout: float, next_delay: float | None) -> float:
+    if next_delay is not None:
+        # 0 means "block forever" to BRPOP/BLMOVE; poll again shortly when more are already due.
+        next_delay = max(next_delay, _MIN_BLOCK_SECONDS)
+    timeout = max(0.0, float(block_timeout))
+    if timeout == 0:
+        return next_delay if next_delay is not None else 0
+    return min(timeout, next_delay) if next_delay is not None else timeout
+
+
 def dequeue_task(
     queue_name: str,
     *,
     redis_url: str | None = None,
     block: bool = False,
     block_timeout: float = 0,
+    worker_id: str | None = None,
 ) -> QueuedTask | None:
-    """Pop one task envelope from the queue."""
+    """Take one task envelope from the queue.
+
+    With `worker_id`, the task is moved into that worker's processing list and must
+    be acked with `ack_task` once handled; otherwise it is popped.
+    """
     client = _redis_client(redis_url=redis_url)
-    timeout = max(0.0, float(block_timeout))
+    processing = _processing_list_name(queue_name, worker_id) if worker_id else None
     raw: str | bytes | None
     if block:
         next_delay = _drain_ready_scheduled_tasks(client, queue_name)
-        if timeout == 0:
-            timeout = next_delay if next_delay is not None else 0
+        timeout = _block_timeout(block_timeout, next_delay)
+        if processing is not None:
+            raw = cast(
+                str | bytes | None,
+                client.blmove(
+                    queue_name,
+                    processing,
+                    timeout,  # type: ignore[arg-type]  # typed int; Redis takes fractional seconds
+                    src="RIGHT",
+                    dest="LEFT",
+                ),
+            )
         else:
-            timeout = min(timeout, next_delay) if next_delay is not None else timeout
-        raw_result = cast(
-            tuple[bytes | str, bytes | str] | None,
-            client.brpop([queue_name], timeout=timeout),
+            raw_result = cast(
+                tuple[bytes | str, bytes | str] | None,
+                client.brpop([queue_name], timeout=timeout),
+            )
+            raw = raw_result[1] if raw_result is not None else None
+    elif processing is not None:
+        raw = cast(
+            str | bytes | None,
+            client.lmove(queue_name, processing, src="RIGHT", dest="LEFT"),
         )
-        if raw_result is None:
-            _drain_ready_scheduled_tasks(client, queue_name)
-            return None
-        raw = raw_result[1]
     else:
         raw = cast(str | bytes | None, client.rpop(queue_name))
     if raw is None:
         _drain_ready_scheduled_tasks(client, queue_name)
         return None
-    return _decode_task(raw, queue_name)
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8")
+    try:
+        return _decode_task(raw, queue_name, reliable=processing is not None)
+    except Exception:
+        if processing is not None:
+            # Undecodable entries would be handed out again forever; drop them (logged above).
+            client.lrem(processing, 1, raw)
+        raise
 
 
-def _decode_task(raw: str | bytes, queue_name: str) -> QueuedTask:
+async def dequeue_task_async(
+    queue_name: str,
+    *,
+    redis_url: str | None = None,
+    block: bool = False,
+    block_timeout: float = 0,
+    worker_id: str | None = None,
+) -> QueuedTask | None:
+    """Take one task envelope without blocking the event loop on Redis I/O.
+
+    `worker_id` works as in `dequeue_task`; ack the task with `ack_task_async`.
+    """
+    client = async_redis_client(redis_url=redis_url)
+    processing = _processing_list_name(queue_name, worker_id) if worker_id else None
+    raw: str | bytes | None
+    if block:
+        next_delay = await _drain_ready_scheduled_tasks_async(client, queue_name)
+        timeout = _block_timeout(block_timeout, next_delay)
+        if processing is not None:
+            raw = await cast(
+                Awaitable[str | bytes | None],
+                client.blmove(
+                    queue_name,
+                    processing,
+                    timeout,  # type: ignore[arg-type]  # typed int; Redis takes fractional seconds
+                    src="RIGHT",
+                    dest="LEFT",
+                ),
+            )
+        else:
+            raw_result = await cast(
+                Awaitable[tuple[bytes | str, bytes | str] | None],
+                client.brpop([queue_name], timeout=timeout),
+            )
+            raw = raw_result[1] if raw_result is not None else None
+    elif processing is not None:
+        raw = await cast(
+            Awaitable[str | bytes | None],
+            client.lmove(queue_name, processing, src="RIGHT", dest="LEFT"),
+        )
+    else:
+        raw = await cast(Awaitable[str | bytes | None], client.rpop(queue_name))
+    if raw is None:
+        await _drain_ready_scheduled_tasks_async(client, queue_name)
+        return None
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8")
+    try:
+        return _decode_task(raw, queue_name, reliable=processing is not None)
+    except Exception:
+        if processing is not None:
+            await cast(Awaitable[int], client.lrem(processing, 1, raw))
+        raise
+
+
+def ack_task(
+    task: QueuedTask,
+    queue_name: str,
+    *,
+    worker_id: str,
+    redis_url: str | None = None,
+) -> bool:
+    """Remove a reliably dequeued task from the worker's processing list.
+
+    Returns False when it was no longer there (e.g. already requeued by the reaper).
+    """
+    if task.receipt is None:
+        return False
+    client = _redis_client(redis_url=redis_url)
+    return bool(client.lrem(_processing_list_name(queue_name, worker_id), 1, task.receipt))
+
+
+async def ack_task_async(
+    task: QueuedTask,
+    queue_name: str,
+    *,
+    worker_id: str,
+    redis_url: str | None = None,
+) -> bool:
+    """Async variant of `ack_task`."""
+    if task.receipt is None:
+        return False
+    client = async_redis_client(redis_url=redis_url)
+    removed = await cast(
+        Awaitable[int],
+        client.lrem(_processing_list_name(queue_name, worker_id), 1, task.receipt),
+    )
+    return bool(removed)
+
+
+async def heartbeat_async(
+    queue_name: str,
+    worker_id: str,
+    *,
+    ttl_seconds: float,
+    redis_url: str | None = None,
+) -> None:
+    """Register the worker and mark it alive for `ttl_seconds`."""
+    client = async_redis_client(redis_url=redis_url)
+    async with client.pipeline(transaction=True) as pipe:
+        pipe.set(_heartbeat_key(queue_name, worker_id), "1", px=max(1, int(ttl_seconds * 1000)))
+        pipe.sadd(_workers_key(queue_name), worker_id)
+        await pipe.execute()
+
+
+async def _return_processing_tasks(
+    client: redis.asyncio.Redis,
+    queue_name: str,
+    worker_id: str,
+) -> int:
+    processing = _processing_list_name(queue_name, worker_id)
+    moved = 0
+    # Newest first onto the consuming end, so the oldest held task is taken next.
+    while await cast(
+        Awaitable[str | bytes | None],
+        client.lmove(processing, queue_name, src="LEFT", dest="RIGHT"),
+    ):
+        moved += 1
+    return moved
+
+
+async def requeue_orphaned_tasks_async(
+    queue_name: str,
+    *,
+    redis_url: str | None = None,
+) -> int:
+    """Move tasks held by workers whose heartbeat expired back onto the queue.
+
+    Each entry moves with one LMOVE, so concurrent reapers never duplicate a task.
+    Returns the number of tasks requeued.
+    """
+    client = async_redis_client(redis_url=redis_url)
+    workers_key = _workers_key(queue_name)
+    workers = [
+        member.decode("utf-8") if isinstance(member, bytes) else str(member)
+        for member in await cast(Awaitable[set[Any]], client.smembers(workers_key))
+    ]
+    if not workers:
+        return 0
+    async with client.pipeline(transaction=False) as pipe:
+        for worker_id in workers:
+            pipe.exists(_heartbeat_key(queue_name, worker_id))
+        alive = await pipe.execute()
+    requeued = 0
+    for worker_id, is_alive in zip(workers, alive, strict=True):
+        if is_alive:
+            continue
+        moved = await _return_processing_tasks(client, queue_name, worker_id)
+        await cast(Awaitable[int], client.srem(workers_key, worker_id))
+        requeued += moved
+        if moved:
+            logger.warning(
+                "rq.queue.requeued_orphaned",
+                extra={"queue_name": queue_name, "worker_id": worker_id, "count": moved},
+            )
+    return requeued
+
+
+async def release_worker_async(
+    queue_name: str,
+    worker_id: str,
+    *,
+    redis_url: str | None = None,
+) -> int:
+    """Requeue anything the worker still holds and unregister it (graceful shutdown)."""
+    client = async_redis_client(redis_url=redis_url)
+    moved = await _return_processing_tasks(client, queue_name, worker_id)
+    async with client.pipeline(transaction=True) as pipe:
+        pipe.delete(_heartbeat_key(queue_name, worker_id))
+        pipe.srem(_workers_key(queue_name), worker_id)
+        await pipe.execute()
+    return moved
+
+
+def _decode_task(raw: str | bytes, queue_name: str, *, reliable: bool = False) -> QueuedTask:
     if isinstance(raw, bytes):
         raw = raw.decode("utf-8")
+    receipt = raw if reliable else None
 
     try:
         payload: dict[str, Any] = json.loads(raw)
@@ -213,12 +510,14 @@ def _decode_task(raw: str | bytes, queue_name: str) -> QueuedTask:
                     payload.get("created_at") or payload.get("received_at")
                 ),
                 attempts=int(payload.get("attempts", 0)),
+                receipt=receipt,
             )
         return QueuedTask(
             task_type=str(payload["task_type"]),
             payload=payload["payload"],
             created_at=datetime.fromisoformat(payload["created_at"]),
             attempts=int(payload.get("attempts", 0)),
+            receipt=receipt,
         )
     except Exception as exc:
         logger.error(
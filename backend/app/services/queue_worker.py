@@ -1,15 +1,40 @@
-"""Generic queue worker with task-type dispatch."""
+"""Generic queue worker with task-type dispatch.
+
+The worker dequeues reliably under its own worker id: a task stays in the worker's
+processing list until it has been handled (or requeued for retry) and is then acked.
+A heartbeat task keeps the worker registered and, on each beat, requeues tasks held
+by workers whose heartbeat expired.
+"""
 
 from __future__ import annotations
 
 import asyncio
+import os
 import random
+import signal
+import socket
 from collections.abc import Awaitable, Callable
+from contextlib import suppress
 from dataclasses import dataclass
+from uuid import uuid4
 
 from app.core.config import settings
 from app.core.logging import get_logger
-from app.services.queue import QueuedTask, dequeue_task
+from app.services.queue import (
+    QueuedTask,
+    ack_task_async,
+    close_async_redis_clients,
+    dequeue_task_async,
+    heartbeat_async,
+    release_worker_async,
+    requeue_orphaned_tasks_async,
+)
+from app.services.task_comment_notifications import TASK_TYPE as TASK_COMMENT_NOTIFICATION_TYPE
+from app.services.task_comment_notifications import (
+    process_task_comment_notification_task,
+    requeue_task_comment_notification_task,
+    task_comment_notification_retry_delay,
+)
 from app.services.webhooks.dispatch import (
     process_webhook_queue_task,
     requeue_webhook_queue_task,
@@ -17,6 +42,8 @@ from app.services.webhooks.dispatch import (
 from app.services.webhooks.queue import TASK_TYPE as WEBHOOK_TASK_TYPE
 
 logger = get_logger(__name__)
+# Blocking pops return this often so a stop request is noticed promptly.
+_STOP_POLL_SECONDS = 1.0
 
 
 @dataclass(frozen=True)
@@ -35,6 +62,14 @@ _TASK_HANDLERS: dict[str, _TaskHandler] = {
         ),
         requeue=lambda task, delay: requeue_webhook_queue_task(task, delay_seconds=delay),
     ),
+    TASK_COMMENT_NOTIFICATION_TYPE: _TaskHandler(
+        handler=process_task_comment_notification_task,
+        attempts_to_delay=task_comment_notification_retry_delay,
+        requeue=lambda task, delay: requeue_task_comment_notification_task(
+            task,
+            delay_seconds=delay,
+        ),
+    ),
 }
 
 
@@ -42,96 +77,292 @@ def _compute_jitter(base_delay: float) -> float:
     return random.uniform(0, min(settings.rq_dispatch_retry_max_seconds / 10, base_delay * 0.1))
 
 
-async def flush_queue(*, block: bool = False, block_timeout: float = 0) -> int:
-    """Consume one queue batch and dispatch by task type."""
-    processed = 0
-    while True:
-        try:
-            task = dequeue_task(
-                settings.rq_queue_name,
-                redis_url=settings.rq_redis_url,
-                block=block,
-                block_timeout=block_timeout,
-            )
-        except Exception:
-            logger.exception(
-                "queue.worker.dequeue_failed",
-                extra={"queue_name": settings.rq_queue_name},
-            )
-            continue
+def _ordering_key(task: QueuedTask) -> str | None:
+    """Tasks sharing a key run one at a time, in the order they were dequeued."""
+    for field in ("session_key", "board_id"):
+        value = task.payload.get(field)
+        if value:
+            return f"{field}:{value}"
+    return None
 
-        if task is None:
-            break
 
-        handler = _TASK_HANDLERS.get(task.task_type)
-        if handler is None:
-            logger.warning(
-                "queue.worker.task_unhandled",
-                extra={
-                    "task_type": task.task_type,
-                    "queue_name": settings.rq_queue_name,
-                },
-            )
-            continue
+async def _process_task(task: QueuedTask) -> bool:
+    handler = _TASK_HANDLERS.get(task.task_type)
+    if handler is None:
+        logger.warning(
+            "queue.worker.task_unhandled",
+            extra={
+                "task_type": task.task_type,
+                "queue_name": settings.rq_queue_name,
+            },
+        )
+        return False
 
-        try:
-            await handler.handler(task)
-            processed += 1
-            logger.info(
-                "queue.worker.success",
+    succeeded = False
+    try:
+        await handler.handler(task)
+        succeeded = True
+        logger.info(
+            "queue.worker.success",
+            extra={
+                "task_type": task.task_type,
+                "attempt": task.attempts,
+            },
+        )
+    except Exception as exc:
+        logger.exception(
+            "queue.worker.failed",
+            extra={
+                "task_type": task.task_type,
+                "attempt": task.attempts,
+                "error": str(exc),
+            },
+        )
+        base_delay = handler.attempts_to_delay(task.attempts)
+        delay = base_delay + _compute_jitter(base_delay)
+        # Requeueing is one pooled Redis command; keep it off the event loop anyway.
+        if not await asyncio.to_thread(handler.requeue, task, delay):
+            logger.warning(
+                "queue.worker.drop_task",
                 extra={
                     "task_type": task.task_type,
                     "attempt": task.attempts,
                 },
             )
-        except Exception as exc:
-            logger.exception(
-                "queue.worker.failed",
-                extra={
-                    "task_type": task.task_type,
-                    "attempt": task.attempts,
-                    "error": str(exc),
-                },
+    return succeeded
+
+
+async def _ack(task: QueuedTask, worker_id: str) -> None:
+    try:
+        await ack_task_async(
+            task,
+            settings.rq_queue_name,
+            worker_id=worker_id,
+            redis_url=settings.rq_redis_url,
+        )
+    except Exception:
+        # The task stays in the processing list and is requeued when this worker stops.
+        logger.exception(
+            "queue.worker.ack_failed",
+            extra={"task_type": task.task_type, "worker_id": worker_id},
+        )
+
+
+class _TaskScheduler:
+    """Run dequeued tasks concurrently while keeping per-board/session order.
+
+    A slot is taken before each dequeue, so at most `concurrency` tasks are held by
+    the worker at once; a task queued behind another with the same ordering key
+    keeps its slot while it waits.
+    """
+
+    def __init__(self, concurrency: int, *, worker_id: str | None = None) -> None:
+        self._worker_id = worker_id
+        self._slots = asyncio.Semaphore(concurrency)
+        self._tails: dict[str, asyncio.Task[bool]] = {}
+        self._running: set[asyncio.Task[bool]] = set()
+        self.processed = 0
+
+    async def acquire_slot(self) -> None:
+        await self._slots.acquire()
+
+    def release_slot(self) -> None:
+        self._slots.release()
+
+    def submit(self, task: QueuedTask) -> None:
+        key = _ordering_key(task)
+        previous = self._tails.get(key) if key is not None else None
+        job = asyncio.create_task(self._run(task, previous))
+        self._running.add(job)
+        if key is not None:
+            self._tails[key] = job
+        job.add_done_callback(lambda done: self._finished(done, key))
+
+    async def _run(self, task: QueuedTask, previous: asyncio.Task[bool] | None) -> bool:
+        if previous is not None:
+            await asyncio.wait([previous])
+        succeeded = await _process_task(task)
+        if self._worker_id is not None:
+            await _ack(task, self._worker_id)
+        return succeeded
+
+    def _finished(self, job: asyncio.Task[bool], key: str | None) -> None:
+        self._running.discard(job)
+        if key is not None and self._tails.get(key) is job:
+            del self._tails[key]
+        self._slots.release()
+        if job.cancelled():
+            return
+        exc = job.exception()
+        if exc is not None:
+            logger.error(
+                "queue.worker.task_crashed",
+                extra={"queue_name": settings.rq_queue_name},
+                exc_info=exc,
             )
-            base_delay = handler.attempts_to_delay(task.attempts)
-            delay = base_delay + _compute_jitter(base_delay)
-            if not handler.requeue(task, delay):
-                logger.warning(
-                    "queue.worker.drop_task",
-                    extra={
-                        "task_type": task.task_type,
-                        "attempt": task.attempts,
-                    },
+        elif job.result():
+            self.processed += 1
+
+    async def drain(self) -> None:
+        """Wait for every submitted task to finish."""
+        while self._running:
+            await asyncio.wait(set(self._running))
+
+
+async def flush_queue(
+    *,
+    block: bool = False,
+    block_timeout: float = 0,
+    concurrency: int | None = None,
+    stop: asyncio.Event | None = None,
+    worker_id: str | None = None,
+) -> int:
+    """Consume queued tasks and dispatch them by task type, up to `concurrency` at once.
+
+    Without `stop`, returns once the queue is empty. With `stop`, keeps polling until
+    it is set. Either way, tasks already dequeued finish before this returns. With
+    `worker_id`, tasks are dequeued reliably and acked once handled.
+    """
+    scheduler = _TaskScheduler(
+        concurrency or settings.rq_worker_concurrency,
+        worker_id=worker_id,
+    )
+    try:
+        while stop is None or not stop.is_set():
+            await scheduler.acquire_slot()
+            if stop is not None and stop.is_set():
+                scheduler.release_slot()
+                break
+            try:
+                task = await dequeue_task_async(
+                    settings.rq_queue_name,
+                    redis_url=settings.rq_redis_url,
+                    block=block,
+                    block_timeout=block_timeout,
+                    worker_id=worker_id,
                 )
-        await asyncio.sleep(settings.rq_dispatch_throttle_seconds)
+            except Exception:
+                scheduler.release_slot()
+                logger.exception(
+                    "queue.worker.dequeue_failed",
+                    extra={"queue_name": settings.rq_queue_name},
+                )
+                continue
+
+            if task is None:
+                scheduler.release_slot()
+                if stop is None:
+                    break
+                continue
+            scheduler.submit(task)
+    finally:
+        await scheduler.drain()
+
+    if scheduler.processed > 0:
+        logger.info("queue.worker.batch_complete", extra={"count": scheduler.processed})
+    return scheduler.processed
+
+
+def _install_stop_handlers(stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        # Not available on Windows event loops; Ctrl+C then interrupts the loop directly.
+        with suppress(NotImplementedError):
+            loop.add_signal_handler(signum, stop.set)
+
+
+def _new_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
 
-    if processed > 0:
-        logger.info("queue.worker.batch_complete", extra={"count": processed})
-    return processed
+
+async def _heartbeat(worker_id: str) -> None:
+    await heartbeat_async(
+        settings.rq_queue_name,
+        worker_id,
+        ttl_seconds=settings.rq_worker_heartbeat_ttl_seconds,
+        redis_url=settings.rq_redis_url,
+    )
 
 
-async def _run_worker_loop() -> None:
+async def _keep_alive(worker_id: str) -> None:
     while True:
+        await asyncio.sleep(settings.rq_worker_heartbeat_ttl_seconds / 3)
         try:
-            await flush_queue(
-                block=True,
-                block_timeout=0,
+            await _heartbeat(worker_id)
+            await requeue_orphaned_tasks_async(
+                settings.rq_queue_name,
+                redis_url=settings.rq_redis_url,
             )
         except Exception:
-            logger.exception(
-                "queue.worker.loop_failed",
-                extra={"queue_name": settings.rq_queue_name},
-            )
-            await asyncio.sleep(1)
+            logger.exception("queue.worker.heartbeat_failed", extra={"worker_id": worker_id})
+
+
+async def _release(worker_id: str) -> None:
+    try:
+        returned = await release_worker_async(
+            settings.rq_queue_name,
+            worker_id,
+            redis_url=settings.rq_redis_url,
+        )
+    except Exception:
+        logger.exception("queue.worker.release_failed", extra={"worker_id": worker_id})
+        return
+    if returned:
+        logger.warning(
+            "queue.worker.requeued_unacked",
+            extra={"worker_id": worker_id, "count": returned},
+        )
+
+
+async def _run_worker_loop(concurrency: int | None = None) -> None:
+    stop = asyncio.Event()
+    _install_stop_handlers(stop)
+    worker_id = _new_worker_id()
+    try:
+        # Register before the first dequeue so the reaper never sees our tasks unowned.
+        await _heartbeat(worker_id)
+        await requeue_orphaned_tasks_async(settings.rq_queue_name, redis_url=settings.rq_redis_url)
+    except Exception:
+        logger.exception("queue.worker.heartbeat_failed", extra={"worker_id": worker_id})
+    keep_alive = asyncio.create_task(_keep_alive(worker_id))
+    try:
+        while not stop.is_set():
+            try:
+                await flush_queue(
+                    block=True,
+                    block_timeout=_STOP_POLL_SECONDS,
+                    concurrency=concurrency,
+                    stop=stop,
+                    worker_id=worker_id,
+                )
+            except Exception:
+                logger.exception(
+                    "queue.worker.loop_failed",
+                    extra={"queue_name": settings.rq_queue_name},
+                )
+                await asyncio.sleep(1)
+    finally:
+        keep_alive.cancel()
+        with suppress(asyncio.CancelledError):
+            await keep_alive
+        await _release(worker_id)
+        await close_async_redis_clients()
+
 
+def run_worker(*, concurrency: int | None = None) -> None:
+    """RQ entrypoint for running continuous queue processing.
 
-def run_worker() -> None:
-    """RQ entrypoint for running continuous queue processing."""
+    SIGINT/SIGTERM stop dequeueing; tasks already in flight finish before exit, and
+    anything left unacked is put back on the queue.
+    """
     logger.info(
         "queue.worker.batch_started",
-        extra={"throttle_seconds": settings.rq_dispatch_throttle_seconds},
+        extra={
+            "gateway_rate_per_second": settings.rq_dispatch_gateway_rate_per_second,
+            "concurrency": concurrency or settings.rq_worker_concurrency,
+        },
     )
     try:
-        asyncio.run(_run_worker_loop())
+        asyncio.run(_run_worker_loop(concurrency))
     finally:
         logger.info("queue.worker.stopped", extra={"queue_name": settings.rq_queue_name})
@@ -0,0 +1,195 @@
+"""Queued delivery of task comment and mention notifications to agents.
+
+Comment creation renders one notification per target agent and enqueues them
+as a single task; the queue worker sends them concurrently. Targets whose send
+fails are requeued (with backoff and capped attempts) without re-notifying the
+agents that already received the message.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlmodel import col
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.session import async_session_maker
+from app.models.agents import Agent
+from app.models.boards import Board
+from app.services.dispatch_rate_limit import acquire_dispatch_token
+from app.services.openclaw.gateway_dispatch import GatewayDispatchService
+from app.services.openclaw.gateway_rpc import OpenClawGatewayError
+from app.services.queue import QueuedTask, enqueue_task
+from app.services.queue import requeue_if_failed as generic_requeue_if_failed
+
+logger = get_logger(__name__)
+TASK_TYPE = "task_comment_notification"
+
+
+@dataclass(frozen=True)
+class QueuedTaskCommentNotification:
+    """Rendered notifications for one comment, keyed by target agent id."""
+
+    board_id: UUID
+    task_id: UUID
+    messages: dict[UUID, str]
+    created_at: datetime
+    attempts: int = 0
+
+
+def _task_from_payload(payload: QueuedTaskCommentNotification) -> QueuedTask:
+    return QueuedTask(
+        task_type=TASK_TYPE,
+        payload={
+            "board_id": str(payload.board_id),
+            "task_id": str(payload.task_id),
+            "messages": {str(agent_id): text for agent_id, text in payload.messages.items()},
+        },
+        created_at=payload.created_at,
+        attempts=payload.attempts,
+    )
+
+
+def decode_task_comment_notification(task: QueuedTask) -> QueuedTaskCommentNotification:
+    if task.task_type != TASK_TYPE:
+        raise ValueError(f"Unexpected task_type={task.task_type!r}; expected {TASK_TYPE!r}")
+    payload: dict[str, Any] = task.payload
+    return QueuedTaskCommentNotification(
+        board_id=UUID(payload["board_id"]),
+        task_id=UUID(payload["task_id"]),
+        messages={UUID(agent_id): str(text) for agent_id, text in payload["messages"].items()},
+        created_at=task.created_at,
+        attempts=task.attempts,
+    )
+
+
+def enqueue_task_comment_notification(payload: QueuedTaskCommentNotification) -> bool:
+    """Queue comment notifications for the worker; returns False when Redis is unavailable."""
+    queued = enqueue_task(
+        _task_from_payload(payload),
+        settings.rq_queue_name,
+        redis_url=settings.rq_redis_url,
+    )
+    log = logger.info if queued else logger.warning
+    log(
+        "task_comment.notify.enqueued" if queued else "task_comment.notify.enqueue_failed",
+        extra={
+            "board_id": str(payload.board_id),
+            "task_id": str(payload.task_id),
+            "targets": len(payload.messages),
+        },
+    )
+    return queued
+
+
+def task_comment_notification_retry_delay(attempts: int) -> float:
+    """Return the backoff (before jitter) for a notification retried after `attempts`."""
+    return min(
+        float(settings.rq_dispatch_retry_base_seconds) * 2.0 ** max(0, attempts),
+        float(settings.rq_dispatch_retry_max_seconds),
+    )
+
+
+def _retry_delay(attempts: int) -> float:
+    delay = task_comment_notification_retry_delay(attempts)
+    max_jitter = min(float(settings.rq_dispatch_retry_max_seconds) / 10, delay * 0.1)
+    return delay + random.uniform(0.0, max_jitter)
+
+
+def requeue_task_comment_notification(
+    payload: QueuedTaskCommentNotification,
+    *,
+    delay_seconds: float = 0,
+) -> bool:
+    """Requeue notifications with capped retries. Returns True if requeued."""
+    return generic_requeue_if_failed(
+        _task_from_payload(payload),
+        settings.rq_queue_name,
+        max_retries=settings.rq_dispatch_max_retries,
+        redis_url=settings.rq_redis_url,
+        delay_seconds=delay_seconds,
+    )
+
+
+async def deliver_task_comment_notification(
+    item: QueuedTaskCommentNotification,
+) -> dict[UUID, str]:
+    """Send every notification concurrently; return the ones that failed."""
+    async with async_session_maker() as session:
+        board = await Board.objects.by_id(item.board_id).first(session)
+        if board is None:
+            return {}
+        dispatch = GatewayDispatchService(session)
+        config = await dispatch.optional_gateway_config_for_board(board)
+        if config is None:
+            return {}
+        agents = (
+            await Agent.objects.filter_by(board_id=board.id)
+            .filter(
+                col(Agent.id).in_(list(item.messages)),
+            )
+            .all(session)
+        )
+
+    async def _send(agent: Agent) -> OpenClawGatewayError | None:
+        session_key = agent.openclaw_session_id or ""
+        await acquire_dispatch_token(config.gateway_id or config.url, session_key=session_key)
+        return await dispatch.try_send_agent_message(
+            session_key=session_key,
+            config=config,
+            agent_name=agent.name,
+            message=item.messages[agent.id],
+            deliver=False,
+        )
+
+    targets = [agent for agent in agents if agent.openclaw_session_id]
+    errors = await asyncio.gather(*(_send(agent) for agent in targets))
+    failed: dict[UUID, str] = {}
+    for agent, error in zip(targets, errors, strict=True):
+        if error is None:
+            continue
+        logger.warning(
+            "task_comment.notify.send_failed",
+            extra={
+                "task_id": str(item.task_id),
+                "agent_id": str(agent.id),
+                "attempt": item.attempts,
+                "error": str(error),
+            },
+        )
+        failed[agent.id] = item.messages[agent.id]
+    return failed
+
+
+async def process_task_comment_notification_task(task: QueuedTask) -> None:
+    item = decode_task_comment_notification(task)
+    failed = await deliver_task_comment_notification(item)
+    if not failed:
+        return
+    # Retry only the agents that were not reached; the requeue is a blocking Redis call.
+    if not await asyncio.to_thread(
+        requeue_task_comment_notification,
+        replace(item, messages=failed),
+        delay_seconds=_retry_delay(item.attempts),
+    ):
+        logger.warning(
+            "task_comment.notify.dropped",
+            extra={
+                "task_id": str(item.task_id),
+                "targets": len(failed),
+                "attempt": item.attempts,
+            },
+        )
+
+
+def requeue_task_comment_notification_task(task: QueuedTask, *, delay_seconds: float = 0) -> bool:
+    return requeue_task_comment_notification(
+        decode_task_comment_notification(task),
+        delay_seconds=delay_seconds,
+    )
@@ -16,7 +16,9 @@ from app.models.agents import Agent
 from app.models.board_webhook_payloads import BoardWebhookPayload
 from app.models.board_webhooks import BoardWebhook
 from app.models.boards import Board
+from app.services.dispatch_rate_limit import acquire_dispatch_token
 from app.services.openclaw.gateway_dispatch import GatewayDispatchService
+from app.services.openclaw.gateway_rpc import GatewayCircuitOpenError
 from app.services.queue import QueuedTask
 from app.services.webhooks.queue import (
     QueuedInboundDelivery,
@@ -87,13 +89,20 @@ async def _notify_target_agent(
         return
 
     message = _webhook_message(board=board, webhook=webhook, payload=payload)
-    await dispatch.try_send_agent_message(
+    await acquire_dispatch_token(
+        config.gateway_id or config.url,
+        session_key=target_agent.openclaw_session_id,
+    )
+    error = await dispatch.try_send_agent_message(
         session_key=target_agent.openclaw_session_id,
         config=config,
         agent_name=target_agent.name,
         message=message,
         deliver=False,
     )
+    if isinstance(error, GatewayCircuitOpenError):
+        # Gateway is known to be down: fail so the delivery is requeued with backoff.
+        raise error
 
 
 async def _load_webhook_payload(
@@ -195,7 +204,7 @@ def requeue_webhook_queue_task(task: QueuedTask, *, delay_seconds: float = 0) ->
 
 
 async def flush_webhook_delivery_queue(*, block: bool = False, block_timeout: float = 0) -> int:
-    """Consume queued webhook events and notify board leads in a throttled batch."""
+    """Consume queued webhook events and notify board leads in a rate-limited batch."""
     processed = 0
     while True:
         try:
@@ -240,7 +249,6 @@ async def flush_webhook_delivery_queue(*, block: bool = False, block_timeout: fl
             except TypeError:
                 requeue_if_failed(item)
         time.sleep(0.0)
-        await asyncio.sleep(settings.rq_dispatch_throttle_seconds)
     if processed > 0:
         logger.info("webhook.dispatch.batch_complete", extra={"count": processed})
     return processed
@@ -278,7 +286,7 @@ def run_flush_webhook_delivery_queue() -> None:
     """RQ entrypoint for running the async queue flush from worker jobs."""
     logger.info(
         "webhook.dispatch.batch_started",
-        extra={"throttle_seconds": settings.rq_dispatch_throttle_seconds},
+        extra={"gateway_rate_per_second": settings.rq_dispatch_gateway_rate_per_second},
     )
     start = time.time()
     asyncio.run(flush_webhook_delivery_queue())
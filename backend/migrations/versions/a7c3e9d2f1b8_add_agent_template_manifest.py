@@ -0,0 +1,31 @@
+"""Add agent workspace file manifest.
+
+Revision ID: a7c3e9d2f1b8
+Revises: d3a9f1c6b2e4
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a7c3e9d2f1b8"
+down_revision = "d3a9f1c6b2e4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add agents.template_manifest.
+
+    Existing rows stay NULL, so their next provisioning writes every file once.
+    """
+    op.add_column("agents", sa.Column("template_manifest", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Remove agents.template_manifest."""
+    op.drop_column("agents", "template_manifest")
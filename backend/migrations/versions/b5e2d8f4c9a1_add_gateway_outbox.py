@@ -0,0 +1,61 @@
+"""Add gateway message outbox.
+
+Revision ID: b5e2d8f4c9a1
+Revises: a7c3e9d2f1b8
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b5e2d8f4c9a1"
+down_revision = "a7c3e9d2f1b8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create gateway_outbox and its claim/ordering indexes."""
+    op.create_table(
+        "gateway_outbox",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("gateway_id", sa.Uuid(), nullable=False),
+        sa.Column("board_id", sa.Uuid(), nullable=True),
+        sa.Column("agent_id", sa.Uuid(), nullable=True),
+        sa.Column("task_id", sa.Uuid(), nullable=True),
+        sa.Column("session_key", sa.String(), nullable=False),
+        sa.Column("agent_name", sa.String(), nullable=False),
+        sa.Column("message", sa.String(), nullable=False),
+        sa.Column("deliver", sa.Boolean(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column("notified_event_type", sa.String(), nullable=True),
+        sa.Column("notified_message", sa.String(), nullable=True),
+        sa.Column("failed_event_type", sa.String(), nullable=True),
+        sa.Column("failed_message", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+        sa.Column("delivered_at", sa.DateTime(), nullable=True),
+        sa.Column("latency_ms", sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_gateway_outbox_gateway_id", "gateway_outbox", ["gateway_id"])
+    op.create_index("ix_gateway_outbox_session_key", "gateway_outbox", ["session_key"])
+    op.create_index(
+        "ix_gateway_outbox_status_next_attempt_at",
+        "gateway_outbox",
+        ["status", "next_attempt_at"],
+    )
+
+
+def downgrade() -> None:
+    """Drop gateway_outbox."""
+    op.drop_index("ix_gateway_outbox_status_next_attempt_at", table_name="gateway_outbox")
+    op.drop_index("ix_gateway_outbox_session_key", table_name="gateway_outbox")
+    op.drop_index("ix_gateway_outbox_gateway_id", table_name="gateway_outbox")
+    op.drop_table("gateway_outbox")
@@ -0,0 +1,43 @@
+"""Add indexed agent token lookup key.
+
+Revision ID: d3a9f1c6b2e4
+Revises: b497b348ebb4
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d3a9f1c6b2e4"
+down_revision = "b497b348ebb4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add agents.agent_token_lookup with a unique index.
+
+    Existing rows stay NULL and are backfilled lazily on their next successful
+    authentication, since the plaintext token is required to derive the key.
+    """
+    op.add_column(
+        "agents",
+        sa.Column("agent_token_lookup", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    )
+    op.create_index(
+        op.f("ix_agents_agent_token_lookup"),
+        "agents",
+        ["agent_token_lookup"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Remove agents.agent_token_lookup."""
+    op.drop_index(op.f("ix_agents_agent_token_lookup"), table_name="agents")
+    op.drop_column("agents", "agent_token_lookup")
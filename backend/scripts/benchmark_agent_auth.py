@@ -0,0 +1,108 @@
+"""Benchmark agent-token authentication latency across agent counts.
+
+Seeds an in-memory SQLite database with N agents and times
+`_find_agent_for_token` for a valid and an invalid token. With indexed lookup
+keys the per-request cost should stay flat (one PBKDF2 verify) as N grows.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Measure agent token auth latency for increasing agent counts.",
+    )
+    parser.add_argument(
+        "--agents",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1_000, 10_000],
+        help="Agent counts to benchmark (default: 10 100 1000 10000)",
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=20,
+        help="Timed lookups per agent count and token kind (default: 20)",
+    )
+    return parser.parse_args()
+
+
+async def _measure(agent_count: int, iterations: int) -> tuple[float, float]:
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlmodel import SQLModel
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from app.core.agent_auth import _find_agent_for_token
+    from app.core.agent_tokens import agent_token_lookup_key, hash_agent_token
+    from app.models.agents import Agent
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.connect() as conn, conn.begin():
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    # Only the matched row's hash is ever verified, so seeded rows can share one.
+    filler_hash = hash_agent_token("filler")
+    valid_token = "benchmark-valid-token"
+    gateway_id = uuid4()
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        for index in range(agent_count - 1):
+            session.add(
+                Agent(
+                    name=f"agent-{index}",
+                    gateway_id=gateway_id,
+                    agent_token_hash=filler_hash,
+                    agent_token_lookup=agent_token_lookup_key(f"filler-{index}"),
+                ),
+            )
+        session.add(
+            Agent(
+                name="target",
+                gateway_id=gateway_id,
+                agent_token_hash=hash_agent_token(valid_token),
+                agent_token_lookup=agent_token_lookup_key(valid_token),
+            ),
+        )
+        await session.commit()
+
+        async def _median_ms(token: str) -> float:
+            samples: list[float] = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                await _find_agent_for_token(session, token)
+                samples.append((time.perf_counter() - started) * 1000)
+            return statistics.median(samples)
+
+        valid_ms = await _median_ms(valid_token)
+        invalid_ms = await _median_ms("benchmark-invalid-token")
+    await engine.dispose()
+    return valid_ms, invalid_ms
+
+
+async def _run() -> int:
+    args = _parse_args()
+    sys.stdout.write(f"{'agents':>8} {'valid_ms':>10} {'invalid_ms':>11}\n")
+    for agent_count in args.agents:
+        valid_ms, invalid_ms = await _measure(max(agent_count, 1), args.iterations)
+        sys.stdout.write(f"{agent_count:>8} {valid_ms:>10.2f} {invalid_ms:>11.2f}\n")
+    return 0
+
+
+def main() -> None:
+    """Run the benchmark and exit with its return code."""
+    raise SystemExit(asyncio.run(_run()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Benchmark agent workspace template rendering.
+
+Renders the full workspace file set for N board agents (one lead per ten
+agents; a share of agents carry custom identity/soul templates) in a few modes:
+
+- `per-agent env`: a fresh environment per agent, as before the shared cache;
+- `per-agent env + bytecode`: the same, but loading compiled templates from a
+  warm bytecode cache (what a newly started worker process pays);
+- `shared`: the process-wide environment with the override LRU;
+- `shared + auto-reload`: the shared environment checking template mtimes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Time agent workspace template rendering.")
+    parser.add_argument(
+        "--agents",
+        type=int,
+        default=1000,
+        help="Agents rendered per mode (default: 1000)",
+    )
+    parser.add_argument(
+        "--override-variants",
+        type=int,
+        default=20,
+        help="Distinct custom identity/soul templates shared by agents (default: 20)",
+    )
+    parser.add_argument(
+        "--override-share",
+        type=float,
+        default=0.5,
+        help="Fraction of agents with custom identity/soul templates (default: 0.5)",
+    )
+    return parser.parse_args()
+
+
+def _fixtures(
+    args: argparse.Namespace,
+) -> list[tuple[Any, dict[str, str], set[str], dict[str, str]]]:
+    from app.models.agents import Agent
+    from app.models.boards import Board
+    from app.models.gateways import Gateway
+    from app.models.users import User
+    from app.services.openclaw.constants import (
+        BOARD_SHARED_TEMPLATE_MAP,
+        DEFAULT_GATEWAY_FILES,
+        LEAD_GATEWAY_FILES,
+        LEAD_TEMPLATE_MAP,
+    )
+    from app.services.openclaw.internal.session_keys import board_scoped_session_key
+    from app.services.openclaw.provisioning import _build_context
+
+    gateway = Gateway(
+        id=uuid4(),
+        organization_id=uuid4(),
+        name="bench",
+        url="ws://bench",
+        workspace_root="/workspace",
+    )
+    user = User(id=uuid4(), clerk_user_id="bench", email="bench@example.com", name="Bench")
+    boards = [
+        Board(
+            id=uuid4(),
+            organization_id=gateway.organization_id,
+            gateway_id=gateway.id,
+            name=f"Board {index}",
+            slug=f"board-{index}",
+        )
+        for index in range(max(args.agents // 10, 1))
+    ]
+    variants = max(args.override_variants, 1)
+    with_overrides = int(args.agents * args.override_share)
+    fixtures = []
+    for index in range(args.agents):
+        board = boards[index % len(boards)]
+        agent_id = uuid4()
+        is_lead = index < len(boards)
+        variant = index % variants
+        agent = Agent(
+            id=agent_id,
+            board_id=board.id,
+            gateway_id=gateway.id,
+            name=f"Agent {index}",
+            is_board_lead=is_lead,
+            openclaw_session_id=board_scoped_session_key(
+                agent_id=agent_id,
+                board_id=board.id,
+                is_board_lead=is_lead,
+            ),
+            identity_template=(
+                f"# {{{{ agent_name }}}} (variant {variant})\n"
+                "{% if identity_role %}Role: {{ identity_role }}{% endif %}\n"
+                if index < with_overrides
+                else None
+            ),
+            soul_template=(
+                f"Variant {variant} soul for {{{{ agent_name }}}} on {{{{ board_name }}}}.\n"
+                if index < with_overrides
+                else None
+            ),
+        )
+        context = _build_context(agent, board, gateway, "bench-token", user)
+        context["directory_role_soul_markdown"] = ""
+        context["directory_role_soul_source_url"] = ""
+        file_names = set(LEAD_GATEWAY_FILES if is_lead else DEFAULT_GATEWAY_FILES)
+        overrides = dict(BOARD_SHARED_TEMPLATE_MAP)
+        if is_lead:
+            overrides.update(LEAD_TEMPLATE_MAP)
+        fixtures.append((agent, context, file_names, overrides))
+    return fixtures
+
+
+def _render_all(
+    fixtures: list[tuple[Any, dict[str, str], set[str], dict[str, str]]],
+    *,
+    before_each: Callable[[], None] | None = None,
+) -> tuple[float, int]:
+    from app.services.openclaw.provisioning import _render_agent_files
+
+    files = 0
+    started = time.perf_counter()
+    for agent, context, file_names, overrides in fixtures:
+        if before_each is not None:
+            before_each()
+        rendered = _render_agent_files(
+            context,
+            agent,
+            file_names,
+            include_bootstrap=True,
+            template_overrides=overrides,
+        )
+        files += len(rendered)
+    return time.perf_counter() - started, files
+
+
+def main() -> None:
+    """Render the fixture set in each mode and print a timing table."""
+    from jinja2 import FileSystemBytecodeCache
+
+    from app.services.openclaw.agent_templates import (
+        AgentTemplates,
+        set_agent_templates,
+        templates_root,
+    )
+
+    args = _parse_args()
+    fixtures = _fixtures(args)
+    root = templates_root()
+
+    with tempfile.TemporaryDirectory(prefix="agent-templates-bench-") as cache_dir:
+        bytecode_cache = FileSystemBytecodeCache(cache_dir)
+
+        def _fresh(bytecode: bool) -> Callable[[], None]:
+            return lambda: set_agent_templates(
+                AgentTemplates(root, bytecode_cache=bytecode_cache if bytecode else None),
+            )
+
+        # Fill the bytecode cache so the bytecode mode measures warm loads only.
+        _fresh(True)()
+        _render_all(fixtures[:20])
+
+        shared = AgentTemplates(root)
+        reloading = AgentTemplates(root, auto_reload=True)
+        modes: list[tuple[str, Callable[[], None] | None, AgentTemplates | None]] = [
+            ("per-agent env", _fresh(False), None),
+            ("per-agent env + bytecode", _fresh(True), None),
+            ("shared", None, shared),
+            ("shared + auto-reload", None, reloading),
+        ]
+        sys.stdout.write(
+            f"{'mode':>26} {'agents':>7} {'files':>6} {'seconds':>8} {'agents/s':>9} "
+            f"{'ms/agent':>9}\n",
+        )
+        try:
+            for label, before_each, templates in modes:
+                if templates is not None:
+                    set_agent_templates(templates)
+                    _render_all(fixtures[:1])
+                elapsed, files = _render_all(fixtures, before_each=before_each)
+                sys.stdout.write(
+                    f"{label:>26} {len(fixtures):>7} {files:>6} {elapsed:>8.2f} "
+                    f"{len(fixtures) / elapsed:>9.0f} {elapsed * 1000 / len(fixtures):>9.2f}\n",
+                )
+        finally:
+            set_agent_templates(None)
+        stats = shared.stats()
+        sys.stdout.write(
+            f"shared override cache: hits={stats.override_hits} "
+            f"misses={stats.override_misses} entries={stats.override_entries}\n",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+"""Load benchmark for gateway RPC, agent provisioning and template sync.
+
+Starts the local stub gateway (`scripts/stub_gateway.py`) with the requested
+latency and failure injection and drives three scenarios against it:
+
+- `rpc`: `openclaw_call` over a mix of read and write methods;
+- `provision`: `apply_agent_lifecycle` for new board agents (no database);
+- `sync`: `sync_gateway_templates` for a gateway with N agents seeded in an
+  in-memory SQLite database.
+
+Each scenario reports throughput, p50/p95/p99 operation latency, failures and
+the connections the stub saw, followed by per-method request latency from the
+gateway RPC metrics. The souls.directory lookup made while rendering SOUL.md is
+stubbed out so results do not depend on the network.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import math
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+SCENARIOS = ("rpc", "provision", "sync")
+DEFAULT_RPC_METHODS = "health,sessions.list,chat.send,agents.files.get"
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Load-test gateway RPC, provisioning and template sync against a stub.",
+    )
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=SCENARIOS,
+        default=list(SCENARIOS),
+        help="Scenarios to run (default: all)",
+    )
+    parser.add_argument("--calls", type=int, default=2_000, help="RPC calls (default: 2000)")
+    parser.add_argument(
+        "--rpc-methods",
+        default=DEFAULT_RPC_METHODS,
+        help=f"Comma-separated methods cycled by the rpc scenario (default: {DEFAULT_RPC_METHODS})",
+    )
+    parser.add_argument(
+        "--agents",
+        type=int,
+        default=100,
+        help="Agents for the provision and sync scenarios (default: 100)",
+    )
+    parser.add_argument(
+        "--sync-runs",
+        type=int,
+        default=3,
+        help="Template sync runs (default: 3)",
+    )
+    parser.add_argument(
+        "--sync-concurrency",
+        type=int,
+        default=None,
+        help="Agents synced at once (default: GATEWAY_TEMPLATE_SYNC_CONCURRENCY)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=50,
+        help="Concurrent operations for rpc and provision (default: 50)",
+    )
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Stub request latency")
+    parser.add_argument("--jitter-ms", type=float, default=1.0, help="Stub latency jitter")
+    parser.add_argument("--handshake-ms", type=float, default=5.0, help="Stub connect latency")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Stub RPC error rate")
+    parser.add_argument(
+        "--disconnect-rate",
+        type=float,
+        default=0.0,
+        help="Stub connection drop rate",
+    )
+    parser.add_argument(
+        "--pool",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Use pooled gateway connections (default: true)",
+    )
+    parser.add_argument(
+        "--cache",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Use the gateway read cache (default: true)",
+    )
+    parser.add_argument(
+        "--circuit",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Use per-gateway circuit breakers (default: true)",
+    )
+    parser.add_argument("--seed", type=int, default=7, help="Stub random seed (default: 7)")
+    return parser.parse_args()
+
+
+@dataclass
+class _ScenarioResult:
+    name: str
+    operations: int
+    failures: int
+    seconds: float
+    latencies: list[float]
+    connections: int
+    peak_connections: int
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q * len(ordered)) - 1, 0)]
+
+
+async def _timed_operations(
+    operations: list[Callable[[], Awaitable[object]]],
+    *,
+    concurrency: int,
+) -> tuple[list[float], int, float]:
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    latencies: list[float] = []
+    failures = 0
+
+    async def _one(operation: Callable[[], Awaitable[object]]) -> None:
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await operation()
+            except Exception:  # noqa: BLE001 - failures are counted, not raised
+                failures += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_one(operation) for operation in operations))
+    return latencies, failures, time.perf_counter() - started
+
+
+async def _rpc_scenario(args: argparse.Namespace, stub: Any) -> tuple[list[float], int, float]:
+    from app.services.openclaw.gateway_rpc import GatewayConfig, openclaw_call
+
+    config = GatewayConfig(url=stub.url, disable_device_pairing=True, gateway_id="stub")
+    stub.files["bench"] = {"SOUL.md": "# soul"}
+    methods = [method.strip() for method in args.rpc_methods.split(",") if method.strip()]
+    params_by_method: dict[str, dict[str, Any]] = {
+        "chat.send": {"sessionKey": "agent:bench:main", "message": "ping", "deliver": False},
+        "agents.files.get": {"agentId": "bench", "name": "SOUL.md"},
+        "agents.files.list": {"agentId": "bench"},
+        "sessions.patch": {"key": "agent:bench:main"},
+    }
+
+    def _operation(method: str) -> Callable[[], Awaitable[object]]:
+        return lambda: openclaw_call(method, params_by_method.get(method), config=config)
+
+    return await _timed_operations(
+        [_operation(methods[index % len(methods)]) for index in range(args.calls)],
+        concurrency=args.concurrency,
+    )
+
+
+def _bench_models(stub_url: str, agent_count: int) -> tuple[Any, Any, list[Any], list[Any], Any]:
+    from app.models.agents import Agent
+    from app.models.boards import Board
+    from app.models.gateways import Gateway
+    from app.models.organizations import Organization
+    from app.models.users import User
+    from app.services.openclaw.internal.session_keys import board_scoped_session_key
+
+    organization = Organization(id=uuid4(), name="benchmark")
+    gateway = Gateway(
+        id=uuid4(),
+        organization_id=organization.id,
+        name="stub",
+        url=stub_url,
+        workspace_root="/workspace",
+        disable_device_pairing=True,
+    )
+    boards = [
+        Board(
+            id=uuid4(),
+            organization_id=organization.id,
+            gateway_id=gateway.id,
+            name=f"Board {index}",
+            slug=f"board-{index}",
+        )
+        for index in range(max(agent_count // 10, 1))
+    ]
+    agents = []
+    for index in range(agent_count):
+        board = boards[index % len(boards)]
+        agent_id = uuid4()
+        is_lead = index < len(boards)
+        agents.append(
+            Agent(
+                id=agent_id,
+                board_id=board.id,
+                gateway_id=gateway.id,
+                name=f"Agent {index}",
+                is_board_lead=is_lead,
+                openclaw_session_id=board_scoped_session_key(
+                    agent_id=agent_id,
+                    board_id=board.id,
+                    is_board_lead=is_lead,
+                ),
+            ),
+        )
+    user = User(id=uuid4(), clerk_user_id="benchmark", email="bench@example.com", name="Bench")
+    return organization, gateway, boards, agents, user
+
+
+async def _provision_scenario(
+    args: argparse.Namespace,
+    stub: Any,
+) -> tuple[list[float], int, float]:
+    from app.services.openclaw.provisioning import OpenClawGatewayProvisioner
+
+    _organization, gateway, boards, agents, user = _bench_models(stub.url, args.agents)
+    boards_by_id = {board.id: board for board in boards}
+    provisioner = OpenClawGatewayProvisioner()
+
+    def _operation(agent: Any) -> Callable[[], Awaitable[object]]:
+        return lambda: provisioner.apply_agent_lifecycle(
+            agent=agent,
+            gateway=gateway,
+            board=boards_by_id[agent.board_id],
+            auth_token="benchmark-token",
+            user=user,
+            action="provision",
+            wake=False,
+        )
+
+    return await _timed_operations(
+        [_operation(agent) for agent in agents],
+        concurrency=args.concurrency,
+    )
+
+
+async def _sync_scenario(args: argparse.Namespace, stub: Any) -> tuple[list[float], int, float]:
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlmodel import SQLModel
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from app.services.openclaw.internal.agent_key import agent_key
+    from app.services.openclaw.provisioning_db import (
+        GatewayTemplateSyncOptions,
+        OpenClawProvisioningService,
+    )
+
+    organization, gateway, boards, agents, user = _bench_models(stub.url, args.agents)
+    for agent in agents:
+        stub.files.setdefault(agent_key(agent), {})["TOOLS.md"] = "AUTH_TOKEN=benchmark-token\n"
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.connect() as conn, conn.begin():
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add_all([organization, user, gateway, *boards, *agents])
+        await session.commit()
+
+    failures = 0
+    latencies: list[float] = []
+    started = time.perf_counter()
+    try:
+        for _ in range(max(args.sync_runs, 1)):
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                run_started = time.perf_counter()
+                result = await OpenClawProvisioningService(session).sync_gateway_templates(
+                    gateway,
+                    GatewayTemplateSyncOptions(
+                        user=user,
+                        include_main=False,
+                        concurrency=args.sync_concurrency,
+                    ),
+                )
+                latencies.append(time.perf_counter() - run_started)
+                failures += len(result.errors)
+                sys.stdout.write(
+                    f"sync run {len(latencies)}: {latencies[-1]:.2f}s "
+                    f"files_written={result.files_written} "
+                    f"files_skipped={result.files_skipped} "
+                    f"files_deleted={result.files_deleted}\n",
+                )
+    finally:
+        await engine.dispose()
+    return latencies, failures, time.perf_counter() - started
+
+
+async def _run_scenario(
+    name: str,
+    args: argparse.Namespace,
+    stub: Any,
+) -> _ScenarioResult:
+    from app.services.openclaw.gateway_cache import set_gateway_rpc_cache
+    from app.services.openclaw.gateway_circuit import set_gateway_circuits
+    from app.services.openclaw.gateway_metrics import get_gateway_rpc_metrics
+    from app.services.openclaw.gateway_rpc import close_gateway_connection_pool
+
+    await close_gateway_connection_pool()
+    set_gateway_rpc_cache(None)
+    set_gateway_circuits(None)
+    get_gateway_rpc_metrics().reset()
+    stub.stats.peak_open_connections = stub.stats.open_connections
+    connections_before = stub.stats.connections
+
+    runner = {"rpc": _rpc_scenario, "provision": _provision_scenario, "sync": _sync_scenario}
+    latencies, failures, seconds = await runner[name](args, stub)
+    await close_gateway_connection_pool()
+    return _ScenarioResult(
+        name=name,
+        operations=len(latencies),
+        failures=failures,
+        seconds=seconds,
+        latencies=latencies,
+        connections=stub.stats.connections - connections_before,
+        peak_connections=stub.stats.peak_open_connections,
+    )
+
+
+def _write_result(result: _ScenarioResult) -> None:
+    from app.services.openclaw.gateway_metrics import get_gateway_rpc_metrics
+
+    p50, p95, p99 = (_percentile(result.latencies, q) * 1000 for q in (0.5, 0.95, 0.99))
+    sys.stdout.write(
+        f"{result.name:>9} {result.operations:>6} {result.failures:>6} {result.seconds:>8.2f} "
+        f"{result.operations / result.seconds:>8.1f} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f} "
+        f"{result.connections:>6} {result.peak_connections:>5}\n",
+    )
+    for series in get_gateway_rpc_metrics().snapshot():
+        key = series.key
+        quantiles = [series.quantile(q) for q in (0.5, 0.95, 0.99)]
+        formatted = " ".join(
+            f"{'-' if value is None else f'{value * 1000:.1f}':>9}" for value in quantiles
+        )
+        sys.stdout.write(
+            f"{'':>9}   {key.phase}:{key.method} [{key.outcome}] n={series.count} "
+            f"p50/p95/p99 ms {formatted}\n",
+        )
+
+
+async def _no_soul_refs(**_kwargs: object) -> list[object]:
+    return []
+
+
+async def _run() -> int:
+    from app.core.config import settings
+    from app.services import souls_directory
+    from scripts.stub_gateway import StubGatewayOptions, serve_stub_gateway
+
+    args = _parse_args()
+    # Injected failures and "already exists" upserts would otherwise flood the report.
+    for name in ("websockets", "alembic", "app"):
+        logging.getLogger(name).setLevel(logging.CRITICAL)
+    settings.gateway_rpc_pool_enabled = args.pool
+    settings.gateway_rpc_cache_enabled = args.cache
+    settings.gateway_circuit_enabled = args.circuit
+    souls_directory.list_souls_directory_refs = _no_soul_refs  # type: ignore[assignment]
+    options = StubGatewayOptions(
+        latency_s=args.latency_ms / 1000,
+        jitter_s=args.jitter_ms / 1000,
+        handshake_s=args.handshake_ms / 1000,
+        failure_rate=args.failure_rate,
+        disconnect_rate=args.disconnect_rate,
+        seed=args.seed,
+    )
+    sys.stdout.write(
+        f"pool={args.pool} cache={args.cache} circuit={args.circuit} concurrency={args.concurrency} "
+        f"latency_ms={args.latency_ms} failure_rate={args.failure_rate} "
+        f"disconnect_rate={args.disconnect_rate}\n",
+    )
+    sys.stdout.write(
+        f"{'scenario':>9} {'ops':>6} {'failed':>6} {'seconds':>8} {'ops/s':>8} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'conns':>6} {'peak':>5}\n",
+    )
+    async with serve_stub_gateway(options) as stub:
+        for name in args.scenarios:
+            _write_result(await _run_scenario(name, args, stub))
+    return 0
+
+
+def main() -> None:
+    """Run the benchmark and exit with its return code."""
+    raise SystemExit(asyncio.run(_run()))
+
+
+if __name__ == "__main__":
+    main()
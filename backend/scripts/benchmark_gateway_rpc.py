@@ -0,0 +1,130 @@
+"""Benchmark `openclaw_call` with and without the gateway connection pool.
+
+Starts the local stub gateway (`scripts/stub_gateway.py`) and times a batch of calls issued sequentially
+and concurrently, once with a fresh websocket per call and once through the
+pooled, multiplexed connections.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+if TYPE_CHECKING:
+    from scripts.stub_gateway import StubGateway
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare one-shot and pooled gateway RPC calls against a local stub.",
+    )
+    parser.add_argument(
+        "--calls",
+        type=int,
+        default=500,
+        help="Calls per scenario (default: 500)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=50,
+        help="Concurrent callers for the concurrent scenario (default: 50)",
+    )
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=1.0,
+        help="Stub gateway per-request latency in ms (default: 1)",
+    )
+    parser.add_argument(
+        "--handshake-ms",
+        type=float,
+        default=5.0,
+        help="Stub gateway connect-handshake latency in ms (default: 5)",
+    )
+    parser.add_argument(
+        "--device-pairing",
+        action="store_true",
+        help="Sign device connect payloads (uses the local OpenClaw device identity)",
+    )
+    return parser.parse_args()
+
+
+async def _scenario(
+    *,
+    pooled: bool,
+    calls: int,
+    concurrency: int,
+    config: Any,
+    stub: StubGateway,
+) -> tuple[float, int]:
+    from app.core.config import settings
+    from app.services.openclaw.gateway_rpc import close_gateway_connection_pool, openclaw_call
+
+    settings.gateway_rpc_pool_enabled = pooled
+    await close_gateway_connection_pool()
+    connections_before = stub.stats.connections
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _one(index: int) -> None:
+        async with semaphore:
+            await openclaw_call("health", {"n": index}, config=config)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_one(index) for index in range(calls)))
+    elapsed = time.perf_counter() - started
+    await close_gateway_connection_pool()
+    return elapsed, stub.stats.connections - connections_before
+
+
+async def _run() -> int:
+    from app.services.openclaw.gateway_rpc import GatewayConfig
+    from scripts.stub_gateway import StubGatewayOptions, serve_stub_gateway
+
+    args = _parse_args()
+    logging.getLogger("websockets").setLevel(logging.WARNING)
+    options = StubGatewayOptions(
+        latency_s=args.latency_ms / 1000,
+        handshake_s=args.handshake_ms / 1000,
+    )
+    async with serve_stub_gateway(options) as stub:
+        config = GatewayConfig(
+            url=stub.url,
+            disable_device_pairing=not args.device_pairing,
+        )
+        sys.stdout.write(
+            f"{'mode':>8} {'concurrency':>12} {'calls':>6} {'seconds':>8} "
+            f"{'calls/s':>9} {'connections':>12}\n",
+        )
+        for concurrency in (1, max(args.concurrency, 1)):
+            for pooled in (False, True):
+                elapsed, connections = await _scenario(
+                    pooled=pooled,
+                    calls=args.calls,
+                    concurrency=concurrency,
+                    config=config,
+                    stub=stub,
+                )
+                mode = "pooled" if pooled else "one-shot"
+                sys.stdout.write(
+                    f"{mode:>8} {concurrency:>12} {args.calls:>6} {elapsed:>8.2f} "
+                    f"{args.calls / elapsed:>9.0f} {connections:>12}\n",
+                )
+    return 0
+
+
+def main() -> None:
+    """Run the benchmark and exit with its return code."""
+    raise SystemExit(asyncio.run(_run()))
+
+
+if __name__ == "__main__":
+    main()
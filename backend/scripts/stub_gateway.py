@@ -0,0 +1,348 @@
+"""Local stub OpenClaw gateway for benchmarks and manual testing.
+
+Implements the websocket protocol used by `gateway_rpc`: a `connect.challenge`
+event, the `connect` handshake, and in-memory versions of `health`, `status`,
+`chat.*`, `sessions.*`, `agents.*`, `agents.files.*` and `config.*`. Every
+request can be delayed (fixed latency plus jitter) and failed at a configurable
+rate, either with an RPC error or by dropping the connection, so client-side
+pooling, retries and circuit breaking can be measured without a real gateway.
+
+Run standalone with `python scripts/stub_gateway.py --port 18789`, or start it
+in-process with `serve_stub_gateway()`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import sys
+from collections import Counter
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import uuid4
+
+from websockets.asyncio.server import ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+
+STUB_GATEWAY_VERSION = "2026.3.1"
+
+
+class StubGatewayError(Exception):
+    """RPC error returned to the client as an `ok: false` response."""
+
+
+@dataclass
+class StubGatewayOptions:
+    """Latency and failure injection knobs (all durations in seconds)."""
+
+    latency_s: float = 0.0
+    jitter_s: float = 0.0
+    handshake_s: float = 0.0
+    failure_rate: float = 0.0
+    disconnect_rate: float = 0.0
+    # Reject `config.patch` calls whose `baseHash` is stale, like the real gateway.
+    enforce_base_hash: bool = False
+    seed: int | None = None
+
+
+@dataclass
+class StubGatewayStats:
+    """Connection and request counters collected by the stub."""
+
+    connections: int = 0
+    open_connections: int = 0
+    peak_open_connections: int = 0
+    requests: Counter[str] = field(default_factory=Counter)
+    injected_failures: int = 0
+    injected_disconnects: int = 0
+
+
+def _merge_patch(target: dict[str, Any], patch: dict[str, Any]) -> dict[str, Any]:
+    merged = dict(target)
+    for key, value in patch.items():
+        if value is None:
+            merged.pop(key, None)
+        elif isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge_patch(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class StubGateway:
+    """In-memory gateway state plus the websocket connection handler."""
+
+    def __init__(self, options: StubGatewayOptions | None = None) -> None:
+        self.options = options or StubGatewayOptions()
+        self.stats = StubGatewayStats()
+        self.url = ""
+        self.agents: dict[str, dict[str, Any]] = {}
+        self.files: dict[str, dict[str, str]] = {}
+        self.sessions: dict[str, dict[str, Any]] = {}
+        self.config: dict[str, Any] = {"agents": {"list": []}}
+        self._random = random.Random(self.options.seed)
+        self._methods: dict[str, Callable[[dict[str, Any]], object]] = {
+            "health": lambda _params: {"ok": True},
+            "status": self._status,
+            "chat.send": self._chat_send,
+            "chat.history": lambda _params: {"messages": []},
+            "chat.abort": lambda _params: {"ok": True},
+            "sessions.list": lambda _params: {"sessions": list(self.sessions.values())},
+            "sessions.patch": self._sessions_patch,
+            "sessions.reset": self._sessions_touch,
+            "sessions.compact": self._sessions_touch,
+            "sessions.delete": self._sessions_delete,
+            "agents.list": lambda _params: {"agents": list(self.agents.values())},
+            "agents.create": self._agents_create,
+            "agents.update": self._agents_update,
+            "agents.delete": self._agents_delete,
+            "agents.files.list": self._files_list,
+            "agents.files.get": self._files_get,
+            "agents.files.set": self._files_set,
+            "agents.files.delete": self._files_delete,
+            "config.get": lambda _params: {"config": self.config, "hash": self._config_hash()},
+            "config.patch": self._config_patch,
+        }
+
+    # Connection handling -------------------------------------------------
+
+    async def handler(self, ws: ServerConnection) -> None:
+        self.stats.connections += 1
+        self.stats.open_connections += 1
+        self.stats.peak_open_connections = max(
+            self.stats.peak_open_connections,
+            self.stats.open_connections,
+        )
+        try:
+            with suppress(ConnectionClosed):
+                await ws.send(
+                    json.dumps(
+                        {"type": "event", "event": "connect.challenge", "payload": {"nonce": "n"}},
+                    ),
+                )
+                connect = json.loads(await ws.recv())
+                if self.options.handshake_s:
+                    await asyncio.sleep(self.options.handshake_s)
+                hello = {"type": "hello-ok", "server": {"version": STUB_GATEWAY_VERSION}}
+                await ws.send(
+                    json.dumps({"type": "res", "id": connect["id"], "ok": True, "payload": hello}),
+                )
+                pending: set[asyncio.Task[None]] = set()
+                async for raw in ws:
+                    task = asyncio.create_task(self._respond(ws, json.loads(raw)))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+        finally:
+            self.stats.open_connections -= 1
+
+    async def _respond(self, ws: ServerConnection, request: dict[str, Any]) -> None:
+        method = str(request.get("method") or "")
+        self.stats.requests[method] += 1
+        delay = self.options.latency_s + self._random.uniform(0, self.options.jitter_s)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.options.disconnect_rate and self._random.random() < self.options.disconnect_rate:
+            self.stats.injected_disconnects += 1
+            await ws.close(code=1011, reason="injected disconnect")
+            return
+        try:
+            if self.options.failure_rate and self._random.random() < self.options.failure_rate:
+                self.stats.injected_failures += 1
+                msg = f"injected failure: {method}"
+                raise StubGatewayError(msg)
+            payload = self._dispatch(method, request.get("params") or {})
+        except StubGatewayError as exc:
+            frame: dict[str, Any] = {
+                "type": "res",
+                "id": request.get("id"),
+                "ok": False,
+                "error": {"message": str(exc)},
+            }
+        else:
+            frame = {"type": "res", "id": request.get("id"), "ok": True, "payload": payload}
+        with suppress(ConnectionClosed):
+            await ws.send(json.dumps(frame))
+
+    def _dispatch(self, method: str, params: dict[str, Any]) -> object:
+        handler = self._methods.get(method)
+        if handler is None:
+            msg = f"unknown method: {method}"
+            raise StubGatewayError(msg)
+        return handler(params)
+
+    # Methods --------------------------------------------------------------
+
+    def _status(self, _params: dict[str, Any]) -> object:
+        return {
+            "version": STUB_GATEWAY_VERSION,
+            "agents": len(self.agents),
+            "sessions": len(self.sessions),
+        }
+
+    def _chat_send(self, params: dict[str, Any]) -> object:
+        key = str(params.get("sessionKey") or "")
+        self.sessions.setdefault(key, {"key": key})
+        return {"runId": uuid4().hex, "status": "started"}
+
+    def _sessions_patch(self, params: dict[str, Any]) -> object:
+        key = str(params.get("key") or "")
+        entry = self.sessions.setdefault(key, {"key": key})
+        entry.update({name: value for name, value in params.items() if name != "key"})
+        return {"ok": True, "key": key}
+
+    def _sessions_touch(self, params: dict[str, Any]) -> object:
+        return {"ok": True, "key": params.get("key")}
+
+    def _sessions_delete(self, params: dict[str, Any]) -> object:
+        self.sessions.pop(str(params.get("key") or ""), None)
+        return {"ok": True}
+
+    def _agents_create(self, params: dict[str, Any]) -> object:
+        agent_id = str(params.get("name") or "")
+        if agent_id in self.agents:
+            msg = f"agent already exists: {agent_id}"
+            raise StubGatewayError(msg)
+        self.agents[agent_id] = {"id": agent_id, "workspace": params.get("workspace")}
+        self.files.setdefault(agent_id, {})
+        return {"agentId": agent_id}
+
+    def _require_agent(self, params: dict[str, Any]) -> str:
+        agent_id = str(params.get("agentId") or "")
+        if agent_id not in self.agents and agent_id not in self.files:
+            msg = f"agent not found: {agent_id}"
+            raise StubGatewayError(msg)
+        return agent_id
+
+    def _agents_update(self, params: dict[str, Any]) -> object:
+        agent_id = self._require_agent(params)
+        entry = self.agents.setdefault(agent_id, {"id": agent_id})
+        entry.update({name: value for name, value in params.items() if name != "agentId"})
+        return {"ok": True}
+
+    def _agents_delete(self, params: dict[str, Any]) -> object:
+        agent_id = self._require_agent(params)
+        self.agents.pop(agent_id, None)
+        if params.get("deleteFiles", True):
+            self.files.pop(agent_id, None)
+        return {"ok": True}
+
+    def _files_list(self, params: dict[str, Any]) -> object:
+        agent_id = self._require_agent(params)
+        return {
+            "files": [
+                {"name": name, "size": len(content.encode("utf-8")), "missing": False}
+                for name, content in sorted(self.files.get(agent_id, {}).items())
+            ],
+        }
+
+    def _files_get(self, params: dict[str, Any]) -> object:
+        agent_id = self._require_agent(params)
+        name = str(params.get("name") or "")
+        content = self.files.get(agent_id, {}).get(name)
+        if content is None:
+            msg = f"file not found: {name}"
+            raise StubGatewayError(msg)
+        return {"file": {"name": name, "content": content}}
+
+    def _files_set(self, params: dict[str, Any]) -> object:
+        agent_id = self._require_agent(params)
+        self.files.setdefault(agent_id, {})[str(params.get("name") or "")] = str(
+            params.get("content") or "",
+        )
+        return {"ok": True}
+
+    def _files_delete(self, params: dict[str, Any]) -> object:
+        agent_id = self._require_agent(params)
+        self.files.get(agent_id, {}).pop(str(params.get("name") or ""), None)
+        return {"ok": True}
+
+    def _config_hash(self) -> str:
+        return hashlib.sha256(json.dumps(self.config, sort_keys=True).encode()).hexdigest()
+
+    def _config_patch(self, params: dict[str, Any]) -> object:
+        base_hash = params.get("baseHash")
+        if self.options.enforce_base_hash and base_hash and base_hash != self._config_hash():
+            msg = "config changed since last load; re-run config.get"
+            raise StubGatewayError(msg)
+        patch = json.loads(str(params.get("raw") or "{}"))
+        if not isinstance(patch, dict):
+            msg = "config.patch raw must be a JSON object"
+            raise StubGatewayError(msg)
+        self.config = _merge_patch(self.config, patch)
+        return {"ok": True, "hash": self._config_hash()}
+
+
+@asynccontextmanager
+async def serve_stub_gateway(
+    options: StubGatewayOptions | None = None,
+    *,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> AsyncIterator[StubGateway]:
+    """Run a stub gateway for the duration of the block; `stub.url` is set on entry."""
+    stub = StubGateway(options)
+    async with serve(stub.handler, host, port) as server:
+        bound_port = next(iter(server.sockets)).getsockname()[1]
+        stub.url = f"ws://{host}:{bound_port}"
+        yield stub
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run a local stub OpenClaw gateway.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18789)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Per-request latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Extra random latency")
+    parser.add_argument("--handshake-ms", type=float, default=0.0, help="Connect latency")
+    parser.add_argument(
+        "--failure-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of requests answered with an RPC error",
+    )
+    parser.add_argument(
+        "--disconnect-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of requests that close the connection instead of answering",
+    )
+    parser.add_argument("--enforce-base-hash", action="store_true")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args()
+
+
+async def _run() -> int:
+    args = _parse_args()
+    logging.getLogger("websockets").setLevel(logging.WARNING)
+    options = StubGatewayOptions(
+        latency_s=args.latency_ms / 1000,
+        jitter_s=args.jitter_ms / 1000,
+        handshake_s=args.handshake_ms / 1000,
+        failure_rate=args.failure_rate,
+        disconnect_rate=args.disconnect_rate,
+        enforce_base_hash=args.enforce_base_hash,
+        seed=args.seed,
+    )
+    async with serve_stub_gateway(options, host=args.host, port=args.port) as stub:
+        sys.stdout.write(f"stub gateway listening on {stub.url}\n")
+        sys.stdout.flush()
+        await asyncio.Future()
+    return 0
+
+
+def main() -> None:
+    """Serve until interrupted."""
+    try:
+        raise SystemExit(asyncio.run(_run()))
+    except KeyboardInterrupt:
+        raise SystemExit(0) from None
+
+
+if __name__ == "__main__":
+    main()
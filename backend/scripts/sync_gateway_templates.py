@@ -62,6 +62,12 @@ def _parse_args() -> argparse.Namespace:
         action="store_true",
         help="Overwrite editable files (e.g. USER.md, MEMORY.md) during update sync",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Agents synced at once (default: GATEWAY_TEMPLATE_SYNC_CONCURRENCY)",
+    )
     return parser.parse_args()
 
 
@@ -100,6 +106,7 @@ async def _run() -> int:
                 force_bootstrap=bool(args.force_bootstrap),
                 overwrite=bool(args.overwrite),
                 board_id=board_id,
+                concurrency=args.concurrency,
             ),
         )
 
@@ -112,6 +119,11 @@ async def _run() -> int:
         f"agents_skipped={result.agents_skipped} "
         f"main_updated={result.main_updated}\n",
     )
+    sys.stdout.write(
+        f"files_written={result.files_written} "
+        f"files_skipped={result.files_skipped} "
+        f"files_deleted={result.files_deleted}\n",
+    )
     if result.errors:
         sys.stdout.write("errors:\n")
         for err in result.errors:
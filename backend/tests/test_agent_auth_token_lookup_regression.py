@@ -1,56 +1,138 @@
 # ruff: noqa: INP001
-"""Regression test sketch for agent-token lookup complexity.
+"""Regression tests for agent-token lookup complexity.
 
-Context:
-- Current implementation performs PBKDF2 verification in a loop over *all* agents
-  that have a token hash (`agent_auth._find_agent_for_token`).
-- This is O(N_agents) *and* each verify is expensive (PBKDF2 200k iterations).
-
-This test is marked xfail to document the desired behavior after a hardening
-refactor: O(1) lookup + single hash verify.
-
-Once token lookup is refactored, flip this to a normal passing test.
+Agent tokens are resolved through an indexed lookup key, so authenticating a
+request verifies at most one PBKDF2 hash regardless of how many agents exist.
+Agents minted before lookup keys existed fall back to a one-time legacy scan
+that backfills the key on success.
 """
 
 from __future__ import annotations
 
-from types import SimpleNamespace
+import hashlib
+from uuid import uuid4
 
 import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core import agent_auth
+from app.core.agent_tokens import (
+    _b64encode,
+    agent_token_lookup_key,
+    hash_agent_token,
+)
+from app.models.agents import Agent
+
+
+async def _make_engine() -> AsyncEngine:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.connect() as conn, conn.begin():
+        await conn.run_sync(SQLModel.metadata.create_all)
+    return engine
+
+
+def _pbkdf2_hash(token: str, *, iterations: int) -> str:
+    salt = b"0123456789abcdef"
+    digest = hashlib.pbkdf2_hmac("sha256", token.encode("utf-8"), salt, iterations)
+    return f"pbkdf2_sha256${iterations}${_b64encode(salt)}${_b64encode(digest)}"
+
+
+def _count_verifies(monkeypatch: pytest.MonkeyPatch) -> dict[str, int]:
+    calls = {"n": 0}
+    real_verify = agent_auth.verify_agent_token_async
+
+    async def _counting_verify(token: str, stored_hash: str) -> bool:
+        calls["n"] += 1
+        return await real_verify(token, stored_hash)
+
+    monkeypatch.setattr(agent_auth, "verify_agent_token_async", _counting_verify)
+    return calls
 
 
 @pytest.mark.asyncio
-@pytest.mark.xfail(
-    reason="Known DoS risk: agent token verification is currently O(N_agents)."
-    " Refactor token scheme/lookup to O(1) and make this pass.",
-    strict=False,
-)
 async def test_agent_token_lookup_should_not_verify_more_than_once(
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
-    # Fake a session that returns many agents with token hashes.
-    class _FakeSession:
-        async def exec(self, _stmt: object) -> list[object]:
-            agents = []
+    engine = await _make_engine()
+    shared_hash = hash_agent_token("unused")
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
             for i in range(50):
-                agents.append(
-                    SimpleNamespace(agent_token_hash=f"pbkdf2_sha256$1$salt{i}$digest{i}")
+                session.add(
+                    Agent(
+                        name=f"agent-{i}",
+                        gateway_id=uuid4(),
+                        agent_token_hash=shared_hash,
+                        agent_token_lookup=agent_token_lookup_key(f"token-{i}"),
+                    ),
                 )
-            return agents
+            target = Agent(
+                name="target",
+                gateway_id=uuid4(),
+                agent_token_hash=hash_agent_token("valid-token"),
+                agent_token_lookup=agent_token_lookup_key("valid-token"),
+            )
+            session.add(target)
+            await session.commit()
 
-    calls = {"n": 0}
+            calls = _count_verifies(monkeypatch)
 
-    def _fake_verify(_token: str, _stored_hash: str) -> bool:
-        calls["n"] += 1
-        # Always invalid
-        return False
+            assert await agent_auth._find_agent_for_token(session, "invalid") is None
+            assert calls["n"] == 0
+
+            found = await agent_auth._find_agent_for_token(session, "valid-token")
+            assert found is not None
+            assert found.id == target.id
+            assert calls["n"] == 1
+    finally:
+        await engine.dispose()
 
-    monkeypatch.setattr(agent_auth, "verify_agent_token", _fake_verify)
 
-    out = await agent_auth._find_agent_for_token(_FakeSession(), "invalid")  # type: ignore[arg-type]
-    assert out is None
+@pytest.mark.asyncio
+async def test_legacy_agent_token_is_backfilled_on_first_authentication(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    engine = await _make_engine()
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            legacy = Agent(
+                name="legacy",
+                gateway_id=uuid4(),
+                agent_token_hash=hash_agent_token("legacy-token"),
+            )
+            session.add(legacy)
+            await session.commit()
+
+            found = await agent_auth._find_agent_for_token(session, "legacy-token")
+            assert found is not None
+            assert found.agent_token_lookup == agent_token_lookup_key("legacy-token")
+
+            calls = _count_verifies(monkeypatch)
+            again = await agent_auth._find_agent_for_token(session, "legacy-token")
+            assert again is not None
+            assert again.id == legacy.id
+            assert calls["n"] == 1
+
+            assert await agent_auth._find_agent_for_token(session, "other-token") is None
+            assert calls["n"] == 1
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_legacy_agent_token_with_outdated_iterations_is_rehashed() -> None:
+    engine = await _make_engine()
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            stale_hash = _pbkdf2_hash("legacy-token", iterations=1_000)
+            session.add(Agent(name="legacy", gateway_id=uuid4(), agent_token_hash=stale_hash))
+            await session.commit()
 
-    # Desired behavior after refactor: avoid linear scan.
-    assert calls["n"] <= 1
+            found = await agent_auth._find_agent_for_token(session, "legacy-token")
+            assert found is not None
+            assert found.agent_token_hash is not None
+            assert found.agent_token_hash.split("$")[1] == "200000"
+    finally:
+        await engine.dispose()
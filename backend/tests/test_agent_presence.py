@@ -0,0 +1,198 @@
+# ruff: noqa: INP001
+"""Write-behind agent presence aggregation tests."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core import agent_auth
+from app.core.config import settings
+from app.core.time import utcnow
+from app.models.agents import Agent
+from app.services.agent_presence import (
+    AgentPresenceAggregator,
+    InMemoryPresenceStore,
+    PresenceTouch,
+    RedisPresenceStore,
+    get_presence_aggregator,
+    set_presence_aggregator,
+)
+
+
+async def _make_engine() -> AsyncEngine:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.connect() as conn, conn.begin():
+        await conn.run_sync(SQLModel.metadata.create_all)
+    return engine
+
+
+@pytest.fixture
+def aggregator() -> Iterator[AgentPresenceAggregator]:
+    instance = AgentPresenceAggregator(InMemoryPresenceStore())
+    set_presence_aggregator(instance)
+    yield instance
+    set_presence_aggregator(None)
+
+
+@pytest.mark.asyncio
+async def test_flush_coalesces_touches_into_one_bulk_update(
+    aggregator: AgentPresenceAggregator,
+) -> None:
+    engine = await _make_engine()
+    now = utcnow()
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            polling = Agent(name="polling", gateway_id=uuid4(), status="offline")
+            updating = Agent(name="updating", gateway_id=uuid4(), status="updating")
+            fresh = Agent(
+                name="fresh",
+                gateway_id=uuid4(),
+                status="online",
+                last_seen_at=now + timedelta(minutes=1),
+            )
+            session.add_all([polling, updating, fresh])
+            await session.commit()
+
+            for offset in range(3):
+                await aggregator.record(polling.id, seen_at=now + timedelta(seconds=offset))
+            await aggregator.record(updating.id, seen_at=now)
+            await aggregator.record(fresh.id, seen_at=now)
+
+            statements: list[str] = []
+            real_exec = session.exec
+
+            async def _tracking_exec(statement, *args, **kwargs):  # type: ignore[no-untyped-def]
+                statements.append(type(statement).__name__)
+                return await real_exec(statement, *args, **kwargs)
+
+            session.exec = _tracking_exec  # type: ignore[method-assign]
+            assert await aggregator.flush(session) == 3
+            assert statements == ["Update"]
+            session.exec = real_exec  # type: ignore[method-assign]
+
+            for agent in (polling, updating, fresh):
+                await session.refresh(agent)
+            assert polling.status == "online"
+            assert polling.last_seen_at == now + timedelta(seconds=2)
+            assert updating.status == "updating"
+            assert updating.last_seen_at == now
+            # A newer heartbeat already committed is never moved backwards.
+            assert fresh.last_seen_at == now + timedelta(minutes=1)
+
+            assert await aggregator.flush(session) == 0
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_touch_records_once_per_interval_and_overlays_without_dirtying(
+    aggregator: AgentPresenceAggregator,
+) -> None:
+    engine = await _make_engine()
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            agent = Agent(name="poller", gateway_id=uuid4(), status="offline")
+            session.add(agent)
+            await session.commit()
+
+            await agent_auth._touch_agent_presence(agent)
+            first = aggregator.pending(agent.id)
+            await agent_auth._touch_agent_presence(agent)
+
+            assert first is not None
+            assert aggregator.pending(agent.id) == first
+            assert agent.status == "online"
+            assert agent.last_seen_at == first.seen_at
+            assert not session.dirty
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_touches_for_the_next_attempt(
+    aggregator: AgentPresenceAggregator,
+) -> None:
+    class _FailingSession:
+        async def exec(self, _statement: object) -> None:
+            raise RuntimeError("db down")
+
+    agent_id = uuid4()
+    await aggregator.record(agent_id, seen_at=utcnow())
+
+    with pytest.raises(RuntimeError):
+        await aggregator.flush(_FailingSession())  # type: ignore[arg-type]
+
+    assert aggregator.pending(agent_id) is not None
+    assert [touch.agent_id for touch in (await aggregator._store.drain())] == [agent_id]
+
+
+@pytest.mark.asyncio
+async def test_redis_store_drains_shared_hash_atomically() -> None:
+    class _FakePipeline:
+        def __init__(self, client: _FakeRedis) -> None:
+            self.client = client
+            self.ops: list[str] = []
+
+        def hgetall(self, key: str) -> None:
+            self.ops.append(key)
+
+        def delete(self, key: str) -> None:
+            self.ops.append(key)
+
+        async def execute(self) -> list[object]:
+            key = self.ops[0]
+            values = dict(self.client.hashes.get(key, {}))
+            self.client.hashes.pop(key, None)
+            return [values, 1]
+
+    class _FakeRedis:
+        def __init__(self) -> None:
+            self.hashes: dict[str, dict[str, str]] = {}
+
+        async def hset(self, key: str, field: str, value: str) -> None:
+            self.hashes.setdefault(key, {})[field] = value
+
+        def pipeline(self, *, transaction: bool = True) -> _FakePipeline:
+            assert transaction is True
+            return _FakePipeline(self)
+
+    client = _FakeRedis()
+    replica_a = RedisPresenceStore(client)  # type: ignore[arg-type]
+    replica_b = RedisPresenceStore(client)  # type: ignore[arg-type]
+    agent_id = uuid4()
+    seen_at = utcnow()
+
+    await replica_a.record(PresenceTouch(agent_id=agent_id, seen_at=seen_at))
+    await replica_b.record(PresenceTouch(agent_id=agent_id, seen_at=seen_at))
+    stored = json.loads(next(iter(client.hashes["mc:agent-presence:pending"].values())))
+    assert stored["mark_online"] is True
+
+    assert await replica_b.drain() == [PresenceTouch(agent_id=agent_id, seen_at=seen_at)]
+    assert await replica_a.drain() == []
+
+
+@pytest.mark.asyncio
+async def test_unreachable_redis_store_does_not_fail_touches(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "agent_presence_backend", "redis")
+    monkeypatch.setattr(settings, "agent_presence_redis_url", "redis://127.0.0.1:1/0")
+    set_presence_aggregator(None)
+    try:
+        aggregator = get_presence_aggregator()
+        agent_id = uuid4()
+
+        await aggregator.record(agent_id, seen_at=utcnow())
+
+        assert aggregator.pending(agent_id) is not None
+        assert await aggregator._store.drain() == []
+    finally:
+        set_presence_aggregator(None)
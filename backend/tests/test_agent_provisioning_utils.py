@@ -10,7 +10,8 @@ import pytest
 
 import app.services.openclaw.internal.agent_key as agent_key_mod
 import app.services.openclaw.provisioning as agent_provisioning
-from app.services.openclaw.provisioning_db import AgentLifecycleService
+from app.services.openclaw.gateway_rpc import GatewayCall, GatewayCallResult
+from app.services.openclaw.provisioning_db import AgentLifecycleService, _parse_tools_md
 from app.services.openclaw.shared import GatewayAgentIdentity
 from app.services.souls_directory import SoulRef
 
@@ -38,6 +39,7 @@ class _AgentStub:
     identity_profile: dict | None = None
     identity_template: str | None = None
     soul_template: str | None = None
+    template_manifest: dict | None = None
 
 
 def test_agent_key_uses_session_key_when_present():
@@ -196,6 +198,8 @@ async def test_provision_overwrites_user_md_on_first_provision(monkeypatch):
     """Gateway may pre-create USER.md; we still want MC's template on first provision."""
 
     class _ControlPlaneStub:
+        set_agent_files = agent_provisioning.GatewayControlPlane.set_agent_files
+
         def __init__(self):
             self.writes: list[tuple[str, str]] = []
 
@@ -266,6 +270,8 @@ async def test_set_agent_files_update_preserves_user_md_even_when_size_zero():
     """Update should preserve editable files unless overwrite is explicitly requested."""
 
     class _ControlPlaneStub:
+        set_agent_files = agent_provisioning.GatewayControlPlane.set_agent_files
+
         def __init__(self):
             self.writes: list[tuple[str, str]] = []
 
@@ -332,6 +338,8 @@ async def test_set_agent_files_update_preserves_user_md_even_when_size_zero():
 @pytest.mark.asyncio
 async def test_set_agent_files_update_preserves_nonmissing_user_md():
     class _ControlPlaneStub:
+        set_agent_files = agent_provisioning.GatewayControlPlane.set_agent_files
+
         def __init__(self):
             self.writes: list[tuple[str, str]] = []
 
@@ -398,6 +406,8 @@ async def test_set_agent_files_update_preserves_nonmissing_user_md():
 @pytest.mark.asyncio
 async def test_set_agent_files_update_overwrite_writes_preserved_user_md():
     class _ControlPlaneStub:
+        set_agent_files = agent_provisioning.GatewayControlPlane.set_agent_files
+
         def __init__(self):
             self.writes: list[tuple[str, str]] = []
 
@@ -462,6 +472,77 @@ async def test_set_agent_files_update_overwrite_writes_preserved_user_md():
     assert ("USER.md", "filled") in cp.writes
 
 
+@pytest.mark.asyncio
+async def test_set_agent_files_skips_files_matching_manifest():
+    class _ControlPlaneStub:
+        def __init__(self):
+            self.files: dict[str, str] = {}
+            self.writes: list[str] = []
+            self.deletes: list[str] = []
+
+        async def set_agent_files(self, *, agent_id, files):
+            self.writes.extend(files)
+            self.files.update(files)
+            return {}
+
+        async def delete_agent_file(self, *, agent_id, name):
+            self.deletes.append(name)
+            self.files.pop(name)
+
+        def listing(self):
+            return {
+                name: {"name": name, "size": len(content.encode()), "missing": False}
+                for name, content in self.files.items()
+            }
+
+    class _Manager(agent_provisioning.BaseAgentLifecycleManager):
+        def _agent_id(self, agent):
+            return "lead"
+
+        def _build_context(self, *, agent, auth_token, user, board):
+            return {}
+
+        def _allow_stale_file_deletion(self, agent):
+            return True
+
+        def _stale_file_candidates(self, agent):
+            return {"ROUTING.md"}
+
+    cp = _ControlPlaneStub()
+    mgr = _Manager(SimpleNamespace(), cp)  # type: ignore[arg-type]
+    agent = _AgentStub(name="Lead")
+    rendered = {"TOOLS.md": "token: é", "SOUL.md": "soul", "ROUTING.md": "old"}
+
+    async def _sync(rendered, **kwargs):
+        cp.writes.clear()
+        return await mgr._set_agent_files(
+            agent=agent,
+            agent_id="lead",
+            rendered=rendered,
+            existing_files=cp.listing(),
+            action="update",
+            **kwargs,
+        )
+
+    assert await _sync(rendered) == agent_provisioning.AgentFileSyncStats(written=3)
+    assert set(agent.template_manifest) == {"TOOLS.md", "SOUL.md", "ROUTING.md"}
+
+    rendered.pop("ROUTING.md")
+    assert await _sync(rendered) == agent_provisioning.AgentFileSyncStats(skipped=2, deleted=1)
+    assert (cp.writes, cp.deletes) == ([], ["ROUTING.md"])
+    assert set(agent.template_manifest) == {"TOOLS.md", "SOUL.md"}
+
+    # Content edited inside the workspace no longer matches the recorded size.
+    cp.files["SOUL.md"] = "edited by agent"
+    rendered["TOOLS.md"] = "token: new"
+    assert await _sync(rendered) == agent_provisioning.AgentFileSyncStats(written=2)
+    assert cp.files == {"TOOLS.md": "token: new", "SOUL.md": "soul"}
+
+    assert await _sync(rendered, overwrite=True) == agent_provisioning.AgentFileSyncStats(
+        written=2,
+    )
+
+
 @pytest.mark.asyncio
 async def test_control_plane_upsert_agent_create_then_update(monkeypatch):
     calls: list[tuple[str, dict[str, object] | None]] = []
@@ -481,7 +562,7 @@ async def test_control_plane_upsert_agent_create_then_update(monkeypatch):
 
     monkeypatch.setattr(agent_provisioning, "openclaw_call", _fake_openclaw_call)
     cp = agent_provisioning.OpenClawGatewayControlPlane(
-        agent_provisioning.GatewayClientConfig(url="ws://gateway.example/ws", token=None),
+        agent_provisioning.GatewayConfig(url="ws://gateway.example/ws", token=None),
     )
     await cp.upsert_agent(
         agent_provisioning.GatewayAgentRegistration(
@@ -515,7 +596,7 @@ async def test_control_plane_upsert_agent_handles_already_exists(monkeypatch):
 
     monkeypatch.setattr(agent_provisioning, "openclaw_call", _fake_openclaw_call)
     cp = agent_provisioning.OpenClawGatewayControlPlane(
-        agent_provisioning.GatewayClientConfig(url="ws://gateway.example/ws", token=None),
+        agent_provisioning.GatewayConfig(url="ws://gateway.example/ws", token=None),
     )
     await cp.upsert_agent(
         agent_provisioning.GatewayAgentRegistration(
@@ -530,6 +611,49 @@ async def test_control_plane_upsert_agent_handles_already_exists(monkeypatch):
     assert calls[1][0] == "agents.update"
 
 
+@pytest.mark.asyncio
+async def test_control_plane_set_agent_files_batches_writes(monkeypatch):
+    batches: list[list[GatewayCall]] = []
+
+    async def _fake_openclaw_call_many(calls, *, config):
+        _ = config
+        batches.append(list(calls))
+        return [
+            GatewayCallResult(
+                error=(
+                    agent_provisioning.OpenClawGatewayError("unsupported file")
+                    if call.params["name"] == "BOOT.md"
+                    else None
+                ),
+            )
+            for call in calls
+        ]
+
+    monkeypatch.setattr(agent_provisioning, "openclaw_call_many", _fake_openclaw_call_many)
+    cp = agent_provisioning.OpenClawGatewayControlPlane(
+        agent_provisioning.GatewayConfig(url="ws://gateway.example/ws", token=None),
+    )
+
+    errors = await cp.set_agent_files(
+        agent_id="agent-x",
+        files={"AGENTS.md": "a", "BOOT.md": "b", "TOOLS.md": "t"},
+    )
+
+    assert len(batches) == 1
+    assert [call.params["name"] for call in batches[0]] == ["AGENTS.md", "BOOT.md", "TOOLS.md"]
+    assert set(errors) == {"BOOT.md"}
+
+
+def test_parse_tools_md_reads_rendered_bullet_values() -> None:
+    content = "# TOOLS.md\n\n- `BASE_URL=http://mc`\n- `AUTH_TOKEN=abc=def`\nAGENT_ID=a1\n"
+
+    assert _parse_tools_md(content) == {
+        "BASE_URL": "http://mc",
+        "AUTH_TOKEN": "abc=def",
+        "AGENT_ID": "a1",
+    }
+
+
 def test_is_missing_agent_error_matches_gateway_agent_not_found() -> None:
     assert agent_provisioning._is_missing_agent_error(
         agent_provisioning.OpenClawGatewayError('agent "mc-abc" not found'),
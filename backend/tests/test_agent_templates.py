@@ -0,0 +1,68 @@
+# ruff: noqa: INP001
+"""Shared agent template environment and override cache tests."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+from jinja2 import FileSystemBytecodeCache
+
+from app.services.openclaw.agent_templates import AgentTemplates
+
+
+def _write(path: Path, content: str, *, mtime: int) -> None:
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def test_file_templates_compile_once_and_reload_only_when_enabled(tmp_path: Path) -> None:
+    template = tmp_path / "SOUL.md.j2"
+    _write(template, "v1 {{ name }}", mtime=1_000)
+    static = AgentTemplates(tmp_path)
+    reloading = AgentTemplates(tmp_path, auto_reload=True)
+    assert static.get_template("SOUL.md.j2") is static.get_template("SOUL.md.j2")
+    assert reloading.get_template("SOUL.md.j2").render(name="a") == "v1 a"
+
+    _write(template, "v2 {{ name }}", mtime=2_000)
+
+    assert static.get_template("SOUL.md.j2").render(name="a") == "v1 a"
+    assert reloading.get_template("SOUL.md.j2").render(name="a") == "v2 a"
+
+
+def test_missing_template_raises_file_not_found(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError, match="Missing template file: NOPE.md.j2"):
+        AgentTemplates(tmp_path).get_template("NOPE.md.j2")
+
+
+def test_override_templates_are_cached_by_content_with_lru_eviction(tmp_path: Path) -> None:
+    templates = AgentTemplates(tmp_path, override_cache_size=2)
+
+    first = templates.from_string("Hi {{ name }}")
+    assert templates.from_string("Hi {{ name }}") is first
+    templates.from_string("B")
+    templates.from_string("Hi {{ name }}")
+    templates.from_string("C")
+
+    stats = templates.stats()
+    assert (stats.override_hits, stats.override_misses, stats.override_entries) == (2, 3, 2)
+    assert templates.from_string("Hi {{ name }}") is first
+    assert templates.from_string("B") is not None
+    assert templates.stats().override_misses == 4
+
+
+def test_bytecode_cache_is_shared_across_environments(tmp_path: Path) -> None:
+    root = tmp_path / "templates"
+    root.mkdir()
+    _write(root / "TOOLS.md.j2", "token={{ token }}", mtime=1_000)
+    cache_dir = tmp_path / "bytecode"
+    cache_dir.mkdir()
+
+    AgentTemplates(root, bytecode_cache=FileSystemBytecodeCache(str(cache_dir))).get_template(
+        "TOOLS.md.j2",
+    )
+    assert list(cache_dir.iterdir())
+
+    warm = AgentTemplates(root, bytecode_cache=FileSystemBytecodeCache(str(cache_dir)))
+    assert warm.get_template("TOOLS.md.j2").render(token="t") == "token=t"
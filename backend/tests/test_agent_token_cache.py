@@ -0,0 +1,198 @@
+# ruff: noqa: INP001
+"""Verified agent-token cache behavior and invalidation tests."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core import agent_auth, agent_token_cache
+from app.core.agent_token_cache import (
+    InMemoryAgentTokenCache,
+    RedisAgentTokenCache,
+    get_agent_token_cache,
+    set_agent_token_cache,
+)
+from app.core.agent_tokens import agent_token_lookup_key, hash_agent_token
+from app.core.config import settings
+from app.models.agents import Agent
+from app.services.openclaw.db_agent_state import mint_agent_token
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+        self.sets: dict[str, set[str]] = {}
+
+    async def get(self, key: str) -> str | None:
+        return self.values.get(key)
+
+    async def smembers(self, key: str) -> set[str]:
+        return set(self.sets.get(key, set()))
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.values.pop(key, None)
+            self.sets.pop(key, None)
+
+    def pipeline(self, *, transaction: bool = True) -> _FakePipeline:
+        del transaction
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, client: _FakeRedis) -> None:
+        self.client = client
+
+    def set(self, key: str, value: str, *, px: int) -> None:
+        del px
+        self.client.values[key] = value
+
+    def sadd(self, key: str, member: str) -> None:
+        self.client.sets.setdefault(key, set()).add(member)
+
+    def pexpire(self, key: str, ttl_ms: int) -> None:
+        del key, ttl_ms
+
+    async def execute(self) -> None:
+        return None
+
+
+@pytest.fixture(autouse=True)
+def _reset_cache() -> Iterator[None]:
+    set_agent_token_cache(None)
+    yield
+    set_agent_token_cache(None)
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache_evicts_least_recently_used_entry() -> None:
+    cache = InMemoryAgentTokenCache(max_entries=2, ttl_seconds=60)
+    agent_a, agent_b, agent_c = uuid4(), uuid4(), uuid4()
+
+    await cache.set("a", agent_a)
+    await cache.set("b", agent_b)
+    assert await cache.get("a") == agent_a
+    await cache.set("c", agent_c)
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") == agent_a
+    assert await cache.get("c") == agent_c
+    assert len(cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache_expires_entries(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = {"value": 100.0}
+    monkeypatch.setattr(agent_token_cache.time, "monotonic", lambda: now["value"])
+    cache = InMemoryAgentTokenCache(max_entries=10, ttl_seconds=5)
+    agent_id = uuid4()
+
+    await cache.set("digest", agent_id)
+    now["value"] = 104.0
+    assert await cache.get("digest") == agent_id
+    now["value"] = 106.0
+    assert await cache.get("digest") is None
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache_invalidates_every_digest_for_agent() -> None:
+    cache = InMemoryAgentTokenCache(max_entries=10, ttl_seconds=60)
+    agent_id, other_id = uuid4(), uuid4()
+    await cache.set("old", agent_id)
+    await cache.set("new", agent_id)
+    await cache.set("other", other_id)
+
+    await cache.invalidate_agent(agent_id)
+
+    assert await cache.get("old") is None
+    assert await cache.get("new") is None
+    assert await cache.get("other") == other_id
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_roundtrip_and_invalidation() -> None:
+    client = _FakeRedis()
+    cache = RedisAgentTokenCache(client, ttl_seconds=60)  # type: ignore[arg-type]
+    agent_id = uuid4()
+
+    await cache.set("digest", agent_id)
+    assert await cache.get("digest") == agent_id
+
+    # A second replica sharing Redis observes the invalidation.
+    await RedisAgentTokenCache(
+        client,  # type: ignore[arg-type]
+        ttl_seconds=60,
+    ).invalidate_agent(agent_id)
+    assert await cache.get("digest") is None
+
+
+@pytest.mark.asyncio
+async def test_unreachable_redis_cache_degrades_to_misses(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "agent_token_cache_backend", "redis")
+    monkeypatch.setattr(settings, "agent_token_cache_redis_url", "redis://127.0.0.1:1/0")
+    cache = get_agent_token_cache()
+    assert isinstance(cache, RedisAgentTokenCache)
+
+    await cache.set("digest", uuid4())
+    assert await cache.get("digest") is None
+
+
+@pytest.mark.asyncio
+async def test_mint_agent_token_invalidates_cached_verifications() -> None:
+    cache = InMemoryAgentTokenCache(max_entries=10, ttl_seconds=60)
+    set_agent_token_cache(cache)
+    agent = Agent(name="rotating", gateway_id=uuid4())
+    await cache.set("previous-token-digest", agent.id)
+
+    await mint_agent_token(agent)
+
+    assert await cache.get("previous-token-digest") is None
+
+
+@pytest.mark.asyncio
+async def test_cached_token_skips_pbkdf2_verification(monkeypatch: pytest.MonkeyPatch) -> None:
+    set_agent_token_cache(InMemoryAgentTokenCache(max_entries=10, ttl_seconds=60))
+    calls = {"n": 0}
+    real_verify = agent_auth.verify_agent_token_async
+
+    async def _counting_verify(token: str, stored_hash: str) -> bool:
+        calls["n"] += 1
+        return await real_verify(token, stored_hash)
+
+    monkeypatch.setattr(agent_auth, "verify_agent_token_async", _counting_verify)
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.connect() as conn, conn.begin():
+        await conn.run_sync(SQLModel.metadata.create_all)
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            agent = Agent(
+                name="poller",
+                gateway_id=uuid4(),
+                agent_token_hash=hash_agent_token("poll-token"),
+                agent_token_lookup=agent_token_lookup_key("poll-token"),
+            )
+            session.add(agent)
+            await session.commit()
+
+            for _ in range(3):
+                found = await agent_auth._find_agent_for_token(session, "poll-token")
+                assert found is not None
+                assert found.id == agent.id
+            assert calls["n"] == 1
+
+            # After rotation the old token no longer resolves, even if cached.
+            await mint_agent_token(agent)
+            session.add(agent)
+            await session.commit()
+            assert await agent_auth._find_agent_for_token(session, "poll-token") is None
+    finally:
+        await engine.dispose()
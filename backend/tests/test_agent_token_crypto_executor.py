@@ -0,0 +1,103 @@
+# ruff: noqa: INP001
+"""Agent-token PBKDF2 work must run off the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Iterator
+
+import pytest
+
+from app.core import agent_tokens
+
+_SLOW_KDF_SECONDS = 0.3
+
+
+@pytest.fixture
+def slow_kdf(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    def _slow_verify(token: str, stored_hash: str) -> bool:
+        del stored_hash
+        time.sleep(_SLOW_KDF_SECONDS)
+        return token == "valid"
+
+    agent_tokens.shutdown_agent_token_crypto()
+    monkeypatch.setattr(agent_tokens.settings, "agent_token_crypto_executor", "thread")
+    monkeypatch.setattr(agent_tokens.settings, "agent_token_crypto_max_workers", 4)
+    monkeypatch.setattr(agent_tokens.settings, "agent_token_crypto_max_concurrency", 4)
+    monkeypatch.setattr(agent_tokens, "verify_agent_token", _slow_verify)
+    yield
+    agent_tokens.shutdown_agent_token_crypto()
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("slow_kdf")
+async def test_concurrent_verifications_are_not_serialized() -> None:
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(agent_tokens.verify_agent_token_async("valid", "hash") for _ in range(4)),
+    )
+    elapsed = time.perf_counter() - started
+
+    assert results == [True, True, True, True]
+    # Serialized on the loop this would take 4 * 0.3s.
+    assert elapsed < _SLOW_KDF_SECONDS * 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("slow_kdf")
+async def test_event_loop_stays_responsive_during_verification() -> None:
+    ticks = 0
+
+    async def _ticker() -> None:
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.create_task(_ticker())
+    try:
+        assert await agent_tokens.verify_agent_token_async("invalid", "hash") is False
+    finally:
+        ticker.cancel()
+
+    assert ticks >= 10
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("slow_kdf")
+async def test_concurrency_limit_records_wait_time(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(agent_tokens.settings, "agent_token_crypto_max_concurrency", 1)
+    monkeypatch.setattr(agent_tokens, "_semaphores", type(agent_tokens._semaphores)())
+    before = agent_tokens.agent_token_crypto_stats()
+
+    await asyncio.gather(
+        agent_tokens.verify_agent_token_async("valid", "hash"),
+        agent_tokens.verify_agent_token_async("valid", "hash"),
+    )
+
+    after = agent_tokens.agent_token_crypto_stats()
+    assert after.calls - before.calls == 2
+    assert after.in_flight == 0
+    assert after.wait_seconds_max >= _SLOW_KDF_SECONDS * 0.8
+    assert after.run_seconds_total - before.run_seconds_total >= _SLOW_KDF_SECONDS * 2 * 0.8
+
+    text = agent_tokens.render_agent_token_crypto_metrics()
+    assert "# TYPE mission_control_agent_token_crypto_calls_total counter" in text
+    assert f"mission_control_agent_token_crypto_calls_total {after.calls}\n" in text
+    assert "mission_control_agent_token_crypto_in_flight 0\n" in text
+
+
+@pytest.mark.asyncio
+async def test_process_pool_executor_hashes_and_verifies(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    agent_tokens.shutdown_agent_token_crypto()
+    monkeypatch.setattr(agent_tokens.settings, "agent_token_crypto_executor", "process")
+    monkeypatch.setattr(agent_tokens.settings, "agent_token_crypto_max_workers", 1)
+    try:
+        stored = await agent_tokens.hash_agent_token_async("process-token")
+        assert await agent_tokens.verify_agent_token_async("process-token", stored) is True
+        assert await agent_tokens.verify_agent_token_async("other-token", stored) is False
+    finally:
+        agent_tokens.shutdown_agent_token_crypto()
@@ -10,8 +10,8 @@ from app.api import approvals
 from app.models.agents import Agent
 from app.models.approvals import Approval
 from app.models.boards import Board
+from app.models.gateway_outbox import GatewayOutboxMessage
 from app.schemas.approvals import ApprovalRead, ApprovalUpdate
-from app.services.openclaw.gateway_rpc import GatewayConfig as GatewayClientConfig
 
 
 class _ByIdQuery:
@@ -56,6 +56,7 @@ def _board() -> Board:
         organization_id=uuid4(),
         name="Ops",
         slug="ops",
+        gateway_id=uuid4(),
     )
 
 
@@ -85,7 +86,6 @@ async def test_update_approval_notifies_lead_when_approved(
         openclaw_session_id="agent:lead:session",
     )
     session = _FakeSession()
-    captured: dict[str, Any] = {}
 
     fake_approval_model = type("FakeApprovalModel", (), {"objects": _ApprovalObjects(approval)})
     monkeypatch.setattr(approvals, "Approval", fake_approval_model)
@@ -93,32 +93,7 @@ async def test_update_approval_notifies_lead_when_approved(
     async def _fake_resolve_lead(*_args: Any, **_kwargs: Any) -> Agent:
         return lead
 
-    async def _fake_optional_gateway_config_for_board(
-        self: approvals.GatewayDispatchService,
-        _board: Board,
-    ) -> GatewayClientConfig:
-        _ = self
-        return GatewayClientConfig(url="ws://gateway.example/ws", token=None)
-
-    async def _fake_try_send_agent_message(
-        self: approvals.GatewayDispatchService,
-        **kwargs: Any,
-    ) -> None:
-        _ = self
-        captured.update(kwargs)
-        return None
-
     monkeypatch.setattr(approvals, "_resolve_board_lead", _fake_resolve_lead)
-    monkeypatch.setattr(
-        approvals.GatewayDispatchService,
-        "optional_gateway_config_for_board",
-        _fake_optional_gateway_config_for_board,
-    )
-    monkeypatch.setattr(
-        approvals.GatewayDispatchService,
-        "try_send_agent_message",
-        _fake_try_send_agent_message,
-    )
 
     async def _fake_load_task_ids_by_approval(
         _session: object,
@@ -147,14 +122,17 @@ async def test_update_approval_notifies_lead_when_approved(
     )
 
     assert updated.status == "approved"
-    assert captured["session_key"] == "agent:lead:session"
-    assert captured["agent_name"] == "Lead Agent"
-    assert "APPROVAL RESOLVED" in captured["message"]
-    assert "Decision: approved" in captured["message"]
-
-    event_types = [item.event_type for item in session.added if hasattr(item, "event_type")]
-    assert "approval.lead_notified" in event_types
-    assert session.commits >= 2
+    # The notification is staged in the outbox and committed with the approval update.
+    [outbox] = [item for item in session.added if isinstance(item, GatewayOutboxMessage)]
+    assert session.added.index(approval) < session.added.index(outbox)
+    assert session.commits == 1
+    assert outbox.gateway_id == board.gateway_id
+    assert outbox.session_key == "agent:lead:session"
+    assert outbox.agent_name == "Lead Agent"
+    assert "APPROVAL RESOLVED" in outbox.message
+    assert "Decision: approved" in outbox.message
+    assert outbox.notified_event_type == "approval.lead_notified"
+    assert outbox.failed_event_type == "approval.lead_notify_failed"
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,208 @@
+# ruff: noqa: INP001, SLF001
+"""Local Clerk session verification with cached JWKS and verified tokens."""
+
+from __future__ import annotations
+
+import base64
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import httpx
+import jwt
+import pytest
+from clerk_backend_api.security.types import AuthErrorReason, AuthStatus
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.core import auth, clerk_tokens
+from app.core.clerk_tokens import ClerkJwksCache, ClerkSessionVerifier
+
+
+def _b64url_uint(value: int) -> str:
+    raw = value.to_bytes((value.bit_length() + 7) // 8, "big")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+class _SigningKey:
+    def __init__(self, kid: str) -> None:
+        self.kid = kid
+        self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    @property
+    def jwk(self) -> dict[str, str]:
+        numbers = self.private_key.public_key().public_numbers()
+        return {
+            "kid": self.kid,
+            "kty": "RSA",
+            "e": _b64url_uint(numbers.e),
+            "n": _b64url_uint(numbers.n),
+        }
+
+    def token(self, **claims: Any) -> str:
+        pem = self.private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        now = int(time.time())
+        payload = {"sub": "user_123", "iat": now, "nbf": now, "exp": now + 60, **claims}
+        return jwt.encode(payload, pem, algorithm="RS256", headers={"kid": self.kid})
+
+
+@pytest.fixture
+def jwks_server(monkeypatch: pytest.MonkeyPatch) -> dict[str, Any]:
+    state: dict[str, Any] = {"keys": [], "requests": 0}
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        state["requests"] += 1
+        assert request.url.path == "/v1/jwks"
+        return httpx.Response(200, json={"keys": state["keys"]})
+
+    real_client = httpx.AsyncClient
+
+    def _client(**kwargs: Any) -> httpx.AsyncClient:
+        return real_client(transport=httpx.MockTransport(_handler), **kwargs)
+
+    monkeypatch.setattr(clerk_tokens.httpx, "AsyncClient", _client)
+    monkeypatch.setattr(clerk_tokens.settings, "clerk_secret_key", "sk_test_dummy")
+    return state
+
+
+def _request(token: str) -> SimpleNamespace:
+    return SimpleNamespace(headers={"Authorization": f"Bearer {token}"})
+
+
+@pytest.mark.asyncio
+async def test_verified_token_is_served_from_cache(jwks_server: dict[str, Any]) -> None:
+    key = _SigningKey("kid-1")
+    jwks_server["keys"] = [key.jwk]
+    verifier = ClerkSessionVerifier(ClerkJwksCache(), max_entries=10)
+    token = key.token()
+
+    first = await verifier.authenticate(_request(token), token)
+    second = await verifier.authenticate(_request(token), token)
+
+    assert first.status == AuthStatus.SIGNED_IN
+    assert second.status == AuthStatus.SIGNED_IN
+    assert second.payload is not None
+    assert second.payload["sub"] == "user_123"
+    stats = verifier.stats()
+    assert stats.verifications == 1
+    assert stats.cache_hits == 1
+    assert stats.cache_misses == 1
+    assert stats.cache_hit_rate == 0.5
+    assert jwks_server["requests"] == 1
+
+
+@pytest.mark.asyncio
+async def test_verifier_stats_are_rendered_for_prometheus(
+    jwks_server: dict[str, Any],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(clerk_tokens, "_verifier", None)
+    assert clerk_tokens.render_clerk_auth_metrics() == ""
+
+    key = _SigningKey("kid-1")
+    jwks_server["keys"] = [key.jwk]
+    verifier = ClerkSessionVerifier(ClerkJwksCache(), max_entries=10)
+    monkeypatch.setattr(clerk_tokens, "_verifier", verifier)
+    token = key.token()
+    for _ in range(2):
+        await verifier.authenticate(_request(token), token)
+
+    text = clerk_tokens.render_clerk_auth_metrics()
+    assert "# TYPE mission_control_clerk_auth_cache_hits_total counter" in text
+    assert "mission_control_clerk_auth_cache_hits_total 1\n" in text
+    assert "mission_control_clerk_auth_verifications_total 1\n" in text
+    assert "mission_control_clerk_auth_jwks_fetches_total 1\n" in text
+
+
+@pytest.mark.asyncio
+async def test_cached_token_expires_with_jwt_exp(
+    jwks_server: dict[str, Any],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    key = _SigningKey("kid-1")
+    jwks_server["keys"] = [key.jwk]
+    verifier = ClerkSessionVerifier(ClerkJwksCache(), max_entries=10)
+    token = key.token(exp=int(time.time()) + 5)
+    assert (await verifier.authenticate(_request(token), token)).status == AuthStatus.SIGNED_IN
+
+    real_time = time.time
+    monkeypatch.setattr(clerk_tokens.time, "time", lambda: real_time() + 6)
+
+    digest = clerk_tokens.hashlib.sha256(token.encode()).hexdigest()
+    assert verifier._cached_claims(digest) is None
+
+
+@pytest.mark.asyncio
+async def test_invalid_signature_is_rejected_and_not_cached(jwks_server: dict[str, Any]) -> None:
+    trusted = _SigningKey("kid-1")
+    forged = _SigningKey("kid-1")
+    jwks_server["keys"] = [trusted.jwk]
+    verifier = ClerkSessionVerifier(ClerkJwksCache(), max_entries=10)
+    token = forged.token()
+
+    for _ in range(2):
+        state = await verifier.authenticate(_request(token), token)
+        assert state.status == AuthStatus.SIGNED_OUT
+    assert verifier.stats().verifications == 2
+    assert verifier.stats().cache_hits == 0
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_refetches_jwks_once_within_rate_limit(
+    jwks_server: dict[str, Any],
+) -> None:
+    old_key = _SigningKey("kid-old")
+    new_key = _SigningKey("kid-new")
+    jwks_server["keys"] = [old_key.jwk]
+    verifier = ClerkSessionVerifier(ClerkJwksCache(), max_entries=10)
+    await verifier.jwks.refresh()
+
+    unknown = _SigningKey("kid-unknown").token()
+    assert (await verifier.authenticate(_request(unknown), unknown)).status == AuthStatus.SIGNED_OUT
+    assert jwks_server["requests"] == 1
+
+    # Key rotation: once the refetch window allows it, the new kid is picked up.
+    verifier.jwks._last_fetch -= clerk_tokens._JWKS_MIN_REFETCH_SECONDS
+    jwks_server["keys"] = [old_key.jwk, new_key.jwk]
+    token = new_key.token()
+    assert (await verifier.authenticate(_request(token), token)).status == AuthStatus.SIGNED_IN
+    assert jwks_server["requests"] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_cold_start_fetch_is_rate_limited(jwks_server: dict[str, Any]) -> None:
+    key = _SigningKey("kid-1")
+    verifier = ClerkSessionVerifier(ClerkJwksCache(), max_entries=10)
+    token = key.token()
+
+    for _ in range(3):
+        assert (await verifier.authenticate(_request(token), token)).status == AuthStatus.SIGNED_OUT
+    assert jwks_server["requests"] == 1
+    assert verifier.jwks.fetch_failures == 1
+
+    verifier.jwks._last_fetch -= clerk_tokens._JWKS_MIN_REFETCH_SECONDS
+    jwks_server["keys"] = [key.jwk]
+    assert (await verifier.authenticate(_request(token), token)).status == AuthStatus.SIGNED_IN
+    assert jwks_server["requests"] == 2
+
+
+@pytest.mark.asyncio
+async def test_authenticate_clerk_request_without_token_is_signed_out(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(auth.settings, "clerk_secret_key", "sk_test_dummy")
+
+    state = await auth._authenticate_clerk_request(SimpleNamespace(headers={}))  # type: ignore[arg-type]
+
+    assert state.status == AuthStatus.SIGNED_OUT
+    assert state.reason == AuthErrorReason.SESSION_TOKEN_MISSING
+
+
+def test_session_token_is_read_from_session_cookie() -> None:
+    request = SimpleNamespace(headers={"cookie": "other=1; __session_abc=tok123"})
+
+    assert clerk_tokens.session_token_from_headers(request) == "tok123"
@@ -0,0 +1,108 @@
+# ruff: noqa: INP001
+"""Redis token-bucket dispatch rate limit tests."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections.abc import AsyncIterator
+
+import pytest
+import pytest_asyncio
+import redis
+
+from app.core.config import settings
+from app.services import dispatch_rate_limit
+from app.services.dispatch_rate_limit import (
+    GatewayRateLimitSnapshot,
+    acquire_dispatch_token,
+    dispatch_rate_limit_snapshot,
+)
+from app.services.queue import close_async_redis_clients
+
+# Buckets need a real Redis (server-side scripts); these tests use a dedicated database
+# on QUEUE_TEST_REDIS_URL and are skipped when it is unreachable.
+_TEST_REDIS_URL = os.environ.get("QUEUE_TEST_REDIS_URL", "redis://localhost:6379/15")
+
+
+@pytest_asyncio.fixture
+async def client(monkeypatch: pytest.MonkeyPatch) -> AsyncIterator[redis.Redis]:
+    client = redis.Redis.from_url(_TEST_REDIS_URL, socket_connect_timeout=0.5)
+    try:
+        client.ping()
+    except redis.RedisError:
+        pytest.skip(f"Redis not reachable at {_TEST_REDIS_URL}")
+    client.flushdb()
+    monkeypatch.setattr(settings, "rq_redis_url", _TEST_REDIS_URL)
+    monkeypatch.setattr(settings, "rq_dispatch_gateway_rate_per_second", 20.0)
+    monkeypatch.setattr(settings, "rq_dispatch_gateway_burst", 3)
+    monkeypatch.setattr(settings, "rq_dispatch_session_rate_per_second", 0.0)
+    yield client
+    await close_async_redis_clients()
+    client.flushdb()
+    client.close()
+
+
+@pytest.mark.asyncio
+async def test_burst_is_free_then_sends_wait_for_refill(client: redis.Redis) -> None:
+    waits = [await acquire_dispatch_token("gw-a") for _ in range(4)]
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert 0 < waits[3] <= 0.1
+    [snapshot] = dispatch_rate_limit_snapshot(client)
+    assert snapshot.gateway == "gw-a"
+    assert snapshot.waited_seconds_total == pytest.approx(waits[3])
+    assert 0 < snapshot.wait_seconds <= 0.05
+
+
+@pytest.mark.asyncio
+async def test_gateways_have_independent_buckets(client: redis.Redis) -> None:
+    for _ in range(3):
+        await acquire_dispatch_token("gw-a")
+
+    assert await acquire_dispatch_token("gw-b") == 0.0
+    assert [item.gateway for item in dispatch_rate_limit_snapshot(client)] == ["gw-a", "gw-b"]
+
+
+@pytest.mark.asyncio
+async def test_session_buckets_throttle_one_session_without_the_others(
+    client: redis.Redis,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    del client
+    monkeypatch.setattr(settings, "rq_dispatch_session_rate_per_second", 10.0)
+    monkeypatch.setattr(settings, "rq_dispatch_session_burst", 1)
+
+    assert await acquire_dispatch_token("gw-a", session_key="agent:a:main") == 0.0
+    assert await acquire_dispatch_token("gw-a", session_key="agent:b:main") == 0.0
+    assert await acquire_dispatch_token("gw-a", session_key="agent:a:main") > 0.05
+
+
+@pytest.mark.asyncio
+async def test_concurrent_senders_share_the_gateway_rate(client: redis.Redis) -> None:
+    del client
+    started = time.monotonic()
+
+    await asyncio.gather(*(acquire_dispatch_token("gw-a") for _ in range(11)))
+
+    # Three burst tokens, then eight more at 20/s.
+    assert time.monotonic() - started >= 0.35
+
+
+@pytest.mark.asyncio
+async def test_unreachable_redis_does_not_block_dispatch(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "rq_redis_url", "redis://127.0.0.1:1/0")
+
+    assert await acquire_dispatch_token("gw-a") == 0.0
+    await close_async_redis_clients()
+
+
+def test_render_prometheus_exports_wait_gauge_and_total_counter() -> None:
+    text = dispatch_rate_limit.render_prometheus(
+        [GatewayRateLimitSnapshot(gateway='g"1', wait_seconds=0.25, waited_seconds_total=3.5)],
+    )
+
+    assert 'mission_control_dispatch_rate_limit_wait_seconds{gateway="g\\"1"} 0.25' in text
+    assert "# TYPE mission_control_dispatch_rate_limit_waited_seconds_total counter" in text
+    assert 'mission_control_dispatch_rate_limit_waited_seconds_total{gateway="g\\"1"} 3.5' in text
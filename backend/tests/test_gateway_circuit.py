@@ -0,0 +1,133 @@
+# ruff: noqa: INP001
+"""Per-gateway circuit breaker tests."""
+
+from __future__ import annotations
+
+import socket
+import time
+from collections.abc import Iterator
+
+import pytest
+
+import app.services.openclaw.gateway_rpc as gateway_rpc
+from app.services.openclaw.gateway_circuit import (
+    GatewayCircuitBreaker,
+    GatewayCircuitRegistry,
+    set_gateway_circuits,
+)
+from app.services.openclaw.gateway_rpc import (
+    GatewayCircuitOpenError,
+    GatewayConfig,
+    OpenClawGatewayError,
+    gateway_circuit_snapshot,
+    openclaw_call,
+)
+from app.services.openclaw.internal.retry import GatewayBackoff
+
+
+@pytest.fixture
+def circuits() -> Iterator[GatewayCircuitRegistry]:
+    registry = GatewayCircuitRegistry(
+        window_size=4,
+        min_calls=2,
+        failure_rate_threshold=0.5,
+        open_seconds=30,
+    )
+    set_gateway_circuits(registry)
+    yield registry
+    set_gateway_circuits(None)
+
+
+def _breaker() -> GatewayCircuitBreaker:
+    return GatewayCircuitBreaker(
+        window_size=4,
+        min_calls=2,
+        failure_rate_threshold=0.5,
+        open_seconds=30,
+    )
+
+
+def _unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def test_breaker_opens_on_failure_rate_and_probes_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    breaker = _breaker()
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+
+    for success in (True, True, False):
+        assert breaker.acquire() is None
+        breaker.record(success=success)
+    assert breaker.snapshot().state == "closed"
+    assert breaker.acquire() is None
+    breaker.record(success=False)
+
+    assert breaker.snapshot().state == "open"
+    assert breaker.acquire() == pytest.approx(30)
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 31)
+    assert breaker.acquire() is None
+    assert breaker.snapshot().state == "half_open"
+    assert breaker.acquire() is not None
+    breaker.record(success=False)
+    assert breaker.snapshot().state == "open"
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 62)
+    assert breaker.acquire() is None
+    breaker.record(success=True)
+    snapshot = breaker.snapshot()
+    assert (snapshot.state, snapshot.window_calls) == ("closed", 0)
+
+
+def test_cancelled_probe_frees_the_half_open_slot(monkeypatch: pytest.MonkeyPatch) -> None:
+    breaker = _breaker()
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    for _ in range(2):
+        breaker.acquire()
+        breaker.record(success=False)
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 31)
+    assert breaker.acquire() is None
+    breaker.release()
+    assert breaker.acquire() is None
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_without_connecting(
+    circuits: GatewayCircuitRegistry,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    config = GatewayConfig(url=f"ws://127.0.0.1:{_unused_port()}", gateway_id="gw-down")
+    for _ in range(2):
+        with pytest.raises(OpenClawGatewayError) as exc_info:
+            await openclaw_call("health", config=config)
+        assert not isinstance(exc_info.value, GatewayCircuitOpenError)
+
+    async def _unexpected_connect(*_args: object, **_kwargs: object) -> None:
+        raise AssertionError("open circuit must not connect")
+
+    monkeypatch.setattr(gateway_rpc, "_openclaw_call_once", _unexpected_connect)
+    with pytest.raises(GatewayCircuitOpenError, match="circuit open") as exc_info:
+        await openclaw_call("health", config=config)
+
+    assert exc_info.value.retry_after_seconds > 0
+    assert gateway_circuit_snapshot(config).state == "open"
+    assert circuits.snapshot("other-gateway").state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_gateway_backoff_does_not_retry_open_circuit() -> None:
+    attempts = 0
+
+    async def _call() -> object:
+        nonlocal attempts
+        attempts += 1
+        raise GatewayCircuitOpenError("gw", 30)
+
+    with pytest.raises(GatewayCircuitOpenError):
+        await GatewayBackoff(timeout_s=60, base_delay_s=10).run(_call)
+    assert attempts == 1
@@ -6,8 +6,10 @@ import pytest
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
 
+import app.services.openclaw.device_identity as device_identity
 from app.services.openclaw.device_identity import (
     build_device_auth_payload,
+    load_device_identity,
     load_or_create_device_identity,
     sign_device_payload,
 )
@@ -65,3 +67,48 @@ def test_sign_device_payload_produces_valid_ed25519_signature(
     loaded = serialization.load_pem_public_key(identity.public_key_pem.encode("utf-8"))
     assert isinstance(loaded, Ed25519PublicKey)
     loaded.verify(_base64url_decode(signature), payload.encode("utf-8"))
+
+
+def test_load_device_identity_is_cached_until_file_changes(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path,
+) -> None:
+    identity_path = tmp_path / "identity" / "device.json"
+    monkeypatch.setenv("OPENCLAW_GATEWAY_DEVICE_IDENTITY_PATH", str(identity_path))
+    first = load_device_identity()
+
+    def _unexpected_reload() -> None:
+        raise AssertionError("identity file should not be re-read")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(device_identity, "load_or_create_device_identity", _unexpected_reload)
+        assert load_device_identity() is first
+
+    # Replacing the file (new inode/mtime) triggers a reload with the new keys.
+    identity_path.unlink()
+    regenerated = load_or_create_device_identity()
+    reloaded = load_device_identity()
+    assert reloaded is not first
+    assert reloaded.device_id == regenerated.device_id != first.device_id
+
+
+def test_loaded_device_identity_signature_matches_pem_signing(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path,
+) -> None:
+    monkeypatch.setenv(
+        "OPENCLAW_GATEWAY_DEVICE_IDENTITY_PATH",
+        str(tmp_path / "identity" / "device.json"),
+    )
+    loaded = load_device_identity()
+    payload = "v1|device|client|backend|operator|operator.read|1|token"
+
+    # Ed25519 signatures are deterministic, so both paths must agree.
+    assert loaded.sign(payload) == sign_device_payload(loaded.identity.private_key_pem, payload)
+    public_key = serialization.load_pem_public_key(loaded.identity.public_key_pem.encode("utf-8"))
+    assert isinstance(public_key, Ed25519PublicKey)
+    raw = public_key.public_bytes(
+        encoding=serialization.Encoding.Raw,
+        format=serialization.PublicFormat.Raw,
+    )
+    assert _base64url_decode(loaded.public_key_raw_base64url) == raw
@@ -0,0 +1,278 @@
+# ruff: noqa: INP001
+"""Gateway event subscription, leader election, and presence batching tests."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app.services.openclaw.gateway_events as gateway_events
+from app.models.agents import Agent
+from app.models.gateways import Gateway
+from app.models.organizations import Organization
+from app.services.agent_presence import (
+    AgentPresenceAggregator,
+    InMemoryPresenceStore,
+    set_presence_aggregator,
+)
+from app.services.openclaw.gateway_events import (
+    GatewayActivityCollector,
+    GatewayEventSubscriber,
+    GatewayEventSupervisor,
+    InMemoryLeaderLock,
+    RedisLeaderLock,
+    event_session_keys,
+)
+from app.services.openclaw.gateway_rpc import GatewayConfig, GatewayEvent
+
+
+@pytest.fixture
+def aggregator() -> Iterator[AgentPresenceAggregator]:
+    instance = AgentPresenceAggregator(InMemoryPresenceStore())
+    set_presence_aggregator(instance)
+    yield instance
+    set_presence_aggregator(None)
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+
+    async def set(self, key: str, value: str, *, nx: bool, px: int) -> bool:
+        assert nx is True and px > 0
+        if key in self.values:
+            return False
+        self.values[key] = value
+        return True
+
+    async def eval(self, script: str, numkeys: int, key: str, owner: str, *args: str) -> int:
+        assert numkeys == 1
+        if self.values.get(key) != owner:
+            return 0
+        if "pexpire" not in script:
+            del self.values[key]
+        return 1
+
+
+def test_event_session_keys_normalizes_agent_activity() -> None:
+    chat = GatewayEvent("chat", {"sessionKey": "agent:mc-1:subagent:abc", "state": "delta"})
+    health = GatewayEvent("health", {"agents": [{"agentId": "lead-2"}, "bogus"]})
+
+    assert event_session_keys(chat) == {"agent:mc-1:main"}
+    assert event_session_keys(health) == {"agent:lead-2:main"}
+    assert event_session_keys(GatewayEvent("tick", {"sessionKey": "agent:x:main"})) == set()
+    assert event_session_keys(GatewayEvent("agent", {"sessionKey": "global"})) == set()
+
+
+@pytest.mark.asyncio
+async def test_collector_flush_touches_matching_gateway_agents(
+    aggregator: AgentPresenceAggregator,
+) -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.connect() as conn, conn.begin():
+        await conn.run_sync(SQLModel.metadata.create_all)
+    org = Organization(id=uuid4(), name="org")
+    gateway, other = (
+        Gateway(id=uuid4(), organization_id=org.id, name=name, url="ws://g", workspace_root="/w")
+        for name in ("g", "o")
+    )
+    agent = Agent(id=uuid4(), gateway_id=gateway.id, name="a", openclaw_session_id="agent:a:main")
+    same_key_elsewhere = Agent(
+        id=uuid4(),
+        gateway_id=other.id,
+        name="b",
+        openclaw_session_id="agent:a:main",
+    )
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add_all([org, gateway, other, agent, same_key_elsewhere])
+        await session.commit()
+
+        collector = GatewayActivityCollector()
+        collector.observe(gateway.id, GatewayEvent("agent", {"sessionKey": "agent:a:main"}))
+        collector.observe(gateway.id, GatewayEvent("chat", {"sessionKey": "agent:a:main"}))
+        assert len(collector) == 1
+
+        assert await collector.flush(session) == 1
+        assert await collector.flush(session) == 0
+
+    assert aggregator.pending(agent.id) is not None
+    assert aggregator.pending(same_key_elsewhere.id) is None
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_redis_leader_lock_elects_one_owner() -> None:
+    client = _FakeRedis()
+    first = RedisLeaderLock(client, ttl_seconds=30, owner="a")  # type: ignore[arg-type]
+    second = RedisLeaderLock(client, ttl_seconds=30, owner="b")  # type: ignore[arg-type]
+
+    assert await first.acquire("gw")
+    assert await first.acquire("gw")
+    assert not await second.acquire("gw")
+    assert not await second.refresh("gw")
+
+    await second.release("gw")
+    assert await first.refresh("gw")
+    await first.release("gw")
+    assert await second.acquire("gw")
+
+
+@pytest.mark.asyncio
+async def test_subscriber_reconnects_and_feeds_collector(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(gateway_events, "_RECONNECT_BASE_DELAY_S", 0.01)
+    connects = 0
+    reconnected = asyncio.Event()
+
+    async def _stream(_config: GatewayConfig) -> AsyncIterator[GatewayEvent]:
+        nonlocal connects
+        connects += 1
+        if connects >= 2:
+            reconnected.set()
+        yield GatewayEvent("agent", {"sessionKey": f"agent:{connects}:main"})
+
+    collector = GatewayActivityCollector()
+    gateway_id = uuid4()
+    subscriber = GatewayEventSubscriber(
+        gateway_id,
+        GatewayConfig(url="ws://gateway"),
+        lock=InMemoryLeaderLock(),
+        collector=collector,
+        lock_ttl_seconds=30,
+        idle_timeout_seconds=5,
+        reconnect_max_seconds=0.05,
+        stream_factory=_stream,
+    )
+    task = asyncio.create_task(subscriber.run())
+    await asyncio.wait_for(reconnected.wait(), timeout=2)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert subscriber.events_received >= 2
+    assert (gateway_id, "agent:1:main") in collector._pending
+
+
+@pytest.mark.asyncio
+async def test_subscriber_without_leadership_never_connects() -> None:
+    client = _FakeRedis()
+    gateway_id = uuid4()
+    assert await RedisLeaderLock(
+        client,  # type: ignore[arg-type]
+        ttl_seconds=30,
+        owner="other",
+    ).acquire(str(gateway_id))
+
+    async def _stream(_config: GatewayConfig) -> AsyncIterator[GatewayEvent]:
+        raise AssertionError("follower must not subscribe")
+        yield  # pragma: no cover
+
+    subscriber = GatewayEventSubscriber(
+        gateway_id,
+        GatewayConfig(url="ws://gateway"),
+        lock=RedisLeaderLock(client, ttl_seconds=0.03, owner="me"),  # type: ignore[arg-type]
+        collector=GatewayActivityCollector(),
+        lock_ttl_seconds=0.03,
+        idle_timeout_seconds=5,
+        reconnect_max_seconds=0.05,
+        stream_factory=_stream,
+    )
+    task = asyncio.create_task(subscriber.run())
+    await asyncio.sleep(0.1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert client.values[f"mc:gateway-events:leader:{gateway_id}"] == "other"
+
+
+@pytest.mark.asyncio
+async def test_subscriber_backs_off_after_unexpected_errors(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(gateway_events, "_RECONNECT_BASE_DELAY_S", 0.01)
+    connects = 0
+    recovered = asyncio.Event()
+
+    async def _stream(_config: GatewayConfig) -> AsyncIterator[GatewayEvent]:
+        nonlocal connects
+        connects += 1
+        if connects == 1:
+            raise RuntimeError("bad frame")
+        recovered.set()
+        yield GatewayEvent("agent", {"sessionKey": "agent:a:main"})
+
+    subscriber = GatewayEventSubscriber(
+        uuid4(),
+        GatewayConfig(url="ws://gateway"),
+        lock=InMemoryLeaderLock(),
+        collector=GatewayActivityCollector(),
+        lock_ttl_seconds=30,
+        idle_timeout_seconds=5,
+        reconnect_max_seconds=0.05,
+        stream_factory=_stream,
+    )
+    task = asyncio.create_task(subscriber.run())
+    await asyncio.wait_for(recovered.wait(), timeout=2)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert connects >= 2
+
+
+@pytest.mark.asyncio
+async def test_supervisor_sync_restarts_exited_subscribers() -> None:
+    class _FlakyLock(InMemoryLeaderLock):
+        def __init__(self) -> None:
+            self.acquires = 0
+
+        async def acquire(self, name: str) -> bool:
+            self.acquires += 1
+            if self.acquires == 1:
+                raise RuntimeError("lock backend bug")
+            return await super().acquire(name)
+
+    async def _stream(_config: GatewayConfig) -> AsyncIterator[GatewayEvent]:
+        await asyncio.Event().wait()
+        yield  # pragma: no cover
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.connect() as conn, conn.begin():
+        await conn.run_sync(SQLModel.metadata.create_all)
+    org = Organization(id=uuid4(), name="org")
+    gateway = Gateway(
+        id=uuid4(),
+        organization_id=org.id,
+        name="g",
+        url="ws://g",
+        workspace_root="/w",
+    )
+    lock = _FlakyLock()
+    supervisor = GatewayEventSupervisor(lock=lock, stream_factory=_stream)
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            session.add_all([org, gateway])
+            await session.commit()
+
+            await supervisor.sync(session)
+            _subscriber, first = supervisor._subscribers[gateway.id]
+            with pytest.raises(RuntimeError):
+                await first
+
+            await supervisor.sync(session)
+            _subscriber, second = supervisor._subscribers[gateway.id]
+            assert second is not first
+            await asyncio.sleep(0)
+            assert not second.done()
+            assert lock.acquires == 2
+    finally:
+        await supervisor.close()
+        await engine.dispose()
@@ -0,0 +1,303 @@
+# ruff: noqa: INP001
+"""Gateway outbox staging and drain worker tests."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import timedelta
+from typing import Any
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app.services.openclaw.outbox as outbox
+from app.core.config import settings
+from app.core.time import utcnow
+from app.models.activity_events import ActivityEvent
+from app.models.agents import Agent
+from app.models.boards import Board
+from app.models.gateway_outbox import GatewayOutboxMessage
+from app.models.gateways import Gateway
+from app.models.organizations import Organization
+from app.models.tasks import Task
+from app.services.openclaw.gateway_dispatch import GatewayDispatchService
+from app.services.openclaw.gateway_rpc import OpenClawGatewayError
+
+
+@pytest_asyncio.fixture
+async def engine(monkeypatch: pytest.MonkeyPatch) -> AsyncIterator[AsyncEngine]:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.connect() as conn, conn.begin():
+        await conn.run_sync(SQLModel.metadata.create_all)
+    monkeypatch.setattr(
+        outbox,
+        "async_session_maker",
+        async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+    )
+    yield engine
+    await engine.dispose()
+
+
+async def _seed(engine: AsyncEngine) -> tuple[Board, Task, list[Agent]]:
+    org = Organization(id=uuid4(), name="org")
+    gateway = Gateway(
+        id=uuid4(), organization_id=org.id, name="g", url="ws://g", workspace_root="/w"
+    )
+    board = Board(id=uuid4(), organization_id=org.id, gateway_id=gateway.id, name="b", slug="b")
+    task = Task(id=uuid4(), board_id=board.id, title="t")
+    agents = [
+        Agent(
+            id=uuid4(),
+            board_id=board.id,
+            gateway_id=gateway.id,
+            name=f"agent-{index}",
+            openclaw_session_id=f"agent:{index}:main",
+        )
+        for index in range(2)
+    ]
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add_all([org, gateway, board, task, *agents])
+        await session.commit()
+    return board, task, agents
+
+
+def _activity(task: Task) -> outbox.OutboxActivity:
+    return outbox.OutboxActivity(
+        notified_event_type="task.assignee_notified",
+        notified_message="notified",
+        failed_event_type="task.assignee_notify_failed",
+        failed_message="Assignee notify failed",
+        task_id=task.id,
+    )
+
+
+async def _rows(engine: AsyncEngine) -> list[GatewayOutboxMessage]:
+    async with AsyncSession(engine) as session:
+        statement = select(GatewayOutboxMessage).order_by(col(GatewayOutboxMessage.created_at))
+        return list((await session.exec(statement)).all())
+
+
+async def _event_types(engine: AsyncEngine) -> list[str]:
+    async with AsyncSession(engine) as session:
+        return list((await session.exec(select(ActivityEvent.event_type))).all())
+
+
+@pytest.mark.asyncio
+async def test_messages_are_only_written_with_the_callers_commit(engine: AsyncEngine) -> None:
+    board, _task, agents = await _seed(engine)
+    no_session = Agent(board_id=board.id, gateway_id=board.gateway_id or uuid4(), name="x")
+
+    async with AsyncSession(engine) as session:
+        assert outbox.enqueue_agent_message(session, board=board, agent=agents[0], message="a")
+        await session.rollback()
+        assert (
+            outbox.enqueue_agent_message(session, board=board, agent=no_session, message="b")
+            is None
+        )
+        assert outbox.enqueue_agent_message(session, board=board, agent=agents[1], message="c")
+        await session.commit()
+
+    [row] = await _rows(engine)
+    assert (row.message, row.status, row.session_key) == ("c", "pending", "agent:1:main")
+
+
+@pytest.mark.asyncio
+async def test_drain_sends_sessions_concurrently_in_order_and_records_latency(
+    engine: AsyncEngine,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    board, task, agents = await _seed(engine)
+    async with AsyncSession(engine) as session:
+        for index in range(3):
+            for agent in agents:
+                outbox.enqueue_agent_message(
+                    session,
+                    board=board,
+                    agent=agent,
+                    message=f"{agent.name}:{index}",
+                    activity=_activity(task),
+                )
+        await session.commit()
+    sent: list[str] = []
+    in_flight = 0
+    peak = 0
+
+    async def _fake_try_send(
+        self: GatewayDispatchService,
+        *,
+        message: str,
+        **_kwargs: Any,
+    ) -> OpenClawGatewayError | None:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        sent.append(message)
+        return None
+
+    monkeypatch.setattr(GatewayDispatchService, "try_send_agent_message", _fake_try_send)
+
+    stats = await outbox.drain_outbox()
+
+    assert (stats.claimed, stats.delivered) == (6, 6)
+    assert peak == 2
+    for agent in agents:
+        assert [item for item in sent if item.startswith(agent.name)] == [
+            f"{agent.name}:{index}" for index in range(3)
+        ]
+    rows = await _rows(engine)
+    assert {row.status for row in rows} == {"delivered"}
+    assert all(row.latency_ms is not None and row.latency_ms >= 0 for row in rows)
+    assert await _event_types(engine) == ["task.assignee_notified"] * 6
+    assert await outbox.drain_outbox() == outbox.OutboxDrainStats()
+
+
+@pytest.mark.asyncio
+async def test_failed_message_holds_back_its_session_and_fails_after_max_attempts(
+    engine: AsyncEngine,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    board, task, agents = await _seed(engine)
+    monkeypatch.setattr(settings, "gateway_outbox_max_attempts", 2)
+    async with AsyncSession(engine) as session:
+        for message in ("first", "second"):
+            outbox.enqueue_agent_message(
+                session,
+                board=board,
+                agent=agents[0],
+                message=message,
+                activity=_activity(task),
+            )
+        outbox.enqueue_agent_message(session, board=board, agent=agents[1], message="other")
+        await session.commit()
+    sent: list[str] = []
+
+    async def _fake_try_send(
+        self: GatewayDispatchService,
+        *,
+        message: str,
+        **_kwargs: Any,
+    ) -> OpenClawGatewayError | None:
+        if message == "first":
+            return OpenClawGatewayError("gateway unavailable")
+        sent.append(message)
+        return None
+
+    monkeypatch.setattr(GatewayDispatchService, "try_send_agent_message", _fake_try_send)
+
+    stats = await outbox.drain_outbox()
+
+    assert (stats.delivered, stats.retried, stats.deferred) == (1, 1, 1)
+    assert sent == ["other"]
+    # "second" is due again but must wait for "first", which is backing off.
+    assert await outbox.drain_outbox() == outbox.OutboxDrainStats()
+
+    async with AsyncSession(engine) as session:
+        first = (
+            await session.exec(
+                select(GatewayOutboxMessage).where(GatewayOutboxMessage.message == "first"),
+            )
+        ).one()
+        first.next_attempt_at = utcnow() - timedelta(seconds=1)
+        session.add(first)
+        await session.commit()
+
+    stats = await outbox.drain_outbox()
+
+    assert (stats.failed, stats.deferred) == (1, 1)
+    rows = {row.message: row for row in await _rows(engine)}
+    assert rows["first"].status == "failed"
+    assert rows["first"].attempts == 2
+    assert rows["first"].last_error == "gateway unavailable"
+    assert await _event_types(engine) == ["task.assignee_notify_failed"]
+
+    # With the failed message out of the way, the session continues in order.
+    stats = await outbox.drain_outbox()
+
+    assert stats.delivered == 1
+    assert sent == ["other", "second"]
+
+
+@pytest.mark.asyncio
+async def test_blocked_session_backlog_does_not_starve_other_sessions(
+    engine: AsyncEngine,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    board, _task, agents = await _seed(engine)
+    monkeypatch.setattr(settings, "gateway_outbox_batch_size", 3)
+    async with AsyncSession(engine) as session:
+        head = outbox.enqueue_agent_message(session, board=board, agent=agents[0], message="head")
+        assert head is not None
+        head.next_attempt_at = utcnow() + timedelta(hours=1)
+        for index in range(5):
+            outbox.enqueue_agent_message(
+                session,
+                board=board,
+                agent=agents[0],
+                message=f"behind:{index}",
+            )
+        outbox.enqueue_agent_message(session, board=board, agent=agents[1], message="other")
+        await session.commit()
+    sent: list[str] = []
+
+    async def _fake_try_send(
+        self: GatewayDispatchService,
+        *,
+        message: str,
+        **_kwargs: Any,
+    ) -> OpenClawGatewayError | None:
+        sent.append(message)
+        return None
+
+    monkeypatch.setattr(GatewayDispatchService, "try_send_agent_message", _fake_try_send)
+
+    stats = await outbox.drain_outbox()
+
+    assert (stats.claimed, stats.delivered) == (1, 1)
+    assert sent == ["other"]
+    rows = {row.message: row.status for row in await _rows(engine)}
+    assert rows["head"] == "pending"
+    assert {rows[f"behind:{index}"] for index in range(5)} == {"pending"}
+
+
+@pytest.mark.asyncio
+async def test_prune_deletes_only_finished_rows_past_retention(
+    engine: AsyncEngine,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    board, _task, agents = await _seed(engine)
+    old = utcnow() - timedelta(days=2)
+    async with AsyncSession(engine) as session:
+        for message, status, attempted_at in (
+            ("old-delivered", "delivered", old),
+            ("old-failed", "failed", old),
+            ("old-pending", "pending", old),
+            ("recent-delivered", "delivered", utcnow()),
+        ):
+            row = outbox.enqueue_agent_message(
+                session,
+                board=board,
+                agent=agents[0],
+                message=message,
+            )
+            assert row is not None
+            row.status = status
+            row.next_attempt_at = attempted_at
+        await session.commit()
+    monkeypatch.setattr(settings, "gateway_outbox_retention_seconds", 24 * 3600.0)
+    monkeypatch.setattr(outbox, "_PRUNE_BATCH_SIZE", 1)
+
+    assert await outbox.prune_outbox() == 2
+
+    assert sorted(row.message for row in await _rows(engine)) == [
+        "old-pending",
+        "recent-delivered",
+    ]
+    monkeypatch.setattr(settings, "gateway_outbox_retention_seconds", 0.0)
+    assert await outbox.prune_outbox() == 0
@@ -0,0 +1,173 @@
+# ruff: noqa: INP001
+"""Gateway read cache, coalescing and write-through invalidation tests."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+import app.services.openclaw.gateway_rpc as gateway_rpc
+from app.services.openclaw.gateway_cache import GatewayRpcCache, set_gateway_rpc_cache
+from app.services.openclaw.gateway_rpc import (
+    GatewayCall,
+    GatewayConfig,
+    OpenClawGatewayError,
+    openclaw_call,
+    openclaw_call_many,
+)
+
+CONFIG = GatewayConfig(url="ws://gateway.example/ws", token="secret-token")
+
+
+@pytest.fixture
+def cache() -> Iterator[GatewayRpcCache]:
+    instance = GatewayRpcCache(ttls={"sessions.list": 0.2, "agents.files.get": 30.0})
+    set_gateway_rpc_cache(instance)
+    yield instance
+    set_gateway_rpc_cache(None)
+
+
+@pytest.fixture
+def gateway_calls(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, Any]]:
+    calls: list[tuple[str, Any]] = []
+
+    async def _fake_call_once(
+        method: str,
+        params: dict[str, Any] | None,
+        *,
+        config: GatewayConfig,
+        gateway_url: str,
+    ) -> object:
+        del config, gateway_url
+        calls.append((method, params))
+        await asyncio.sleep(0.01)
+        return {"sessions": [{"key": "agent:a:main"}], "call": len(calls)}
+
+    monkeypatch.setattr(gateway_rpc, "_openclaw_call_once", _fake_call_once)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_reads_are_cached_per_params_until_ttl_expires(
+    cache: GatewayRpcCache,
+    gateway_calls: list[tuple[str, Any]],
+) -> None:
+    first = await openclaw_call("sessions.list", config=CONFIG)
+    assert isinstance(first, dict)
+    first["sessions"].clear()
+
+    assert await openclaw_call("sessions.list", config=CONFIG) == {
+        "sessions": [{"key": "agent:a:main"}],
+        "call": 1,
+    }
+    await openclaw_call("agents.files.get", {"agentId": "a", "name": "SOUL.md"}, config=CONFIG)
+    await openclaw_call("agents.files.get", {"name": "SOUL.md", "agentId": "a"}, config=CONFIG)
+    await openclaw_call("status", config=CONFIG)
+    await openclaw_call("status", config=CONFIG)
+    assert [method for method, _ in gateway_calls] == [
+        "sessions.list",
+        "agents.files.get",
+        "status",
+        "status",
+    ]
+
+    await asyncio.sleep(0.25)
+    assert await openclaw_call("sessions.list", config=CONFIG) == {
+        "sessions": [{"key": "agent:a:main"}],
+        "call": 5,
+    }
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (2, 3)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_call(
+    cache: GatewayRpcCache,
+    gateway_calls: list[tuple[str, Any]],
+) -> None:
+    results = await asyncio.gather(
+        *(openclaw_call("sessions.list", config=CONFIG) for _ in range(10)),
+    )
+
+    assert len(gateway_calls) == 1
+    assert all(result == results[0] for result in results)
+    assert results[0] is not results[1]
+    assert cache.stats().coalesced == 9
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached(
+    cache: GatewayRpcCache,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    attempts = 0
+
+    async def _failing_call_once(*_args: object, **_kwargs: object) -> object:
+        nonlocal attempts
+        attempts += 1
+        raise OpenClawGatewayError("missing scope: operator.read")
+
+    monkeypatch.setattr(gateway_rpc, "_openclaw_call_once", _failing_call_once)
+    for _ in range(2):
+        with pytest.raises(OpenClawGatewayError):
+            await openclaw_call("sessions.list", config=CONFIG)
+
+    assert attempts == 2
+    assert cache.stats().entries == 0
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_affected_reads_on_that_gateway(
+    cache: GatewayRpcCache,
+    gateway_calls: list[tuple[str, Any]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    other = GatewayConfig(url="ws://other.example/ws", token="secret-token")
+    soul = {"agentId": "a", "name": "SOUL.md"}
+    for config in (CONFIG, other):
+        await openclaw_call("sessions.list", config=config)
+        await openclaw_call("agents.files.get", soul, config=config)
+
+    await openclaw_call("sessions.patch", {"key": "agent:a:main"}, config=CONFIG)
+    assert cache.stats().entries == 3
+
+    async def _fake_call_many_once(
+        calls: list[GatewayCall],
+        **_kwargs: object,
+    ) -> list[gateway_rpc.GatewayCallResult]:
+        return [gateway_rpc.GatewayCallResult(payload={}) for _ in calls]
+
+    monkeypatch.setattr(gateway_rpc, "_openclaw_call_many_once", _fake_call_many_once)
+    await openclaw_call_many([GatewayCall("agents.files.set", soul)], config=CONFIG)
+    assert cache.stats().entries == 2
+
+    gateway_calls.clear()
+    await openclaw_call("sessions.list", config=CONFIG)
+    await openclaw_call("agents.files.get", soul, config=CONFIG)
+    await openclaw_call("sessions.list", config=other)
+    assert [method for method, _ in gateway_calls] == ["sessions.list", "agents.files.get"]
+
+
+@pytest.mark.asyncio
+async def test_read_in_flight_during_write_is_not_stored(
+    cache: GatewayRpcCache,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    release_read = asyncio.Event()
+
+    async def _fake_call_once(method: str, *_args: object, **_kwargs: object) -> object:
+        if method == "sessions.list":
+            await release_read.wait()
+        return {"method": method}
+
+    monkeypatch.setattr(gateway_rpc, "_openclaw_call_once", _fake_call_once)
+    read = asyncio.create_task(openclaw_call("sessions.list", config=CONFIG))
+    await asyncio.sleep(0)
+    await openclaw_call("chat.send", {"sessionKey": "agent:a:main"}, config=CONFIG)
+    release_read.set()
+
+    assert await read == {"method": "sessions.list"}
+    assert cache.stats().entries == 0
@@ -0,0 +1,85 @@
+# ruff: noqa: INP001
+"""Gateway RPC latency histogram and Prometheus export tests."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.main import prometheus_metrics
+from app.services.openclaw.gateway_metrics import (
+    GatewayRpcMetrics,
+    render_prometheus,
+    set_gateway_rpc_metrics,
+)
+
+
+@pytest.fixture
+def metrics() -> Iterator[GatewayRpcMetrics]:
+    registry = GatewayRpcMetrics(buckets=(0.1, 1.0))
+    set_gateway_rpc_metrics(registry)
+    yield registry
+    set_gateway_rpc_metrics(None)
+
+
+def test_series_are_keyed_by_gateway_method_and_outcome(metrics: GatewayRpcMetrics) -> None:
+    for seconds in (0.05, 0.05, 0.5, 5.0):
+        metrics.observe(
+            gateway="gw-1",
+            phase="request",
+            method="chat.send",
+            outcome="ok",
+            seconds=seconds,
+        )
+    metrics.observe(
+        gateway="gw-1",
+        phase="request",
+        method="chat.send",
+        outcome="timeout",
+        seconds=1.0,
+    )
+
+    ok, timeout = metrics.snapshot()
+    assert (ok.key.outcome, timeout.key.outcome) == ("ok", "timeout")
+    assert ok.count == 4
+    assert ok.bucket_counts == (2, 1)
+    assert ok.sum_seconds == pytest.approx(5.6)
+    assert ok.quantile(0.5) == pytest.approx(0.1)
+    assert ok.quantile(0.99) == 1.0
+
+
+def test_render_prometheus_emits_cumulative_buckets(metrics: GatewayRpcMetrics) -> None:
+    metrics.observe(gateway='g"1', phase="connect", method="connect", outcome="ok", seconds=0.2)
+    metrics.observe(gateway='g"1', phase="connect", method="connect", outcome="ok", seconds=3)
+
+    text = render_prometheus(metrics.snapshot())
+    labels = 'gateway="g\\"1",phase="connect",method="connect",outcome="ok"'
+
+    assert "# TYPE mission_control_gateway_rpc_duration_seconds histogram" in text
+    assert f'_bucket{{{labels},le="0.1"}} 0' in text
+    assert f'_bucket{{{labels},le="1.0"}} 1' in text
+    assert f'_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f"_count{{{labels}}} 2" in text
+
+
+def test_metrics_endpoint_requires_configured_token(
+    metrics: GatewayRpcMetrics,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    metrics.observe(gateway="gw", phase="request", method="health", outcome="ok", seconds=0.01)
+    monkeypatch.setattr(settings, "metrics_token", "")
+
+    with pytest.raises(HTTPException) as exc_info:
+        prometheus_metrics(authorization=None)
+    assert exc_info.value.status_code == 404
+
+    monkeypatch.setattr(settings, "metrics_token", "scrape-secret")
+    with pytest.raises(HTTPException) as exc_info:
+        prometheus_metrics(authorization="Bearer wrong")
+    assert exc_info.value.status_code == 401
+
+    response = prometheus_metrics(authorization="Bearer scrape-secret")
+    assert b'method="health"' in response.body
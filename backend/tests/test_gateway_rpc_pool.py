@@ -0,0 +1,248 @@
+# ruff: noqa: INP001
+"""Gateway RPC connection pool tests against a local websocket stub."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any
+
+import pytest
+import pytest_asyncio
+from websockets.asyncio.server import ServerConnection, serve
+
+import app.services.openclaw.gateway_rpc as gateway_rpc
+from app.core.config import settings
+from app.services.openclaw.gateway_metrics import GatewayRpcMetrics, set_gateway_rpc_metrics
+from app.services.openclaw.gateway_rpc import (
+    GatewayCall,
+    GatewayConfig,
+    GatewayConnectionPool,
+    OpenClawGatewayError,
+    openclaw_call,
+    openclaw_call_many,
+)
+
+
+@dataclass
+class _StubGateway:
+    url: str = ""
+    connections: int = 0
+    handshakes: int = 0
+    open_sockets: list[ServerConnection] = field(default_factory=list)
+
+    async def handler(self, ws: ServerConnection) -> None:
+        self.connections += 1
+        self.open_sockets.append(ws)
+        await ws.send(
+            json.dumps({"type": "event", "event": "connect.challenge", "payload": {"nonce": "n"}}),
+        )
+        connect = json.loads(await ws.recv())
+        self.handshakes += 1
+        await ws.send(json.dumps({"type": "res", "id": connect["id"], "ok": True, "payload": {}}))
+        async for raw in ws:
+            request = json.loads(raw)
+            asyncio.create_task(self._respond(ws, request))
+
+    async def _respond(self, ws: ServerConnection, request: dict[str, Any]) -> None:
+        params = request.get("params") or {}
+        if request["method"] == "hang":
+            # Keep the socket open but never answer, like a half-open connection.
+            return
+        await asyncio.sleep(float(params.get("delay", 0)))
+        if request["method"] == "fail":
+            frame = {"type": "res", "id": request["id"], "ok": False, "error": {"message": "boom"}}
+        else:
+            frame = {"type": "res", "id": request["id"], "ok": True, "payload": params}
+        await ws.send(json.dumps(frame))
+
+
+@pytest_asyncio.fixture
+async def stub_gateway() -> AsyncIterator[_StubGateway]:
+    stub = _StubGateway()
+    async with serve(stub.handler, "127.0.0.1", 0) as server:
+        port = next(iter(server.sockets)).getsockname()[1]
+        stub.url = f"ws://127.0.0.1:{port}"
+        yield stub
+    await gateway_rpc.close_gateway_connection_pool()
+
+
+def _config(stub: _StubGateway) -> GatewayConfig:
+    return GatewayConfig(url=stub.url, disable_device_pairing=True)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_connection_and_demux_by_id(
+    stub_gateway: _StubGateway,
+) -> None:
+    config = _config(stub_gateway)
+    # Later requests answer first, so responses arrive out of order.
+    results = await asyncio.gather(
+        *(
+            openclaw_call("echo", {"n": n, "delay": (10 - n) / 200}, config=config)
+            for n in range(10)
+        ),
+    )
+
+    assert [result["n"] for result in results] == list(range(10))  # type: ignore[index]
+    assert stub_gateway.handshakes == 1
+    assert gateway_rpc.get_gateway_connection_pool().stats().connections_opened == 1
+
+
+@pytest.mark.asyncio
+async def test_gateway_error_does_not_drop_connection(stub_gateway: _StubGateway) -> None:
+    config = _config(stub_gateway)
+    with pytest.raises(OpenClawGatewayError, match="boom"):
+        await openclaw_call("fail", config=config)
+
+    assert await openclaw_call("echo", {"ok": 1}, config=config) == {"ok": 1}
+    assert stub_gateway.connections == 1
+
+
+@pytest.mark.asyncio
+async def test_reconnects_after_server_closes_connection(stub_gateway: _StubGateway) -> None:
+    config = _config(stub_gateway)
+    assert await openclaw_call("echo", {"a": 1}, config=config) == {"a": 1}
+
+    await stub_gateway.open_sockets[0].close()
+    await asyncio.sleep(0.05)
+
+    assert await openclaw_call("echo", {"a": 2}, config=config) == {"a": 2}
+    assert stub_gateway.connections == 2
+
+
+@pytest.mark.asyncio
+async def test_max_in_flight_opens_additional_connections_up_to_limit(
+    stub_gateway: _StubGateway,
+) -> None:
+    pool = GatewayConnectionPool(max_connections=2, max_in_flight=2, idle_timeout_seconds=0)
+    config = _config(stub_gateway)
+    gateway_url = gateway_rpc._build_gateway_url(config)
+
+    results = await asyncio.gather(
+        *(
+            pool.call("echo", {"n": n, "delay": 0.05}, config=config, gateway_url=gateway_url)
+            for n in range(6)
+        ),
+    )
+
+    assert len(results) == 6
+    assert pool.stats().connections_opened == 2
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_idle_connection_is_closed(stub_gateway: _StubGateway) -> None:
+    pool = GatewayConnectionPool(max_connections=1, max_in_flight=4, idle_timeout_seconds=0.05)
+    config = _config(stub_gateway)
+    gateway_url = gateway_rpc._build_gateway_url(config)
+
+    await pool.call("echo", {}, config=config, gateway_url=gateway_url)
+    assert pool.stats().open_connections == 1
+    await asyncio.sleep(0.2)
+
+    assert pool.stats().open_connections == 0
+    await pool.call("echo", {}, config=config, gateway_url=gateway_url)
+    assert pool.stats().connections_opened == 2
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_unanswered_request_times_out_and_drops_its_connection(
+    stub_gateway: _StubGateway,
+) -> None:
+    pool = GatewayConnectionPool(
+        max_connections=1,
+        max_in_flight=4,
+        idle_timeout_seconds=0,
+        request_timeout_seconds=0.2,
+    )
+    config = _config(stub_gateway)
+    gateway_url = gateway_rpc._build_gateway_url(config)
+
+    async def _late_echo() -> object:
+        await asyncio.sleep(0.1)
+        return await pool.call("echo", {"delay": 1}, config=config, gateway_url=gateway_url)
+
+    hung, in_flight = await asyncio.gather(
+        pool.call("hang", {}, config=config, gateway_url=gateway_url),
+        _late_echo(),
+        return_exceptions=True,
+    )
+
+    assert isinstance(hung, TimeoutError)
+    assert isinstance(in_flight, ConnectionError)
+    assert pool.stats().open_connections == 0
+    assert await pool.call("echo", {"n": 1}, config=config, gateway_url=gateway_url) == {"n": 1}
+    assert stub_gateway.connections == 2
+    await pool.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pooled", [True, False])
+async def test_call_many_pipelines_over_one_connection_with_per_call_errors(
+    stub_gateway: _StubGateway,
+    monkeypatch: pytest.MonkeyPatch,
+    pooled: bool,
+) -> None:
+    monkeypatch.setattr(settings, "gateway_rpc_pool_enabled", pooled)
+    calls = [
+        GatewayCall("echo", {"n": 0, "delay": 0.03}),
+        GatewayCall("fail"),
+        GatewayCall("echo", {"n": 2}),
+    ]
+
+    results = await openclaw_call_many(calls, config=_config(stub_gateway))
+
+    assert results[0].unwrap() == {"n": 0, "delay": 0.03}
+    assert not results[1].ok
+    assert str(results[1].error) == "boom"
+    assert results[2].payload == {"n": 2}
+    assert stub_gateway.connections == 1
+
+
+@pytest.mark.asyncio
+async def test_call_many_deadline_fails_only_unanswered_calls(
+    stub_gateway: _StubGateway,
+) -> None:
+    results = await openclaw_call_many(
+        [GatewayCall("echo", {"n": 0}), GatewayCall("echo", {"n": 1, "delay": 1})],
+        config=_config(stub_gateway),
+        timeout_seconds=0.3,
+    )
+
+    assert results[0].payload == {"n": 0}
+    assert results[1].error is not None
+    assert "deadline" in str(results[1].error)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pooled", [True, False])
+async def test_calls_record_connect_and_request_latency_by_outcome(
+    stub_gateway: _StubGateway,
+    monkeypatch: pytest.MonkeyPatch,
+    pooled: bool,
+) -> None:
+    monkeypatch.setattr(settings, "gateway_rpc_pool_enabled", pooled)
+    metrics = GatewayRpcMetrics()
+    set_gateway_rpc_metrics(metrics)
+    config = GatewayConfig(url=stub_gateway.url, disable_device_pairing=True, gateway_id="gw-1")
+    try:
+        await openclaw_call("echo", {}, config=config)
+        with pytest.raises(OpenClawGatewayError):
+            await openclaw_call("fail", config=config)
+    finally:
+        set_gateway_rpc_metrics(None)
+
+    counts = {
+        (item.key.phase, item.key.method, item.key.outcome): item.count
+        for item in metrics.snapshot()
+        if item.key.gateway == "gw-1"
+    }
+    assert counts == {
+        ("connect", "connect", "ok"): 1 if pooled else 2,
+        ("request", "echo", "ok"): 1,
+        ("request", "fail", "gateway_error"): 1,
+    }
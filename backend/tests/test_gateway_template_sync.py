@@ -0,0 +1,134 @@
+# ruff: noqa: INP001
+"""Concurrent gateway template sync tests."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+from uuid import uuid4
+
+import pytest
+
+import app.services.openclaw.provisioning_db as provisioning_db
+from app.models.agents import Agent
+from app.models.boards import Board
+from app.models.gateways import Gateway
+from app.schemas.gateways import GatewayTemplatesSyncResult
+from app.services.openclaw.provisioning_db import GatewayTemplateSyncOptions
+
+
+def _fixture(agent_count: int) -> tuple[Gateway, Board, list[Agent]]:
+    gateway = Gateway(
+        id=uuid4(),
+        organization_id=uuid4(),
+        name="g",
+        url="ws://g",
+        workspace_root="/w",
+    )
+    board = Board(id=uuid4(), organization_id=gateway.organization_id, name="b", slug="b")
+    agents = [
+        Agent(id=uuid4(), board_id=board.id, gateway_id=gateway.id, name=f"agent-{index}")
+        for index in range(agent_count)
+    ]
+    return gateway, board, agents
+
+
+def _context(gateway: Gateway, *, concurrency: int) -> Any:
+    return provisioning_db._SyncContext(
+        session=None,  # type: ignore[arg-type]
+        gateway=gateway,
+        control_plane=None,  # type: ignore[arg-type]
+        backoff=provisioning_db._template_sync_backoff(),
+        options=GatewayTemplateSyncOptions(user=None, concurrency=concurrency),
+        provisioner=None,  # type: ignore[arg-type]
+    )
+
+
+def _result(gateway: Gateway) -> GatewayTemplatesSyncResult:
+    return provisioning_db._base_result(gateway, include_main=False, reset_sessions=False)
+
+
+@pytest.mark.asyncio
+async def test_agents_sync_concurrently_and_merge_in_agent_order(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    gateway, board, agents = _fixture(6)
+    paused_agent = Agent(id=uuid4(), board_id=uuid4(), gateway_id=gateway.id, name="orphan")
+    in_flight = 0
+    peak = 0
+
+    async def _fake_sync_one_agent(
+        ctx: Any,
+        result: GatewayTemplatesSyncResult,
+        agent: Agent,
+        _board: Board,
+    ) -> bool:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        # Earlier agents finish last.
+        await asyncio.sleep(0.01 * (len(agents) - agents.index(agent)))
+        in_flight -= 1
+        provisioning_db._append_sync_error(result, agent=agent, message=agent.name)
+        result.agents_updated += 1
+        result.files_skipped += 2
+        return False
+
+    monkeypatch.setattr(provisioning_db, "_sync_one_agent", _fake_sync_one_agent)
+    result = _result(gateway)
+    stopped = await provisioning_db._sync_board_agents(
+        _context(gateway, concurrency=3),
+        result,
+        [*agents[:3], paused_agent, *agents[3:]],
+        boards_by_id={board.id: board},
+        paused_board_ids=set(),
+    )
+
+    assert stopped is False
+    assert peak == 3
+    assert (result.agents_updated, result.agents_skipped) == (6, 1)
+    assert result.files_skipped == 12
+    assert [error.message for error in result.errors] == [
+        "agent-0",
+        "agent-1",
+        "agent-2",
+        "Skipping agent: board not found for agent.",
+        "agent-3",
+        "agent-4",
+        "agent-5",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fatal_agent_stops_agents_not_yet_started(monkeypatch: pytest.MonkeyPatch) -> None:
+    gateway, board, agents = _fixture(6)
+    started: list[str] = []
+
+    async def _fake_sync_one_agent(
+        ctx: Any,
+        result: GatewayTemplatesSyncResult,
+        agent: Agent,
+        _board: Board,
+    ) -> bool:
+        started.append(agent.name)
+        await asyncio.sleep(0)
+        if agent is agents[1]:
+            provisioning_db._append_sync_error(result, agent=agent, message="gateway timeout")
+            return True
+        result.agents_updated += 1
+        return False
+
+    monkeypatch.setattr(provisioning_db, "_sync_one_agent", _fake_sync_one_agent)
+    result = _result(gateway)
+    stopped = await provisioning_db._sync_board_agents(
+        _context(gateway, concurrency=2),
+        result,
+        agents,
+        boards_by_id={board.id: board},
+        paused_board_ids=set(),
+    )
+
+    assert stopped is True
+    assert started == ["agent-0", "agent-1"]
+    assert result.agents_updated == 1
+    assert [error.message for error in result.errors] == ["gateway timeout"]
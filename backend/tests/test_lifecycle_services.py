@@ -3,6 +3,7 @@
 
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass, field
 from types import SimpleNamespace
 from typing import Any
@@ -13,6 +14,7 @@ from fastapi import HTTPException, status
 
 import app.services.openclaw.coordination_service as coordination_lifecycle
 import app.services.openclaw.onboarding_service as onboarding_lifecycle
+from app.schemas.gateway_coordination import GatewayLeadBroadcastRequest
 from app.services.openclaw.gateway_rpc import GatewayConfig as GatewayClientConfig
 from app.services.openclaw.gateway_rpc import OpenClawGatewayError
 from app.services.openclaw.shared import GatewayAgentIdentity
@@ -270,3 +272,96 @@ async def test_board_onboarding_dispatch_answer_maps_timeout_error(
 
     assert exc_info.value.status_code == status.HTTP_502_BAD_GATEWAY
     assert "Gateway onboarding answer dispatch failed:" in str(exc_info.value.detail)
+
+
+@pytest.mark.asyncio
+async def test_gateway_lead_broadcast_fans_out_with_limit_and_per_board_timeout(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    boards = [_BoardStub(id=uuid4(), gateway_id=uuid4(), name=f"Board {i}") for i in range(5)]
+
+    @dataclass
+    class _BroadcastSession(_FakeSession):
+        async def exec(self, _statement: object) -> list[_BoardStub]:
+            return boards
+
+    session = _BroadcastSession()
+    service = coordination_lifecycle.GatewayCoordinationService(session)  # type: ignore[arg-type]
+    actor = _AgentStub(id=uuid4(), name="Gateway Agent")
+    board_sessions: list[object] = []
+    in_flight = 0
+    peak = 0
+
+    class _SessionMaker:
+        async def __aenter__(self) -> _FakeSession:
+            board_sessions.append(_FakeSession())
+            return board_sessions[-1]  # type: ignore[return-value]
+
+        async def __aexit__(self, *_exc: object) -> None:
+            return None
+
+    async def _fake_require_gateway_main_actor(
+        self: coordination_lifecycle.GatewayCoordinationService,
+        _actor: object,
+    ) -> tuple[object, GatewayClientConfig]:
+        assert self is service
+        return SimpleNamespace(id=uuid4()), GatewayClientConfig(url="ws://gw", token=None)
+
+    async def _fake_ensure_and_message_board_lead(
+        self: coordination_lifecycle.GatewayCoordinationService,
+        *,
+        board: _BoardStub,
+        **_kwargs: Any,
+    ) -> tuple[_AgentStub, bool]:
+        nonlocal in_flight, peak
+        assert self is not service and self.session in board_sessions
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            if board is boards[0]:
+                await asyncio.sleep(10)
+            await asyncio.sleep(0.01)
+            if board is boards[1]:
+                raise OpenClawGatewayError("agent not found")
+            if board is boards[2]:
+                raise RuntimeError("database unavailable")
+            return _AgentStub(id=uuid4(), name=f"Lead {board.name}"), False
+        finally:
+            in_flight -= 1
+
+    monkeypatch.setattr(
+        coordination_lifecycle.GatewayCoordinationService,
+        "require_gateway_main_actor",
+        _fake_require_gateway_main_actor,
+    )
+    monkeypatch.setattr(
+        coordination_lifecycle.GatewayCoordinationService,
+        "_ensure_and_message_board_lead",
+        _fake_ensure_and_message_board_lead,
+    )
+    monkeypatch.setattr(coordination_lifecycle, "async_session_maker", _SessionMaker)
+    monkeypatch.setattr(coordination_lifecycle.settings, "gateway_lead_broadcast_concurrency", 2)
+    monkeypatch.setattr(
+        coordination_lifecycle.settings,
+        "gateway_lead_broadcast_board_timeout_seconds",
+        0.2,
+    )
+
+    started = asyncio.get_running_loop().time()
+    response = await service.broadcast_gateway_lead_message(
+        actor_agent=actor,  # type: ignore[arg-type]
+        payload=GatewayLeadBroadcastRequest(content="status?"),
+    )
+
+    assert asyncio.get_running_loop().time() - started < 2
+    assert peak == 2
+    assert (response.sent, response.failed, response.timed_out) == (2, 3, 1)
+    assert [result.board_id for result in response.results] == [board.id for board in boards]
+    assert response.results[0].timed_out is True
+    assert response.results[0].error == "Timed out after 0.2s."
+    assert response.results[1].timed_out is False
+    assert response.results[1].error
+    assert response.results[2].ok is False
+    assert response.results[2].error == "Unexpected error: RuntimeError."
+    assert [result.ok for result in response.results[3:]] == [True, True]
+    assert session.committed == 1
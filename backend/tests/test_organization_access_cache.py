@@ -0,0 +1,157 @@
+# ruff: noqa: INP001
+"""Organization board-access snapshot caching and invalidation tests."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.boards import Board
+from app.models.organization_board_access import OrganizationBoardAccess
+from app.models.organization_members import OrganizationMember
+from app.models.organizations import Organization
+from app.models.users import User
+from app.services import organizations
+from app.services.organization_access_cache import (
+    MemberBoardAccess,
+    OrganizationAccessCache,
+    get_organization_access_cache,
+    invalidate_organization_board_access,
+    set_organization_access_cache,
+)
+
+
+async def _make_engine() -> AsyncEngine:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.connect() as conn, conn.begin():
+        await conn.run_sync(SQLModel.metadata.create_all)
+    return engine
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache() -> Iterator[None]:
+    set_organization_access_cache(OrganizationAccessCache(max_entries=100, ttl_seconds=60))
+    yield
+    set_organization_access_cache(None)
+
+
+def _snapshot(*, organization_id: UUID | None = None) -> MemberBoardAccess:
+    return MemberBoardAccess(
+        member_id=uuid4(),
+        organization_id=organization_id or uuid4(),
+        all_boards_read=False,
+        all_boards_write=False,
+        read_board_ids=frozenset({uuid4()}),
+        write_board_ids=frozenset(),
+    )
+
+
+def test_cache_evicts_lru_and_expires_entries(monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = OrganizationAccessCache(max_entries=2, ttl_seconds=5)
+    first, second, third = _snapshot(), _snapshot(), _snapshot()
+    cache.set(first)
+    cache.set(second)
+    assert cache.get(first.member_id) == first
+    cache.set(third)
+    assert cache.get(second.member_id) is None
+    assert len(cache) == 2
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 10)
+    assert cache.get(first.member_id) is None
+
+
+def test_cache_invalidates_by_organization() -> None:
+    cache = OrganizationAccessCache(max_entries=10, ttl_seconds=60)
+    org_id = uuid4()
+    same_org = [_snapshot(organization_id=org_id) for _ in range(2)]
+    other = _snapshot()
+    for snapshot in [*same_org, other]:
+        cache.set(snapshot)
+
+    cache.invalidate_organization(org_id)
+
+    assert all(cache.get(snapshot.member_id) is None for snapshot in same_org)
+    assert cache.get(other.member_id) == other
+
+
+@pytest.mark.asyncio
+async def test_board_create_invalidates_org_wide_snapshot_after_commit() -> None:
+    engine = await _make_engine()
+    org = Organization(id=uuid4(), name="org")
+    user = User(id=uuid4(), clerk_user_id="u1", active_organization_id=org.id)
+    member = OrganizationMember(
+        id=uuid4(),
+        organization_id=org.id,
+        user_id=user.id,
+        role="member",
+        all_boards_read=True,
+    )
+    board = Board(id=uuid4(), organization_id=org.id, name="a", slug="a")
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add_all([org, user, member, board])
+        await session.commit()
+
+        assert await organizations.get_active_membership(session, user) == member
+        ids = await organizations.list_accessible_board_ids(session, member=member, write=False)
+        assert ids == [board.id]
+        assert get_organization_access_cache().get(member.id) is not None
+
+        new_board = Board(id=uuid4(), organization_id=org.id, name="b", slug="b")
+        invalidate_organization_board_access(session, org.id)
+        session.add(new_board)
+        # Simulate a concurrent request re-populating the shared cache before commit.
+        get_organization_access_cache().set(
+            await organizations._load_member_board_access(session, member),
+        )
+        await session.commit()
+
+        assert get_organization_access_cache().get(member.id) is None
+        ids = await organizations.list_accessible_board_ids(session, member=member, write=False)
+        assert ids == sorted([board.id, new_board.id])
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_explicit_access_snapshot_is_memoized_per_request_session() -> None:
+    engine = await _make_engine()
+    org = Organization(id=uuid4(), name="org")
+    user = User(id=uuid4(), clerk_user_id="u1", active_organization_id=org.id)
+    member = OrganizationMember(id=uuid4(), organization_id=org.id, user_id=user.id)
+    board = Board(id=uuid4(), organization_id=org.id, name="a", slug="a")
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add_all([org, user, member, board])
+        session.add(
+            OrganizationBoardAccess(
+                organization_member_id=member.id,
+                board_id=board.id,
+                can_read=True,
+                can_write=False,
+            ),
+        )
+        await session.commit()
+
+    # No shared caching: only the request-level memo can serve repeat checks.
+    set_organization_access_cache(OrganizationAccessCache(max_entries=0, ttl_seconds=0))
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        assert await organizations.has_board_access(
+            session,
+            member=member,
+            board=board,
+            write=False,
+        )
+        memoized = session.info["organization_access.snapshots"][member.id]
+        assert memoized.read_board_ids == frozenset({board.id})
+        assert not await organizations.has_board_access(
+            session,
+            member=member,
+            board=board,
+            write=True,
+        )
+    await engine.dispose()
@@ -20,7 +20,7 @@ from app.models.organizations import Organization
 from app.models.skills import SkillPack
 from app.models.users import User
 from app.schemas.organizations import OrganizationBoardAccessSpec, OrganizationMemberAccessUpdate
-from app.services import organizations
+from app.services import organization_access_cache, organizations
 
 
 @dataclass
@@ -433,56 +433,94 @@ async def test_has_board_access_uses_org_board_access_row_read_and_write() -> No
     )
     board = Board(id=uuid4(), organization_id=org_id, name="b", slug="b")
 
-    access = OrganizationBoardAccess(
-        organization_member_id=member.id,
-        board_id=board.id,
-        can_read=True,
-        can_write=False,
-    )
-    session = _FakeSession(exec_results=[_FakeExecResult(first_value=access)])
-    assert (
-        await organizations.has_board_access(
-            session,
-            member=member,
-            board=board,
-            write=False,
+    cases = [
+        ((True, False), False, True),
+        ((False, True), False, True),
+        ((True, False), True, False),
+    ]
+    for (can_read, can_write), write, expected in cases:
+        organization_access_cache.get_organization_access_cache().clear()
+        session = _FakeSession(
+            exec_results=[_FakeExecResult(all_values=[(board.id, can_read, can_write)])],
         )
-        is True
+        assert (
+            await organizations.has_board_access(
+                session,
+                member=member,
+                board=board,
+                write=write,
+            )
+            is expected
+        )
+
+
+@pytest.mark.asyncio
+async def test_board_access_snapshot_is_cached_until_member_access_update() -> None:
+    org_id = uuid4()
+    member = OrganizationMember(
+        id=uuid4(),
+        organization_id=org_id,
+        user_id=uuid4(),
+        role="member",
     )
+    readable = Board(id=uuid4(), organization_id=org_id, name="r", slug="r")
+    writable = Board(id=uuid4(), organization_id=org_id, name="w", slug="w")
 
-    access2 = OrganizationBoardAccess(
-        organization_member_id=member.id,
-        board_id=board.id,
-        can_read=False,
-        can_write=True,
+    session = _FakeSession(
+        exec_results=[
+            _FakeExecResult(
+                all_values=[(readable.id, True, False), (writable.id, True, True)],
+            ),
+        ],
     )
-    session2 = _FakeSession(exec_results=[_FakeExecResult(first_value=access2)])
-    assert (
-        await organizations.has_board_access(
-            session2,
-            member=member,
-            board=board,
-            write=False,
-        )
-        is True
+    assert await organizations.has_board_access(session, member=member, board=readable, write=False)
+    assert not await organizations.has_board_access(
+        session, member=member, board=readable, write=True
+    )
+    assert set(
+        await organizations.list_accessible_board_ids(session, member=member, write=True)
+    ) == {writable.id}
+    # A single access query served every check, and later sessions hit the shared cache.
+    assert session.exec_results == []
+    assert await organizations.has_board_access(
+        _FakeSession(exec_results=[]), member=member, board=writable, write=True
     )
 
-    access3 = OrganizationBoardAccess(
-        organization_member_id=member.id,
-        board_id=board.id,
-        can_read=True,
-        can_write=False,
+    await organizations.apply_member_access_update(
+        _FakeSession(exec_results=[]),
+        member=member,
+        update=OrganizationMemberAccessUpdate(
+            all_boards_read=False,
+            all_boards_write=False,
+            board_access=[],
+        ),
     )
-    session3 = _FakeSession(exec_results=[_FakeExecResult(first_value=access3)])
-    assert (
-        await organizations.has_board_access(
-            session3,
-            member=member,
-            board=board,
-            write=True,
-        )
-        is False
+    reloaded = _FakeSession(exec_results=[_FakeExecResult(all_values=[])])
+    assert not await organizations.has_board_access(
+        reloaded, member=member, board=writable, write=True
     )
+    assert reloaded.exec_results == []
+
+
+@pytest.mark.asyncio
+async def test_board_access_snapshot_ignored_when_member_flags_change() -> None:
+    org_id = uuid4()
+    member = OrganizationMember(
+        id=uuid4(),
+        organization_id=org_id,
+        user_id=uuid4(),
+        role="member",
+        all_boards_read=True,
+    )
+    board_id = uuid4()
+    session = _FakeSession(exec_results=[_FakeExecResult(all_values=[board_id]), []])
+    assert await organizations.list_accessible_board_ids(session, member=member, write=False) == [
+        board_id
+    ]
+
+    member.all_boards_read = False
+    session = _FakeSession(exec_results=[_FakeExecResult(all_values=[])])
+    assert await organizations.list_accessible_board_ids(session, member=member, write=False) == []
 
 
 @pytest.mark.asyncio
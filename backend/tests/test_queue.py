@@ -3,11 +3,20 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
+from typing import cast
 
 import pytest
+import redis
 
+from app.services import queue
 from app.services.queue import QueuedTask, dequeue_task, enqueue_task, requeue_if_failed
 
 
@@ -103,3 +112,239 @@ def test_dequeue_task_tolerates_legacy_payload_without_envelope(
     assert task.task_type == "legacy"
     assert task.attempts == 2
     assert task.payload["board_id"] == "6f3ab1ec-3ef6-4f4d-a6a7-e2d6e5d6f7a8"
+
+
+def _scheduled_task(name: str) -> QueuedTask:
+    return QueuedTask(
+        task_type="generic-task", payload={"name": name}, created_at=datetime.now(UTC)
+    )
+
+
+def test_queue_clients_share_one_connection_pool_per_url(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(queue, "_pools", {})
+
+    first = queue._redis_client("redis://queue-a:6379/0")
+
+    assert queue._redis_client("redis://queue-a:6379/0").connection_pool is first.connection_pool
+    assert queue._redis_client("redis://queue-b:6379/0").connection_pool is not (
+        first.connection_pool
+    )
+
+
+# The tests below need a real Redis (scripts and blocking pops); they use a
+# dedicated database on QUEUE_TEST_REDIS_URL and are skipped when it is unreachable.
+_TEST_REDIS_URL = os.environ.get("QUEUE_TEST_REDIS_URL", "redis://localhost:6379/15")
+
+
+@pytest.fixture
+def redis_url(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
+    client = redis.Redis.from_url(_TEST_REDIS_URL, socket_connect_timeout=0.5)
+    try:
+        client.ping()
+    except redis.RedisError:
+        pytest.skip(f"Redis not reachable at {_TEST_REDIS_URL}")
+    client.flushdb()
+    monkeypatch.setattr(queue, "_pools", {})
+    yield _TEST_REDIS_URL
+    client.flushdb()
+    client.close()
+
+
+def test_drain_moves_ready_tasks_in_one_call_and_reports_next_due(redis_url: str) -> None:
+    client = queue._redis_client(redis_url)
+    now = time.time()
+    for name, due in (("ready-1", now - 2), ("ready-2", now - 1), ("later", now + 30)):
+        client.zadd("generic-queue:scheduled", {_scheduled_task(name).to_json(): due})
+
+    next_delay = queue._drain_ready_scheduled_tasks(client, "generic-queue")
+
+    assert next_delay is not None and 29 < next_delay <= 30
+    names = [
+        json.loads(raw)["payload"]["name"]
+        for raw in cast(list[bytes], client.lrange("generic-queue", 0, -1))
+    ]
+    assert names == ["ready-2", "ready-1"]
+    assert client.zcard("generic-queue:scheduled") == 1
+
+
+def test_drain_caps_batch_and_reports_remaining_ready_as_due_now(redis_url: str) -> None:
+    client = queue._redis_client(redis_url)
+    now = time.time()
+    client.zadd(
+        "generic-queue:scheduled",
+        {_scheduled_task(f"t{index}").to_json(): now - 10 + index for index in range(5)},
+    )
+
+    assert queue._drain_ready_scheduled_tasks(client, "generic-queue", max_items=3) == 0.0
+    assert client.llen("generic-queue") == 3
+    assert queue._drain_ready_scheduled_tasks(client, "generic-queue", max_items=3) is None
+    assert client.llen("generic-queue") == 5
+
+
+@pytest.mark.asyncio
+async def test_async_dequeue_promotes_ready_scheduled_tasks(redis_url: str) -> None:
+    assert queue._schedule_for_later(
+        _scheduled_task("retry"),
+        "generic-queue",
+        0.2,
+        redis_url=redis_url,
+    )
+    try:
+        assert await queue.dequeue_task_async("generic-queue", redis_url=redis_url) is None
+        # The blocking pop waits until the retry is due, then the next call promotes it.
+        task = None
+        for _ in range(3):
+            task = await queue.dequeue_task_async(
+                "generic-queue",
+                redis_url=redis_url,
+                block=True,
+                block_timeout=2,
+            )
+            if task is not None:
+                break
+    finally:
+        await queue.close_async_redis_clients()
+
+    assert task is not None
+    assert task.payload == {"name": "retry"}
+
+
+def test_concurrent_workers_promote_scheduled_tasks_without_duplicates_or_losses(
+    redis_url: str,
+) -> None:
+    client = queue._redis_client(redis_url)
+    now = time.time()
+    names = [f"task-{index}" for index in range(2_000)]
+    # Spread due times over the next half second so workers keep racing to promote.
+    client.zadd(
+        "stress-queue:scheduled",
+        {
+            _scheduled_task(name).to_json(): now - 0.5 + index / 2_000
+            for index, name in enumerate(names)
+        },
+    )
+    seen: list[str] = []
+    seen_lock = threading.Lock()
+    deadline = time.monotonic() + 20
+
+    def _worker() -> None:
+        while time.monotonic() < deadline:
+            with seen_lock:
+                if len(seen) >= len(names):
+                    return
+            task = queue.dequeue_task(
+                "stress-queue",
+                redis_url=redis_url,
+                block=True,
+                block_timeout=0.1,
+            )
+            if task is not None:
+                with seen_lock:
+                    seen.append(str(task.payload["name"]))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for future in [executor.submit(_worker) for _ in range(8)]:
+            future.result()
+
+    assert len(seen) == len(names)
+    assert sorted(seen) == sorted(names)
+    assert client.zcard("stress-queue:scheduled") == 0
+    assert client.llen("stress-queue") == 0
+
+
+def _queued(name: str) -> QueuedTask:
+    return QueuedTask(
+        task_type="generic-task",
+        payload={"name": name},
+        created_at=datetime.now(UTC),
+    )
+
+
+def test_reliable_dequeue_holds_task_until_acked(redis_url: str) -> None:
+    client = queue._redis_client(redis_url)
+    assert enqueue_task(_queued("a"), "generic-queue", redis_url=redis_url)
+
+    task = dequeue_task("generic-queue", redis_url=redis_url, worker_id="w1", block=True)
+
+    assert task is not None
+    assert task.payload == {"name": "a"}
+    assert client.llen("generic-queue") == 0
+    assert client.llen("generic-queue:processing:w1") == 1
+    assert queue.ack_task(task, "generic-queue", worker_id="w1", redis_url=redis_url)
+    assert client.llen("generic-queue:processing:w1") == 0
+    assert not queue.ack_task(task, "generic-queue", worker_id="w1", redis_url=redis_url)
+
+
+@pytest.mark.asyncio
+async def test_tasks_of_a_worker_whose_heartbeat_expired_are_requeued_once(
+    redis_url: str,
+) -> None:
+    client = queue._redis_client(redis_url)
+    for name in ("old", "new", "other"):
+        assert enqueue_task(_queued(name), "generic-queue", redis_url=redis_url)
+    try:
+        await queue.heartbeat_async("generic-queue", "dead", ttl_seconds=0.1, redis_url=redis_url)
+        await queue.heartbeat_async("generic-queue", "alive", ttl_seconds=30, redis_url=redis_url)
+        held = [
+            await queue.dequeue_task_async("generic-queue", redis_url=redis_url, worker_id="dead")
+            for _ in range(2)
+        ]
+        alive = await queue.dequeue_task_async(
+            "generic-queue",
+            redis_url=redis_url,
+            worker_id="alive",
+        )
+        assert [task.payload["name"] for task in held if task] == ["old", "new"]
+        assert alive is not None
+
+        await asyncio.sleep(0.2)
+        requeued = await asyncio.gather(
+            *(
+                queue.requeue_orphaned_tasks_async("generic-queue", redis_url=redis_url)
+                for _ in range(4)
+            ),
+        )
+        retried = [
+            await queue.dequeue_task_async("generic-queue", redis_url=redis_url, worker_id="alive")
+            for _ in range(3)
+        ]
+    finally:
+        await queue.close_async_redis_clients()
+
+    assert sum(requeued) == 2
+    # Same envelopes (attempts untouched), oldest first; nothing else is left.
+    assert [(task.payload["name"], task.attempts) for task in retried if task] == [
+        ("old", 0),
+        ("new", 0),
+    ]
+    assert retried[2] is None
+    assert client.llen("generic-queue:processing:dead") == 0
+    assert client.llen("generic-queue:processing:alive") == 3
+    assert client.smembers("generic-queue:workers") == {b"alive"}
+
+
+@pytest.mark.asyncio
+async def test_release_worker_returns_unacked_tasks_and_unregisters(redis_url: str) -> None:
+    client = queue._redis_client(redis_url)
+    assert enqueue_task(_queued("a"), "generic-queue", redis_url=redis_url)
+    try:
+        await queue.heartbeat_async("generic-queue", "w1", ttl_seconds=30, redis_url=redis_url)
+        assert await queue.dequeue_task_async("generic-queue", redis_url=redis_url, worker_id="w1")
+
+        assert await queue.release_worker_async("generic-queue", "w1", redis_url=redis_url) == 1
+    finally:
+        await queue.close_async_redis_clients()
+
+    assert client.llen("generic-queue") == 1
+    assert client.exists("generic-queue:worker:w1") == 0
+    assert client.smembers("generic-queue:workers") == set()
+
+
+def test_reliable_dequeue_drops_undecodable_entries(redis_url: str) -> None:
+    client = queue._redis_client(redis_url)
+    client.lpush("generic-queue", "not json")
+
+    with pytest.raises(json.JSONDecodeError):
+        dequeue_task("generic-queue", redis_url=redis_url, worker_id="w1")
+
+    assert client.llen("generic-queue:processing:w1") == 0
@@ -0,0 +1,156 @@
+# ruff: noqa: INP001
+"""Queue worker concurrency, ordering and shutdown tests."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime
+
+import pytest
+
+from app.services import queue_worker
+from app.services.queue import QueuedTask
+
+
+def _task(board: str, index: int) -> QueuedTask:
+    return QueuedTask(
+        task_type="test",
+        payload={"board_id": board, "index": index},
+        created_at=datetime.now(UTC),
+    )
+
+
+class _Harness:
+    def __init__(self, tasks: list[QueuedTask], *, delay: float = 0.01) -> None:
+        self.pending = list(tasks)
+        self.delay = delay
+        self.started: list[tuple[str, int]] = []
+        self.finished: list[tuple[str, int]] = []
+        self.in_flight = 0
+        self.peak = 0
+        self.board_in_flight: dict[str, int] = {}
+
+    async def dequeue(self, *_args: object, **_kwargs: object) -> QueuedTask | None:
+        await asyncio.sleep(0)
+        return self.pending.pop(0) if self.pending else None
+
+    async def handle(self, task: QueuedTask) -> None:
+        item = (str(task.payload["board_id"]), int(task.payload["index"]))
+        board = item[0]
+        self.board_in_flight[board] = self.board_in_flight.get(board, 0) + 1
+        assert self.board_in_flight[board] == 1
+        self.started.append(item)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        self.board_in_flight[board] -= 1
+        self.finished.append(item)
+
+
+@pytest.fixture
+def harness(monkeypatch: pytest.MonkeyPatch) -> _Harness:
+    tasks = [_task(board, index) for index in range(4) for board in ("a", "b", "c", "d", "e")]
+    harness = _Harness(tasks)
+    monkeypatch.setattr(queue_worker, "dequeue_task_async", harness.dequeue)
+    monkeypatch.setitem(
+        queue_worker._TASK_HANDLERS,
+        "test",
+        queue_worker._TaskHandler(
+            handler=harness.handle,
+            attempts_to_delay=lambda _attempts: 0,
+            requeue=lambda _task, _delay: True,
+        ),
+    )
+    return harness
+
+
+@pytest.mark.asyncio
+async def test_flush_queue_runs_tasks_concurrently_in_per_board_order(harness: _Harness) -> None:
+    processed = await queue_worker.flush_queue(concurrency=3)
+
+    assert processed == 20
+    assert harness.peak == 3
+    for board in ("a", "b", "c", "d", "e"):
+        assert [index for name, index in harness.started if name == board] == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_flush_queue_with_concurrency_one_is_sequential(harness: _Harness) -> None:
+    assert await queue_worker.flush_queue(concurrency=1) == 20
+    assert harness.peak == 1
+    assert harness.started == harness.finished
+
+
+@pytest.mark.asyncio
+async def test_stop_finishes_in_flight_tasks_without_taking_new_ones(harness: _Harness) -> None:
+    harness.delay = 0.05
+    stop = asyncio.Event()
+    worker = asyncio.create_task(queue_worker.flush_queue(block=True, concurrency=4, stop=stop))
+    while len(harness.started) < 4:
+        await asyncio.sleep(0.005)
+    stop.set()
+
+    processed = await worker
+
+    assert processed == len(harness.finished) == len(harness.started)
+    assert sorted(harness.started) == sorted(harness.finished)
+    assert len(harness.pending) == 20 - processed
+    assert processed < 20
+
+
+def test_ordering_key_prefers_agent_session_over_board() -> None:
+    task = QueuedTask(
+        task_type="test",
+        payload={"board_id": "b", "session_key": "agent:x:main"},
+        created_at=datetime.now(UTC),
+    )
+
+    assert queue_worker._ordering_key(task) == "session_key:agent:x:main"
+    assert queue_worker._ordering_key(_task("b", 0)) == "board_id:b"
+    assert (
+        queue_worker._ordering_key(
+            QueuedTask(task_type="test", payload={}, created_at=datetime.now(UTC)),
+        )
+        is None
+    )
+
+
+@pytest.mark.asyncio
+async def test_reliable_worker_acks_handled_tasks_but_not_ones_it_failed_to_requeue(
+    harness: _Harness,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    acked: list[int] = []
+
+    async def _ack(task: QueuedTask, queue_name: str, **kwargs: object) -> bool:
+        assert kwargs["worker_id"] == "w1"
+        acked.append(int(task.payload["index"]))
+        return True
+
+    async def _handle(task: QueuedTask) -> None:
+        if task.payload["board_id"] != "a":
+            return
+        raise RuntimeError("gateway down")
+
+    def _requeue(task: QueuedTask, _delay: float) -> bool:
+        if task.payload["index"] == 0:
+            return True
+        raise RuntimeError("redis down")
+
+    harness.pending = [_task("a", 0), _task("a", 1), _task("b", 2)]
+    monkeypatch.setattr(queue_worker, "ack_task_async", _ack)
+    monkeypatch.setitem(
+        queue_worker._TASK_HANDLERS,
+        "test",
+        queue_worker._TaskHandler(
+            handler=_handle,
+            attempts_to_delay=lambda _attempts: 0,
+            requeue=_requeue,
+        ),
+    )
+
+    assert await queue_worker.flush_queue(concurrency=2, worker_id="w1") == 1
+
+    # Index 0 was requeued for retry and index 2 succeeded; index 1 stays held.
+    assert sorted(acked) == [0, 2]
@@ -0,0 +1,74 @@
+# ruff: noqa: INP001
+"""Stub gateway protocol and failure-injection tests."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import AsyncIterator
+
+import pytest
+import pytest_asyncio
+
+from app.services.openclaw.gateway_rpc import (
+    GatewayConfig,
+    OpenClawGatewayError,
+    close_gateway_connection_pool,
+    openclaw_call,
+    openclaw_connect_metadata,
+)
+from scripts.stub_gateway import StubGateway, StubGatewayOptions, serve_stub_gateway
+
+
+@pytest_asyncio.fixture
+async def stub() -> AsyncIterator[StubGateway]:
+    async with serve_stub_gateway(StubGatewayOptions(seed=1)) as gateway:
+        yield gateway
+    await close_gateway_connection_pool()
+
+
+def _config(stub: StubGateway) -> GatewayConfig:
+    return GatewayConfig(url=stub.url, disable_device_pairing=True)
+
+
+@pytest.mark.asyncio
+async def test_stub_serves_agent_lifecycle_methods(stub: StubGateway) -> None:
+    config = _config(stub)
+    hello = await openclaw_connect_metadata(config=config)
+    assert isinstance(hello, dict)
+    assert hello["server"]["version"]
+
+    await openclaw_call("agents.create", {"name": "a1", "workspace": "/w/a1"}, config=config)
+    with pytest.raises(OpenClawGatewayError, match="already exists"):
+        await openclaw_call("agents.create", {"name": "a1"}, config=config)
+    await openclaw_call(
+        "agents.files.set",
+        {"agentId": "a1", "name": "TOOLS.md", "content": "AUTH_TOKEN=t"},
+        config=config,
+    )
+    assert await openclaw_call(
+        "agents.files.get",
+        {"agentId": "a1", "name": "TOOLS.md"},
+        config=config,
+    ) == {"file": {"name": "TOOLS.md", "content": "AUTH_TOKEN=t"}}
+
+    config_payload = await openclaw_call("config.get", config=config)
+    assert isinstance(config_payload, dict)
+    await openclaw_call(
+        "config.patch",
+        {"raw": json.dumps({"agents": {"list": [{"id": "a1"}]}}), "baseHash": "stale"},
+        config=config,
+    )
+    assert stub.config == {"agents": {"list": [{"id": "a1"}]}}
+    with pytest.raises(OpenClawGatewayError, match="unknown method"):
+        await openclaw_call("nope", config=config)
+    assert stub.stats.connections == 2
+    assert stub.stats.requests["agents.create"] == 2
+
+
+@pytest.mark.asyncio
+async def test_stub_injects_rpc_failures(stub: StubGateway) -> None:
+    stub.options.failure_rate = 1.0
+
+    with pytest.raises(OpenClawGatewayError, match="injected failure: health"):
+        await openclaw_call("health", config=_config(stub))
+    assert stub.stats.injected_failures == 1
@@ -0,0 +1,166 @@
+# ruff: noqa: INP001
+"""Queued task comment notification tests."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+from typing import Any
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app.services.task_comment_notifications as notifications
+from app.core.config import settings
+from app.models.agents import Agent
+from app.models.boards import Board
+from app.models.gateways import Gateway
+from app.models.organizations import Organization
+from app.services.openclaw.gateway_dispatch import GatewayDispatchService
+from app.services.openclaw.gateway_rpc import OpenClawGatewayError
+from app.services.queue import dequeue_task
+from app.services.queue_worker import _TASK_HANDLERS
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.values: list[str] = []
+        self.scheduled: dict[str, float] = {}
+
+    def lpush(self, key: str, value: str) -> None:
+        del key
+        self.values.insert(0, value)
+
+    def rpop(self, key: str) -> str | None:
+        del key
+        return self.values.pop() if self.values else None
+
+    def zadd(self, key: str, mapping: dict[str, float]) -> None:
+        del key
+        self.scheduled.update(mapping)
+
+    def zrangebyscore(self, *_args: object, **_kwargs: object) -> list[object]:
+        return []
+
+
+@pytest.fixture
+def fake_redis(monkeypatch: pytest.MonkeyPatch) -> _FakeRedis:
+    fake = _FakeRedis()
+    monkeypatch.setattr("app.services.queue._redis_client", lambda **_kwargs: fake)
+    return fake
+
+
+@pytest_asyncio.fixture
+async def engine(monkeypatch: pytest.MonkeyPatch) -> AsyncIterator[AsyncEngine]:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.connect() as conn, conn.begin():
+        await conn.run_sync(SQLModel.metadata.create_all)
+    monkeypatch.setattr(
+        notifications,
+        "async_session_maker",
+        async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+    )
+    yield engine
+    await engine.dispose()
+
+
+async def _seed(engine: AsyncEngine) -> tuple[Board, list[Agent]]:
+    org = Organization(id=uuid4(), name="org")
+    gateway = Gateway(
+        id=uuid4(), organization_id=org.id, name="g", url="ws://g", workspace_root="/w"
+    )
+    board = Board(id=uuid4(), organization_id=org.id, gateway_id=gateway.id, name="b", slug="b")
+    agents = [
+        Agent(
+            id=uuid4(),
+            board_id=board.id,
+            gateway_id=gateway.id,
+            name=f"agent-{index}",
+            openclaw_session_id=f"agent:{index}:main",
+        )
+        for index in range(3)
+    ]
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add_all([org, gateway, board, *agents])
+        await session.commit()
+    return board, agents
+
+
+def test_notification_roundtrips_through_the_queue(fake_redis: _FakeRedis) -> None:
+    item = notifications.QueuedTaskCommentNotification(
+        board_id=uuid4(),
+        task_id=uuid4(),
+        messages={uuid4(): "NEW TASK COMMENT", uuid4(): "TASK MENTION"},
+        created_at=datetime.now(UTC),
+    )
+
+    assert notifications.enqueue_task_comment_notification(item)
+    task = dequeue_task(settings.rq_queue_name)
+
+    assert task is not None
+    assert notifications.TASK_TYPE in _TASK_HANDLERS
+    assert notifications.decode_task_comment_notification(task) == item
+
+
+@pytest.mark.asyncio
+async def test_worker_sends_concurrently_and_requeues_only_failed_targets(
+    engine: AsyncEngine,
+    fake_redis: _FakeRedis,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    board, agents = await _seed(engine)
+    in_flight = 0
+    peak = 0
+    sent: list[str] = []
+
+    async def _fake_try_send(
+        self: GatewayDispatchService,
+        *,
+        session_key: str,
+        message: str,
+        **_kwargs: Any,
+    ) -> OpenClawGatewayError | None:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if session_key == agents[1].openclaw_session_id:
+            return OpenClawGatewayError("gateway unavailable")
+        sent.append(message)
+        return None
+
+    tokens: list[tuple[str, str | None]] = []
+
+    async def _fake_acquire(gateway_id: str, *, session_key: str | None = None) -> float:
+        tokens.append((gateway_id, session_key))
+        return 0.0
+
+    monkeypatch.setattr(GatewayDispatchService, "try_send_agent_message", _fake_try_send)
+    monkeypatch.setattr(notifications, "acquire_dispatch_token", _fake_acquire)
+    item = notifications.QueuedTaskCommentNotification(
+        board_id=board.id,
+        task_id=uuid4(),
+        messages={agent.id: f"hello {agent.name}" for agent in agents},
+        created_at=datetime.now(UTC),
+    )
+
+    await _TASK_HANDLERS[notifications.TASK_TYPE].handler(
+        notifications._task_from_payload(item),
+    )
+
+    assert peak == 3
+    assert sorted(sent) == ["hello agent-0", "hello agent-2"]
+    assert sorted(tokens) == sorted(
+        (str(board.gateway_id), agent.openclaw_session_id) for agent in agents
+    )
+    [raw] = fake_redis.scheduled
+    requeued = json.loads(raw)
+    assert requeued["attempts"] == 1
+    assert requeued["payload"]["messages"] == {str(agents[1].id): "hello agent-1"}
@@ -157,7 +157,6 @@ async def test_dispatch_flush_processes_items_and_throttles(
         processed.append(item.payload_id)
 
     monkeypatch.setattr(dispatch, "_process_single_item", _process)
-    monkeypatch.setattr(dispatch.settings, "rq_dispatch_throttle_seconds", 0)
     monkeypatch.setattr(dispatch.time, "sleep", lambda seconds: throttles.append(seconds))
 
     await dispatch.flush_webhook_delivery_queue()
@@ -182,7 +181,6 @@ async def test_dispatch_flush_requeues_on_process_error(monkeypatch: pytest.Monk
 
     monkeypatch.setattr(dispatch, "_process_single_item", _process)
     monkeypatch.setattr(dispatch, "requeue_if_failed", _requeue)
-    monkeypatch.setattr(dispatch.settings, "rq_dispatch_throttle_seconds", 0)
     monkeypatch.setattr(dispatch.time, "sleep", lambda seconds: None)
 
     await dispatch.flush_webhook_delivery_queue()
@@ -214,7 +212,6 @@ async def test_dispatch_flush_recovers_from_dequeue_error(monkeypatch: pytest.Mo
         processed += 1
 
     monkeypatch.setattr(dispatch, "_process_single_item", _process)
-    monkeypatch.setattr(dispatch.settings, "rq_dispatch_throttle_seconds", 0)
     monkeypatch.setattr(dispatch.time, "sleep", lambda seconds: None)
 
     await dispatch.flush_webhook_delivery_queue()
@@ -237,6 +234,11 @@ async def test_notify_target_agent_prefers_mapped_agent(monkeypatch: pytest.Monk
         openclaw_session_id="lead:session",
     )
     sent: list[dict[str, str]] = []
+    tokens: list[tuple[str, str | None]] = []
+
+    async def _fake_acquire(gateway_id: str, *, session_key: str | None = None) -> float:
+        tokens.append((gateway_id, session_key))
+        return 0.0
 
     class _FakeAgentObjects:
         def filter_by(self, **kwargs: object) -> _FakeAgentObjects:
@@ -257,7 +259,7 @@ async def test_notify_target_agent_prefers_mapped_agent(monkeypatch: pytest.Monk
 
         async def optional_gateway_config_for_board(self, board: object) -> object:
             del board
-            return object()
+            return SimpleNamespace(gateway_id="gateway-1", url="ws://gateway")
 
         async def try_send_agent_message(
             self,
@@ -273,6 +275,7 @@ async def test_notify_target_agent_prefers_mapped_agent(monkeypatch: pytest.Monk
 
     monkeypatch.setattr(dispatch.Agent, "objects", _FakeAgentObjects())
     monkeypatch.setattr(dispatch, "GatewayDispatchService", _FakeDispatchService)
+    monkeypatch.setattr(dispatch, "acquire_dispatch_token", _fake_acquire)
 
     webhook = SimpleNamespace(id=uuid4(), description="desc", agent_id=agent_id)
     board = SimpleNamespace(id=uuid4(), name="Board")
@@ -286,6 +289,7 @@ async def test_notify_target_agent_prefers_mapped_agent(monkeypatch: pytest.Monk
     )
 
     assert sent == [{"session_key": "mapped:session", "agent_name": "Mapped Agent"}]
+    assert tokens == [("gateway-1", "mapped:session")]
 
 
 @pytest.mark.asyncio
@@ -296,6 +300,11 @@ async def test_notify_target_agent_falls_back_to_lead(monkeypatch: pytest.Monkey
         openclaw_session_id="lead:session",
     )
     sent: list[dict[str, str]] = []
+    tokens: list[tuple[str, str | None]] = []
+
+    async def _fake_acquire(gateway_id: str, *, session_key: str | None = None) -> float:
+        tokens.append((gateway_id, session_key))
+        return 0.0
 
     class _FakeAgentObjects:
         def filter_by(self, **kwargs: object) -> _FakeAgentObjects:
@@ -314,7 +323,7 @@ async def test_notify_target_agent_falls_back_to_lead(monkeypatch: pytest.Monkey
 
         async def optional_gateway_config_for_board(self, board: object) -> object:
             del board
-            return object()
+            return SimpleNamespace(gateway_id="gateway-1", url="ws://gateway")
 
         async def try_send_agent_message(
             self,
@@ -330,6 +339,7 @@ async def test_notify_target_agent_falls_back_to_lead(monkeypatch: pytest.Monkey
 
     monkeypatch.setattr(dispatch.Agent, "objects", _FakeAgentObjects())
     monkeypatch.setattr(dispatch, "GatewayDispatchService", _FakeDispatchService)
+    monkeypatch.setattr(dispatch, "acquire_dispatch_token", _fake_acquire)
 
     webhook = SimpleNamespace(id=uuid4(), description="desc", agent_id=None)
     board = SimpleNamespace(id=uuid4(), name="Board")
@@ -0,0 +1,17 @@
+/**
+ * Generated by orval v8.3.0 🍺
+ * Do not edit manually.
+ * Mission Control API
+ * OpenAPI spec version: 0.1.0
+ */
+import type { GatewayCircuitStatusState } from "./gatewayCircuitStatusState";
+
+/**
+ * Circuit breaker state for a gateway as seen by this API process.
+ */
+export interface GatewayCircuitStatus {
+  state: GatewayCircuitStatusState;
+  failure_rate: number;
+  window_calls: number;
+  retry_after_seconds?: number | null;
+}
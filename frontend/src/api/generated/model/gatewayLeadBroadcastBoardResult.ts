@@ -17,6 +17,8 @@ export interface GatewayLeadBroadcastBoardResult {
   lead_agent_name?: string | null;
   /** Whether this board delivery succeeded. */
   ok?: boolean;
+  /** Whether this board hit the per-board broadcast timeout. */
+  timed_out?: boolean;
   /** Failure reason if this board failed. */
   error?: string | null;
 }
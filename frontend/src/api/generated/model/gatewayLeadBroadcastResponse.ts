@@ -16,5 +16,7 @@ export interface GatewayLeadBroadcastResponse {
   sent?: number;
   /** Number of boards that failed messaging. */
   failed?: number;
+  /** Number of failed boards that hit the per-board timeout (included in failed). */
+  timed_out?: number;
   results?: GatewayLeadBroadcastBoardResult[];
 }
@@ -16,5 +16,8 @@ export interface GatewayTemplatesSyncResult {
   agents_updated: number;
   agents_skipped: number;
   main_updated: boolean;
+  files_written?: number;
+  files_skipped?: number;
+  files_deleted?: number;
   errors?: GatewayTemplatesSyncError[];
 }
@@ -87,6 +87,8 @@ export * from "./dashboardWipRangeSeries";
 export * from "./dashboardWipRangeSeriesBucket";
 export * from "./dashboardWipRangeSeriesRange";
 export * from "./dashboardWipSeriesSet";
+export * from "./gatewayCircuitStatus";
+export * from "./gatewayCircuitStatusState";
 export * from "./gatewayCommandsResponse";
 export * from "./gatewayCreate";
 export * from "./gatewayLeadBroadcastBoardResult";